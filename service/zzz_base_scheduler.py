@@ -1,5 +1,6 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from zzz_syn_battle_service import SynBattle
+from zzz_save_battle_class import collect_battle_blobs
 import asyncio
 
 # 创建后台调度器
@@ -9,6 +10,9 @@ syn_battle = SynBattle()
 # 添加任务，每60秒执行一次
 scheduler.add_job(syn_battle.fetch_data, 'interval', seconds=60)
 
+# 每天清理一次没有被引用的配置文件
+scheduler.add_job(collect_battle_blobs, 'interval', hours=24)
+
 # 启动调度器
 scheduler.start()
 
@@ -0,0 +1,163 @@
+"""
+共享配队服务的压力测试 使用本地 sqlite 数据库 不需要 MySQL
+
+python zzz_battle_load_test.py --rows 10000 --requests 2000 --concurrency 16
+
+依次测试 旧接口 /getBattleInfo (全量) 、 /listBattleInfo 第一页 、 翻页 、 搜索 、 带 If-None-Match 的 304
+以及 上传 (内容寻址存储去重) 、 下载 原文件 / gzip / 304 / 范围请求 、 垃圾回收
+输出每个场景的 requests/sec 和 p50/p99 延迟
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+
+def prepare_database(temp_dir, rows):
+    """ 在导入服务之前指定数据库和文件目录 并写入测试数据 """
+    os.environ["ZZZ_DATABASE_URI"] = f"sqlite:///{os.path.join(temp_dir, 'battle.db')}"
+    os.environ["ZZZ_BLOB_ROOT"] = os.path.join(temp_dir, "blob")
+
+    from zzz_data_model import BattleInfo, session_scope
+
+    start = datetime(2024, 1, 1)
+    with session_scope() as session:
+        session.bulk_save_objects([
+            BattleInfo(
+                battle_name=f"battle_{i}",
+                battle_url=f"battle/battle_{i}.yml",
+                creation_name=f"user_{i % 100}",
+                creation_date=start + timedelta(minutes=i),
+            )
+            for i in range(rows)
+        ])
+
+
+def run_scenario(name, send, total, concurrency):
+    """ 多个线程并发调用 send 统计吞吐和延迟 """
+    from fastapi.testclient import TestClient
+    from zzz_shared_battle_service import app
+
+    local = threading.local()
+    cost_list = []
+    lock = threading.Lock()
+
+    def _one(idx):
+        if not hasattr(local, "client"):
+            local.client = TestClient(app)
+        t1 = time.perf_counter()
+        send(local.client, idx)
+        cost = time.perf_counter() - t1
+        with lock:
+            cost_list.append(cost)
+
+    t1 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(_one, range(total)))
+    total_cost = time.perf_counter() - t1
+
+    cost_list.sort()
+    p50 = statistics.median(cost_list) * 1000
+    p99 = cost_list[min(len(cost_list) - 1, int(len(cost_list) * 0.99))] * 1000
+    print(f"{name:<12} {total / total_cost:>8.1f} req/s  p50 {p50:>7.2f}ms  p99 {p99:>7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        prepare_database(temp_dir, args.rows)
+
+        from fastapi.testclient import TestClient
+        from zzz_shared_battle_service import app
+
+        client = TestClient(app)
+        first_page = client.get("/listBattleInfo").json()
+        cursor_list = [None]
+        while len(cursor_list) < 20 and first_page["next_cursor"] is not None:
+            cursor_list.append(first_page["next_cursor"])
+            first_page = client.get("/listBattleInfo", params={"cursor": first_page["next_cursor"]}).json()
+        etag = client.get("/listBattleInfo").headers["ETag"]
+
+        def _check(response, status_code=200):
+            if response.status_code != status_code:
+                raise RuntimeError(f"{response.status_code} {response.text}")
+
+        # 全量接口每次返回全部数据 请求数少一些
+        run_scenario("全量", lambda c, i: _check(c.post("/getBattleInfo")),
+                     max(1, args.requests // 20), args.concurrency)
+        run_scenario("第一页", lambda c, i: _check(c.get("/listBattleInfo")),
+                     args.requests, args.concurrency)
+        run_scenario("翻页", lambda c, i: _check(c.get("/listBattleInfo", params={"cursor": cursor_list[i % len(cursor_list)]})),
+                     args.requests, args.concurrency)
+        run_scenario("搜索", lambda c, i: _check(c.get("/listBattleInfo", params={"keyword": f"user_{i % 100}"})),
+                     args.requests, args.concurrency)
+        run_scenario("304", lambda c, i: _check(c.get("/listBattleInfo", headers={"If-None-Match": etag}), 304),
+                     args.requests, args.concurrency)
+
+        run_blob_scenarios(client, args)
+
+
+def run_blob_scenarios(client, args):
+    """ 上传和下载配置文件 并检查去重和垃圾回收 """
+    from zzz_blob_store import blob_store
+    from zzz_data_model import get_battle_by_name
+    from zzz_save_battle_class import collect_battle_blobs
+
+    # 8 种不同的内容 每种上传多次 只应该保存 8 个文件
+    content_list = [
+        ("\n".join(f"- name: action_{j}\n  key: attack_{i}\n  duration: 0.{j}" for j in range(50)) + "\n").encode("utf-8")
+        for i in range(8)
+    ]
+
+    def _upload(c, i, content_idx=None):
+        content = content_list[i % len(content_list) if content_idx is None else content_idx]
+        response = c.post("/uploadBattleInfo",
+                          params={"battle_name": f"upload_{i}", "creation_name": "load_test"},
+                          files={"file": (f"upload_{i}.yml", content)})
+        if response.status_code != 200:
+            raise RuntimeError(f"{response.status_code} {response.text}")
+
+    upload_cnt = max(len(content_list), args.requests // 10)
+    run_scenario("上传", _upload, upload_cnt, args.concurrency)
+    blob_cnt = len(list(blob_store.iter_digests()))
+    print(f"上传 {upload_cnt} 个配置 保存了 {blob_cnt} 个文件 (不同内容 {len(content_list)} 个)")
+
+    battle = get_battle_by_name("upload_0")
+    url = f"/downloadBattleInfo/{battle.id}"
+    identity = client.get(url, headers={"Accept-Encoding": "identity"})
+    gzipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+    print(f"下载 原文件 {len(identity.content)} 字节 gzip {gzipped.headers.get('content-length')} 字节 "
+          f"内容一致 {gzipped.content == identity.content == content_list[0]}")
+
+    def _check(response, status_code):
+        if response.status_code != status_code:
+            raise RuntimeError(f"{response.status_code} {response.text}")
+
+    etag = identity.headers["ETag"]
+    run_scenario("下载", lambda c, i: _check(c.get(url, headers={"Accept-Encoding": "identity"}), 200),
+                 args.requests, args.concurrency)
+    run_scenario("下载gzip", lambda c, i: _check(c.get(url, headers={"Accept-Encoding": "gzip"}), 200),
+                 args.requests, args.concurrency)
+    run_scenario("下载304", lambda c, i: _check(c.get(url, headers={"Accept-Encoding": "identity", "If-None-Match": etag}), 304),
+                 args.requests, args.concurrency)
+    run_scenario("范围请求", lambda c, i: _check(c.get(url, headers={"Range": "bytes=0-99"}), 206),
+                 args.requests, args.concurrency)
+
+    # 把所有配置都改成第一种内容 其余文件没有被引用 超过保留时间后被清理
+    for i in range(1, upload_cnt):
+        _upload(client, i, content_idx=0)
+    removed = collect_battle_blobs(grace_seconds=0)
+    print(f"垃圾回收 删除 {removed} 个文件 剩余 {len(list(blob_store.iter_digests()))} 个")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import contextlib
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+
+try:
+    import brotli
+except ImportError:  # brotli 是可选依赖 没有安装时只提供 gzip
+    brotli = None
+
+# 读写文件的块大小
+CHUNK_SIZE = 64 * 1024
+
+# 单个文件的大小上限 配队文件只是几 KB 的 YAML
+MAX_BLOB_SIZE = int(os.environ.get("ZZZ_BLOB_MAX_SIZE", str(1024 * 1024)))
+
+# 支持的压缩格式 按优先级排列 {Content-Encoding: 文件后缀}
+ENCODING_SUFFIX = {"br": ".br", "gzip": ".gz"}
+
+
+class BlobStore:
+    """
+    按内容寻址的本地文件存储
+    文件以 sha256 命名 放在 {root}/{前2位}/{3-4位}/ 目录下 相同内容的上传只保存一份
+    写入时同时保存 gzip / brotli 压缩后的副本 下载时不需要再压缩
+    """
+
+    def __init__(self, root, max_size=MAX_BLOB_SIZE):
+        self.root = root
+        self.max_size = max_size
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def path(self, digest, encoding=None):
+        """ 文件路径 encoding 为 br / gzip 时返回对应压缩副本的路径 """
+        if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+            raise ValueError(f"文件哈希不正确: {digest}")
+        file_path = os.path.join(self.root, digest[:2], digest[2:4], digest)
+        if encoding is not None:
+            file_path += ENCODING_SUFFIX[encoding]
+        return file_path
+
+    def exists(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def put_chunks(self, chunks, validate=None):
+        """
+        边写入临时文件边计算哈希 再移动到内容对应的路径
+        已经有相同内容的文件时 丢弃临时文件 只刷新已有文件的修改时间 避免被垃圾回收
+
+        :param chunks: 文件内容的字节块
+        :param validate: 校验临时文件的函数 参数是临时文件路径 内容不正确时抛出 ValueError
+        :return: 文件的 sha256
+        """
+        sha256 = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_size:
+                        raise ValueError(f"文件超过大小上限 {self.max_size} 字节")
+                    sha256.update(chunk)
+                    f.write(chunk)
+
+            if validate is not None:
+                validate(tmp_path)
+
+            digest = sha256.hexdigest()
+            blob_path = self.path(digest)
+            if os.path.exists(blob_path):
+                os.utime(blob_path)
+                return digest
+
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            self._write_compressed(tmp_path, digest)
+            # 压缩副本先写好 最后移动原文件 有原文件就说明这个文件是完整的
+            os.replace(tmp_path, blob_path)
+            return digest
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def put_bytes(self, content, validate=None):
+        return self.put_chunks([content], validate=validate)
+
+    def _write_compressed(self, src_path, digest):
+        """ 保存压缩副本 压缩后没有变小的不保存 """
+        with open(src_path, "rb") as f:
+            content = f.read()
+
+        compressed = {"gzip": gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed["br"] = brotli.compress(content)
+
+        for encoding, data in compressed.items():
+            if len(data) >= len(content):
+                continue
+            fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path(digest, encoding))
+
+    def available_encodings(self, digest):
+        """ 已保存压缩副本的格式 按优先级排列 """
+        return [i for i in ENCODING_SUFFIX if os.path.exists(self.path(digest, i))]
+
+    def verify(self, digest):
+        """ 重新计算哈希 检查文件内容是否完整 """
+        sha256 = hashlib.sha256()
+        try:
+            with open(self.path(digest), "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    sha256.update(chunk)
+        except OSError:
+            return False
+        return sha256.hexdigest() == digest
+
+    def iter_digests(self):
+        """ 遍历所有文件的哈希 """
+        for first in os.listdir(self.root):
+            first_dir = os.path.join(self.root, first)
+            if len(first) != 2 or not os.path.isdir(first_dir):
+                continue
+            for second in os.listdir(first_dir):
+                second_dir = os.path.join(first_dir, second)
+                if not os.path.isdir(second_dir):
+                    continue
+                for name in os.listdir(second_dir):
+                    if len(name) == 64 and "." not in name:
+                        yield name
+
+    def delete(self, digest):
+        """ 删除文件和压缩副本 """
+        for encoding in [None, *ENCODING_SUFFIX]:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.path(digest, encoding))
+
+    def collect_garbage(self, referenced, grace_seconds=3600):
+        """
+        删除没有被引用的文件
+        刚写入还没有保存到数据库的文件也没有被引用 所以只删除超过 grace_seconds 没有被写入的文件
+
+        :param referenced: 数据库中引用的文件哈希
+        :param grace_seconds: 文件最后写入后多久才可以删除
+        :return: 删除的文件数量
+        """
+        now = time.time()
+        removed = 0
+        for digest in list(self.iter_digests()):
+            if digest in referenced:
+                continue
+            try:
+                if now - os.path.getmtime(self.path(digest)) < grace_seconds:
+                    continue
+            except FileNotFoundError:
+                continue
+            self.delete(digest)
+            removed += 1
+
+        # 写入中途退出留下的临时文件
+        for name in os.listdir(self.tmp_dir):
+            tmp_path = os.path.join(self.tmp_dir, name)
+            try:
+                if now - os.path.getmtime(tmp_path) >= grace_seconds:
+                    os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+
+        if removed > 0:
+            logging.info(f"[{datetime.now()}] 清理了 {removed} 个没有被引用的配置文件")
+        return removed
+
+
+# 配队文件的存储目录
+blob_store = BlobStore(os.environ.get("ZZZ_BLOB_ROOT", "blob"))
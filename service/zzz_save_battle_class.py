@@ -1,77 +1,78 @@
+import asyncio
 import os
 import yaml
 from datetime import datetime
 from fastapi import HTTPException
-from zzz_data_model import BattleInfo, get_db_session
+from zzz_blob_store import blob_store, CHUNK_SIZE
+from zzz_data_model import BattleInfo, session_scope, get_referenced_blob_hashes
 import requests
 
-# 初始化
-session = get_db_session()
-
 
 async def save_battle(battle_name: str, file, creation_name: str, creation_date: datetime):
-    try:
-        # 检查 battle_name 是否已存在
-        existing_battle = session.query(BattleInfo).filter_by(battle_name=battle_name).first()
-        if existing_battle:
-            # 删除旧的文件
-            if os.path.exists(existing_battle.battle_url):
-                os.remove(existing_battle.battle_url)
+    # 下载、写文件和数据库操作会阻塞 放到线程池中执行
+    if isinstance(file, str) and (file.startswith('http://') or file.startswith('https://')):
+        return await asyncio.to_thread(save_battle_from_url, battle_name, file, creation_name, creation_date)
 
-        # 如果file是URL，则下载文件
-        if isinstance(file, str) and (file.startswith('http://') or file.startswith('https://')):
-            response = requests.get(file)
-            if response.status_code != 200:
-                return HTTPException(status_code=400, detail='无法从提供的URL下载文件')
-            file_content = response.content
-            file_extension = '.yml'
-        else:
-            # 对于上传的文件
-            file_extension = os.path.splitext(file.filename)[1]
-            if file_extension.lower() not in ('.yml', '.yaml'):
-                return HTTPException(status_code=400, detail='文件格式不正确，只支持 YAML 文件')
-            file_content = await file.read()  # 使用 await 读取文件内容
+    # 对于上传的文件
+    file_extension = os.path.splitext(file.filename)[1]
+    if file_extension.lower() not in ('.yml', '.yaml'):
+        return HTTPException(status_code=400, detail='文件格式不正确，只支持 YAML 文件')
+    # 上传的文件已经由 FastAPI 暂存 分块读取 边读边计算哈希
+    chunks = iter(lambda: file.file.read(CHUNK_SIZE), b'')
+    return await asyncio.to_thread(save_battle_chunks, battle_name, chunks, creation_name, creation_date)
 
-        # 确保目录存在
-        if not os.path.exists("battle"):
-            os.makedirs("battle")
 
-        # 构建文件路径
-        file_path = f"battle/{battle_name}{file_extension}"
+def save_battle_from_url(battle_name: str, file_url: str, creation_name: str, creation_date: datetime):
+    # 如果file是URL，则下载文件
+    with requests.get(file_url, stream=True, timeout=30) as response:
+        if response.status_code != 200:
+            return HTTPException(status_code=400, detail='无法从提供的URL下载文件')
+        return save_battle_chunks(battle_name, response.iter_content(CHUNK_SIZE), creation_name, creation_date)
 
-        # 保存文件
-        with open(file_path, "wb") as f:
-            f.write(file_content)
 
-        # 尝试读取 YAML 文件
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                yaml.safe_load(f)
-        except Exception as e:
-            os.remove(file_path)
-            return HTTPException(status_code=400, detail=f"文件内容不正确，无法解析为 YAML：{e}")
+def validate_yaml(file_path: str):
+    # 尝试读取 YAML 文件
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            yaml.safe_load(f)
+    except Exception as e:
+        raise ValueError(f"文件内容不正确，无法解析为 YAML：{e}") from e
+
+
+def save_battle_chunks(battle_name: str, chunks, creation_name: str, creation_date: datetime):
+    # 保存到内容寻址存储 相同内容的配置只保存一份
+    try:
+        blob_hash = blob_store.put_chunks(chunks, validate=validate_yaml)
+    except ValueError as e:
+        return HTTPException(status_code=400, detail=str(e))
+
+    with session_scope() as session:
+        # 检查 battle_name 是否已存在
+        existing_battle = session.query(BattleInfo).filter_by(battle_name=battle_name).first()
 
         # 更新或插入新记录到数据库
         if existing_battle:
+            # 删除旧版按名称保存的文件 内容寻址存储中的旧文件可能被其他配置共用 由垃圾回收清理
+            if existing_battle.battle_url is not None and os.path.exists(existing_battle.battle_url):
+                os.remove(existing_battle.battle_url)
             # 更新现有记录
-            existing_battle.battle_url = file_path
+            existing_battle.battle_url = None
+            existing_battle.blob_hash = blob_hash
             existing_battle.creation_name = creation_name
             existing_battle.creation_date = creation_date
-            session.commit()
         else:
             # 插入新记录
             new_battle = BattleInfo(
                 battle_name=battle_name,
-                battle_url=file_path,
+                blob_hash=blob_hash,
                 creation_name=creation_name,
                 creation_date=creation_date
             )
             session.add(new_battle)
-            session.commit()
-    except:
-        session.rollback()
-        raise  # 可以选择抛出异常，以便调用者可以捕捉到错误
-    finally:
-        session.close()
 
     return HTTPException(status_code=200)
+
+
+def collect_battle_blobs(grace_seconds=3600):
+    # 清理没有被任何配置引用的文件
+    return blob_store.collect_garbage(get_referenced_blob_hashes(), grace_seconds=grace_seconds)
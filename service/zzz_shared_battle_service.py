@@ -1,20 +1,50 @@
-from fastapi import FastAPI, File, UploadFile, Query, HTTPException
+from fastapi import FastAPI, File, UploadFile, Query, HTTPException, Request, Response
 from fastapi.responses import FileResponse
-from zzz_data_model import get_battle_info, get_battle_url
+from zzz_data_model import get_battle_info, get_battle_url, list_battle_info, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from zzz_save_battle_class import save_battle
+from zzz_blob_store import blob_store
 from datetime import datetime
+from urllib.parse import quote
+import hashlib
+import json
 import os
 
 # 初始化 FastAPI 应用
 app = FastAPI()
 
 
-# 查询全部数据的接口
+# 查询全部数据的接口 旧版客户端使用
+# 数据库操作会阻塞 使用普通函数 由 FastAPI 放到线程池中执行
 @app.post("/getBattleInfo")
-async def read_battle_info():
+def read_battle_info():
     return {"data": get_battle_info(), "msg": "查询成功"}
 
 
+# 分页查询的接口 按上传时间倒序 支持按名称搜索
+# 响应带 ETag 客户端用 If-None-Match 重新请求时 数据没有变化则返回 304
+@app.get("/listBattleInfo")
+def list_battle_info_page(
+        request: Request,
+        cursor: str | None = Query(None, description="上一页返回的 next_cursor 为空时查询第一页"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="每页条数"),
+        keyword: str | None = Query(None, max_length=30, description="按配置名称或上传者名称搜索"),
+):
+    try:
+        data, next_cursor = list_battle_info(cursor=cursor, limit=limit, keyword=keyword)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    content = {"data": data, "next_cursor": next_cursor, "msg": "查询成功"}
+    body = json.dumps(content, ensure_ascii=False).encode("utf-8")
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag in [i.strip() for i in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 # 上传文件并处理的接口
 @app.post("/uploadBattleInfo")
 async def upload_battle_info(
@@ -27,16 +57,21 @@ async def upload_battle_info(
 
 # 下载文件的接口
 @app.get("/downloadBattleInfo/{bid}")
-async def download_battle_info(bid: int):
+def download_battle_info(bid: int, request: Request):
     # 根据ID查询数据
     battle_info = get_battle_url(bid)
 
     if not battle_info:
         return HTTPException(status_code=400, detail="数据不存在")
 
-    # 获取文件路径
+    if battle_info.blob_hash is not None:
+        if not blob_store.exists(battle_info.blob_hash):
+            return HTTPException(status_code=400, detail="文件不存在")
+        return blob_response(request, battle_info.blob_hash, f"{battle_info.battle_name}.yml")
+
+    # 旧版按名称保存的文件
     file_path = battle_info.battle_url
-    if not os.path.exists(file_path):
+    if file_path is None or not os.path.exists(file_path):
         return HTTPException(status_code=400, detail="文件不存在")
 
     # 返回文件响应
@@ -47,6 +82,98 @@ async def download_battle_info(bid: int):
     )
 
 
+def accepted_encodings(accept_encoding):
+    # 解析 Accept-Encoding 返回客户端接受的压缩格式 忽略 q=0 的格式
+    result = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0
+        if name != "" and q > 0:
+            result.add(name)
+    return result
+
+
+def parse_range(range_header, size):
+    # 解析单个字节范围 返回 (开始, 结束) 包含结束位置 不支持的格式返回 None 范围无效时抛出 ValueError
+    if not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start_str, _, end_str = range_header[6:].strip().partition("-")
+    try:
+        if start_str == "":
+            # bytes=-N 最后 N 个字节
+            length = int(end_str)
+            if length <= 0:
+                raise ValueError(range_header)
+            return max(0, size - length), size - 1
+        start = int(start_str)
+        end = int(end_str) if end_str != "" else size - 1
+    except ValueError as e:
+        raise ValueError(range_header) from e
+    if start >= size or end < start:
+        raise ValueError(range_header)
+    return start, min(end, size - 1)
+
+
+def blob_response(request: Request, blob_hash: str, filename: str):
+    """
+    返回内容寻址存储中的文件
+    文件名就是内容的哈希 直接作为强 ETag 客户端带 If-None-Match 时内容没有变化返回 304
+    客户端接受压缩时返回预先压缩的副本 请求范围时返回原文件的部分内容
+    """
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+        "Content-Disposition": f"attachment; filename*=utf-8''{quote(filename)}",
+    }
+
+    # 范围请求只针对原文件 If-Range 不匹配时返回完整文件
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header is not None and (if_range is None or if_range == f'"{blob_hash}"'):
+        with open(blob_store.path(blob_hash), "rb") as f:
+            content = f.read()
+        try:
+            byte_range = parse_range(range_header, len(content))
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{len(content)}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            headers["ETag"] = f'"{blob_hash}"'
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(content)}"
+            return Response(content=content[start:end + 1], status_code=206,
+                            media_type="application/x-yaml", headers=headers)
+
+    # 选择压缩格式 不同格式的内容不同 ETag 也不同
+    encoding = None
+    accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+    for i in blob_store.available_encodings(blob_hash):
+        if i in accepted:
+            encoding = i
+            break
+    etag = f'"{blob_hash}"' if encoding is None else f'"{blob_hash}-{encoding}"'
+    headers["ETag"] = etag
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag in [i.strip() for i in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    with open(blob_store.path(blob_hash, encoding), "rb") as f:
+        content = f.read()
+    return Response(content=content, media_type="application/x-yaml", headers=headers)
+
+
 # 运行应用
 if __name__ == "__main__":
     import uvicorn
@@ -41,7 +41,8 @@ class SynBattle:
                     creation_date = datetime.fromtimestamp(data['modify_time'])
                     file_name = file_name_tool(data['file_name'])
                     battle = get_battle_by_name(file_name)
-                    if (battle is None) or (battle.battle_url is None) or (creation_date > battle.creation_date):
+                    if (battle is None) or (battle.battle_url is None and battle.blob_hash is None) \
+                            or (creation_date > battle.creation_date):
                         logging.info(f"[{datetime.now()}] 发现配置【{data['file_name']}】存在差异，开始同步")
                         if clear_battle_info_table():
                             await self.getFileUrl(data['file_id'], data['busid'],
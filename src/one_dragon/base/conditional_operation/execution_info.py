@@ -1,3 +1,4 @@
+from collections.abc import Callable
 from functools import cached_property
 
 from one_dragon.base.conditional_operation.atomic_op import AtomicOp
@@ -10,12 +11,14 @@ class ExecutionInfo:
         self,
         op_list: list[AtomicOp],
         interrupt_cal_tree: StateCalNode | None = None,
+        interrupt_cal_func: Callable[[float], bool] | None = None,
     ):
         """
         保存触发操作的相关信息
         """
         self.trigger: str | None = None  # 触发器
         self.interrupt_cal_tree: StateCalNode | None = interrupt_cal_tree  # 打断状态判断树
+        self.interrupt_cal_func: Callable[[float], bool] | None = interrupt_cal_func  # 打断状态判断树编译后的判断函数
         self.priority: int | None = None  # 优先级 只能被高等级的打断；为None时可以被随意打断
 
         self.op_list: list[AtomicOp] = op_list  # 需要执行的指令列表
@@ -13,6 +13,8 @@ from one_dragon.base.conditional_operation.operation_executor import (
     OperationExecutor,
 )
 from one_dragon.base.conditional_operation.scene import Scene
+from one_dragon.base.conditional_operation.scene_wakeup import SceneWakeup
+from one_dragon.base.conditional_operation.state_cal_program import StateCalProgram
 from one_dragon.base.conditional_operation.state_record_service import StateRecordService
 from one_dragon.base.conditional_operation.state_recorder import StateRecord
 from one_dragon.thread.atomic_int import AtomicInt
@@ -46,6 +48,8 @@ class ConditionalOperator(ConditionalOperatorLoader):
 
         self.trigger_2_scene: dict[str, Scene] = {}  # 需要状态触发的场景处理
         self.normal_scene: Scene | None = None  # 不需要状态触发的场景处理
+        self.normal_scene_wakeup: SceneWakeup | None = None  # 不需要状态触发的场景的唤醒器
+        self.normal_scene_event_driven: bool = True  # 主循环由状态变化唤醒 False时按固定间隔轮询
         self.last_trigger_time: dict[int, float] = {}  # 各场景最后一次的触发时间
 
         self.is_running: bool = False  # 整体是否正在运行
@@ -77,18 +81,25 @@ class ConditionalOperator(ConditionalOperatorLoader):
         self.dispose()  # 先把旧的清除掉
         self.trigger_2_scene = {}
         self.normal_scene = None
+        self.normal_scene_wakeup = None
         self.last_trigger_time = {}
 
+        state_cal_program = StateCalProgram()  # 全部场景共用 结构相同的判断树只编译一次
         for scene in self.scenes:
             scene.build(
                 state_recorder_getter=self.state_record_service.get_state_recorder,
                 op_getter=self.get_atomic_op,
             )
+            scene.compile(state_cal_program)
             if len(scene.triggers) > 0:
                 for trigger in scene.triggers:
                     self.trigger_2_scene[trigger] = scene
             else:
                 self.normal_scene = scene
+                self.normal_scene_wakeup = SceneWakeup(
+                    scene,
+                    state_recorder_getter=self.state_record_service.get_state_recorder,
+                )
 
     def dispose(self) -> None:
         """
@@ -127,13 +138,19 @@ class ConditionalOperator(ConditionalOperatorLoader):
     def _normal_scene_loop(self) -> None:
         """
         主循环
+        事件驱动时 只在场景用到的状态变化、时间区间到期、其它场景结束时 才重新判断
         :return:
         """
         normal_scene_id = id(self.normal_scene)
+        wakeup = self.normal_scene_wakeup
+        wakeup.reset()
         while self.is_running:
             if self.running_executor_cnt.get() > 0:
                 # 有其它场景在运行 等待
-                time.sleep(0.02)
+                if self.normal_scene_event_driven:
+                    wakeup.wait(for_notify=True)
+                else:
+                    time.sleep(0.02)
                 continue
 
             # log.debug('开始等待新的主循环')
@@ -151,7 +168,13 @@ class ConditionalOperator(ConditionalOperatorLoader):
                 if past_time < self.normal_scene.interval_seconds:
                     to_sleep = self.normal_scene.interval_seconds - past_time
                 else:
-                    new_execution_info = self.normal_scene.match_execution(trigger_time)
+                    change_time = wakeup.take_change(trigger_time)
+                    if change_time is not None or not self.normal_scene_event_driven:
+                        new_execution_info = self.normal_scene.match_execution(trigger_time)
+                        wakeup.record_evaluation(new_execution_info is not None, trigger_time, change_time)
+                    else:  # 状态没有变化 结果不会变
+                        new_execution_info = None
+
                     if new_execution_info is not None:
                         log.debug(f'当前场景 主循环 当前条件 {new_execution_info.expr_display}')
                         new_execution_info.priority = self.normal_scene.priority
@@ -175,9 +198,13 @@ class ConditionalOperator(ConditionalOperatorLoader):
             if to_sleep is not None:
                 # 等待时间不能写在锁里 要尽快释放锁
                 time.sleep(to_sleep)
+            elif self.normal_scene_event_driven:  # 等待状态变化
+                wakeup.wait()
             else:  # 没有命中的状态 或者 提交执行了 那就自旋等待
                 time.sleep(0.02)
 
+        log.debug(f'主循环结束 {wakeup.stats_display}')
+
     def _trigger_scene(self, state_name: str) -> None:
         """
         触发对应的场景
@@ -249,6 +276,8 @@ class ConditionalOperator(ConditionalOperatorLoader):
         with self._task_lock:
             self.is_running = False
             self._stop_running_task()
+        if self.normal_scene_wakeup is not None:
+            self.normal_scene_wakeup.notify()
 
     def _stop_running_task(self) -> None:
         """
@@ -275,6 +304,8 @@ class ConditionalOperator(ConditionalOperatorLoader):
                     self.running_executor_cnt.dec()
             except Exception:  # run_async里有callback打印日志
                 pass
+        if self.normal_scene_wakeup is not None:
+            self.normal_scene_wakeup.notify()
 
     @cached_property
     def usage_states(self) -> set[str]:
@@ -305,6 +336,9 @@ class ConditionalOperator(ConditionalOperatorLoader):
         if not self.is_running:
             return
 
+        if self.normal_scene_wakeup is not None:
+            self.normal_scene_wakeup.on_states_updated(state_records)
+
         top_priority_scene: Optional[Scene] = None
         top_priority_state: Optional[str] = None
 
@@ -346,7 +380,10 @@ class ConditionalOperator(ConditionalOperatorLoader):
                 if (self.running_executor is not None and self.running_executor.running
                         and self.current_execution_info.interrupt_cal_tree is not None):
                     now = time.time()
-                    if self.current_execution_info.interrupt_cal_tree.in_time_range(now):
+                    interrupt_cal_func = self.current_execution_info.interrupt_cal_func
+                    if interrupt_cal_func is None:
+                        interrupt_cal_func = self.current_execution_info.interrupt_cal_tree.in_time_range
+                    if interrupt_cal_func(now):
                         interrupt = True
                         log.debug('复合中断条件满足，执行中断')
                 if interrupt:
@@ -4,6 +4,7 @@ from typing import Any, Callable
 from one_dragon.base.conditional_operation.atomic_op import AtomicOp
 from one_dragon.base.conditional_operation.execution_info import ExecutionInfo
 from one_dragon.base.conditional_operation.operation_def import OperationDef
+from one_dragon.base.conditional_operation.state_cal_program import StateCalProgram
 from one_dragon.base.conditional_operation.state_handler import StateHandler
 from one_dragon.base.conditional_operation.state_recorder import StateRecorder
 
@@ -52,6 +53,16 @@ class Scene:
                 op_getter=op_getter,
             )
 
+    def compile(self, program: StateCalProgram) -> None:
+        """
+        将场景内的状态判断树编译成判断函数 需要先调用 build
+
+        Args:
+            program: 状态判断程序
+        """
+        for handler in self.handlers:
+            handler.compile(program)
+
     @cached_property
     def usage_states(self) -> set[str]:
         """
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from collections.abc import Callable
+
+from one_dragon.base.conditional_operation.scene import Scene
+from one_dragon.base.conditional_operation.state_cal_tree import (
+    StateCalNode,
+    StateCalNodeType,
+)
+from one_dragon.base.conditional_operation.state_handler import StateHandler
+from one_dragon.base.conditional_operation.state_recorder import (
+    StateRecord,
+    StateRecorder,
+)
+
+
+class SceneWakeup:
+
+    def __init__(
+        self,
+        scene: Scene,
+        state_recorder_getter: Callable[[str], StateRecorder | None],
+        fallback_seconds: float = 1.0,
+    ):
+        """
+        场景的唤醒器 用于代替固定间隔的轮询
+
+        场景的判断结果只会在以下情况变化 因此只有这些时候需要重新判断
+        1. 场景用到的状态被更新或清除
+        2. 状态的时间区间到期 即 记录时间+区间下限 开始满足 / 记录时间+区间上限 之后不再满足 用最小堆保存这些时间点
+        3. 其它需要重新判断的时机 例如指令执行完毕
+
+        Args:
+            scene: 场景 需要已经 build
+            state_recorder_getter: 状态记录器获取方法
+            fallback_seconds: 兜底的最长等待时间 防止有绕过状态服务的状态修改时永远不判断
+        """
+        self.scene: Scene = scene
+        self.fallback_seconds: float = fallback_seconds
+        self._state_recorder_getter: Callable[[str], StateRecorder | None] = state_recorder_getter
+
+        # 场景用到的状态 -> 状态判断的时间区间
+        self._state_2_time_range: dict[str, set[tuple[float, float]]] = {}
+        for handler in scene.handlers:
+            self._collect_handler(handler)
+
+        self._condition: threading.Condition = threading.Condition()
+        self._dirty: bool = False  # 是否需要重新判断
+        self._notified: bool = False  # 是否有 notify 调用 用于等待指令执行完毕
+        self._change_time: float | None = None  # 最早一次未处理的变化时间 用于统计延迟
+        self._deadlines: list[float] = []  # 时间区间到期的时间点 最小堆
+        self._last_take_time: float = time.time()  # 上次取出变化进行判断的时间
+
+        # 统计
+        self.start_time: float = time.time()
+        self.eval_cnt: int = 0  # 判断次数
+        self.trigger_cnt: int = 0  # 判断后命中的次数
+        self.latency_total: float = 0  # 状态变化到命中的总延迟
+        self.latency_max: float = 0  # 状态变化到命中的最大延迟
+
+    def _collect_handler(self, handler: StateHandler) -> None:
+        if handler.state_cal_tree is not None:
+            self._collect_node(handler.state_cal_tree)
+        for sub_handler in handler.sub_handlers:
+            self._collect_handler(sub_handler)
+
+    def _collect_node(self, node: StateCalNode) -> None:
+        if node.node_type == StateCalNodeType.STATE:
+            time_range = (node.state_time_range_min, node.state_time_range_max)
+            self._state_2_time_range.setdefault(node.state_recorder.state_name, set()).add(time_range)
+        if node.left_child is not None:
+            self._collect_node(node.left_child)
+        if node.right_child is not None:
+            self._collect_node(node.right_child)
+
+    def reset(self) -> None:
+        """
+        开始运行前重置 并根据当前的状态记录生成到期时间
+        """
+        with self._condition:
+            now = time.time()
+            self._dirty = True  # 开始时先判断一次
+            self._change_time = now
+            self._deadlines = []
+            for state_name in self._state_2_time_range:
+                self._push_deadlines(state_name, now)
+            self._last_take_time = now
+
+            self.start_time = now
+            self.eval_cnt = 0
+            self.trigger_cnt = 0
+            self.latency_total = 0
+            self.latency_max = 0
+
+    def on_states_updated(self, state_records: list[StateRecord]) -> None:
+        """
+        状态更新后的回调 场景用到的状态有变化时唤醒
+        状态记录器需要已经更新完毕
+
+        Args:
+            state_records: 状态记录列表
+        """
+        now = time.time()
+        with self._condition:
+            changed: bool = False
+            for record in state_records:
+                if record.state_name in self._state_2_time_range:
+                    changed = True
+                    self._push_deadlines(record.state_name, now)
+
+                if record.is_clear:
+                    continue
+                recorder = self._state_recorder_getter(record.state_name)
+                if recorder is None or recorder.mutex_list is None:
+                    continue
+                for mutex_state in recorder.mutex_list:  # 互斥状态会被清除
+                    if mutex_state in self._state_2_time_range:
+                        changed = True
+
+            if changed:
+                self._mark_dirty(now)
+
+    def _push_deadlines(self, state_name: str, now: float) -> None:
+        recorder = self._state_recorder_getter(state_name)
+        if recorder is None or recorder.last_record_time <= 0:  # 未出现或已清除 时间差会一直过大
+            return
+        for time_min, time_max in self._state_2_time_range[state_name]:
+            for deadline in (recorder.last_record_time + time_min, recorder.last_record_time + time_max + 1e-3):
+                if deadline > now:
+                    heapq.heappush(self._deadlines, deadline)
+
+    def notify(self) -> None:
+        """
+        唤醒并要求重新判断 用于指令执行完毕、停止运行等情况
+        """
+        with self._condition:
+            self._notified = True
+            self._mark_dirty(time.time())
+
+    def _mark_dirty(self, now: float) -> None:
+        self._dirty = True
+        if self._change_time is None:
+            self._change_time = now
+        self._condition.notify_all()
+
+    def wait(self, for_notify: bool = False) -> None:
+        """
+        等待直到 需要重新判断 / 时间区间到期 / 兜底时间到达
+
+        Args:
+            for_notify: 只等待 notify 调用 用于有其它场景在运行时 等待其结束
+        """
+        with self._condition:
+            if for_notify:
+                if not self._notified:
+                    self._condition.wait(self.fallback_seconds)
+                self._notified = False
+            elif not self._dirty:
+                now = time.time()
+                timeout = self._last_take_time + self.fallback_seconds - now
+                if len(self._deadlines) > 0:
+                    timeout = min(timeout, self._deadlines[0] - now)
+                if timeout > 0:
+                    self._condition.wait(timeout)
+
+    def take_change(self, now: float) -> float | None:
+        """
+        取出待处理的变化 并清空标记
+
+        Args:
+            now: 当前时间
+
+        Returns:
+            float | None: 需要重新判断时 返回最早的变化时间；不需要判断时 返回None
+        """
+        with self._condition:
+            change_time = self._change_time
+            while len(self._deadlines) > 0 and self._deadlines[0] <= now:
+                deadline = heapq.heappop(self._deadlines)
+                if change_time is None or deadline < change_time:
+                    change_time = deadline
+
+            if change_time is None and now - self._last_take_time < self.fallback_seconds:
+                return None
+
+            self._last_take_time = now
+            self._dirty = False
+            self._notified = False
+            self._change_time = None
+            return now if change_time is None else change_time
+
+    def record_evaluation(self, matched: bool, trigger_time: float, change_time: float | None) -> None:
+        """
+        记录一次判断 用于统计
+
+        Args:
+            matched: 是否命中
+            trigger_time: 判断时间
+            change_time: 触发这次判断的变化时间
+        """
+        self.eval_cnt += 1
+        if not matched:
+            return
+        self.trigger_cnt += 1
+        if change_time is not None:
+            latency = max(0.0, trigger_time - change_time)
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    @property
+    def stats_display(self) -> str:
+        past = max(1e-6, time.time() - self.start_time)
+        avg_latency = self.latency_total / self.trigger_cnt if self.trigger_cnt > 0 else 0
+        return (f'判断 {self.eval_cnt / past:.1f}次/秒 命中 {self.trigger_cnt}次 '
+                f'状态变化到命中 平均 {avg_latency * 1000:.1f}ms 最大 {self.latency_max * 1000:.1f}ms')
+
+
+def __debug_benchmark():
+    """
+    对比 固定间隔轮询 和 事件驱动 的主循环 统计判断次数和状态变化到命中的延迟
+    1. config/auto_battle 中的 全配队通用 主循环总有兜底处理器命中 指令结束后总要重新判断 两者判断次数接近
+    2. 只有少量处理器的合成场景 大部分时间不命中 事件驱动在状态无变化时可以省去无效判断
+    """
+    import random
+
+    from one_dragon.base.conditional_operation.atomic_op import AtomicOp
+    from one_dragon.base.conditional_operation.operation_def import OperationDef
+    from one_dragon.base.conditional_operation.operator import ConditionalOperator
+    from one_dragon.base.conditional_operation.state_record_service import (
+        StateRecordService,
+    )
+
+    class _DebugStateRecordService(StateRecordService):
+
+        def __init__(self):
+            StateRecordService.__init__(self)
+            self.recorders: dict[str, StateRecorder] = {}
+
+        def get_state_recorder(self, state_name: str) -> StateRecorder | None:
+            if state_name not in self.recorders:
+                self.recorders[state_name] = StateRecorder(state_name)
+            return self.recorders[state_name]
+
+    class _DebugOperator(ConditionalOperator):
+
+        def __init__(self, service: StateRecordService, scene_data: dict | None):
+            ConditionalOperator.__init__(
+                self,
+                sub_dir=['auto_battle'],
+                template_name='全配队通用',
+                operation_template_sub_dir=['auto_battle_operation'],
+                state_handler_template_sub_dir=['auto_battle_state_handler'],
+                state_record_service=service,
+                read_from_merged=False,
+            )
+            self.scene_data: dict | None = scene_data
+
+        def load(self) -> None:
+            if self.scene_data is None:
+                ConditionalOperator.load(self)
+            else:
+                self.scenes = [Scene(self.scene_data)]
+
+        def get_atomic_op(self, op_def: OperationDef) -> AtomicOp:
+            return AtomicOp(op_name=op_def.op_name)  # 空指令 只测试判断本身
+
+    synthetic_scene_data = {
+        'interval': 0.02,
+        'handlers': [
+            {'states': '[合成-技能, 0, 0.3] & [合成-能量, 0, 1]{3, 3}', 'operations': [{'op_name': '合成-释放'}]},
+            {'states': '[合成-技能, 0.5, 0.6]', 'operations': [{'op_name': '合成-等待'}]},
+        ],
+    }
+    for title, scene_data in [('全配队通用', None), ('合成场景', synthetic_scene_data)]:
+        for event_driven in [False, True]:
+            service = _DebugStateRecordService()
+            op = _DebugOperator(service, scene_data)
+            op.init()
+            op.normal_scene_event_driven = event_driven
+            op.trigger_2_scene = {}  # 只测试主循环
+            state_name_list = sorted(op.normal_scene.usage_states)
+
+            rng = random.Random(0)
+            op.start_running_async()
+            end_time = time.time() + 5
+            while time.time() < end_time:
+                state_name = rng.choice(state_name_list)
+                if rng.random() < 0.5 or state_name != '合成-技能':
+                    service.update_state(StateRecord(state_name, time.time(), value=rng.randint(0, 3)))
+                time.sleep(rng.random() * 0.04)
+            mode = '事件驱动' if event_driven else '固定轮询'
+            print(f'{title} {mode} 状态持续变化: {op.normal_scene_wakeup.stats_display}')
+
+            op.normal_scene_wakeup.reset()
+            time.sleep(3)
+            print(f'{title} {mode} 状态无变化: {op.normal_scene_wakeup.stats_display}')
+            op.stop_running()
+            time.sleep(0.1)
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
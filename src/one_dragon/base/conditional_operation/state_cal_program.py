@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from enum import IntEnum
+from math import inf
+
+from one_dragon.base.conditional_operation.state_cal_tree import (
+    StateCalNode,
+    StateCalNodeType,
+    StateCalOpType,
+)
+from one_dragon.base.conditional_operation.state_recorder import StateRecorder
+from one_dragon.utils.log_utils import log
+
+
+class StateCalInstType(IntEnum):
+
+    TRUE = 0
+    STATE = 1
+    AND = 2
+    OR = 3
+    NOT = 4
+
+
+class StateCalProgram:
+
+    def __init__(self):
+        """
+        将多棵状态判断树编译成一个扁平的指令列表 再生成判断函数
+
+        - 指令按拓扑顺序排列 子表达式一定在父表达式之前
+        - 结构相同的子表达式(包括不同场景之间的)在指令列表中只保留一份
+        - 结构相同的根节点共用一个判断函数 只编译一次
+        - 每个根节点展开成一个 Python 表达式编译成函数 省去逐个节点的递归调用
+          不同根节点共有的子表达式会展开到各自的表达式中 每次用到时都会计算
+          每帧缓存共有子表达式的结果 在 config/auto_battle 的配置上没有明显收益 所以没有使用
+
+        指令格式
+        - TRUE: (TRUE,)
+        - STATE: (STATE, 状态记录器下标, 时间下限, 时间上限, 值下限, 值上限)
+        - AND / OR: (AND/OR, 左指令下标, 右指令下标)
+        - NOT: (NOT, 指令下标)
+        """
+        self.inst_list: list[tuple] = []  # 指令列表
+        self.recorder_list: list[StateRecorder] = []  # 指令用到的状态记录器
+        self.compiled_node_cnt: int = 0  # 编译过的树节点数量 用于统计消除效果
+
+        self._inst_2_slot: dict[tuple, int] = {}  # 指令 -> 下标 结构相同的指令只保留一份
+        self._recorder_2_idx: dict[StateRecorder, int] = {}  # 状态记录器 -> 下标
+        self._node_2_slot: dict[StateCalNode, int] = {}  # 树节点 -> 下标
+        self._slot_2_func: dict[int, Callable[[float], bool]] = {}  # 指令下标 -> 生成的判断函数
+        self._namespace: dict = {'inf': inf}  # 生成函数使用的全局变量 包含全部状态记录器
+
+    def compile(self, node: StateCalNode) -> Callable[[float], bool]:
+        """
+        编译一棵状态判断树 得到判断函数
+        结构相同的树共用一个函数 表达式过深无法编译时 退回使用树本身的判断
+        子表达式会展开到函数的表达式中 不会在不同函数之间共用计算结果
+
+        Args:
+            node: 树的根节点
+
+        Returns:
+            Callable[[float], bool]: 输入当前时间 返回是否满足 与 node.in_time_range 一致
+        """
+        slot = self.add_node(node)
+        func = self._slot_2_func.get(slot)
+        if func is None:
+            try:
+                func = eval(f'lambda now: {self._to_expr(slot)}', self._namespace)
+            except (SyntaxError, RecursionError, MemoryError):
+                log.warning('状态判断表达式过深 无法编译 使用状态判断树计算')
+                func = node.in_time_range
+            self._slot_2_func[slot] = func
+        return func
+
+    def add_node(self, node: StateCalNode) -> int:
+        """
+        将一棵状态判断树加入指令列表
+
+        Args:
+            node: 树的根节点
+
+        Returns:
+            int: 根节点对应的指令下标
+        """
+        slot = self._node_2_slot.get(node)
+        if slot is not None:  # 同一个节点对象被多次引用 例如父级的打断树
+            return slot
+
+        self.compiled_node_cnt += 1
+        if node.node_type == StateCalNodeType.OP:
+            if node.op_type == StateCalOpType.AND:
+                inst = (StateCalInstType.AND, self.add_node(node.left_child), self.add_node(node.right_child))
+            elif node.op_type == StateCalOpType.OR:
+                inst = (StateCalInstType.OR, self.add_node(node.left_child), self.add_node(node.right_child))
+            else:
+                inst = (StateCalInstType.NOT, self.add_node(node.left_child))
+        elif node.node_type == StateCalNodeType.STATE:
+            value_min = node.state_value_range_min
+            value_max = node.state_value_range_max
+            if value_min is None or value_max is None:  # 与 StateCalNode 一致 两者都有才判断值
+                value_min = value_max = None
+            inst = (
+                StateCalInstType.STATE,
+                self._get_recorder_idx(node.state_recorder),
+                node.state_time_range_min,
+                node.state_time_range_max,
+                value_min,
+                value_max,
+            )
+        else:
+            inst = (StateCalInstType.TRUE,)
+
+        slot = self._inst_2_slot.get(inst)
+        if slot is None:
+            slot = len(self.inst_list)
+            self.inst_list.append(inst)
+            self._inst_2_slot[inst] = slot
+
+        self._node_2_slot[node] = slot
+        return slot
+
+    def _get_recorder_idx(self, recorder: StateRecorder) -> int:
+        idx = self._recorder_2_idx.get(recorder)
+        if idx is None:
+            idx = len(self.recorder_list)
+            self.recorder_list.append(recorder)
+            self._recorder_2_idx[recorder] = idx
+            self._namespace[f'r{idx}'] = recorder
+        return idx
+
+    def _to_expr(self, slot: int) -> str:
+        inst = self.inst_list[slot]
+        inst_type = inst[0]
+        if inst_type == StateCalInstType.STATE:
+            recorder = f'r{inst[1]}'
+            expr = f'{inst[2]!r} <= now - {recorder}.last_record_time <= {inst[3]!r}'
+            if inst[4] is not None:
+                expr = (f'{expr} and {recorder}.last_value is not None'
+                        f' and {inst[4]!r} <= {recorder}.last_value <= {inst[5]!r}')
+            return f'({expr})'
+        elif inst_type == StateCalInstType.AND:
+            return f'({self._to_expr(inst[1])} and {self._to_expr(inst[2])})'
+        elif inst_type == StateCalInstType.OR:
+            return f'({self._to_expr(inst[1])} or {self._to_expr(inst[2])})'
+        elif inst_type == StateCalInstType.NOT:
+            return f'(not {self._to_expr(inst[1])})'
+        else:
+            return 'True'
+
+
+def __debug_benchmark():
+    """
+    使用 config/auto_battle 中的配置 对比 状态判断树 和 编译后程序 的计算耗时
+    状态记录器使用随机生成的时间线
+    """
+    import os
+    import random
+    import time
+
+    from one_dragon.base.conditional_operation.loader import (
+        ConditionalOperatorLoader,
+    )
+    from one_dragon.base.conditional_operation.scene import Scene
+    from one_dragon.utils import os_utils
+
+    template_dir = os_utils.get_path_under_work_dir('config', 'auto_battle')
+    template_name_list = sorted({
+        i[:-len('.sample.yml')] for i in os.listdir(template_dir) if i.endswith('.sample.yml')
+    })
+
+    rng = random.Random(0)
+    for template_name in template_name_list:
+        recorders: dict[str, StateRecorder] = {}
+
+        def get_recorder(state_name: str, recorders=recorders) -> StateRecorder:
+            if state_name not in recorders:
+                recorders[state_name] = StateRecorder(state_name)
+            return recorders[state_name]
+
+        loader = ConditionalOperatorLoader(
+            sub_dir=['auto_battle'],
+            template_name=template_name,
+            operation_template_sub_dir=['auto_battle_operation'],
+            state_handler_template_sub_dir=['auto_battle_state_handler'],
+            read_from_merged=False,
+        )
+        loader.load()
+        scenes: list[Scene] = loader.scenes
+        for scene in scenes:
+            scene.build(state_recorder_getter=get_recorder, op_getter=lambda op_def: None)
+
+
+        tick_cnt = 2000
+        timelines: list[list[tuple[StateRecorder, float, int]]] = []
+        for tick in range(tick_cnt):
+            now = 1000 + tick * 0.02
+            timelines.append([
+                (recorder, now - rng.random() * 5, rng.randint(0, 10))
+                for recorder in recorders.values()
+                if rng.random() < 0.1
+            ])
+
+        program = StateCalProgram()
+        cost_list = []
+        match_list = []
+        for use_program in [False, True]:
+            if use_program:
+                for scene in scenes:
+                    scene.compile(program)
+            for recorder in recorders.values():
+                recorder.reset_to_initial()
+            matched = []
+            t1 = time.perf_counter()
+            for tick in range(tick_cnt):
+                now = 1000 + tick * 0.02
+                for recorder, record_time, value in timelines[tick]:
+                    recorder.last_record_time = record_time
+                    recorder.last_value = value
+                for scene in scenes:
+                    info = scene.match_execution(now)
+                    matched.append(None if info is None else info.expr_display)
+            cost_list.append(time.perf_counter() - t1)
+            match_list.append(matched)
+
+        print(f'{template_name}: 状态 {len(recorders)} 树节点 {program.compiled_node_cnt} 指令 {len(program.inst_list)}')
+        print(f'  状态判断树 {cost_list[0] / tick_cnt * 1e6:.1f}us/帧 编译后程序 {cost_list[1] / tick_cnt * 1e6:.1f}us/帧 '
+              f'结果一致 {match_list[0] == match_list[1]}')
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
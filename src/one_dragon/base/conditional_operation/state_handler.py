@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 from functools import cached_property
-from typing import Any, Callable
+from typing import Any
 
 from one_dragon.base.conditional_operation.atomic_op import AtomicOp
 from one_dragon.base.conditional_operation.execution_info import ExecutionInfo
 from one_dragon.base.conditional_operation.operation_def import OperationDef
+from one_dragon.base.conditional_operation.state_cal_program import StateCalProgram
 from one_dragon.base.conditional_operation.state_cal_tree import (
     StateCalNode,
     StateCalNodeType,
@@ -34,6 +36,8 @@ class StateHandler:
         self.op_list: list[AtomicOp] = []  # 操作列表
         self.state_cal_tree: StateCalNode | None = None  # 状态判断树
         self.interrupt_states_cal_tree: StateCalNode | None = None  # 可被打断的状态判断树
+        self.state_cal_func: Callable[[float], bool] | None = None  # 状态判断树编译后的判断函数
+        self.interrupt_states_cal_func: Callable[[float], bool] | None = None  # 打断状态判断树编译后的判断函数
 
         # TODO 调试代码 后续删除
         for k in data.keys():
@@ -78,6 +82,8 @@ class StateHandler:
         """
         self.state_cal_tree = construct_state_cal_tree(self.states, state_recorder_getter)
         self.interrupt_states_cal_tree = self._build_interrupt_tree(state_recorder_getter, parent_interrupt_states_cal_tree)
+        self.state_cal_func = None
+        self.interrupt_states_cal_func = None
 
         if len(self.sub_handlers) > 0:
             for i in self.sub_handlers:
@@ -127,6 +133,19 @@ class StateHandler:
            right_child=self_interrupt_tree
         )
 
+    def compile(self, program: StateCalProgram) -> None:
+        """
+        将状态判断树编译成判断函数 需要先调用 build
+
+        Args:
+            program: 状态判断程序 同一个操作器的全部处理器共用 结构相同的判断树只编译一次
+        """
+        self.state_cal_func = program.compile(self.state_cal_tree)
+        if self.interrupt_states_cal_tree is not None:
+            self.interrupt_states_cal_func = program.compile(self.interrupt_states_cal_tree)
+        for handler in self.sub_handlers:
+            handler.compile(program)
+
     @cached_property
     def usage_states(self) -> set[str]:
         """
@@ -152,7 +171,12 @@ class StateHandler:
         Returns:
             符合条件的场景下的执行信息
         """
-        if self.state_cal_tree.in_time_range(trigger_time):
+        if self.state_cal_func is not None:
+            matched = self.state_cal_func(trigger_time)
+        else:
+            matched = self.state_cal_tree.in_time_range(trigger_time)
+
+        if matched:
             if self.sub_handlers is not None and len(self.sub_handlers) > 0:
                 for sub_handler in self.sub_handlers:
                     info = sub_handler.match_execution(trigger_time)
@@ -160,7 +184,7 @@ class StateHandler:
                         info.add_state(self.states, self.display_name)
                         return info
             else:
-                info = ExecutionInfo(self.op_list, self.interrupt_states_cal_tree)
+                info = ExecutionInfo(self.op_list, self.interrupt_states_cal_tree, self.interrupt_states_cal_func)
                 info.add_state(self.states, self.display_name)
                 return info
 
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import threading
+import time
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor, Future
 from typing import TYPE_CHECKING
 
 from one_dragon.base.conditional_operation.state_recorder import StateRecorder, StateRecord
 from one_dragon.utils import thread_utils
+from one_dragon.utils.log_utils import log
 
 if TYPE_CHECKING:
     from one_dragon.base.conditional_operation.operator import ConditionalOperator
@@ -19,6 +22,20 @@ class StateRecordService(ABC):
     def __init__(self):
         self.op_list: set[ConditionalOperator] = set()
 
+        self.coalesce_dispatch: bool = True  # 合并分发 False时每次更新都单独提交给操作器
+
+        # 待分发的状态记录 同一个状态只保留一个 由单个分发任务依次处理
+        self._pending_lock: threading.Lock = threading.Lock()
+        self._pending_records: dict[str, StateRecord] = {}
+        self._dispatching: bool = False  # 是否已经有分发任务在运行
+
+        # 统计
+        self.stats_start_time: float = time.time()
+        self.update_cnt: int = 0  # 收到的状态记录数量
+        self.merged_cnt: int = 0  # 被合并掉的状态记录数量
+        self.dispatch_cnt: int = 0  # 分发的批次数量
+        self.max_batch_size: int = 0  # 单批最多的状态数量
+
     def register_operator(self, op: ConditionalOperator):
         """
         注册一个操作器
@@ -61,14 +78,97 @@ class StateRecordService(ABC):
     def batch_update_states(self, state_records: list[StateRecord]) -> None:
         """
         批量更新多个状态
-        更新后触发 操作器相应的动作
+        状态记录器立即更新 操作器的回调则合并后分发
+
+        分发只由一个任务进行 分发期间到达的更新会合并成下一批
+        同一个状态在一批中只保留最后到达的记录 与状态记录器的最终状态一致 批内按到达顺序排列
         """
         for state_record in state_records:
             self._update_state_recorder(state_record)
 
-        for op in self.op_list:
-            f: Future = _state_record_service_executor.submit(op.batch_update_states, state_records)
-            f.add_done_callback(thread_utils.handle_future_result)
+        if not self.coalesce_dispatch:
+            with self._pending_lock:
+                self.update_cnt += len(state_records)
+                self.dispatch_cnt += 1
+                self.max_batch_size = max(self.max_batch_size, len(state_records))
+            for op in self.op_list:
+                f: Future = _state_record_service_executor.submit(op.batch_update_states, state_records)
+                f.add_done_callback(thread_utils.handle_future_result)
+            return
+
+        with self._pending_lock:
+            self.update_cnt += len(state_records)
+            for state_record in state_records:
+                # 先移除再加入 旧记录被替换的同时移到最后 保持到达顺序
+                if self._pending_records.pop(state_record.state_name, None) is not None:
+                    self.merged_cnt += 1
+                self._pending_records[state_record.state_name] = state_record
+
+            if self._dispatching:
+                return
+            self._dispatching = True
+
+        try:
+            f: Future = _state_record_service_executor.submit(self._dispatch_pending_records)
+        except BaseException:
+            # 没有提交成功 需要还原 否则之后的更新都不会再分发
+            with self._pending_lock:
+                self._dispatching = False
+            raise
+        f.add_done_callback(self._on_dispatch_done)
+
+    def _on_dispatch_done(self, future: Future) -> None:
+        """
+        分发任务结束 任务在开始前被取消时 还原分发状态
+        """
+        if future.cancelled():
+            with self._pending_lock:
+                self._dispatching = False
+            return
+        thread_utils.handle_future_result(future)
+
+    def _dispatch_pending_records(self) -> None:
+        """
+        将待分发的状态记录 逐批通知给各个操作器 直到没有新的记录
+        """
+        try:
+            while True:
+                with self._pending_lock:
+                    if len(self._pending_records) == 0:
+                        self._dispatching = False
+                        return
+                    batch = list(self._pending_records.values())
+                    self._pending_records = {}
+                    self.dispatch_cnt += 1
+                    self.max_batch_size = max(self.max_batch_size, len(batch))
+
+                for op in list(self.op_list):
+                    try:
+                        op.batch_update_states(batch)
+                    except Exception:
+                        log.error('操作器处理状态更新失败', exc_info=True)
+        except BaseException:
+            # 正常结束时已经在锁内还原 这里只处理意外退出 避免之后的更新都不再分发
+            with self._pending_lock:
+                self._dispatching = False
+            raise
+
+    def reset_stats(self) -> None:
+        """
+        重置分发统计
+        """
+        with self._pending_lock:
+            self.stats_start_time = time.time()
+            self.update_cnt = 0
+            self.merged_cnt = 0
+            self.dispatch_cnt = 0
+            self.max_batch_size = 0
+
+    @property
+    def stats_display(self) -> str:
+        past = max(1e-6, time.time() - self.stats_start_time)
+        return (f'状态记录 {self.update_cnt / past:.0f}条/秒 合并 {self.merged_cnt}条 '
+                f'分发 {self.dispatch_cnt / past:.0f}批/秒 单批最多 {self.max_batch_size}个状态')
 
     def _update_state_recorder(self, new_record: StateRecord) -> StateRecorder | None:
         """
@@ -103,3 +203,71 @@ class StateRecordService(ABC):
         整个脚本运行结束后的清理
         """
         _state_record_service_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def __debug_benchmark():
+    """
+    模拟多个识别线程 以每秒1000条的速度突发更新状态
+    对比 每次更新单独分发 和 合并分发 操作器回调的次数和延迟
+    操作器回调中持有锁一小段时间 模拟打断判断时对 _task_lock 的争用
+    """
+    import random
+
+    class _DebugStateRecordService(StateRecordService):
+
+        def __init__(self):
+            StateRecordService.__init__(self)
+            self.recorders: dict[str, StateRecorder] = {}
+
+        def get_state_recorder(self, state_name: str) -> StateRecorder | None:
+            if state_name not in self.recorders:
+                self.recorders[state_name] = StateRecorder(state_name)
+            return self.recorders[state_name]
+
+    class _DebugOperator:
+
+        def __init__(self):
+            self.lock = threading.Lock()
+            self.call_cnt: int = 0
+            self.latency_list: list[float] = []
+
+        def batch_update_states(self, state_records: list[StateRecord]) -> None:
+            with self.lock:
+                self.call_cnt += 1
+                now = time.time()
+                for record in state_records:
+                    self.latency_list.append(now - record.trigger_time)
+                time.sleep(0.0005)
+
+    state_name_list = [f'状态-{i}' for i in range(20)]
+    for coalesce in [False, True]:
+        service = _DebugStateRecordService()
+        service.coalesce_dispatch = coalesce
+        op = _DebugOperator()
+        service.register_operator(op)
+
+        def _produce(seed: int, service=service) -> None:
+            rng = random.Random(seed)
+            end_time = time.time() + 3
+            while time.time() < end_time:
+                for _ in range(5):  # 一次识别产生多个状态
+                    service.update_state(StateRecord(rng.choice(state_name_list), time.time()))
+                time.sleep(0.02)
+
+        thread_list = [threading.Thread(target=_produce, args=(i,)) for i in range(4)]
+        for t in thread_list:
+            t.start()
+        for t in thread_list:
+            t.join()
+        time.sleep(0.5)
+
+        latency_list = sorted(op.latency_list)
+        p50 = latency_list[len(latency_list) // 2] * 1000
+        p99 = latency_list[int(len(latency_list) * 0.99)] * 1000
+        mode = '合并分发' if coalesce else '单独分发'
+        print(f'{mode}: {service.stats_display} 操作器回调 {op.call_cnt}次 '
+              f'延迟 p50 {p50:.2f}ms p99 {p99:.2f}ms')
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
@@ -2,6 +2,11 @@ import time
 
 from cv2.typing import MatLike
 
+from one_dragon.base.controller.frame_bus import FrameBus
+from one_dragon.base.controller.frame_change_detector import (
+    FrameChangeDetector,
+    FrameChangeResult,
+)
 from one_dragon.base.geometry.point import Point
 
 
@@ -23,6 +28,8 @@ class ControllerBase:
         self.screenshot_history: list[ScreenshotWithTime] = []
         self.screenshot_alive_seconds: float = screenshot_alive_seconds  # 截图在内存的存活时间
         self.max_screenshot_cnt: int = max_screenshot_cnt  # 内存中最多保持的截图数量
+        self.frame_change_detector: FrameChangeDetector = FrameChangeDetector()  # 画面变化检测 只检测非独立的截图
+        self.frame_bus: FrameBus = FrameBus(self._capture_for_bus)  # 非独立的截图都经过截图总线 画中画、后台服务等共用
 
     def init_before_context_run(self) -> bool:
         """
@@ -56,16 +63,26 @@ class ControllerBase:
         """
         pass
 
-    def screenshot(self, independent: bool = False) -> tuple[float, MatLike | None]:
+    def screenshot(self, independent: bool = False, detect_change: bool = False) -> tuple[float, MatLike | None]:
         """
         截图并保存在内存中
-        """
-        self.before_screenshot()
-        screenshot_time = time.time()
-        screen = self.get_screenshot(independent)
-        if screen is None:
-            return screenshot_time, None
-        fix_screen = self.fill_uid_black(screen)
+        :param independent: 是否独立截图 不经过截图总线
+        :param detect_change: 是否进行画面变化检测 只有用到 last_frame_change 的调用方需要 独立截图不检测
+        """
+        if independent:
+            self.before_screenshot()
+            screenshot_time = time.time()
+            screen = self.get_screenshot(independent)
+            if screen is None:
+                return screenshot_time, None
+            fix_screen = self.fill_uid_black(screen)
+        else:
+            # 调用方可以修改截图 只有画中画、推流等也在取帧时 总线才复制一份共用
+            screenshot_time, fix_screen = self.frame_bus.get_writable_image()
+            if fix_screen is None:
+                return screenshot_time, None
+            if detect_change:
+                self.frame_change_detector.update(fix_screen, screenshot_time)
 
         if self.max_screenshot_cnt > 0:
             self.screenshot_history.append(ScreenshotWithTime(fix_screen, screenshot_time))
@@ -78,6 +95,23 @@ class ControllerBase:
 
         return screenshot_time, fix_screen
 
+    def _capture_for_bus(self) -> MatLike | None:
+        """
+        截图总线使用的截图方法 缩放到默认分辨率并遮挡UID
+        """
+        self.before_screenshot()
+        screen = self.get_screenshot(False)
+        if screen is None:
+            return None
+        return self.fill_uid_black(screen)
+
+    @property
+    def last_frame_change(self) -> FrameChangeResult | None:
+        """
+        最近一张进行了检测的截图的画面变化检测结果
+        """
+        return self.frame_change_detector.last_result
+
     def before_screenshot(self) -> None:
         """
         截图前的操作 由子类实现
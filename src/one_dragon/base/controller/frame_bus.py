@@ -0,0 +1,402 @@
+import threading
+import time
+from collections.abc import Callable
+
+import cv2
+from cv2.typing import MatLike
+
+_SHARED_READER_SECONDS = 5  # 这段时间内有其他调用方从总线取过帧时 可修改的截图才复制一份放到总线上共用
+
+
+class BusFrame:
+
+    def __init__(self, image: MatLike, create_time: float, seq: int):
+        """
+        截图总线上的一帧 图片和缩放结果都是只读的 所有订阅者共用 不需要复制
+        截图的原数组只由这一帧持有 不会交给任何调用方 需要修改的调用方自行复制
+        """
+        self.image: MatLike = _read_only_view(image)
+        """截图 只读"""
+
+        self.create_time: float = create_time
+        """截图开始的时间"""
+
+        self.seq: int = seq
+        """截图序号 每次截图加1"""
+
+        self._scaled: dict[int, MatLike] = {}  # 宽度 -> 缩放后的只读图片
+        self._scale_lock: threading.Lock = threading.Lock()
+
+    def get_scaled(self, max_width: int | None) -> tuple[MatLike, bool]:
+        """
+        获取不超过指定宽度的图片 同一帧同一宽度只缩放一次
+
+        Args:
+            max_width: 最大宽度 None 时返回原图
+
+        Returns:
+            tuple[MatLike, bool]: 只读图片 本次是否进行了缩放
+        """
+        width = self.image.shape[1]
+        if max_width is None or max_width <= 0 or width <= max_width:
+            return self.image, False
+
+        with self._scale_lock:
+            scaled = self._scaled.get(max_width)
+            if scaled is not None:
+                return scaled, False
+            height = max(1, round(self.image.shape[0] * max_width / width))
+            scaled = _read_only_view(cv2.resize(self.image, (max_width, height), interpolation=cv2.INTER_AREA))
+            self._scaled[max_width] = scaled
+            return scaled, True
+
+
+class FrameSubscriber:
+
+    def __init__(self, bus: 'FrameBus', name: str, max_fps: float, max_width: int | None):
+        """
+        截图总线的订阅者 声明自己需要的最高帧率和最大宽度
+
+        Args:
+            bus: 截图总线
+            name: 订阅者名称 用于统计
+            max_fps: 最高帧率 最近一帧在 1/max_fps 秒内时直接复用
+            max_width: 最大宽度 None 时使用原图
+        """
+        self.bus: FrameBus = bus
+        self.name: str = name
+        self.max_fps: float = max_fps
+        self.max_width: int | None = max_width
+
+        self.request_cnt: int = 0  # 取帧次数
+        self.capture_cnt: int = 0  # 由本订阅者触发的截图次数
+        self.reused_cnt: int = 0  # 复用其他截图的次数 即节省的截图次数
+        self.failed_cnt: int = 0  # 截图失败的次数
+
+    @property
+    def max_age(self) -> float:
+        return 1.0 / self.max_fps if self.max_fps > 0 else 0
+
+    def get_frame(self) -> BusFrame | None:
+        """
+        获取一帧 最近一帧足够新时直接复用 否则截图
+
+        Returns:
+            BusFrame | None: 截图失败时返回 None
+        """
+        self.request_cnt += 1
+        frame, captured = self.bus.get_frame_with_source(max_age=self.max_age)
+        if frame is None:
+            self.failed_cnt += 1
+        elif captured:
+            self.capture_cnt += 1
+        else:
+            self.reused_cnt += 1
+        return frame
+
+    def get_image(self) -> MatLike | None:
+        """
+        获取一帧按最大宽度缩放后的只读图片
+
+        Returns:
+            MatLike | None: 截图失败时返回 None
+        """
+        frame = self.get_frame()
+        if frame is None:
+            return None
+        image, resized = frame.get_scaled(self.max_width)
+        if image is not frame.image:
+            self.bus.record_scale(resized)
+        return image
+
+    def unsubscribe(self) -> None:
+        self.bus.unsubscribe(self)
+
+    @property
+    def stats_display(self) -> str:
+        return (f'{self.name} 取帧 {self.request_cnt} 截图 {self.capture_cnt} 复用 {self.reused_cnt} '
+                f'失败 {self.failed_cnt}')
+
+
+class FrameBus:
+
+    def __init__(self, capture_fn: Callable[[], MatLike | None]):
+        """
+        截图总线 同一个游戏窗口的截图都经过这里
+
+        - 所有截图串行执行 不会在多个线程中同时调用截图方法
+        - 调用方声明可以接受的截图时间 最近一帧足够新时直接复用 不再截图
+        - 需要新截图时 如果已经有在请求之后开始的截图正在进行 等待它完成后共用
+        - 截图和缩放结果都是只读的 订阅者之间共用 不需要复制
+        - 指令需要可修改的截图时 原数组直接交给指令 只有存在其他取帧方时才复制一份放到总线上
+
+        Args:
+            capture_fn: 截图方法 返回缩放到默认分辨率并遮挡UID的截图 失败时返回None
+        """
+        self.capture_fn: Callable[[], MatLike | None] = capture_fn
+
+        self._capture_lock: threading.Lock = threading.Lock()  # 保证截图串行
+        self._lock: threading.Lock = threading.Lock()  # 保护下面的状态
+        self._latest: BusFrame | None = None
+        self._seq: int = 0
+        self._subscribers: list[FrameSubscriber] = []
+        self._last_shared_request_time: float = 0  # 最近一次取共用帧的时间
+
+        # 统计
+        self.request_cnt: int = 0  # 取帧次数
+        self.capture_cnt: int = 0  # 实际截图次数
+        self.reused_cnt: int = 0  # 复用最近一帧的次数
+        self.collapsed_cnt: int = 0  # 等待其他线程的截图后共用的次数
+        self.failed_cnt: int = 0  # 截图失败的次数
+        self.scale_cnt: int = 0  # 实际缩放次数
+        self.scale_reused_cnt: int = 0  # 复用缩放结果的次数
+        self.writable_cnt: int = 0  # 取可修改截图的次数
+        self.copy_cnt: int = 0  # 为可修改截图复制的次数
+        self.capture_seconds: float = 0  # 截图总耗时
+
+    @property
+    def latest(self) -> BusFrame | None:
+        """最近一帧"""
+        return self._latest
+
+    def subscribe(self, name: str, max_fps: float, max_width: int | None = None) -> FrameSubscriber:
+        """
+        添加订阅者
+
+        Args:
+            name: 订阅者名称 用于统计
+            max_fps: 最高帧率
+            max_width: 最大宽度 None 时使用原图
+
+        Returns:
+            FrameSubscriber: 订阅者
+        """
+        subscriber = FrameSubscriber(self, name, max_fps, max_width)
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: FrameSubscriber) -> None:
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def get_frame(self, max_age: float | None = None) -> BusFrame | None:
+        """
+        获取一帧
+
+        Args:
+            max_age: 可以接受的截图最大时间差 None 时需要在本次调用之后开始的截图
+
+        Returns:
+            BusFrame | None: 截图失败时返回 None
+        """
+        return self.get_frame_with_source(max_age)[0]
+
+    def get_frame_with_source(self, max_age: float | None = None) -> tuple[BusFrame | None, bool]:
+        """
+        获取一帧 同时返回是否由本次调用截图
+
+        Args:
+            max_age: 可以接受的截图最大时间差 None 时需要在本次调用之后开始的截图
+
+        Returns:
+            tuple[BusFrame | None, bool]: 截图 是否由本次调用截图
+        """
+        request_time = time.time()
+        min_create_time = request_time if max_age is None else request_time - max_age
+        with self._lock:
+            self.request_cnt += 1
+            self._last_shared_request_time = request_time
+            latest = self._latest
+            if latest is not None and latest.create_time >= min_create_time:
+                self.reused_cnt += 1
+                return latest, False
+
+        with self._capture_lock:
+            # 等待期间其他线程可能已经截了一张足够新的图
+            latest = self._latest
+            if latest is not None and latest.create_time >= min_create_time:
+                with self._lock:
+                    self.collapsed_cnt += 1
+                return latest, False
+
+            create_time, image = self._capture()
+            if image is None:
+                return None, False
+            with self._lock:
+                self._seq += 1
+                frame = BusFrame(image, create_time, self._seq)
+                self._latest = frame
+            return frame, True
+
+    def get_writable_image(self) -> tuple[float, MatLike | None]:
+        """
+        获取一张在本次调用之后开始的截图 调用方可以修改
+
+        由本次调用截图时 原数组直接交给调用方
+        最近有订阅者或其他取帧方时 才复制一份放到总线上共用 否则不复制
+        合并到其他线程的截图时 复制一份
+
+        Returns:
+            tuple[float, MatLike | None]: 截图开始的时间 截图 截图失败时为 None
+        """
+        request_time = time.time()
+        with self._lock:
+            self.request_cnt += 1
+            self.writable_cnt += 1
+
+        with self._capture_lock:
+            latest = self._latest
+            if latest is not None and latest.create_time >= request_time:
+                with self._lock:
+                    self.collapsed_cnt += 1
+                    self.copy_cnt += 1
+                return latest.create_time, latest.image.copy()
+
+            create_time, image = self._capture()
+            if image is None:
+                return create_time, None
+            with self._lock:
+                self._seq += 1
+                shared = (len(self._subscribers) > 0
+                          or create_time - self._last_shared_request_time <= _SHARED_READER_SECONDS)
+                if shared:
+                    self.copy_cnt += 1
+            if shared:
+                frame = BusFrame(image.copy(), create_time, self._seq)
+                with self._lock:
+                    self._latest = frame
+            return create_time, image
+
+    def _capture(self) -> tuple[float, MatLike | None]:
+        """
+        截图并记录统计 需要在 _capture_lock 中调用
+
+        Returns:
+            tuple[float, MatLike | None]: 截图开始的时间 截图 截图失败时为 None
+        """
+        create_time = time.time()
+        image = self.capture_fn()
+        cost = time.time() - create_time
+        with self._lock:
+            self.capture_seconds += cost
+            if image is None:
+                self.failed_cnt += 1
+            else:
+                self.capture_cnt += 1
+        return create_time, image
+
+    def record_scale(self, resized: bool) -> None:
+        """
+        记录缩放统计
+
+        Args:
+            resized: 本次是否进行了缩放 False 为复用了缩放结果
+        """
+        with self._lock:
+            if resized:
+                self.scale_cnt += 1
+            else:
+                self.scale_reused_cnt += 1
+
+    def clear(self) -> None:
+        """
+        清除最近一帧 游戏窗口变化后调用 避免复用旧窗口的截图
+        """
+        with self._lock:
+            self._latest = None
+
+    @property
+    def saved_cnt(self) -> int:
+        """节省的截图次数"""
+        return self.reused_cnt + self.collapsed_cnt
+
+    @property
+    def stats_display(self) -> str:
+        avg = self.capture_seconds / self.capture_cnt * 1000 if self.capture_cnt > 0 else 0
+        with self._lock:
+            subscribers = list(self._subscribers)
+        text = (f'截图总线 取帧 {self.request_cnt} 截图 {self.capture_cnt} 节省 {self.saved_cnt} '
+                f'(复用 {self.reused_cnt} 合并 {self.collapsed_cnt}) 失败 {self.failed_cnt} '
+                f'缩放 {self.scale_cnt} 复用缩放 {self.scale_reused_cnt} 截图平均 {avg:.1f}ms '
+                f'可修改截图 {self.writable_cnt} 复制 {self.copy_cnt}')
+        for subscriber in subscribers:
+            text += f'\n  {subscriber.stats_display}'
+        return text
+
+
+def _read_only_view(image: MatLike) -> MatLike:
+    """
+    返回图片的只读视图 不复制数据 原数组仍然可写
+    """
+    view = image.view()
+    view.flags.writeable = False
+    return view
+
+
+def __debug_benchmark():
+    """
+    模拟 运行中的指令 10fps 截图 画中画 30fps 推流 15fps 同时取帧
+    对比各自截图 和 经过截图总线 的实际截图次数
+    以及 只有指令截图时 可修改截图不再复制
+    """
+    import numpy as np
+
+    capture_cost = 0.015  # 模拟 BitBlt 截图耗时
+
+    def _capture() -> MatLike:
+        time.sleep(capture_cost)
+        return np.zeros((1080, 1920, 3), dtype=np.uint8)
+
+    bus = FrameBus(_capture)
+    run_seconds = 3
+    stop_event = threading.Event()
+
+    def _run(name: str | None, fps: float, max_width: int | None) -> None:
+        # 指令不订阅 每次需要调用之后的新截图 并且可以修改截图
+        subscriber = bus.subscribe(name, fps, max_width) if name is not None else None
+        while not stop_event.is_set():
+            start = time.time()
+            if subscriber is not None:
+                subscriber.get_image()
+            else:
+                bus.get_writable_image()
+            time.sleep(max(0.0, 1 / fps - (time.time() - start)))
+        if subscriber is not None:
+            subscriber.unsubscribe()
+
+    thread_list = [
+        threading.Thread(target=_run, args=(None, 10, None)),
+        threading.Thread(target=_run, args=('画中画', 30, 480)),
+        threading.Thread(target=_run, args=('推流', 15, 1280)),
+    ]
+    for t in thread_list:
+        t.start()
+    time.sleep(run_seconds)
+    stop_event.set()
+    for t in thread_list:
+        t.join()
+
+    print(f'各自截图约 {(10 + 30 + 15) * run_seconds} 次')
+    print(bus.stats_display)
+
+    image = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    t1 = time.perf_counter()
+    for _ in range(20):
+        image.copy()
+    print(f'复制一张截图 {(time.perf_counter() - t1) / 20 * 1000:.2f}ms')
+
+    # 画中画、推流停止后 只有指令在截图
+    bus = FrameBus(_capture)
+    stop_event.clear()
+    t = threading.Thread(target=_run, args=(None, 10, None))
+    t.start()
+    time.sleep(run_seconds)
+    stop_event.set()
+    t.join()
+    print(bus.stats_display)
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
@@ -0,0 +1,163 @@
+import threading
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from one_dragon.base.geometry.rectangle import Rect
+
+
+class FrameChangeResult:
+
+    def __init__(
+        self,
+        frame_id: int,
+        create_time: float,
+        changed: bool,
+        changed_ratio: float,
+        changed_rect: Rect | None,
+        luma_hash: int,
+    ):
+        """
+        一张截图的画面变化检测结果
+        """
+        self.frame_id: int = frame_id
+        """画面编号 只有画面变化时才会增加 编号相同即画面没有变化"""
+
+        self.create_time: float = create_time
+        """截图时间"""
+
+        self.changed: bool = changed
+        """与参考画面相比是否有变化"""
+
+        self.changed_ratio: float = changed_ratio
+        """变化的像素比例 按缩略图计算"""
+
+        self.changed_rect: Rect | None = changed_rect
+        """变化区域的外接矩形 原图坐标 没有变化时为None"""
+
+        self.luma_hash: int = luma_hash
+        """缩略图亮度的哈希值"""
+
+
+class FrameChangeDetector:
+
+    def __init__(
+        self,
+        thumb_width: int = 240,
+        thumb_height: int = 135,
+        pixel_threshold: int = 8,
+        ratio_threshold: float = 0.0003,
+    ):
+        """
+        画面变化检测 将截图缩小成亮度缩略图后与参考画面比较
+
+        参考画面是最近一次判定为变化的画面 而不是上一张截图
+        这样缓慢的渐变动画累计到阈值后也能判定为变化 不会因为每帧差异都很小而一直认为没有变化
+
+        默认的 240x135 缩略图中 一个像素对应 1920x1080 原图的 8x8 区域 整数倍缩小也更快
+        阈值约为 10 个缩略图像素 原图中约 25x25 的变化 如按钮、图标出现或文字变化 都能检测到
+
+        Args:
+            thumb_width: 缩略图宽度
+            thumb_height: 缩略图高度
+            pixel_threshold: 缩略图单个像素亮度差大于该值时 认为该像素有变化
+            ratio_threshold: 有变化的像素比例大于该值时 认为画面有变化
+        """
+        self.thumb_width: int = thumb_width
+        self.thumb_height: int = thumb_height
+        self.pixel_threshold: int = pixel_threshold
+        self.ratio_threshold: float = ratio_threshold
+
+        self._lock: threading.Lock = threading.Lock()
+        self._reference_thumb: np.ndarray | None = None  # 参考画面的缩略图
+        self._frame_id: int = 0
+        self._last_result: FrameChangeResult | None = None
+
+        # 统计
+        self.changed_cnt: int = 0  # 判定为变化的次数
+        self.unchanged_cnt: int = 0  # 判定为没有变化的次数
+
+    def update(self, image: MatLike, create_time: float) -> FrameChangeResult:
+        """
+        检测新的截图相对参考画面是否有变化
+
+        Args:
+            image: 截图 RGB
+            create_time: 截图时间
+
+        Returns:
+            FrameChangeResult: 检测结果
+        """
+        thumb = self._to_thumb(image)
+        luma_hash = hash((thumb >> 3).tobytes())  # 忽略低位的噪声
+
+        with self._lock:
+            if self._reference_thumb is None or self._reference_thumb.shape != thumb.shape:
+                changed = True
+                changed_ratio = 1.0
+                changed_rect = Rect(0, 0, image.shape[1], image.shape[0])
+            else:
+                mask = cv2.absdiff(thumb, self._reference_thumb) > self.pixel_threshold
+                changed_ratio = float(np.count_nonzero(mask)) / mask.size
+                changed = changed_ratio > self.ratio_threshold
+                changed_rect = self._get_changed_rect(mask, image) if changed else None
+
+            if changed:
+                self._reference_thumb = thumb
+                self._frame_id += 1
+                self.changed_cnt += 1
+            else:
+                self.unchanged_cnt += 1
+
+            result = FrameChangeResult(
+                frame_id=self._frame_id,
+                create_time=create_time,
+                changed=changed,
+                changed_ratio=changed_ratio,
+                changed_rect=changed_rect,
+                luma_hash=luma_hash,
+            )
+            self._last_result = result
+
+        return result
+
+    def _to_thumb(self, image: MatLike) -> np.ndarray:
+        """
+        先缩小再转灰度 比在原图上转灰度快很多
+        """
+        small = cv2.resize(image, (self.thumb_width, self.thumb_height), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+        return small
+
+    def _get_changed_rect(self, mask: np.ndarray, image: MatLike) -> Rect:
+        """
+        将缩略图上的变化区域 换算成原图坐标的外接矩形
+        """
+        ys, xs = np.nonzero(mask)
+        scale_x = image.shape[1] / self.thumb_width
+        scale_y = image.shape[0] / self.thumb_height
+        return Rect(
+            int(xs.min() * scale_x),
+            int(ys.min() * scale_y),
+            min(image.shape[1], int(np.ceil((xs.max() + 1) * scale_x))),
+            min(image.shape[0], int(np.ceil((ys.max() + 1) * scale_y))),
+        )
+
+    @property
+    def last_result(self) -> FrameChangeResult | None:
+        """
+        最近一张截图的检测结果
+        """
+        return self._last_result
+
+    def reset(self) -> None:
+        """
+        清空参考画面 下一张截图一定判定为变化
+        """
+        with self._lock:
+            self._reference_thumb = None
+            self._last_result = None
+            self.changed_cnt = 0
+            self.unchanged_cnt = 0
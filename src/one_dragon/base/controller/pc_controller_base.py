@@ -69,6 +69,7 @@ class PcControllerBase(ControllerBase):
             是否初始化成功
         """
         self.game_win.init_win()
+        self.frame_bus.clear()
         if self.is_game_window_ready:
             self.screenshot_controller.init_screenshot(self.screenshot_method)
             return True
@@ -89,6 +90,7 @@ class PcControllerBase(ControllerBase):
         """
         self.btn_controller.reset()
         self.screenshot_controller.cleanup()
+        log.debug(self.frame_bus.stats_display)
 
     def active_window(self) -> None:
         """
@@ -5,17 +5,26 @@
 支持两种插件来源：
 - BUILTIN: 内置插件，位于 src/zzz_od/application 目录
 - THIRD_PARTY: 第三方插件，位于项目根目录 plugins 目录
+
+提供清单路径时，扫描结果会缓存到清单中，之后启动时文件没有变化的工厂不会导入模块，
+而是注册为 LazyApplicationFactory，在第一次使用时才导入。
 """
 
 from __future__ import annotations
 
 import importlib
 import sys
+import time
 from pathlib import Path
 from types import ModuleType
 from typing import TYPE_CHECKING
 
 from one_dragon.base.operation.application.application_factory import ApplicationFactory
+from one_dragon.base.operation.application.application_factory_manifest import (
+    ApplicationFactoryManifest,
+    FactoryManifestEntry,
+    LazyApplicationFactory,
+)
 from one_dragon.base.operation.application.plugin_info import (
     PluginInfo,
     PluginSource,
@@ -37,12 +46,18 @@ class ApplicationFactoryManager:
     负责扫描、加载和刷新应用工厂，提供插件式的应用注册机制。
     """
 
-    def __init__(self, ctx: OneDragonContext, plugin_dirs: list[tuple[Path, PluginSource]]):
+    def __init__(
+        self,
+        ctx: OneDragonContext,
+        plugin_dirs: list[tuple[Path, PluginSource]],
+        manifest_path: Path | None = None,
+    ):
         """初始化应用工厂管理器
 
         Args:
             ctx: OneDragon 上下文
             plugin_dirs: 插件目录列表，每项为 (path, source) 元组
+            manifest_path: 应用工厂清单路径，为 None 时不使用清单，每次都导入所有工厂模块
         """
         self.ctx: OneDragonContext = ctx
         self._plugin_dirs: list[tuple[Path, PluginSource]] = plugin_dirs
@@ -51,6 +66,11 @@ class ApplicationFactoryManager:
         self._plugin_infos: dict[str, PluginInfo] = {}  # {app_id: PluginInfo}
         self._scan_failures: list[tuple[Path, str]] = []  # 最近一次扫描的失败记录
         self._added_sys_paths: set[str] = set()  # 跟踪已添加到 sys.path 的路径
+        self._manifest: ApplicationFactoryManifest | None = (
+            ApplicationFactoryManifest(manifest_path) if manifest_path is not None else None
+        )
+        self._scanned_factory_files: set[str] = set()  # 最近一次扫描到的工厂文件
+        self.lazy_factory_cnt: int = 0  # 最近一次扫描中 使用清单延迟加载的工厂数量
 
     @property
     def plugin_dirs(self) -> list[tuple[Path, PluginSource]]:
@@ -83,9 +103,10 @@ class ApplicationFactoryManager:
         """发现所有应用工厂
 
         扫描所有插件目录，自动发现并加载应用工厂类。
+        使用清单时，文件没有变化的工厂以 LazyApplicationFactory 注册，不导入模块。
 
         Args:
-            reload_modules: 是否重新加载已加载的模块
+            reload_modules: 是否重新加载已加载的模块，为 True 时忽略清单，导入所有工厂模块
 
         Returns:
             tuple[list[ApplicationFactory], list[ApplicationFactory]]:
@@ -97,6 +118,9 @@ class ApplicationFactoryManager:
         # 清空旧的插件信息
         self._plugin_infos.clear()
         self._scan_failures.clear()
+        self._scanned_factory_files.clear()
+        self.lazy_factory_cnt = 0
+        t1 = time.perf_counter()
 
         for plugin_dir, source in self._plugin_dirs:
             if not plugin_dir.is_dir():
@@ -105,6 +129,10 @@ class ApplicationFactoryManager:
             non_default_factories.extend(non_default)
             default_factories.extend(default)
 
+        if self._manifest is not None:
+            self._manifest.retain(self._scanned_factory_files)
+            self._manifest.save()
+
         default_factories.sort(
             key=lambda factory: (
                 factory.priority is None,
@@ -116,7 +144,9 @@ class ApplicationFactoryManager:
         log.info(
             f"发现 {len(non_default_factories)} 个非默认组应用, "
             f"{len(default_factories)} 个默认组应用, "
-            f"{len(self._scan_failures)} 个失败"
+            f"{len(self._scan_failures)} 个失败, "
+            f"{self.lazy_factory_cnt} 个延迟加载, "
+            f"耗时 {(time.perf_counter() - t1) * 1000:.0f}ms"
         )
         return non_default_factories, default_factories
 
@@ -169,10 +199,20 @@ class ApplicationFactoryManager:
         for factory_file in factory_files:
             if factory_file.parent in conflict_dirs:
                 continue
+            self._scanned_factory_files.add(str(factory_file))
             try:
-                result = self._load_factory_from_file(factory_file, reload_modules, source, directory)
+                entry = None
+                if self._manifest is not None and not reload_modules:
+                    entry = self._manifest.get_valid_entry(factory_file)
+
+                if entry is not None:
+                    result = self._create_lazy_factory(entry, factory_file, source, directory)
+                else:
+                    result = self._load_factory_from_file(factory_file, reload_modules, source, directory)
                 if result is None:
                     self._scan_failures.append((factory_file, "No ApplicationFactory subclass found"))
+                    if self._manifest is not None:
+                        self._manifest.remove(factory_file)
                     continue
 
                 factory, is_default = result
@@ -184,6 +224,8 @@ class ApplicationFactoryManager:
                 error_msg = f"{type(e).__name__}: {str(e)}"
                 self._scan_failures.append((factory_file, error_msg))
                 log.warning(f"加载工厂文件 {factory_file} 失败: {error_msg}")
+                if self._manifest is not None:
+                    self._manifest.remove(factory_file)
 
         return non_default_factories, default_factories
 
@@ -214,6 +256,39 @@ class ApplicationFactoryManager:
             ImportError: 模块导入失败
             Other exceptions: 工厂加载或实例化时的其他错误
         """
+        module, module_name = self._import_factory_module(factory_file, reload_modules, source, base_dir)
+
+        # 查找并实例化工厂类（每个模块最多一个）
+        factory_result = self._find_factory_in_module(
+            module, module_name, factory_file, source
+        )
+
+        if factory_result is not None and self._manifest is not None:
+            self._record_manifest_entry(factory_result[0], factory_file)
+
+        return factory_result
+
+    def _import_factory_module(
+        self,
+        factory_file: Path,
+        reload_modules: bool,
+        source: PluginSource,
+        base_dir: Path | None,
+    ) -> tuple[ModuleType, str]:
+        """导入工厂模块
+
+        Args:
+            factory_file: 工厂文件路径
+            reload_modules: 是否重新加载模块
+            source: 插件来源
+            base_dir: 扫描根目录
+
+        Returns:
+            tuple[ModuleType, str]: (模块, 模块名)
+
+        Raises:
+            ImportError: 模块导入失败
+        """
         # 1. 解析 module_name 和 module_root
         if base_dir is None:
             raise ImportError(f"缺少 base_dir: {factory_file}")
@@ -250,12 +325,123 @@ class ApplicationFactoryManager:
         else:
             module = import_module_from_file(factory_file, module_name, module_root)
 
-        # 5. 查找并实例化工厂类（每个模块最多一个）
-        factory_result = self._find_factory_in_module(
-            module, module_name, factory_file, source
+        return module, module_name
+
+    def _create_lazy_factory(
+        self,
+        entry: FactoryManifestEntry,
+        factory_file: Path,
+        source: PluginSource,
+        base_dir: Path,
+    ) -> tuple[ApplicationFactory, bool]:
+        """使用清单中的记录创建延迟加载的工厂，并注册插件信息
+
+        Args:
+            entry: 清单中的记录
+            factory_file: 工厂文件路径
+            source: 插件来源
+            base_dir: 扫描根目录
+
+        Returns:
+            tuple[ApplicationFactory, bool]: (延迟加载的工厂, 是否默认组)
+        """
+        if source == PluginSource.THIRD_PARTY:
+            # 插件的其它模块可能在导入前就被使用（如应用设置），提前加入 sys.path
+            ensure_sys_path(base_dir, self._added_sys_paths)
+
+        if entry.app_id in self._plugin_infos:
+            existing = self._plugin_infos[entry.app_id]
+            raise ImportError(
+                f"重复的 APP_ID '{entry.app_id}'，"
+                f"当前模块 {entry.const_module}，"
+                f"首次注册于 {existing.const_module}"
+            )
+
+        self._plugin_infos[entry.app_id] = PluginInfo(
+            app_id=entry.app_id,
+            app_name=entry.app_name,
+            default_group=entry.default_group,
+            source=source,
+            author=entry.author,
+            homepage=entry.homepage,
+            version=entry.version,
+            description=entry.description,
+            plugin_dir=factory_file.parent,
+            factory_module=entry.factory_module,
+            const_module=entry.const_module,
         )
 
-        return factory_result
+        factory = LazyApplicationFactory(
+            entry,
+            loader=lambda: self._load_lazy_factory(entry, factory_file, source, base_dir),
+        )
+        self.lazy_factory_cnt += 1
+        log.debug(f"延迟加载工厂: {entry.factory_class} (default_group={entry.default_group})")
+        return factory, entry.default_group
+
+    def _load_lazy_factory(
+        self,
+        entry: FactoryManifestEntry,
+        factory_file: Path,
+        source: PluginSource,
+        base_dir: Path,
+    ) -> ApplicationFactory:
+        """导入延迟加载工厂的模块，并创建真正的工厂
+
+        Args:
+            entry: 清单中的记录
+            factory_file: 工厂文件路径
+            source: 插件来源
+            base_dir: 扫描根目录
+
+        Returns:
+            ApplicationFactory: 真正的工厂
+
+        Raises:
+            ImportError: 模块导入失败，或与清单中的记录不一致
+        """
+        module, module_name = self._import_factory_module(factory_file, False, source, base_dir)
+        factory_cls = self._find_factory_class(module, module_name)
+        if factory_cls is None:
+            raise ImportError(f"工厂模块中没有 ApplicationFactory 子类: {factory_file}")
+
+        factory = factory_cls(self.ctx)
+        if factory.app_id != entry.app_id:
+            raise ImportError(f"工厂的 APP_ID '{factory.app_id}' 与清单记录 '{entry.app_id}' 不一致")
+        return factory
+
+    def _record_manifest_entry(self, factory: ApplicationFactory, factory_file: Path) -> None:
+        """将已加载的工厂记录到清单
+
+        Args:
+            factory: 已加载的工厂
+            factory_file: 工厂文件路径
+        """
+        plugin_info = self._plugin_infos.get(factory.app_id)
+        const_file = self._find_const_file(factory_file.parent)
+        if plugin_info is None or const_file is None:
+            return
+
+        self._manifest.put(FactoryManifestEntry(
+            app_id=factory.app_id,
+            app_name=factory.app_name,
+            default_group=factory.default_group,
+            need_notify=factory.need_notify,
+            priority=factory.priority,
+            source=plugin_info.source.value,
+            author=plugin_info.author,
+            homepage=plugin_info.homepage,
+            version=plugin_info.version,
+            description=plugin_info.description,
+            factory_file=str(factory_file),
+            factory_module=plugin_info.factory_module,
+            factory_class=type(factory).__name__,
+            const_module=plugin_info.const_module,
+            file_stamps={
+                str(factory_file): ApplicationFactoryManifest.make_stamp(factory_file),
+                str(const_file): ApplicationFactoryManifest.make_stamp(const_file),
+            },
+        ))
 
     def _get_unload_prefix(
         self,
@@ -323,25 +509,50 @@ class ApplicationFactoryManager:
         Raises:
             Exception: 工厂实例化或元数据读取失败
         """
+        factory_cls = self._find_factory_class(module, module_name)
+        if factory_cls is None:
+            return None
+
+        factory = factory_cls(self.ctx)
+        is_default = factory.default_group
+        self._register_plugin_metadata(
+            factory, factory_file, module_name, source
+        )
+        log.debug(f"加载工厂: {factory_cls.__name__} (default_group={is_default})")
+        return factory, is_default
+
+    @staticmethod
+    def _find_factory_class(module: ModuleType, module_name: str) -> type[ApplicationFactory] | None:
+        """在模块中查找定义在该模块内的 ApplicationFactory 子类
+
+        Args:
+            module: 已加载的模块
+            module_name: 模块名
+
+        Returns:
+            type[ApplicationFactory] | None: 工厂类，未找到时返回 None
+        """
         for attr_name in dir(module):
             attr = getattr(module, attr_name)
             if (
                 isinstance(attr, type)
                 and issubclass(attr, ApplicationFactory)
                 and attr is not ApplicationFactory
+                and attr is not LazyApplicationFactory
                 and hasattr(attr, '__module__')
                 and attr.__module__ == module_name
             ):
-                factory = attr(self.ctx)
-                is_default = factory.default_group
-                self._register_plugin_metadata(
-                    factory, factory_file, module_name, source
-                )
-                log.debug(f"加载工厂: {attr_name} (default_group={is_default})")
-                return factory, is_default
+                return attr
 
         return None
 
+    def _find_const_file(self, plugin_dir: Path) -> Path | None:
+        """查找插件目录下的 const 文件"""
+        for f in plugin_dir.iterdir():
+            if f.is_file() and f.suffix == '.py' and f.stem.endswith(self._const_module_suffix):
+                return f
+        return None
+
     def _register_plugin_metadata(
         self,
         factory: ApplicationFactory,
@@ -374,12 +585,7 @@ class ApplicationFactoryManager:
         )
 
         # 查找 factory 同目录下的 const 文件
-        const_file = None
-        for f in factory_file.parent.iterdir():
-            if f.is_file() and f.suffix == '.py' and f.stem.endswith(self._const_module_suffix):
-                const_file = f
-                break
-
+        const_file = self._find_const_file(factory_file.parent)
         if const_file is None:
             raise ImportError(f"插件 {factory.app_id} 缺少 *{self._const_module_suffix}.py 文件")
 
@@ -416,3 +622,66 @@ class ApplicationFactoryManager:
         self._plugin_infos[plugin_info.app_id] = plugin_info
 
         return plugin_info
+
+
+def __debug_benchmark():
+    """
+    在新的解释器中扫描 zzz_od/application 对比 没有清单(冷启动) 和 使用清单(热启动) 的耗时
+    包括界面启动时 应用列表为每个应用读取运行记录 的耗时
+    上下文模块在界面启动时已经导入 不计入耗时 只统计扫描和读取运行记录新导入的模块数量 以及其中应用模块的数量
+    """
+    import json
+    import os
+    import subprocess
+    import tempfile
+
+    from one_dragon.utils import os_utils
+
+    src_dir = Path(__file__).parents[4]
+    app_dir = src_dir / 'zzz_od' / 'application'
+    child_code = (
+        'import json, sys, time\n'
+        'from pathlib import Path\n'
+        'from types import SimpleNamespace\n'
+        'import zzz_od.context.zzz_context\n'
+        'from one_dragon.base.operation.application.application_factory_manager import ApplicationFactoryManager\n'
+        'from one_dragon.base.operation.application.plugin_info import PluginSource\n'
+        'base_modules = set(sys.modules)\n'
+        'ctx = SimpleNamespace(game_account_config=SimpleNamespace(game_refresh_hour_offset=4))\n'
+        't1 = time.perf_counter()\n'
+        'manager = ApplicationFactoryManager(ctx, [(Path(sys.argv[1]), PluginSource.BUILTIN)], manifest_path=Path(sys.argv[2]))\n'
+        'non_default, default = manager.discover_factories()\n'
+        't2 = time.perf_counter()\n'
+        'for factory in non_default + default:\n'
+        '    try:\n'
+        '        factory.get_run_record(0)\n'
+        '    except Exception:\n'
+        '        pass\n'
+        't3 = time.perf_counter()\n'
+        'new_modules = [i for i in sys.modules if i not in base_modules]\n'
+        'app_modules = [i for i in new_modules if i.endswith("_app") and hasattr(sys.modules[i], "__file__")'
+        ' and not sys.modules[i].__file__.endswith("__init__.py")]\n'
+        'print(json.dumps({"discover": t2 - t1, "run_record": t3 - t2, "modules": len(new_modules), '
+        '"app_modules": len(app_modules), "apps": len(non_default) + len(default), '
+        '"lazy": manager.lazy_factory_cnt, "failures": len(manager.scan_failures)}))\n'
+    )
+    env = dict(os.environ)
+    env['PYTHONPATH'] = str(src_dir)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manifest_path = Path(temp_dir) / 'application_factory_manifest.json'
+        for title in ['冷启动', '热启动', '热启动']:
+            result = subprocess.run(
+                [sys.executable, '-c', child_code, str(app_dir), str(manifest_path)],
+                cwd=os_utils.get_work_dir(), env=env, capture_output=True, text=True, encoding='utf-8',
+            )
+            if result.returncode != 0:
+                print(result.stderr)
+                return
+            data = json.loads(result.stdout.strip().splitlines()[-1])
+            print(f'{title}: 扫描 {data["discover"] * 1000:.0f}ms 读取运行记录 {data["run_record"] * 1000:.0f}ms '
+                  f'新导入模块 {data["modules"]}个 其中应用模块 {data["app_modules"]}个 '
+                  f'应用 {data["apps"]}个 延迟加载 {data["lazy"]}个 失败 {data["failures"]}个')
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
@@ -0,0 +1,278 @@
+"""应用工厂清单
+
+缓存扫描得到的应用工厂元数据，使启动时不需要导入所有工厂模块。
+
+- 首次扫描时导入工厂模块，记录 app_id、名称、默认组、模块路径等元数据，以及工厂文件和常量文件的签名
+- 之后启动时只检查文件签名，未变化的工厂使用 LazyApplicationFactory 代替，在第一次使用时才导入模块
+- 文件签名为 修改时间 + 大小 + sha1，修改时间变化但内容不变（如切换分支）时仍视为有效
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from one_dragon.base.operation.application.application_config import ApplicationConfig
+from one_dragon.base.operation.application.application_factory import ApplicationFactory
+from one_dragon.base.operation.application_base import Application
+from one_dragon.base.operation.application_run_record import AppRunRecord
+from one_dragon.utils.log_utils import log
+
+_MANIFEST_VERSION = 1
+
+
+@dataclass
+class FactoryManifestEntry:
+    """一个应用工厂在清单中的记录"""
+
+    # 工厂元数据
+    app_id: str
+    app_name: str
+    default_group: bool
+    need_notify: bool
+    priority: int | None
+
+    # 插件元数据
+    source: str
+    author: str = ''
+    homepage: str = ''
+    version: str = ''
+    description: str = ''
+
+    # 模块信息
+    factory_file: str = ''
+    factory_module: str = ''
+    factory_class: str = ''
+    const_module: str = ''
+
+    # 文件签名 {文件路径: [修改时间ns, 大小, sha1]}
+    file_stamps: dict[str, list] = field(default_factory=dict)
+
+
+class ApplicationFactoryManifest:
+
+    def __init__(self, manifest_path: str | Path):
+        """
+        应用工厂清单 以 json 保存在本地
+
+        Args:
+            manifest_path: 清单文件路径
+        """
+        self.manifest_path: Path = Path(manifest_path)
+        self._lock = threading.Lock()
+        self._entries: dict[str, FactoryManifestEntry] | None = None  # {工厂文件路径: 记录} 第一次使用时加载
+        self._dirty: bool = False
+
+    def _load(self) -> dict[str, FactoryManifestEntry]:
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = {}
+        if not self.manifest_path.is_file():
+            return self._entries
+        try:
+            with open(self.manifest_path, encoding='utf-8') as file:
+                data = json.load(file)
+            if data.get('version') != _MANIFEST_VERSION:
+                return self._entries
+            for item in data.get('entries', []):
+                entry = FactoryManifestEntry(**item)
+                self._entries[entry.factory_file] = entry
+        except Exception:
+            log.warning(f'应用工厂清单无法读取 将重新扫描 {self.manifest_path}', exc_info=True)
+            self._entries = {}
+        return self._entries
+
+    def get_valid_entry(self, factory_file: Path) -> FactoryManifestEntry | None:
+        """
+        获取工厂文件的记录 记录中的文件有变化时返回None
+
+        Args:
+            factory_file: 工厂文件路径
+
+        Returns:
+            FactoryManifestEntry | None: 有效的记录
+        """
+        with self._lock:
+            entry = self._load().get(str(factory_file))
+            if entry is None or len(entry.file_stamps) == 0:
+                return None
+
+            for file_path, stamp in entry.file_stamps.items():
+                new_stamp = self._check_stamp(file_path, stamp)
+                if new_stamp is None:
+                    return None
+                if new_stamp is not stamp:
+                    entry.file_stamps[file_path] = new_stamp
+                    self._dirty = True
+            return entry
+
+    @staticmethod
+    def _check_stamp(file_path: str, stamp: list) -> list | None:
+        """
+        检查文件签名
+
+        Returns:
+            list | None: 文件没有变化时返回签名 只有修改时间变化时返回新的签名 内容有变化时返回None
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        mtime_ns, size, sha1 = stamp
+        if stat.st_mtime_ns == mtime_ns and stat.st_size == size:
+            return stamp
+        if stat.st_size != size:
+            return None
+        if ApplicationFactoryManifest._file_sha1(file_path) != sha1:
+            return None
+        return [stat.st_mtime_ns, stat.st_size, sha1]
+
+    @staticmethod
+    def make_stamp(file_path: Path) -> list:
+        """
+        生成文件签名
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            list: [修改时间ns, 大小, sha1]
+        """
+        stat = os.stat(file_path)
+        return [stat.st_mtime_ns, stat.st_size, ApplicationFactoryManifest._file_sha1(str(file_path))]
+
+    @staticmethod
+    def _file_sha1(file_path: str) -> str:
+        with open(file_path, 'rb') as file:
+            return hashlib.sha1(file.read()).hexdigest()
+
+    def put(self, entry: FactoryManifestEntry) -> None:
+        """
+        新增或更新一个记录
+        """
+        with self._lock:
+            self._load()[entry.factory_file] = entry
+            self._dirty = True
+
+    def remove(self, factory_file: Path) -> None:
+        """
+        移除一个记录 用于加载失败的工厂
+        """
+        with self._lock:
+            if self._load().pop(str(factory_file), None) is not None:
+                self._dirty = True
+
+    def retain(self, factory_files: set[str]) -> None:
+        """
+        只保留本次扫描到的工厂文件 移除已经删除的插件
+
+        Args:
+            factory_files: 本次扫描到的工厂文件路径
+        """
+        with self._lock:
+            entries = self._load()
+            for key in [i for i in entries if i not in factory_files]:
+                entries.pop(key)
+                self._dirty = True
+
+    def save(self) -> None:
+        """
+        有变化时保存到文件
+        """
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            data = {
+                'version': _MANIFEST_VERSION,
+                'entries': [asdict(i) for i in self._entries.values()],
+            }
+            try:
+                self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = self.manifest_path.with_suffix('.tmp')
+                with open(temp_path, 'w', encoding='utf-8') as file:
+                    json.dump(data, file, ensure_ascii=False, indent=1)
+                os.replace(temp_path, self.manifest_path)
+                self._dirty = False
+            except Exception:
+                log.warning(f'应用工厂清单保存失败 {self.manifest_path}', exc_info=True)
+
+    def clear(self) -> None:
+        """
+        删除清单 下次扫描时重新导入所有工厂模块
+        """
+        with self._lock:
+            self._entries = {}
+            self._dirty = False
+            self.manifest_path.unlink(missing_ok=True)
+
+
+class LazyApplicationFactory(ApplicationFactory):
+
+    def __init__(self, entry: FactoryManifestEntry, loader: Callable[[], ApplicationFactory]):
+        """
+        延迟加载的应用工厂
+
+        注册时只使用清单中的元数据 第一次创建应用、配置或运行记录时才导入工厂模块
+        工厂模块只在 create_application 中导入应用模块 界面启动时为每个应用读取运行记录
+        只会导入工厂、常量、配置和运行记录模块 不会导入应用和其中的指令
+        配置和运行记录的缓存都由真正的工厂持有
+
+        Args:
+            entry: 清单中的记录
+            loader: 导入模块并创建真正工厂的方法
+        """
+        self.app_id: str = entry.app_id
+        self.app_name: str = entry.app_name
+        self.default_group: bool = entry.default_group
+        self.need_notify: bool = entry.need_notify
+        self.priority: int | None = entry.priority
+        self._config_cache: dict[str, ApplicationConfig] = {}
+        self._run_record_cache: dict[str, AppRunRecord] = {}
+
+        self.entry: FactoryManifestEntry = entry
+        self._loader: Callable[[], ApplicationFactory] = loader
+        self._factory: ApplicationFactory | None = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        """是否已经导入了工厂模块"""
+        return self._factory is not None
+
+    @property
+    def factory(self) -> ApplicationFactory:
+        """真正的工厂 第一次使用时导入模块"""
+        if self._factory is not None:
+            return self._factory
+        with self._load_lock:
+            if self._factory is None:
+                t1 = time.perf_counter()
+                self._factory = self._loader()
+                log.debug(f'延迟加载工厂 {self.app_id} 耗时 {(time.perf_counter() - t1) * 1000:.0f}ms')
+        return self._factory
+
+    def create_application(self, instance_idx: int, group_id: str) -> Application:
+        return self.factory.create_application(instance_idx, group_id)
+
+    def create_config(self, instance_idx: int, group_id: str) -> ApplicationConfig:
+        return self.factory.create_config(instance_idx, group_id)
+
+    def create_run_record(self, instance_idx: int) -> AppRunRecord:
+        return self.factory.create_run_record(instance_idx)
+
+    def get_config(self, instance_idx: int, group_id: str) -> ApplicationConfig:
+        return self.factory.get_config(instance_idx, group_id)
+
+    def get_run_record(self, instance_idx: int) -> AppRunRecord:
+        return self.factory.get_run_record(instance_idx)
+
+    def clear_cache(self) -> None:
+        if self._factory is not None:
+            self._factory.clear_cache()
@@ -1,12 +1,24 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
 from collections.abc import Callable
-from concurrent.futures import Future, ThreadPoolExecutor
-from contextlib import suppress
 from dataclasses import dataclass
+from enum import IntEnum
 from typing import Any
 
-from one_dragon.utils import thread_utils
+from one_dragon.utils.log_utils import log
 
-_od_event_bus_executor = ThreadPoolExecutor(thread_name_prefix='od_event_bus', max_workers=32)
+_DRAIN_BATCH_SIZE = 32  # 一个监听者连续处理的事件数量 超过后让出线程 避免高频事件占住线程
+
+
+class EventPriority(IntEnum):
+    """监听者的优先级 有多个监听者等待执行时 优先执行高优先级的"""
+
+    HIGH = 0  # 运行状态控制、按键等需要及时响应的
+    NORMAL = 1
+    LOW = 2  # 日志、统计等可以延后的
 
 
 @dataclass
@@ -15,10 +27,230 @@ class ContextEventItem:
     data: Any
 
 
+@dataclass
+class ContextEventStats:
+    """一个事件的分发统计"""
+
+    event_id: str
+    dispatch_cnt: int = 0  # 下发给监听者的次数 一个事件有多个监听者时计算多次
+    deliver_cnt: int = 0  # 回调执行的次数
+    coalesced_cnt: int = 0  # 等待中被新事件合并的次数
+    dropped_cnt: int = 0  # 监听者队列满时被丢弃的次数
+    error_cnt: int = 0  # 回调抛出异常的次数
+    total_latency: float = 0  # 下发到回调开始执行的总耗时
+    max_latency: float = 0
+    total_cost: float = 0  # 回调执行的总耗时
+    max_cost: float = 0
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.deliver_cnt if self.deliver_cnt > 0 else 0
+
+    @property
+    def avg_cost(self) -> float:
+        return self.total_cost / self.deliver_cnt if self.deliver_cnt > 0 else 0
+
+
+@dataclass
+class ContextListenerStats:
+    """一个监听者的队列统计"""
+
+    name: str
+    event_id_list: list[str]
+    priority: EventPriority
+    sync: bool
+    queue_size: int  # 当前等待执行的事件数量
+    max_queue_size: int  # 出现过的最大等待数量
+
+
+class _PendingEvent:
+
+    __slots__ = ('item', 'dispatch_time')
+
+    def __init__(self, item: ContextEventItem, dispatch_time: float):
+        self.item: ContextEventItem = item
+        self.dispatch_time: float = dispatch_time
+
+
+class _EventListener:
+
+    def __init__(
+        self,
+        bus: 'ContextEventBus',
+        callback: Callable[[ContextEventItem], None],
+        priority: EventPriority,
+        coalesce: bool,
+        sync: bool,
+        max_queue_size: int,
+    ):
+        """
+        一个回调对应一个监听者 监听多个事件时共用一个队列
+        同一个监听者的事件按下发顺序串行执行
+        """
+        self.bus: ContextEventBus = bus
+        self.callback: Callable[[ContextEventItem], None] = callback
+        self.priority: EventPriority = priority
+        self.coalesce: bool = coalesce
+        self.sync: bool = sync
+        self.max_queue_size: int = max_queue_size
+        self.event_id_list: list[str] = []
+
+        self._lock = threading.Lock()
+        self._queue: deque[_PendingEvent] = deque()
+        self._pending_by_event: dict[str, _PendingEvent] = {}  # 合并事件时 每个事件等待中的那一个
+        self._scheduled: bool = False  # 是否已经在分发器中等待执行或正在执行
+        self.peak_queue_size: int = 0
+
+    @property
+    def name(self) -> str:
+        return getattr(self.callback, '__qualname__', repr(self.callback))
+
+    def put(self, item: ContextEventItem) -> None:
+        now = time.perf_counter()
+        if self.sync:
+            self.bus._record_dispatch(item.event_id)
+            self._invoke(_PendingEvent(item, now))
+            return
+
+        with self._lock:
+            if self.coalesce:
+                pending = self._pending_by_event.get(item.event_id)
+                if pending is not None:  # 还没有执行 直接换成最新的事件 保持原来的位置
+                    pending.item = item
+                    self.bus._record_coalesced(item.event_id)
+                    return
+
+            dropped: _PendingEvent | None = None
+            if len(self._queue) >= self.max_queue_size:
+                dropped = self._queue.popleft()
+                if self._pending_by_event.get(dropped.item.event_id) is dropped:
+                    self._pending_by_event.pop(dropped.item.event_id)
+
+            pending = _PendingEvent(item, now)
+            self._queue.append(pending)
+            if self.coalesce:
+                self._pending_by_event[item.event_id] = pending
+            self.peak_queue_size = max(self.peak_queue_size, len(self._queue))
+
+            need_schedule = not self._scheduled
+            self._scheduled = True
+
+        self.bus._record_dispatch(item.event_id)
+        if dropped is not None:
+            self.bus._record_dropped(dropped.item.event_id)
+        if need_schedule:
+            _od_event_dispatcher.schedule(self)
+
+    def drain(self) -> None:
+        """
+        在分发器的线程中执行 连续处理一批事件
+        """
+        for _ in range(_DRAIN_BATCH_SIZE):
+            with self._lock:
+                if len(self._queue) == 0:
+                    self._scheduled = False
+                    return
+                pending = self._queue.popleft()
+                if self._pending_by_event.get(pending.item.event_id) is pending:
+                    self._pending_by_event.pop(pending.item.event_id)
+            self._invoke(pending)
+
+        with self._lock:
+            if len(self._queue) == 0:
+                self._scheduled = False
+                return
+        _od_event_dispatcher.schedule(self)  # 还有事件 重新排队 让其他监听者先执行
+
+    def _invoke(self, pending: _PendingEvent) -> None:
+        start_time = time.perf_counter()
+        success = True
+        try:
+            self.callback(pending.item)
+        except Exception:
+            success = False
+            log.error(f'事件回调执行失败 {pending.item.event_id} {self.name}', exc_info=True)
+        end_time = time.perf_counter()
+        self.bus._record_deliver(pending.item.event_id, start_time - pending.dispatch_time,
+                                 end_time - start_time, success)
+
+    @property
+    def queue_size(self) -> int:
+        return len(self._queue)
+
+
+class _EventDispatcher:
+
+    def __init__(self, max_workers: int):
+        """
+        执行监听者队列的线程池
+        每个监听者同时最多只在一个线程中执行 有多个监听者等待时按优先级执行
+
+        Args:
+            max_workers: 最大线程数 按需创建
+        """
+        self.max_workers: int = max_workers
+        self._condition = threading.Condition()
+        self._ready: list[tuple[int, int, _EventListener]] = []  # 堆 (优先级, 序号, 监听者)
+        self._seq = itertools.count()
+        self._threads: list[threading.Thread] = []
+        self._idle_cnt: int = 0
+        self._running: bool = True
+
+    def schedule(self, listener: _EventListener) -> None:
+        with self._condition:
+            if not self._running:
+                return
+            heapq.heappush(self._ready, (listener.priority, next(self._seq), listener))
+            # 被唤醒前空闲线程数不会减少 所以按等待的数量判断是否需要新线程
+            if len(self._ready) > self._idle_cnt and len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._run, name=f'od_event_bus_{len(self._threads)}', daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            else:
+                self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._idle_cnt += 1
+                while self._running and len(self._ready) == 0:
+                    self._condition.wait()
+                self._idle_cnt -= 1
+                if not self._running:
+                    return
+                _, _, listener = heapq.heappop(self._ready)
+            listener.drain()
+
+    def shutdown(self) -> None:
+        """
+        停止执行 丢弃还没有执行的事件
+        """
+        with self._condition:
+            self._running = False
+            self._ready.clear()
+            self._condition.notify_all()
+
+    @property
+    def ready_size(self) -> int:
+        """等待线程执行的监听者数量"""
+        return len(self._ready)
+
+    @property
+    def thread_cnt(self) -> int:
+        return len(self._threads)
+
+
+_od_event_dispatcher = _EventDispatcher(max_workers=32)
+
+
 class ContextEventBus:
 
     def __init__(self):
-        self.callbacks: dict[str, list[Callable[[Any], None]]] = {}
+        self.callbacks: dict[str, list[_EventListener]] = {}
+        self._listener_list: list[_EventListener] = []
+        self._listener_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._event_stats: dict[str, ContextEventStats] = {}
 
     def dispatch_event(self, event_id: str, event_obj: Any = None):
         """
@@ -27,25 +259,51 @@ class ContextEventBus:
         :param event_obj: 事件体
         :return:
         """
-        if event_id not in self.callbacks:
+        listener_list = self.callbacks.get(event_id)
+        if not listener_list:
             return
-        for callback in self.callbacks[event_id]:
-            future: Future = _od_event_bus_executor.submit(callback, ContextEventItem(event_id, event_obj))
-            future.add_done_callback(thread_utils.handle_future_result)
+        item = ContextEventItem(event_id, event_obj)
+        for listener in tuple(listener_list):
+            listener.put(item)
 
-    def listen_event(self, event_id: str, callback: Callable[[ContextEventItem], None]):
+    def listen_event(
+        self,
+        event_id: str,
+        callback: Callable[[ContextEventItem], None],
+        priority: EventPriority = EventPriority.NORMAL,
+        coalesce: bool = False,
+        sync: bool = False,
+        max_queue_size: int = 1000,
+    ):
         """
         新增监听事件
+        每个回调有自己的队列 事件按下发顺序串行执行 同一个回调监听多个事件时共用一个队列 选项以第一次监听时为准
         监听的回调，如果耗时过长，应该在自己的线程池的工作，避免阻塞
         :param event_id:
         :param callback:
+        :param priority: 有多个回调等待执行时 优先执行高优先级的
+        :param coalesce: 是否合并事件 同一个事件还没执行时 只保留最新的一个 适合只关心最新状态的回调
+        :param sync: 是否在下发事件的线程中直接执行 适合只发送信号等很快的回调
+        :param max_queue_size: 队列中最多等待的事件数量 满时丢弃最旧的
         :return:
         """
-        if event_id not in self.callbacks:
-            self.callbacks[event_id] = []
-        existed_callbacks = self.callbacks[event_id]
-        if callback not in existed_callbacks:
-            existed_callbacks.append(callback)
+        with self._listener_lock:
+            listener = self._find_listener(callback)
+            if listener is None:
+                listener = _EventListener(self, callback, priority=priority, coalesce=coalesce, sync=sync,
+                                          max_queue_size=max_queue_size)
+                self._listener_list.append(listener)
+            if event_id in listener.event_id_list:
+                return
+            listener.event_id_list.append(event_id)
+            # 复制后替换 下发事件时不需要加锁
+            self.callbacks[event_id] = [*self.callbacks.get(event_id, []), listener]
+
+    def _find_listener(self, callback: Callable[[Any], None]) -> _EventListener | None:
+        for listener in self._listener_list:
+            if listener.callback == callback:
+                return listener
+        return None
 
     def unlisten_event(self, event_id: str, callback: Callable[[Any], None]):
         """
@@ -54,10 +312,11 @@ class ContextEventBus:
         :param callback:
         :return:
         """
-        if event_id not in self.callbacks:
-            return
-        with suppress(Exception):
-            self.callbacks[event_id].remove(callback)
+        with self._listener_lock:
+            listener = self._find_listener(callback)
+            if listener is None or event_id not in listener.event_id_list:
+                return
+            self._remove_listener_event(listener, event_id)
 
     def unlisten_all_event(self, obj: Any):
         """
@@ -65,20 +324,157 @@ class ContextEventBus:
         :param obj:
         :return:
         """
-        to_remove = {}
-        for key, existed_callbacks in self.callbacks.items():
-            to_remove[key] = []
-            for existed in existed_callbacks:
-                if id(existed.__self__) == id(obj):
-                    to_remove[key].append(existed)
+        with self._listener_lock:
+            for listener in list(self._listener_list):
+                if id(getattr(listener.callback, '__self__', None)) != id(obj):
+                    continue
+                for event_id in list(listener.event_id_list):
+                    self._remove_listener_event(listener, event_id)
+
+    def _remove_listener_event(self, listener: _EventListener, event_id: str) -> None:
+        listener.event_id_list.remove(event_id)
+        self.callbacks[event_id] = [i for i in self.callbacks[event_id] if i is not listener]
+        if len(listener.event_id_list) == 0:
+            # 已经在队列中的事件仍会执行 与原来提交到线程池后无法撤回一致
+            self._listener_list.remove(listener)
+
+    def _get_stats(self, event_id: str) -> ContextEventStats:
+        stats = self._event_stats.get(event_id)
+        if stats is None:
+            stats = self._event_stats[event_id] = ContextEventStats(event_id)
+        return stats
+
+    def _record_dispatch(self, event_id: str) -> None:
+        with self._stats_lock:
+            self._get_stats(event_id).dispatch_cnt += 1
+
+    def _record_coalesced(self, event_id: str) -> None:
+        with self._stats_lock:
+            stats = self._get_stats(event_id)
+            stats.dispatch_cnt += 1
+            stats.coalesced_cnt += 1
+
+    def _record_dropped(self, event_id: str) -> None:
+        with self._stats_lock:
+            self._get_stats(event_id).dropped_cnt += 1
+
+    def _record_deliver(self, event_id: str, latency: float, cost: float, success: bool) -> None:
+        with self._stats_lock:
+            stats = self._get_stats(event_id)
+            stats.deliver_cnt += 1
+            if not success:
+                stats.error_cnt += 1
+            stats.total_latency += latency
+            stats.max_latency = max(stats.max_latency, latency)
+            stats.total_cost += cost
+            stats.max_cost = max(stats.max_cost, cost)
+
+    def get_event_stats(self) -> list[ContextEventStats]:
+        """
+        各个事件的分发统计 用于排查事件积压
+        :return:
+        """
+        with self._stats_lock:
+            return [ContextEventStats(**vars(i)) for i in self._event_stats.values()]
 
-        for key, removes in to_remove.items():
-            for remove in removes:
-                self.callbacks[key].remove(remove)
+    def get_listener_stats(self) -> list[ContextListenerStats]:
+        """
+        各个监听者的队列统计
+        :return:
+        """
+        with self._listener_lock:
+            return [
+                ContextListenerStats(
+                    name=i.name,
+                    event_id_list=list(i.event_id_list),
+                    priority=i.priority,
+                    sync=i.sync,
+                    queue_size=i.queue_size,
+                    max_queue_size=i.peak_queue_size,
+                )
+                for i in self._listener_list
+            ]
 
     def after_app_shutdown(self) -> None:
         """
         App关闭后进行的操作 关闭一切可能资源操作
         @return:
         """
-        _od_event_bus_executor.shutdown(wait=False, cancel_futures=True)
+        _od_event_dispatcher.shutdown()
+
+
+def __debug_stress():
+    """
+    压力测试 每秒下发数千个事件
+    对比 原来每个事件都提交到线程池 和 监听者队列 的下发耗时、延迟和顺序
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    event_cnt = 20000
+    batch_size = 50  # 每 10ms 下发 50 个 即每秒 5000 个事件
+
+    def _dispatch_all(dispatch: Callable[[str, int], None]) -> float:
+        dispatch_seconds = 0
+        for i in range(event_cnt):
+            t1 = time.perf_counter()
+            dispatch('screenshot' if i % 10 != 0 else 'state', i)
+            dispatch_seconds += time.perf_counter() - t1
+            if i % batch_size == batch_size - 1:
+                time.sleep(0.01)
+        return dispatch_seconds / event_cnt
+
+    # 原来的方式 每个事件的每个回调都提交到线程池
+    executor = ThreadPoolExecutor(max_workers=32)
+    received: list[int] = []
+    received_lock = threading.Lock()
+
+    def _slow_callback(event: ContextEventItem) -> None:
+        time.sleep(0.0005)
+        with received_lock:
+            received.append(event.data)
+
+    dispatch_cost = _dispatch_all(lambda event_id, data: executor.submit(_slow_callback, ContextEventItem(event_id, data)))
+    executor.shutdown(wait=True)
+    out_of_order = sum(1 for a, b in itertools.pairwise(received) if b < a)
+    print(f'线程池: 下发 {dispatch_cost * 1e6:.1f}us/个 乱序 {out_of_order} 次')
+
+    # 监听者队列
+    bus = ContextEventBus()
+    serial_received: list[int] = []
+    latest_state: list[int] = []
+    sync_cnt = [0]
+
+    class _Listener:
+
+        def on_serial(self, event: ContextEventItem) -> None:
+            sum(range(100))
+            serial_received.append(event.data)
+
+        def on_latest(self, event: ContextEventItem) -> None:
+            time.sleep(0.005)  # 很慢 只需要最新的截图
+            latest_state.append(event.data)
+
+        def on_sync(self, event: ContextEventItem) -> None:
+            sync_cnt[0] += 1
+
+    listener = _Listener()
+    bus.listen_event('screenshot', listener.on_serial)
+    bus.listen_event('state', listener.on_serial)
+    bus.listen_event('screenshot', listener.on_latest, coalesce=True, priority=EventPriority.LOW)
+    bus.listen_event('state', listener.on_sync, sync=True)
+
+    dispatch_cost = _dispatch_all(bus.dispatch_event)
+    time.sleep(0.5)
+    out_of_order = sum(1 for a, b in itertools.pairwise(serial_received) if b < a)
+    print(f'监听者队列: 下发 {dispatch_cost * 1e6:.1f}us/个 串行回调收到 {len(serial_received)} 个 乱序 {out_of_order} 次 '
+          f'合并回调收到 {len(latest_state)} 个 最后一个 {latest_state[-1] if latest_state else None} '
+          f'同步回调收到 {sync_cnt[0]} 个 线程数 {_od_event_dispatcher.thread_cnt}')
+    for stats in bus.get_event_stats():
+        print(f'{stats.event_id}: 下发 {stats.dispatch_cnt} 执行 {stats.deliver_cnt} 合并 {stats.coalesced_cnt} '
+              f'丢弃 {stats.dropped_cnt} 延迟 平均 {stats.avg_latency * 1000:.2f}ms 最长 {stats.max_latency * 1000:.2f}ms')
+    for stats in bus.get_listener_stats():
+        print(f'{stats.name}: 队列 {stats.queue_size} 最大 {stats.max_queue_size}')
+
+
+if __name__ == '__main__':
+    __debug_stress()
@@ -1,6 +1,8 @@
 import inspect
 import logging
+import os
 import threading
+import time
 from enum import Enum
 from functools import cached_property
 from pathlib import Path
@@ -36,7 +38,14 @@ from one_dragon.base.operation.overlay_debug_bus import OverlayDebugBus
 from one_dragon.base.push.push_service import PushService
 from one_dragon.base.screen.screen_loader import ScreenContext
 from one_dragon.base.screen.template_loader import TemplateLoader
-from one_dragon.utils import debug_utils, file_utils, i18_utils, log_utils, thread_utils
+from one_dragon.utils import (
+    debug_utils,
+    file_utils,
+    i18_utils,
+    log_utils,
+    os_utils,
+    thread_utils,
+)
 from one_dragon.utils.log_utils import log
 
 
@@ -139,7 +148,11 @@ class OneDragonContext(ContextEventBus, OneDragonEnvContext):
     @cached_property
     def factory_manager(self) -> ApplicationFactoryManager:
         """应用工厂管理器"""
-        return ApplicationFactoryManager(self, self.application_plugin_dirs)
+        return ApplicationFactoryManager(
+            self,
+            self.application_plugin_dirs,
+            manifest_path=Path(os_utils.get_path_under_work_dir('.cache')) / 'application_factory_manifest.json',
+        )
 
     #------------------- 以下是 游戏/脚本级别的 -------------------#
 
@@ -267,6 +280,7 @@ class OneDragonContext(ContextEventBus, OneDragonEnvContext):
                 i18_utils.update_default_lang(self.custom_config.ui_language)
 
             log_utils.set_log_level(logging.DEBUG if self.env_config.is_debug else logging.INFO)
+            self.update_perf_trace()
 
             if not self._application_registered:  # 只需要注册一次
                 self.register_application_factory()
@@ -380,7 +394,7 @@ class OneDragonContext(ContextEventBus, OneDragonEnvContext):
         if self.controller.game_win is not None:
             self.controller.game_win.active()
         _, img = self.controller.screenshot(independent=True)
-        base_file_name = debug_utils.save_debug_image(img, copy_screenshot=copy_screenshot)
+        base_file_name = debug_utils.save_debug_image(img, copy_screenshot=copy_screenshot, keep=True)
         self._save_overlay_patched_image(img, base_file_name)
 
     def _save_overlay_patched_image(self, base_image, base_file_name: str) -> None:
@@ -405,6 +419,7 @@ class OneDragonContext(ContextEventBus, OneDragonEnvContext):
             patched,
             file_name=f"{base_file_name}{config.patched_capture_suffix}",
             copy_screenshot=False,
+            keep=True,
         )
 
     @staticmethod
@@ -479,6 +494,47 @@ class OneDragonContext(ContextEventBus, OneDragonEnvContext):
             if prop in self.__dict__:
                 del self.__dict__[prop]
 
+    @property
+    def perf_trace_dir(self) -> str:
+        """
+        性能追踪的保存目录
+        :return:
+        """
+        return os_utils.get_path_under_work_dir('.debug', 'perf_trace')
+
+    def update_perf_trace(self) -> None:
+        """
+        按配置开启或关闭性能追踪
+        :return:
+        """
+        if not self.env_config.perf_trace_enabled:
+            self.overlay_debug_bus.stop_recording()
+        elif self.overlay_debug_bus.recorder is None:
+            self.overlay_debug_bus.start_recording(self.perf_trace_dir)
+
+    def export_perf_trace(self, start_time: float | None = None, end_time: float | None = None) -> str | None:
+        """
+        把性能追踪导出成 Chrome / Perfetto 可以打开的 JSON
+        没有开启记录时 导出之前运行留下的记录
+        :param start_time: 只导出这个时间之后的事件
+        :param end_time: 只导出这个时间之前的事件
+        :return: 导出的文件路径 没有任何记录时返回 None
+        """
+        from one_dragon.base.operation import perf_trace_recorder
+
+        file_path = os.path.join(debug_utils.get_debug_dir_path(),
+                                 f'perf_trace_{time.strftime("%Y%m%d_%H%M%S")}.json')
+        recorder = self.overlay_debug_bus.recorder
+        if recorder is not None:
+            recorder.export_chrome_trace(file_path, start_time=start_time, end_time=end_time)
+        else:
+            segments = perf_trace_recorder.list_segments(self.perf_trace_dir)
+            if len(segments) == 0:
+                return None
+            perf_trace_recorder.export_chrome_trace(segments, file_path, start_time=start_time, end_time=end_time)
+        log.info('性能追踪已导出 %s', file_path)
+        return file_path
+
     def init_ocr(self) -> None:
         """
         初始化OCR
@@ -536,8 +592,10 @@ class OneDragonContext(ContextEventBus, OneDragonEnvContext):
         StateRecordService.after_app_shutdown()
         from one_dragon.utils import gpu_executor
         gpu_executor.shutdown(wait=False)
+        debug_utils.shutdown_debug_image_writer()
         from one_dragon.base.operation.application_base import Application
         Application.after_app_shutdown()
         self.run_context.after_app_shutdown()
         self.push_service.after_app_shutdown()
+        self.overlay_debug_bus.stop_recording()
         self.overlay_debug_bus.clear()
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import difflib
 import inspect
+import logging
 import time
+import weakref
 from collections.abc import Callable
 from functools import cached_property
 from typing import TYPE_CHECKING, Any, ClassVar
@@ -16,6 +18,7 @@ from one_dragon.base.matcher.ocr import ocr_utils
 from one_dragon.base.operation.application.application_run_context import (
     ApplicationRunContextStateEventEnum,
 )
+from one_dragon.base.operation.context_event_bus import EventPriority
 from one_dragon.base.operation.operation_base import OperationBase, OperationResult
 from one_dragon.base.operation.operation_edge import OperationEdge, OperationEdgeDesc
 from one_dragon.base.operation.operation_node import OperationNode
@@ -24,12 +27,13 @@ from one_dragon.base.operation.operation_round_result import (
     OperationRoundResult,
     OperationRoundResultEnum,
 )
+from one_dragon.base.operation.round_pacer import RoundPacer
 from one_dragon.base.screen import screen_utils
 from one_dragon.base.screen.screen_area import ScreenArea
 from one_dragon.base.screen.screen_utils import FindAreaResultEnum, OcrClickResultEnum
 from one_dragon.utils import debug_utils, str_utils
 from one_dragon.utils.i18_utils import coalesce_gt, gt
-from one_dragon.utils.log_utils import log
+from one_dragon.utils.log_utils import log, log_every
 
 if TYPE_CHECKING:
     from one_dragon.base.operation.one_dragon_context import OneDragonContext
@@ -80,11 +84,35 @@ class NodeStateProxy:
         return self.result.is_fail if self.result is not None else False
 
 
+class OperationNodeGraph:
+
+    def __init__(
+            self,
+            start_node: OperationNode,
+            node_map: dict[str, OperationNode],
+            node_edges_map: dict[str, list[OperationEdge]],
+    ):
+        """
+        由类上的节点注解构建的节点网络 同一个类的所有实例共用
+        """
+        self.start_node: OperationNode = start_node
+        """起始节点 不包含游戏窗口检查"""
+
+        self.node_map: dict[str, OperationNode] = node_map
+        """节点集合 key=节点名称 value=节点"""
+
+        self.node_edges_map: dict[str, list[OperationEdge]] = node_edges_map
+        """节点的边集合 key=节点名称 value=从该节点出发的边列表"""
+
+
 class Operation(OperationBase):
 
     STATUS_TIMEOUT: ClassVar[str] = '执行超时'
     STATUS_SCREEN_UNKNOWN: ClassVar[str] = '未能识别当前画面'
 
+    _node_graph_cache: ClassVar[weakref.WeakKeyDictionary[type, OperationNodeGraph]] = weakref.WeakKeyDictionary()
+    """类 -> 节点网络 类被回收后自动移除"""
+
     def __init__(
             self,
             ctx: OneDragonContext,
@@ -159,6 +187,9 @@ class Operation(OperationBase):
         self._current_node_start_time: float | None = None
         """当前节点的开始运行时间"""
 
+        self._node_enter_time: float = 0
+        """进入当前节点的时间 不扣除暂停 用于性能追踪"""
+
         self._current_node: OperationNode | None = None
         """当前执行的节点"""
 
@@ -183,6 +214,24 @@ class Operation(OperationBase):
         self.node_status: dict[str, NodeStateProxy] = {}
         """已保存节点状态的字典"""
 
+        self._node_frame_id: int | None = None
+        """当前节点上一轮处理的画面编号 用于 skip_unchanged_frame"""
+
+        self._node_frame_round_result: OperationRoundResult | None = None
+        """当前节点上一轮处理后的重试/等待结果 画面没有变化时沿用"""
+
+        self._node_frame_round_cost: float = 0
+        """当前节点上一轮处理的耗时 包括结果中的等待 沿用结果时保持相同的节奏"""
+
+        self._node_frame_skip_cnt: int = 0
+        """当前节点连续沿用结果的轮数"""
+
+        self.skipped_round_cnt: int = 0
+        """画面没有变化而跳过处理的轮数"""
+
+        self._node_pacer: RoundPacer | None = None
+        """当前节点的轮次节奏控制 节点设置了 target_fps 时才有"""
+
     def _init_before_execute(self):
         """在操作开始前初始化执行状态。
 
@@ -205,19 +254,27 @@ class Operation(OperationBase):
         self.node_retry_times = 0
         self.node_clicked = False
         self._current_node_start_time = now
+        self._node_enter_time = now
         self._previous_round_result = None
         self.node_status.clear()
+        self._reset_node_frame()
+        self._init_node_pacer()
+        self.skipped_round_cnt = 0
 
         # 监听事件
         self.ctx.run_context.event_bus.unlisten_all_event(self)
-        self.ctx.run_context.event_bus.listen_event(ApplicationRunContextStateEventEnum.PAUSE, self._on_pause)
-        self.ctx.run_context.event_bus.listen_event(ApplicationRunContextStateEventEnum.RESUME, self._on_resume)
+        self.ctx.run_context.event_bus.listen_event(ApplicationRunContextStateEventEnum.PAUSE, self._on_pause,
+                                                   priority=EventPriority.HIGH)
+        self.ctx.run_context.event_bus.listen_event(ApplicationRunContextStateEventEnum.RESUME, self._on_resume,
+                                                   priority=EventPriority.HIGH)
 
         self.handle_init()
 
-    def _analyse_node_annotations(self) -> tuple[OperationNode, list[OperationNode], list[OperationEdge]]:
+    @classmethod
+    def _analyse_node_annotations(cls) -> tuple[OperationNode, list[OperationNode], list[OperationEdge]]:
         """
         扫描类方法的操作节点和边注解
+        注解只跟类有关 直接扫描类属性 不会触发实例上的 property
         Returns:
             tuple[OperationNode, list[OperationNode], list[OperationEdge]]: 起始节点 节点列表 边列表
         """
@@ -228,7 +285,14 @@ class Operation(OperationBase):
         node_name_map: dict[str, OperationNode] = {}
         edge_desc_list: list[OperationEdgeDesc] = []
 
-        for name, method in inspect.getmembers(self, predicate=inspect.ismethod):
+        for name in sorted(dir(cls)):
+            # 按 MRO 取到实际生效的属性 子类覆盖且没有装饰的方法不是节点
+            method = inspect.getattr_static(cls, name, None)
+            if isinstance(method, (staticmethod, classmethod)):
+                method = method.__func__
+            if not callable(method):
+                continue
+
             # 从方法对象上直接获取 @operation_node 附加的节点信息
             node: OperationNode = getattr(method, 'operation_node_annotation', None)
             if node is None:
@@ -269,37 +333,35 @@ class Operation(OperationBase):
 
         return start_node, node_list, edge_list
 
-    def _init_network(self) -> None:
-        """初始化操作节点网络。
+    @classmethod
+    def _get_node_graph(cls) -> OperationNodeGraph:
+        """
+        获取类的节点网络 每个类只分析一次注解
 
-        此方法通过以下步骤构建操作图：
-        1. 从注解添加节点和边
-        2. 从子类实现添加节点和边
-        3. 构建用于图遍历的内部数据结构
-        4. 确定起始节点
+        缓存以类对象为键 插件重新加载时会生成新的类对象 自然使用新的网络
+        节点和边都不会在运行中修改 所有实例共用同一份
+
+        Returns:
+            OperationNodeGraph: 节点网络
         """
-        # 初始化节点和边集合
-        self._node_edges_map.clear()
-        self._node_map.clear()
+        graph = Operation._node_graph_cache.get(cls)
+        if graph is not None:
+            return graph
 
-        start_node, node_list, edge_list = self._analyse_node_annotations()
+        start_node, node_list, edge_list = cls._analyse_node_annotations()
 
-        # 添加节点
+        node_map: dict[str, OperationNode] = {}
         for node in node_list:
-            self._add_node(node)
+            if node.cn in node_map:
+                raise ValueError(f'存在重复的节点 {node.cn}')
+            node_map[node.cn] = node
 
-        # 添加边
+        node_edges_map: dict[str, list[OperationEdge]] = {}
         op_in_map: dict[str, int] = {}  # 入度
         for edge in edge_list:
-            from_id = edge.node_from.cn
-            if from_id not in self._node_edges_map:
-                self._node_edges_map[from_id] = []
-            self._node_edges_map[from_id].append(edge)
-
+            node_edges_map.setdefault(edge.node_from.cn, []).append(edge)
             to_id = edge.node_to.cn
-            if to_id not in op_in_map:
-                op_in_map[to_id] = 0
-            op_in_map[to_id] = op_in_map[to_id] + 1
+            op_in_map[to_id] = op_in_map.get(to_id, 0) + 1
 
         if start_node is None:  # 没有指定开始节点时 自动判断
             # 找出入度为0的开始点
@@ -312,7 +374,24 @@ class Operation(OperationBase):
         if start_node is None:
             raise ValueError('找不到起始节点')
 
-        start_node = self._add_check_game_node(start_node)
+        graph = OperationNodeGraph(start_node, node_map, node_edges_map)
+        Operation._node_graph_cache[cls] = graph
+        return graph
+
+    def _init_network(self) -> None:
+        """初始化操作节点网络。
+
+        此方法通过以下步骤构建操作图：
+        1. 获取类的节点网络 由注解分析得到 每个类只分析一次
+        2. 复制到实例上 并在起始节点前增加游戏窗口检查节点
+        """
+        graph = self._get_node_graph()
+
+        # 初始化节点和边集合 只复制映射 节点和边共用
+        self._node_map = dict(graph.node_map)
+        self._node_edges_map = dict(graph.node_edges_map)
+
+        start_node = self._add_check_game_node(graph.start_node)
         # 初始化开始节点
         self._start_node = start_node
         self._current_node = start_node
@@ -454,6 +533,7 @@ class Operation(OperationBase):
             if round_result.result == OperationRoundResultEnum.RETRY:
                 self.node_retry_times += 1
                 if self.node_retry_times <= self.node_max_retry_times:
+                    self._pace_round()
                     continue
                 else:
                     round_result.result = OperationRoundResultEnum.FAIL
@@ -461,6 +541,7 @@ class Operation(OperationBase):
                 self.node_retry_times = 0
 
             if round_result.result == OperationRoundResultEnum.WAIT:
+                self._pace_round()
                 continue
 
             # 成功或者失败的 找下一个节点
@@ -481,12 +562,20 @@ class Operation(OperationBase):
                     op_result = self.op_fail(round_result.status)
                     break
             else:  # 继续下一个节点
+                self._emit_trace_node_span(round_result.status)
                 self._previous_round_result = round_result
                 self._previous_node = self._current_node
                 self._current_node = next_node
                 self._reset_status_for_new_node()  # 重置状态
                 continue
 
+        self._emit_trace_node_span(op_result.status)
+        self._emit_trace_span(
+            category="operation",
+            name=self.display_name,
+            start_time=self.operation_start_time,
+            meta={"success": op_result.success, "status": op_result.status},
+        )
         self.after_operation_done(op_result)
         return op_result
 
@@ -509,7 +598,13 @@ class Operation(OperationBase):
         if self._current_node.op_method is not None:
             if self._current_node.screenshot_before_round:
                 self.screenshot()
+                if self._current_node.skip_unchanged_frame:
+                    reuse_round_result = self._round_by_unchanged_frame()
+                    if reuse_round_result is not None:
+                        return reuse_round_result
             current_round_result: OperationRoundResult = self._current_node.op_method(self)
+            if self._current_node.skip_unchanged_frame:
+                self._record_node_frame(current_round_result)
         elif self._current_node.op is not None:
             op_result = self._current_node.op.execute()
             current_round_result = self.round_by_op_result(op_result,
@@ -573,7 +668,108 @@ class Operation(OperationBase):
         """
         self.node_retry_times = 0  # 每个节点都可以重试
         self._current_node_start_time = time.time()  # 每个节点单独计算耗时
+        self._node_enter_time = self._current_node_start_time
         self.node_clicked = False  # 重置节点点击
+        self._reset_node_frame()  # 新节点不沿用上一个节点的结果
+        self._init_node_pacer()
+
+    def _init_node_pacer(self) -> None:
+        """按当前节点的目标帧率 初始化轮次节奏控制。"""
+        node = self._current_node
+        if node is None or node.target_fps is None:
+            self._node_pacer = None
+        else:
+            self._node_pacer = RoundPacer(node.target_fps, idle_interval=node.idle_interval)
+
+    def _pace_round(self) -> None:
+        """重试/等待的轮次结束后 按当前节点的目标帧率等待。
+
+        处理函数中已经等待过的时间会计入间隔 画面连续没有变化时逐步延长间隔。
+        """
+        if self._node_pacer is None:
+            return
+        frame = self.ctx.controller.last_frame_change
+        to_wait = self._node_pacer.next_wait(
+            round_cost=time.time() - self.round_start_time,
+            frame_id=frame.frame_id if frame is not None else None,
+        )
+        if to_wait > 0:
+            time.sleep(to_wait)
+
+    def _reset_node_frame(self) -> None:
+        """清空当前节点记录的画面和结果。"""
+        self._node_frame_id = None
+        self._node_frame_round_result = None
+        self._node_frame_round_cost = 0
+        self._node_frame_skip_cnt = 0
+
+    def _record_node_frame(self, round_result: OperationRoundResult) -> None:
+        """记录当前节点本轮处理的画面和结果。
+
+        只记录重试和等待的结果 成功和失败会离开当前节点 不需要沿用。
+
+        Args:
+            round_result: 本轮的处理结果。
+        """
+        frame = self.ctx.controller.last_frame_change
+        if frame is None or round_result.result not in (OperationRoundResultEnum.RETRY, OperationRoundResultEnum.WAIT):
+            self._reset_node_frame()
+            return
+        self._node_frame_id = frame.frame_id
+        self._node_frame_round_result = round_result
+        self._node_frame_round_cost = time.time() - self.round_start_time
+        self._node_frame_skip_cnt = 0
+
+    def _round_by_unchanged_frame(self) -> OperationRoundResult | None:
+        """画面与当前节点上一轮处理时相比没有变化时 沿用上一轮的结果。
+
+        处理函数对同样的画面会得到同样的结果 因此跳过识别不改变指令的行为。
+        沿用时会等待到与上一轮相同的耗时 保持原有的节奏和重试次数的消耗。
+        连续沿用达到节点的 max_unchanged_frame_skip 后强制处理一次 避免变化太小没有检测到时一直沿用。
+
+        Returns:
+            OperationRoundResult | None: 沿用的结果 画面有变化或没有可沿用的结果时返回None。
+        """
+        if self._node_frame_round_result is None:
+            return None
+        frame = self.ctx.controller.last_frame_change
+        if frame is None or frame.frame_id != self._node_frame_id:
+            return None
+        if self._node_frame_skip_cnt >= self._current_node.max_unchanged_frame_skip:
+            return None
+
+        self._node_frame_skip_cnt += 1
+        self.skipped_round_cnt += 1
+        self._after_round_wait(wait_round_time=self._node_frame_round_cost)
+        last_result = self._node_frame_round_result
+        return OperationRoundResult(last_result.result, status=last_result.status, data=last_result.data)
+
+    def wait_frame_changed(self, timeout_seconds: float, interval: float = 0.1) -> bool:
+        """不断截图 直到画面发生变化或超时。
+
+        用于等待加载画面、动画等 期间不进行任何识别。
+
+        Args:
+            timeout_seconds: 超时时间（秒）。
+            interval: 截图间隔（秒）。默认为0.1。
+
+        Returns:
+            bool: 画面是否发生了变化。
+        """
+        if not self._node_need_frame_change:
+            # 当前节点的截图没有进行检测 先截一张作为比较的基准
+            self.screenshot(detect_change=True)
+        frame = self.ctx.controller.last_frame_change
+        start_frame_id = frame.frame_id if frame is not None else None
+        start_time = time.time()
+        while True:
+            self.screenshot(detect_change=True)
+            frame = self.ctx.controller.last_frame_change
+            if frame is not None and frame.frame_id != start_frame_id:
+                return True
+            if self.ctx.run_context.is_context_stop or time.time() - start_time >= timeout_seconds:
+                return False
+            time.sleep(interval)
 
     def _on_pause(self, e=None):
         """操作暂停时触发的回调。
@@ -628,18 +824,29 @@ class Operation(OperationBase):
         """
         return time.time() - self.operation_start_time - self.pause_total_time
 
-    def screenshot(self):
+    def screenshot(self, detect_change: bool | None = None):
         """截图并保存在内存中。
 
         此方法包装截图功能并将最后一张截图保存在内存中
         以用于错误处理。
 
+        Args:
+            detect_change: 是否进行画面变化检测。默认为None（当前节点用到画面变化时才检测）。
+
         Returns:
             np.ndarray: 截图图像。
         """
-        self.last_screenshot_time, self.last_screenshot = self.ctx.controller.screenshot()
+        if detect_change is None:
+            detect_change = self._node_need_frame_change
+        self.last_screenshot_time, self.last_screenshot = self.ctx.controller.screenshot(detect_change=detect_change)
         return self.last_screenshot
 
+    @property
+    def _node_need_frame_change(self) -> bool:
+        """当前节点是否用到画面变化检测 跳过没有变化的画面或按画面变化调整节奏时才需要。"""
+        node = self._current_node
+        return node is not None and (node.skip_unchanged_frame or node.idle_interval is not None)
+
     def save_screenshot(self, prefix: str | None = None) -> str:
         """保存最后一张截图并对UID进行遮罩。
 
@@ -671,6 +878,8 @@ class Operation(OperationBase):
             result: 最终操作结果。
         """
         self.ctx.unlisten_all_event(self)
+        if self.skipped_round_cnt > 0:
+            log.debug('%s 画面没有变化 跳过识别 %d 轮', self.display_name, self.skipped_round_cnt)
         if result.success:
             log.info('%s 执行成功 返回状态 %s', self.display_name, coalesce_gt(result.status, '成功', model='ui'))
         else:
@@ -756,6 +965,24 @@ class Operation(OperationBase):
             )
         )
 
+    def _emit_trace_node_span(self, status: str | None) -> None:
+        """离开当前节点时 记录节点的耗时到性能追踪中"""
+        if self._current_node is None:
+            return
+        self._emit_trace_span(
+            category="node",
+            name=self._current_node.cn,
+            start_time=self._node_enter_time,
+            meta={"operation": self.op_name, "status": status},
+        )
+
+    def _emit_trace_span(self, category: str, name: str, start_time: float, meta: dict[str, Any]) -> None:
+        """记录一段到现在为止的耗时 只有开启了性能追踪才会记录"""
+        bus = getattr(self.ctx, "overlay_debug_bus", None)
+        if bus is None or getattr(bus, "recorder", None) is None:
+            return
+        bus.record_span(category, name, start_time, time.time(), meta)
+
     def _emit_overlay_round_perf(self, elapsed_ms: float) -> None:
         bus = getattr(self.ctx, "overlay_debug_bus", None)
         if bus is None:
@@ -1413,7 +1640,8 @@ class Operation(OperationBase):
         self.ctx.screen_loader.update_current_screen_name(current_screen_name)
         if current_screen_name is None:
             return self.round_retry(Operation.STATUS_SCREEN_UNKNOWN, wait=retry_wait, wait_round_time=retry_wait_round)
-        log.debug(f'当前识别画面 {current_screen_name}')
+        log_every(1, logging.DEBUG, '当前识别画面 %s', current_screen_name,
+                  key=('round_by_goto_screen', current_screen_name))
         if current_screen_name == screen_name:
             return self.round_success(current_screen_name, wait=success_wait, wait_round_time=success_wait_round)
 
@@ -1527,3 +1755,48 @@ class Operation(OperationBase):
             NodeStateProxy: 一个包含当前节点的代理对象。
         """
         return NodeStateProxy(self._current_node)
+
+
+def __debug_benchmark():
+    """
+    对比 每次执行都分析注解 和 按类缓存节点网络 时 创建并初始化一个简单指令的耗时
+    只测试 构造 + 节点网络初始化 这是短指令每次 execute 前的固定开销
+    """
+    from one_dragon.base.operation.operation_edge import node_from
+    from one_dragon.base.operation.operation_node import operation_node
+
+    class _DebugOperation(Operation):
+
+        def __init__(self):
+            Operation.__init__(self, ctx=None, op_name='测试指令', need_check_game_win=False)
+
+        @operation_node(name='点击', is_start_node=True)
+        def click(self) -> OperationRoundResult:
+            return self.round_success()
+
+        @node_from(from_name='点击')
+        @operation_node(name='等待')
+        def wait(self) -> OperationRoundResult:
+            return self.round_success()
+
+        @node_from(from_name='等待')
+        @node_from(from_name='点击', success=False)
+        @operation_node(name='返回')
+        def back(self) -> OperationRoundResult:
+            return self.round_success()
+
+    times = 20000
+    for use_cache in [False, True]:
+        t1 = time.perf_counter()
+        for _ in range(times):
+            if not use_cache:
+                Operation._node_graph_cache.clear()
+            op = _DebugOperation()
+            op._init_network()
+        cost = time.perf_counter() - t1
+        mode = '按类缓存' if use_cache else '每次分析'
+        print(f'{mode}: {cost / times * 1e6:.1f}us/次')
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
@@ -19,6 +19,10 @@ class OperationNode:
             mute: bool = False,
             screenshot_before_round: bool = True,
             save_status: bool = False,
+            skip_unchanged_frame: bool = False,
+            max_unchanged_frame_skip: int = 2,
+            target_fps: Optional[float] = None,
+            idle_interval: Optional[float] = None,
     ):
         """
 
@@ -34,6 +38,10 @@ class OperationNode:
             mute: 是否不显示当前节点的结果日志
             screenshot_before_round: 当前节点每次运行前是否自动截图
             save_status: 是否保存当前状态到列表中
+            skip_unchanged_frame: 截图后画面没有变化时 不执行节点处理 沿用上一轮的重试/等待结果
+            max_unchanged_frame_skip: 最多连续沿用的轮数 超过后即使画面没有变化也执行一次处理 避免小的变化没有检测到时一直等待
+            target_fps: 重试/等待时的目标帧率 按轮次开始时间控制间隔 处理的耗时计入间隔内
+            idle_interval: 设置了目标帧率时 画面连续没有变化的最长间隔 None 时不退避
         """
 
         self.cn: str = cn
@@ -69,6 +77,18 @@ class OperationNode:
         self.save_status: bool = save_status
         """是否保存当前状态到列表中"""
 
+        self.skip_unchanged_frame: bool = skip_unchanged_frame
+        """截图后画面没有变化时 不执行节点处理 沿用上一轮的重试/等待结果"""
+
+        self.max_unchanged_frame_skip: int = max_unchanged_frame_skip
+        """最多连续沿用的轮数 超过后强制执行一次处理"""
+
+        self.target_fps: Optional[float] = target_fps
+        """重试/等待时的目标帧率"""
+
+        self.idle_interval: Optional[float] = idle_interval
+        """画面连续没有变化的最长间隔"""
+
 def operation_node(
         name: str,
         retry_on_op_fail: bool = False,
@@ -79,6 +99,10 @@ def operation_node(
         mute: bool = False,
         screenshot_before_round: bool = True,
         save_status: bool = False,
+        skip_unchanged_frame: bool = False,
+        max_unchanged_frame_skip: int = 2,
+        target_fps: Optional[float] = None,
+        idle_interval: Optional[float] = None,
 ):
     def decorator(func):
         # 直接将 node 对象作为函数的一个属性附加到函数上
@@ -93,6 +117,10 @@ def operation_node(
             mute=mute,
             screenshot_before_round=screenshot_before_round,
             save_status=save_status,
+            skip_unchanged_frame=skip_unchanged_frame,
+            max_unchanged_frame_skip=max_unchanged_frame_skip,
+            target_fps=target_fps,
+            idle_interval=idle_interval,
         )
         setattr(func, 'operation_node_annotation', node)
         return func
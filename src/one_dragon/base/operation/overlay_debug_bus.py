@@ -4,7 +4,10 @@ import threading
 import time
 from collections import deque
 from dataclasses import dataclass, field
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from one_dragon.base.operation.perf_trace_recorder import PerfTraceRecorder
 
 
 def _normalize_created(created: float | None) -> float:
@@ -90,6 +93,40 @@ class OverlayDebugBus:
         self._timeline_items: deque[TimelineItem] = deque(maxlen=max_timeline_items)
         self._performance_items: deque[PerfMetricSample] = deque(maxlen=max_perf_items)
         self._thread_local = threading.local()
+        # Optional on-disk trace of every item; None keeps the hot path to one attribute check.
+        self.recorder: PerfTraceRecorder | None = None
+
+    def start_recording(self, dir_path: str, **kwargs: Any) -> PerfTraceRecorder:
+        """Stream all following items (and operation spans) to an on-disk trace.
+
+        Any recorder that is already running is closed first.
+        Extra keyword arguments are passed to PerfTraceRecorder.
+        """
+        from one_dragon.base.operation.perf_trace_recorder import PerfTraceRecorder
+
+        self.stop_recording()
+        recorder = PerfTraceRecorder(dir_path, **kwargs)
+        self.recorder = recorder
+        return recorder
+
+    def stop_recording(self) -> None:
+        recorder = self.recorder
+        self.recorder = None
+        if recorder is not None:
+            recorder.close()
+
+    def record_span(
+        self,
+        category: str,
+        name: str,
+        start_time: float,
+        end_time: float,
+        meta: dict[str, Any] | None = None,
+    ) -> None:
+        """Record a duration such as an operation node. Spans are only kept by the recorder."""
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record_span(category, name, start_time, end_time, meta)
 
     def set_crop_offset(self, x: int, y: int) -> None:
         self._thread_local.crop_offset = (x, y)
@@ -105,21 +142,33 @@ class OverlayDebugBus:
         item.created = _normalize_created(item.created)
         with self._lock:
             self._vision_items.append(item)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record_vision(item)
 
     def add_decision(self, item: DecisionTraceItem) -> None:
         item.created = _normalize_created(item.created)
         with self._lock:
             self._decision_items.append(item)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record_decision(item)
 
     def add_timeline(self, item: TimelineItem) -> None:
         item.created = _normalize_created(item.created)
         with self._lock:
             self._timeline_items.append(item)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record_timeline(item)
 
     def add_performance(self, item: PerfMetricSample) -> None:
         item.created = _normalize_created(item.created)
         with self._lock:
             self._performance_items.append(item)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record_performance(item)
 
     def clear(self) -> None:
         with self._lock:
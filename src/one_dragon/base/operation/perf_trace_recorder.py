@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from one_dragon.base.operation.overlay_debug_bus import (
+        DecisionTraceItem,
+        PerfMetricSample,
+        TimelineItem,
+        VisionDrawItem,
+    )
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 所有分段加起来的最大大小
+DEFAULT_SEGMENT_BYTES = 8 * 1024 * 1024  # 单个分段的最大大小
+SEGMENT_SUFFIX = '.trace.jsonl'
+
+
+class PerfTraceRecorder:
+
+    def __init__(
+            self,
+            dir_path: str,
+            max_bytes: int = DEFAULT_MAX_BYTES,
+            segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+    ):
+        """
+        把运行时的调试事件持续写入硬盘 可以导出成 Chrome / Perfetto 的 trace 格式在时间线上查看
+
+        - 每个事件是一行 Chrome trace 格式的 JSON 按大小切分成多个分段文件
+        - 总大小超过上限时 删除最早的分段 目录中之前运行留下的分段也会计入
+        - 每个分段开头会写入用到的线程名称 删除旧分段后 剩下的分段仍然可以单独导出
+        - 事件的附加信息放在 args.meta 中 不能序列化的内容转成字符串 仍然失败时丢弃事件 不会影响调用方
+
+        Args:
+            dir_path: 保存分段的目录
+            max_bytes: 所有分段加起来的最大大小
+            segment_bytes: 单个分段的最大大小
+        """
+        self.dir_path: str = dir_path
+        self.max_bytes: int = max_bytes
+        self.segment_bytes: int = segment_bytes
+
+        self._lock = threading.Lock()
+        self._pid: int = os.getpid()
+        self._thread_names: dict[int, str] = {}
+        self._segment_tids: set[int] = set()  # 当前分段已经写入名称的线程
+        self._file = None
+        self._segment_size: int = 0
+        self._closed: bool = False
+
+        self.dropped_cnt: int = 0  # 无法序列化而丢弃的事件数量
+
+        os.makedirs(dir_path, exist_ok=True)
+        self._segments: list[str] = list_segments(dir_path)  # 按时间顺序
+        self._total_bytes: int = sum(os.path.getsize(i) for i in self._segments)
+        self._next_segment_idx: int = self._parse_segment_idx(self._segments[-1]) + 1 if self._segments else 0
+
+        atexit.register(self.close)
+
+    @property
+    def total_bytes(self) -> int:
+        """所有分段的大小"""
+        with self._lock:
+            return self._total_bytes + self._segment_size
+
+    def record_vision(self, item: VisionDrawItem) -> None:
+        args: dict[str, Any] = {'box': [item.x1, item.y1, item.x2, item.y2]}
+        if item.score is not None:
+            args['score'] = round(float(item.score), 4)
+        if item.meta:
+            args['meta'] = item.meta
+        self._write_event('i', 'vision', f'{item.source}:{item.label}', item.created, args, scope='t')
+
+    def record_decision(self, item: DecisionTraceItem) -> None:
+        args = {
+            'trigger': item.trigger,
+            'expression': item.expression,
+            'status': item.status,
+        }
+        if item.meta:
+            args['meta'] = item.meta
+        self._write_event('i', f'decision:{item.source}', item.operation, item.created, args, scope='t')
+
+    def record_timeline(self, item: TimelineItem) -> None:
+        args = {'detail': item.detail, 'level': item.level}
+        if item.meta:
+            args['meta'] = item.meta
+        self._write_event('i', f'timeline:{item.category}', item.title, item.created, args, scope='t')
+
+    def record_performance(self, item: PerfMetricSample) -> None:
+        if item.unit == 'ms':
+            # 耗时类的指标 画成结束于记录时间的一段
+            duration = max(0.0, float(item.value)) / 1000
+            self.record_span('perf', item.metric, item.created - duration, item.created, item.meta)
+        else:
+            self._write_event('C', 'perf', item.metric, item.created, {item.metric: item.value})
+
+    def record_span(
+            self,
+            category: str,
+            name: str,
+            start_time: float,
+            end_time: float,
+            meta: dict[str, Any] | None = None,
+    ) -> None:
+        """
+        记录一段耗时
+
+        Args:
+            category: 分类
+            name: 名称
+            start_time: 开始时间 time.time()
+            end_time: 结束时间 time.time()
+            meta: 附加信息
+        """
+        duration_us = max(0, int((end_time - start_time) * 1_000_000))
+        self._write_event('X', category, name, start_time, meta or {}, duration_us=duration_us)
+
+    def _write_event(
+            self,
+            ph: str,
+            category: str,
+            name: str,
+            created: float,
+            args: dict[str, Any],
+            duration_us: int | None = None,
+            scope: str | None = None,
+    ) -> None:
+        tid = threading.get_ident()
+        # ts 放在最前面 导出时按时间筛选不需要解析整行
+        event: dict[str, Any] = {'ts': int(created * 1_000_000), 'ph': ph}
+        if duration_us is not None:
+            event['dur'] = duration_us
+        if scope is not None:
+            event['s'] = scope
+        event['pid'] = self._pid
+        event['tid'] = tid
+        event['cat'] = category
+        event['name'] = name
+        event['args'] = args
+        try:
+            line = json.dumps(event, ensure_ascii=False, separators=(',', ':'), default=str) + '\n'
+        except (TypeError, ValueError):
+            # 字典的键不是字符串等 转换后再试一次
+            try:
+                event['args'] = _to_json_safe(args)
+                line = json.dumps(event, ensure_ascii=False, separators=(',', ':'), default=str) + '\n'
+            except (TypeError, ValueError, RecursionError):  # 循环引用等
+                self.dropped_cnt += 1
+                return
+
+        with self._lock:
+            if self._closed:
+                return
+            if self._file is None or self._segment_size >= self.segment_bytes:
+                self._open_new_segment()
+            if tid not in self._segment_tids:
+                self._write_line(self._thread_name_line(tid))
+            self._write_line(line)
+
+    def _thread_name_line(self, tid: int) -> str:
+        name = self._thread_names.get(tid)
+        if name is None:
+            name = threading.current_thread().name  # 只会在写入事件的线程调用
+            self._thread_names[tid] = name
+        self._segment_tids.add(tid)
+        event = {'ts': 0, 'ph': 'M', 'pid': self._pid, 'tid': tid, 'name': 'thread_name', 'args': {'name': name}}
+        return json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+    def _write_line(self, line: str) -> None:
+        data = line.encode('utf-8')
+        self._file.write(data)
+        self._segment_size += len(data)
+
+    def _open_new_segment(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._total_bytes += self._segment_size
+
+        path = os.path.join(self.dir_path, f'{self._next_segment_idx:08d}{SEGMENT_SUFFIX}')
+        self._next_segment_idx += 1
+        self._file = open(path, 'ab', buffering=64 * 1024)  # noqa: SIM115 写满一个分段前保持打开
+        self._segments.append(path)
+        self._segment_size = 0
+        self._segment_tids = set()
+
+        process_event = {'ts': 0, 'ph': 'M', 'pid': self._pid, 'name': 'process_name', 'args': {'name': 'OneDragon'}}
+        self._write_line(json.dumps(process_event, separators=(',', ':')) + '\n')
+
+        # 删除最早的分段 当前分段不会被删除
+        while len(self._segments) > 1 and self._total_bytes + self.segment_bytes > self.max_bytes:
+            oldest = self._segments.pop(0)
+            try:
+                self._total_bytes -= os.path.getsize(oldest)
+                os.remove(oldest)
+            except OSError:
+                pass
+
+    def flush(self) -> None:
+        """把缓冲区写入硬盘"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        """停止记录 之后的事件会被忽略 已经写入的分段会保留"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+                self._total_bytes += self._segment_size
+                self._segment_size = 0
+                self._file = None
+        atexit.unregister(self.close)
+
+    def export_chrome_trace(
+            self,
+            file_path: str,
+            start_time: float | None = None,
+            end_time: float | None = None,
+    ) -> int:
+        """
+        导出成 Chrome trace 的 JSON 可以在 chrome://tracing 或 https://ui.perfetto.dev 中打开
+        逐行复制 不会一次性读入所有事件
+
+        Args:
+            file_path: 导出的文件路径
+            start_time: 只导出这个时间之后的事件 time.time() 例如某一场战斗的开始时间
+            end_time: 只导出这个时间之前的事件 time.time()
+
+        Returns:
+            int: 导出的事件数量 不包括线程名称等元数据
+        """
+        self.flush()
+        with self._lock:
+            segments = list(self._segments)
+        return export_chrome_trace(segments, file_path, start_time=start_time, end_time=end_time)
+
+    @staticmethod
+    def _parse_segment_idx(path: str) -> int:
+        try:
+            return int(os.path.basename(path)[:-len(SEGMENT_SUFFIX)])
+        except ValueError:
+            return 0
+
+
+def _to_json_safe(value: Any) -> Any:
+    """
+    转换成可以序列化的内容 字典的键和不认识的对象都转成字符串
+
+    Args:
+        value: 事件的附加信息
+
+    Returns:
+        Any: 可以序列化的内容
+    """
+    if isinstance(value, dict):
+        return {k if isinstance(k, str) else str(k): _to_json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_to_json_safe(i) for i in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def list_segments(dir_path: str) -> list[str]:
+    """
+    目录中的分段文件
+
+    Args:
+        dir_path: 保存分段的目录
+
+    Returns:
+        list[str]: 分段文件路径 按时间顺序
+    """
+    if not os.path.isdir(dir_path):
+        return []
+    names = sorted(i for i in os.listdir(dir_path) if i.endswith(SEGMENT_SUFFIX))
+    return [os.path.join(dir_path, i) for i in names]
+
+
+def export_chrome_trace(
+        segments: list[str],
+        file_path: str,
+        start_time: float | None = None,
+        end_time: float | None = None,
+) -> int:
+    """
+    把分段文件导出成 Chrome trace 的 JSON 也可以用于之前运行留下的分段
+
+    Args:
+        segments: 分段文件路径 按时间顺序
+        file_path: 导出的文件路径
+        start_time: 只导出这个时间之后的事件 time.time()
+        end_time: 只导出这个时间之前的事件 time.time()
+
+    Returns:
+        int: 导出的事件数量 不包括线程名称等元数据
+    """
+    start_us = None if start_time is None else int(start_time * 1_000_000)
+    end_us = None if end_time is None else int(end_time * 1_000_000)
+    seen_metadata: set[str] = set()
+    event_cnt = 0
+    first = True
+
+    with open(file_path, 'w', encoding='utf-8') as out:
+        out.write('{"displayTimeUnit":"ms","traceEvents":[\n')
+        for segment in segments:
+            try:
+                file = open(segment, encoding='utf-8')  # noqa: SIM115 分段可能在导出过程中被删除
+            except OSError:
+                continue
+            with file:
+                for line in file:
+                    if not line.endswith('\n') or not line.startswith('{"ts":'):  # 正在记录时 最后一行可能只写入了一半
+                        continue
+                    line = line[:-1]
+                    ts = int(line[6:line.index(',', 6)])
+                    if ts == 0:  # 元数据 每个分段都有一份 只需要导出一次
+                        if line in seen_metadata:
+                            continue
+                        seen_metadata.add(line)
+                    else:
+                        if start_us is not None and ts < start_us:
+                            continue
+                        if end_us is not None and ts > end_us:
+                            continue
+                        event_cnt += 1
+                    if not first:
+                        out.write(',\n')
+                    out.write(line)
+                    first = False
+        out.write('\n]}\n')
+
+    return event_cnt
+
+
+def __debug_benchmark():
+    """
+    对比 没有开启记录 和 开启记录 时 添加调试事件的耗时 并导出一份 trace
+    """
+    import tempfile
+
+    from one_dragon.base.operation.overlay_debug_bus import (
+        OverlayDebugBus,
+        PerfMetricSample,
+        TimelineItem,
+        VisionDrawItem,
+    )
+
+    event_cnt = 100_000
+    bus = OverlayDebugBus()
+
+    def _add_events() -> float:
+        t1 = time.perf_counter()
+        for i in range(event_cnt // 3):
+            bus.add_timeline(TimelineItem(category='node', title='测试', detail=f'第 {i} 轮'))
+            bus.add_performance(PerfMetricSample(metric='ocr_ms', value=12.5, unit='ms'))
+            bus.add_vision(VisionDrawItem(source='ocr', label='文本', x1=1, y1=2, x2=30, y2=40, score=0.9))
+        return (time.perf_counter() - t1) / (event_cnt // 3 * 3) * 1_000_000
+
+    disabled_us = _add_events()
+
+    with tempfile.TemporaryDirectory() as dir_path:
+        recorder = bus.start_recording(os.path.join(dir_path, 'trace'), max_bytes=8 * 1024 * 1024,
+                                       segment_bytes=1024 * 1024)
+        enabled_us = _add_events()
+        bus.stop_recording()
+
+        t1 = time.perf_counter()
+        export_path = os.path.join(dir_path, 'trace.json')
+        exported = recorder.export_chrome_trace(export_path)
+        export_ms = (time.perf_counter() - t1) * 1000
+        with open(export_path, encoding='utf-8') as file:
+            trace = json.load(file)
+
+        print(f'未开启记录: {disabled_us:.2f}us/事件')
+        print(f'开启记录: {enabled_us:.2f}us/事件 分段总大小 {recorder.total_bytes / 1024 / 1024:.1f}MB')
+        print(f'导出 {exported} 个事件 {export_ms:.0f}ms 解析后 {len(trace["traceEvents"])} 个')
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
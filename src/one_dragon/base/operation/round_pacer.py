@@ -0,0 +1,188 @@
+class RoundPacer:
+
+    def __init__(
+        self,
+        target_fps: float,
+        idle_interval: float | None = None,
+        idle_backoff: float = 2,
+    ):
+        """
+        节点轮次的节奏控制 按目标帧率计算每轮结束后还需要等待的时间
+
+        - 按轮次的开始时间计算 处理本身的耗时会计入间隔 而不是处理后再固定等待
+        - 画面连续没有变化时 间隔按倍数增加到 idle_interval 画面变化后立刻恢复
+
+        Args:
+            target_fps: 目标帧率 即每秒最多进行多少轮
+            idle_interval: 画面没有变化时的最长间隔 None 时不退避
+            idle_backoff: 每次退避时间隔增加的倍数
+        """
+        self.target_fps: float = target_fps
+        self.idle_interval: float | None = idle_interval
+        self.idle_backoff: float = idle_backoff
+
+        self.base_interval: float = 1.0 / target_fps if target_fps > 0 else 0
+        self.interval: float = self.base_interval  # 当前使用的间隔
+        self.last_frame_id: int | None = None  # 上一轮的画面编号
+
+        # 统计
+        self.round_cnt: int = 0  # 轮次
+        self.idle_round_cnt: int = 0  # 画面没有变化的轮次
+        self.wait_total: float = 0  # 总共等待的秒数
+
+    def reset(self) -> None:
+        """
+        进入节点时重置
+        """
+        self.interval = self.base_interval
+        self.last_frame_id = None
+
+    def next_wait(self, round_cost: float, frame_id: int | None) -> float:
+        """
+        计算本轮结束后需要等待的时间
+
+        Args:
+            round_cost: 本轮已经使用的时间 包括处理函数中的等待
+            frame_id: 本轮画面的编号 与上一轮相同时视为画面没有变化 None 时视为有变化
+
+        Returns:
+            float: 需要等待的秒数
+        """
+        self.round_cnt += 1
+        frame_changed = frame_id is None or frame_id != self.last_frame_id
+        self.last_frame_id = frame_id
+        if not frame_changed and self.idle_interval is not None:
+            self.idle_round_cnt += 1
+            self.interval = min(self.idle_interval, max(self.interval, self.base_interval, 0.01) * self.idle_backoff)
+        else:
+            self.interval = self.base_interval
+
+        to_wait = max(0.0, self.interval - round_cost)
+        self.wait_total += to_wait
+        return to_wait
+
+
+def __debug_benchmark():
+    """
+    使用 .debug/images 下按文件名排序的画面 模拟以 30 帧录制的画面序列
+    画面序列前后各有一段静止的菜单 对比 处理后固定等待 和 按目标帧率并在静止时退避 两种节奏
+    统计 每分钟使用的 CPU 秒数 以及 画面切换到处理到新画面的延迟
+    """
+    import os
+    import time
+
+    import cv2
+
+    from one_dragon.base.controller.frame_change_detector import FrameChangeDetector
+    from one_dragon.utils import cv2_utils, debug_utils
+
+    image_dir = debug_utils.get_debug_image_dir_path()
+    image_list = [cv2_utils.read_image(os.path.join(image_dir, i))
+                  for i in sorted(os.listdir(image_dir)) if i.endswith('.png')]
+    if len(image_list) == 0:
+        print('.debug/images 下没有画面')
+        return
+
+    # 静止 5 秒 -> 逐帧播放录制画面 -> 静止 5 秒
+    record_fps = 30
+    frame_list = [image_list[0]] * record_fps * 5 + image_list + [image_list[-1]] * record_fps * 5
+    duration = len(frame_list) / record_fps
+    template = image_list[0][100:200, 100:300]
+
+    def _perceive(image) -> None:
+        # 模拟节点的识别耗时
+        cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+
+    for title, pacer in [('固定等待 0.1s', None), ('目标 10 帧 静止时退避到 1s', RoundPacer(10, idle_interval=1))]:
+        detector = FrameChangeDetector()
+        latency_list: list[float] = []
+        change_time: float | None = None
+        last_frame_idx: int = -1
+
+        start_time = time.time()
+        start_cpu = time.process_time()
+        while True:
+            round_start_time = time.time()
+            frame_idx = int((round_start_time - start_time) * record_fps)
+            if frame_idx >= len(frame_list):
+                break
+            if change_time is None and frame_idx > last_frame_idx >= 0 and frame_list[frame_idx] is not frame_list[last_frame_idx]:
+                # 上一轮之后画面有切换 用切换那一帧的时间计算延迟
+                for i in range(last_frame_idx + 1, frame_idx + 1):
+                    if frame_list[i] is not frame_list[last_frame_idx]:
+                        change_time = start_time + i / record_fps
+                        break
+            last_frame_idx = frame_idx
+
+            image = frame_list[frame_idx]
+            frame = detector.update(image, round_start_time)
+            _perceive(image)
+            if change_time is not None:
+                latency_list.append(time.time() - change_time)
+                change_time = None
+
+            if pacer is None:
+                time.sleep(0.1)
+            else:
+                time.sleep(pacer.next_wait(time.time() - round_start_time, frame.frame_id))
+
+        cpu_per_minute = (time.process_time() - start_cpu) / duration * 60
+        latency_list.sort()
+        p50 = latency_list[len(latency_list) // 2] * 1000 if len(latency_list) > 0 else 0
+        p99 = latency_list[int(len(latency_list) * 0.99)] * 1000 if len(latency_list) > 0 else 0
+        print(f'{title}: CPU {cpu_per_minute:.2f}秒/分钟 画面切换到处理 p50 {p50:.1f}ms p99 {p99:.1f}ms')
+
+
+def __debug_loading_wait():
+    """
+    模拟 等待...加载 这类节点 node_max_retry_times=60
+    对比 原来的 round_retry(wait=1) 和 现在的 target_fps=1 idle_interval=2 两种节奏
+    使用虚拟时间 每轮的耗时用真实的区域模板匹配测量 不需要 .debug/images
+    统计 重试次数用完前的总时间 识别次数 以及 目标出现到识别到的延迟
+    """
+    import time
+
+    import cv2
+    import numpy as np
+
+    # 节点使用 round_by_find_area 只在画面的一个区域中匹配
+    rng = np.random.default_rng(0)
+    area = rng.integers(0, 255, (200, 400, 3), dtype=np.uint8)
+    template = area[50:110, 100:220].copy()
+    t1 = time.perf_counter()
+    for _ in range(20):
+        cv2.matchTemplate(area, template, cv2.TM_CCOEFF_NORMED)
+    round_cost = (time.perf_counter() - t1) / 20
+    max_retry_times = 60
+
+    # (场景, 画面在某一时刻的编号, 目标出现的时间 None 为一直不出现)
+    scenes = [
+        ('画面卡住 一直没有加载完', lambda t: 0, None),
+        ('静止的加载画面 8秒后加载完', lambda t: 0 if t < 8 else 1, 8.0),
+        ('有动画的加载画面 8秒后加载完', lambda t: int(t * 30), 8.0),
+    ]
+    print(f'每轮识别耗时 {round_cost * 1000:.1f}ms')
+    for scene_name, frame_at, target_time in scenes:
+        for title, pacer in [('wait=1', None), ('target_fps=1 idle_interval=2', RoundPacer(1, idle_interval=2))]:
+            now = 0.0
+            round_cnt = 0
+            found_time = None
+            while round_cnt <= max_retry_times:
+                round_cnt += 1
+                if target_time is not None and now >= target_time:
+                    found_time = now + round_cost
+                    break
+                if pacer is None:
+                    now += round_cost + 1  # round_retry(wait=1) 在处理后固定等待
+                else:
+                    now += round_cost + pacer.next_wait(round_cost, frame_at(now))
+            if found_time is None:
+                result = f'{round_cnt - 1} 次重试用完 耗时 {now:.1f}s'
+            else:
+                result = f'识别 {round_cnt} 次 目标出现后 {(found_time - target_time) * 1000:.0f}ms 识别到'
+            print(f'{scene_name} {title}: {result}')
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
+    __debug_loading_wait()
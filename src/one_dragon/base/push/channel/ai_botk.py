@@ -96,7 +96,7 @@ class AiBotK(PushChannel):
 
             # 发送请求
             headers = {"Content-Type": "application/json"}
-            response = requests.post(url, data=json.dumps(data).encode("utf-8"), headers=headers, timeout=15)
+            response = self.session.post(url, data=json.dumps(data).encode("utf-8"), headers=headers, timeout=15)
 
             if response.status_code == 200:
                 result = response.json()
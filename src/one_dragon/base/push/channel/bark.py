@@ -1,5 +1,4 @@
 import json
-import requests
 from cv2.typing import MatLike
 
 from one_dragon.base.push.push_channel import PushChannel
@@ -144,7 +143,7 @@ class Bark(PushChannel):
 
             # 发送请求
             headers = {"Content-Type": "application/json;charset=utf-8"}
-            response = requests.post(
+            response = self.session.post(
                 url=url,
                 data=json.dumps(data),
                 headers=headers,
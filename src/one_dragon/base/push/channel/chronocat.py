@@ -8,7 +8,6 @@ import json
 import re
 from typing import List
 
-import requests
 from cv2.typing import MatLike
 
 from one_dragon.base.push.push_channel import PushChannel
@@ -221,7 +220,7 @@ class Chronocat(PushChannel):
             bool: 是否发送成功
         """
         try:
-            response = requests.post(url, headers=headers, data=json.dumps(data), timeout=15)
+            response = self.session.post(url, headers=headers, data=json.dumps(data), timeout=15)
             return response.status_code == 200
         except Exception:
             log.error("Chronocat 推送异常", exc_info=True)
@@ -3,7 +3,6 @@ import hashlib
 import hmac
 import time
 
-import requests
 from cv2.typing import MatLike
 
 from one_dragon.base.push.push_channel import PushChannel
@@ -108,7 +107,7 @@ class DingDingBot(PushChannel):
                 "timestamp": timestamp,
                 "sign": sign,
             }
-            response = requests.post(
+            response = self.session.post(
                 webhook_base,
                 params=params,
                 json=message_data,
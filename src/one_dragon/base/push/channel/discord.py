@@ -6,7 +6,6 @@ Discord 机器人推送渠道
 
 import json
 
-import requests
 from cv2.typing import MatLike
 
 from one_dragon.base.push.push_channel import PushChannel
@@ -98,7 +97,7 @@ class Discord(PushChannel):
             dm_headers["Content-Type"] = "application/json"
             dm_payload = json.dumps({"recipient_id": user_id})
 
-            response = requests.post(
+            response = self.session.post(
                 create_dm_url,
                 headers=dm_headers,
                 data=dm_payload,
@@ -132,7 +131,7 @@ class Discord(PushChannel):
                 data = json.dumps(message_payload, ensure_ascii=False)
                 headers["Content-Type"] = "application/json"
 
-            response = requests.post(message_url, headers=headers, data=data, files=files, timeout=30)
+            response = self.session.post(message_url, headers=headers, data=data, files=files, timeout=30)
             response.raise_for_status()
 
             return True, "推送成功"
@@ -3,7 +3,6 @@ import hashlib
 import hmac
 import time
 
-import requests
 from cv2.typing import MatLike
 
 from one_dragon.base.push.push_channel import PushChannel
@@ -153,7 +152,7 @@ class FeiShu(PushChannel):
 
             # 发送消息
             url = f'https://{base_url}/open-apis/bot/v2/hook/{key}'
-            response = requests.post(url, json=message_data, timeout=15)
+            response = self.session.post(url, json=message_data, timeout=15)
             response.raise_for_status()
             result = response.json()
 
@@ -184,7 +183,7 @@ class FeiShu(PushChannel):
             auth_headers = {
                 "Content-Type": "application/json; charset=utf-8"
             }
-            auth_response = requests.post(
+            auth_response = self.session.post(
                 auth_endpoint,
                 headers=auth_headers,
                 json={
@@ -211,7 +210,7 @@ class FeiShu(PushChannel):
                 'image_type': (None, 'message')
             }
 
-            image_response = requests.post(
+            image_response = self.session.post(
                 image_endpoint,
                 headers=image_headers,
                 files=files,
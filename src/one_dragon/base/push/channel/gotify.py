@@ -91,7 +91,7 @@ class Gotify(PushChannel):
             full_url = f"{url}/message?token={token}"
 
             try:
-                response = requests.post(full_url, data=data, timeout=15)
+                response = self.session.post(full_url, data=data, timeout=15)
                 response.raise_for_status()
                 result = response.json()
 
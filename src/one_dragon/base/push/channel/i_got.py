@@ -4,7 +4,6 @@ iGot 推送渠道
 提供通过 iGot 服务发送消息的功能。
 """
 
-import requests
 from cv2.typing import MatLike
 
 from one_dragon.base.push.push_channel import PushChannel
@@ -69,7 +68,7 @@ class IGot(PushChannel):
             headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
             # 发送请求
-            response = requests.post(url, data=data, headers=headers, timeout=15)
+            response = self.session.post(url, data=data, headers=headers, timeout=15)
             response.raise_for_status()
             response_json = response.json()
 
@@ -2,7 +2,6 @@ import base64
 import json
 from typing import Any
 
-import requests
 from cv2.typing import MatLike
 
 from one_dragon.base.push.push_channel import PushChannel
@@ -149,7 +148,7 @@ class Ntfy(PushChannel):
         success_cnt = 0
         try:
             for data in data_list:
-                response = requests.post(full_url, data=data, headers=headers, timeout=15)
+                response = self.session.post(full_url, data=data, headers=headers, timeout=15)
                 response.raise_for_status()
 
                 if response.status_code == 200:
@@ -1,7 +1,6 @@
 import json
 from typing import Any
 
-import requests
 from cv2.typing import MatLike
 
 from one_dragon.base.operation.notify_pool import NotifyPoolItem
@@ -112,7 +111,7 @@ class OneBot(PushChannel):
                 data_private["message_type"] = "private"
                 data_private["user_id"] = user_id
                 try:
-                    response_private = requests.post(url, data=json.dumps(data_private), headers=headers, timeout=15)
+                    response_private = self.session.post(url, data=json.dumps(data_private), headers=headers, timeout=15)
                     response_private.raise_for_status()
                     result_private = response_private.json()
 
@@ -133,7 +132,7 @@ class OneBot(PushChannel):
                 data_group["message_type"] = "group"
                 data_group["group_id"] = group_id
                 try:
-                    response_group = requests.post(url, data=json.dumps(data_group), headers=headers, timeout=15)
+                    response_group = self.session.post(url, data=json.dumps(data_group), headers=headers, timeout=15)
                     response_group.raise_for_status()
                     result_group = response_group.json()
 
@@ -216,7 +215,7 @@ class OneBot(PushChannel):
     ) -> tuple[bool, str]:
         """发送单批合并转发请求"""
         try:
-            resp = requests.post(url, data=json.dumps(data), headers=headers, timeout=30)
+            resp = self.session.post(url, data=json.dumps(data), headers=headers, timeout=30)
             resp.raise_for_status()
             result = resp.json()
             if result.get('status') == 'ok':
@@ -4,7 +4,6 @@ PushMe 推送渠道
 提供通过 PushMe 服务发送消息的功能，支持自定义服务地址。
 """
 
-import requests
 from cv2.typing import MatLike
 
 from one_dragon.base.push.push_channel import PushChannel
@@ -85,7 +84,7 @@ class PushMe(PushChannel):
             url = custom_url if custom_url else "https://push.i-i.me/"
 
             # 发送请求
-            response = requests.post(url, data=data, timeout=15)
+            response = self.session.post(url, data=data, timeout=15)
 
             # 检查响应结果
             if response.status_code == 200 and response.text == "success":
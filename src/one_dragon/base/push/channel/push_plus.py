@@ -1,5 +1,5 @@
 import json
-import requests
+
 from cv2.typing import MatLike
 
 from one_dragon.base.push.push_channel import PushChannel
@@ -115,7 +115,7 @@ class PushPlus(PushChannel):
 
             # 发送请求
             headers = {"Content-Type": "application/json"}
-            response = requests.post(url=url, json=data, headers=headers, timeout=15).json()
+            response = self.session.post(url=url, json=data, headers=headers, timeout=15).json()
 
             code = response.get("code")
             if code == 200:
@@ -126,7 +126,7 @@ class PushPlus(PushChannel):
                 # 尝试备用地址
                 url_old = "http://pushplus.hxtrip.com/send"
                 headers["Accept"] = "application/json"
-                response_old = requests.post(url=url_old, json=data, headers=headers, timeout=15).json()
+                response_old = self.session.post(url=url_old, json=data, headers=headers, timeout=15).json()
 
                 if response_old.get("code") == 200:
                     return True, "PushPlus(hxtrip) 推送成功！"
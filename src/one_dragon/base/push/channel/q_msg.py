@@ -4,7 +4,6 @@ Qmsg 酱推送渠道
 提供通过 Qmsg 酱服务发送消息的功能，支持个人消息和群消息。
 """
 
-import requests
 from cv2.typing import MatLike
 
 from one_dragon.base.push.push_channel import PushChannel
@@ -82,7 +81,7 @@ class QMsg(PushChannel):
             payload = {"msg": message_content.encode("utf-8")}
 
             # 发送请求
-            response = requests.post(url=url, params=payload, timeout=15)
+            response = self.session.post(url=url, params=payload, timeout=15)
             response.raise_for_status()
             response_json = response.json()
 
@@ -1,6 +1,5 @@
 import re
 
-import requests
 from cv2.typing import MatLike
 
 from one_dragon.base.push.push_channel import PushChannel
@@ -78,7 +77,7 @@ class ServerChan(PushChannel):
 
             # 发送请求
             headers = {'Content-Type': 'application/json;charset=utf-8'}
-            response = requests.post(url, json=message_data, headers=headers, timeout=10)
+            response = self.session.post(url, json=message_data, headers=headers, timeout=10)
 
             if response.status_code == 200:
                 result = response.json()
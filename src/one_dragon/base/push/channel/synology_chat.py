@@ -6,7 +6,6 @@ Synology Chat 推送渠道
 
 import json
 
-import requests
 from cv2.typing import MatLike
 
 from one_dragon.base.push.push_channel import PushChannel
@@ -83,7 +82,7 @@ class SynologyChat(PushChannel):
             data = "payload=" + json.dumps(payload_data)
 
             # 发送请求
-            response = requests.post(full_url, data=data, timeout=15)
+            response = self.session.post(full_url, data=data, timeout=15)
 
             # 检查响应状态码
             if response.status_code == 200:
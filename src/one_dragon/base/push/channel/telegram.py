@@ -99,7 +99,7 @@ class Telegram(PushChannel):
                         'chat_id': (None, str(user_id)),
                         'caption': (None, f"{title}\n{content}")
                     }
-                    response = requests.post(photo_url, files=files, proxies=proxies, timeout=30)
+                    response = self.session.post(photo_url, files=files, proxies=proxies, timeout=30)
                 else:
                     # 发送消息
                     headers = {"Content-Type": "application/x-www-form-urlencoded"}
@@ -107,7 +107,7 @@ class Telegram(PushChannel):
                         "chat_id": str(user_id),
                         "text": f"{title}\n{content}",
                     }
-                    response = requests.post(url, data=payload, proxies=proxies, timeout=15)
+                    response = self.session.post(url, data=payload, proxies=proxies, timeout=15)
 
                 response.raise_for_status()
                 result = response.json()
@@ -4,7 +4,6 @@
 提供通过微加机器人服务发送消息的功能，支持自动模板选择。
 """
 
-import requests
 from cv2.typing import MatLike
 
 from one_dragon.base.push.push_channel import PushChannel
@@ -99,7 +98,7 @@ class WePlusBot(PushChannel):
             # 发送请求
             url = "https://www.weplusbot.com/send"
             headers = {"Content-Type": "application/json"}
-            response = requests.post(url=url, json=data, headers=headers, timeout=15)
+            response = self.session.post(url=url, json=data, headers=headers, timeout=15)
             response.raise_for_status()
             response_json = response.json()
 
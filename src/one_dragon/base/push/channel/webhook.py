@@ -1,4 +1,3 @@
-import base64
 import datetime
 import json
 import time
@@ -133,10 +132,7 @@ class Webhook(PushChannel):
                 image_base64 = ""
                 if image is not None:  # image是MatLike，可能具有多个参数，此时if image会歧义
                     try:
-                        image_bytes = self.image_to_bytes(image)
-                        if image_bytes:
-                            image_bytes.seek(0)
-                            image_base64 = base64.b64encode(image_bytes.getvalue()).decode('utf-8')
+                        image_base64 = self.image_to_base64(image) or ""
                     except Exception as e:
                         log.error(f"图片处理失败: {e}")
                         image_base64 = ""
@@ -161,7 +157,7 @@ class Webhook(PushChannel):
             # GET 请求通常不包含 body
             request_data = None if method == "GET" else processed_body.encode("utf-8")
             # 发送请求
-            response = requests.request(
+            response = self.session.request(
                 method=method,
                 url=processed_url,
                 headers=headers,
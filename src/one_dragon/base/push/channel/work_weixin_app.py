@@ -7,7 +7,6 @@
 
 import json
 import time
-import requests
 import threading
 from typing import Optional, Tuple
 
@@ -97,7 +96,7 @@ class WorkWeixinApp(PushChannel):
                 "corpsecret": corpsecret,
             }
             try:
-                response = requests.get(get_token_url, params=params, proxies=proxies, timeout=10)
+                response = self.session.get(get_token_url, params=params, proxies=proxies, timeout=10)
                 response.raise_for_status()
                 data = response.json()
 
@@ -138,7 +137,7 @@ class WorkWeixinApp(PushChannel):
             'media': ('image.jpg', image_bytes, 'image/jpeg')
         }
         try:
-            response = requests.post(upload_url, files=files, proxies=proxies, timeout=30)
+            response = self.session.post(upload_url, files=files, proxies=proxies, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -176,7 +175,7 @@ class WorkWeixinApp(PushChannel):
             'media': ('image.jpg', image_bytes, 'image/jpeg') # filename, content, content-type
         }
         try:
-            response = requests.post(upload_url, files=files, proxies=proxies, timeout=30)
+            response = self.session.post(upload_url, files=files, proxies=proxies, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -201,7 +200,7 @@ class WorkWeixinApp(PushChannel):
         headers = {"Content-Type": "application/json; charset=utf-8"}
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 send_url,
                 data=json.dumps(message_payload).encode("utf-8"),
                 headers=headers,
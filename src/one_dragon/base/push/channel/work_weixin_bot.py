@@ -2,7 +2,6 @@ import base64
 import hashlib
 import json
 
-import requests
 from cv2.typing import MatLike
 
 from one_dragon.base.push.push_channel import PushChannel
@@ -79,7 +78,7 @@ class WorkWeixinBot(PushChannel):
             # 1. 先发文字
             text_data = {"msgtype": "text", "text": {"content": f"{title}\n{content}"}}
             try:
-                resp_obj = requests.post(url, data=json.dumps(text_data), headers=headers, timeout=15)
+                resp_obj = self.session.post(url, data=json.dumps(text_data), headers=headers, timeout=15)
                 resp_obj.raise_for_status()
 
                 status = resp_obj.status_code
@@ -154,7 +153,7 @@ class WorkWeixinBot(PushChannel):
             "image": {"base64": img_base64, "md5": img_md5}
         }
 
-        resp_obj = requests.post(url, data=json.dumps(img_data), headers=headers, timeout=15)
+        resp_obj = self.session.post(url, data=json.dumps(img_data), headers=headers, timeout=15)
         status = resp_obj.status_code
         body_snip = (resp_obj.text or "")[:300] if hasattr(resp_obj, "text") else ""
 
@@ -110,7 +110,7 @@ class WxPusher(PushChannel):
             # 发送请求
             url = "https://wxpusher.zjiecode.com/api/send/message"
             headers = {"Content-Type": "application/json"}
-            response = requests.post(url=url, json=data, headers=headers, timeout=15)
+            response = self.session.post(url=url, json=data, headers=headers, timeout=15)
 
             if response.status_code == 200:
                 result = response.json()
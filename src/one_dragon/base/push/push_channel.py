@@ -1,14 +1,107 @@
 import base64
+import threading
+import weakref
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from io import BytesIO
 
 import cv2
+import requests
 from cv2.typing import MatLike
 
 from one_dragon.base.operation.notify_pool import NotifyPoolItem
 from one_dragon.base.push.push_channel_config import PushChannelConfigField
 
 
+class _ImageEncodings:
+
+    def __init__(self, image_ref: weakref.ref):
+        self.image_ref: weakref.ref = image_ref  # 只用于确认 id 没有被其它图片复用 不会让图片一直留在内存中
+        self.data: dict[tuple, bytes | None] = {}  # {编码参数: 编码后的字节}
+        self.pending: dict[tuple, threading.Event] = {}  # 正在编码的参数
+
+
+class _EncodedImageCache:
+
+    def __init__(self, capacity: int = 8):
+        """
+        图片编码结果的缓存 同一次推送会发给多个渠道 同一张图片只需要编码一次
+
+        以图片对象的 id 为键 只保存编码结果和图片的弱引用
+        编码在锁外进行 其它渠道只等待同一张图片同一种编码的结果 不会互相阻塞
+
+        Args:
+            capacity: 最多缓存的图片数量
+        """
+        self.capacity: int = capacity
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[int, _ImageEncodings] = OrderedDict()
+
+    def get(self, image: MatLike, key: tuple, encode) -> bytes | None:
+        """
+        获取图片的编码结果 没有缓存时编码
+
+        Args:
+            image: 图片
+            key: 编码参数
+            encode: 编码方法 返回编码后的字节 失败时返回None
+
+        Returns:
+            bytes | None: 编码后的字节
+        """
+        try:
+            image_ref = weakref.ref(image)
+        except TypeError:  # 不支持弱引用的对象 不缓存
+            return encode()
+
+        image_id = id(image)
+        while True:
+            with self._lock:
+                encodings = self._cache.get(image_id)
+                if encodings is None or encodings.image_ref() is not image:
+                    # 原来的图片已经被释放 id 被新的图片复用
+                    encodings = _ImageEncodings(image_ref)
+                    self._cache[image_id] = encodings
+                    self._trim()
+                self._cache.move_to_end(image_id)
+
+                if key in encodings.data:
+                    return encodings.data[key]
+                event = encodings.pending.get(key)
+                if event is None:
+                    event = threading.Event()
+                    encodings.pending[key] = event
+                    break
+            event.wait()  # 其它线程正在编码 完成后重新读取缓存
+
+        encoded = False
+        data = None
+        try:
+            data = encode()
+            encoded = True
+        finally:
+            with self._lock:
+                encodings.pending.pop(key, None)
+                if encoded and self._cache.get(image_id) is encodings:
+                    encodings.data[key] = data
+            event.set()  # 编码出现异常时 等待的线程会重新编码
+        return data
+
+    def _trim(self) -> None:
+        """
+        超过容量时 先移除图片已经被释放的 再移除最久没有使用的
+        """
+        if len(self._cache) <= self.capacity:
+            return
+        for image_id in [i for i, e in self._cache.items() if e.image_ref() is None and not e.pending]:
+            del self._cache[image_id]
+        while len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+
+
+_encoded_image_cache = _EncodedImageCache()
+
+
 class PushChannel(ABC):
 
     def __init__(
@@ -21,6 +114,35 @@ class PushChannel(ABC):
         self.channel_name: str = channel_name  # 渠道显示名称
         self.config_schema: list[PushChannelConfigField] = config_schema  # 所需的配置字段
 
+        # requests.Session 不是线程安全的 每个推送线程使用自己的会话
+        self._local = threading.local()
+        self._sessions: list[requests.Session] = []
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        当前线程使用的 HTTP 会话 复用连接 避免每次推送都重新握手
+        """
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+            with self._session_lock:
+                self._sessions.append(session)
+        return session
+
+    def close_session(self) -> None:
+        """
+        关闭所有线程的 HTTP 会话
+        """
+        with self._session_lock:
+            sessions = self._sessions
+            self._sessions = []
+            self._local = threading.local()
+        for session in sessions:
+            session.close()
+
     @abstractmethod
     def push(
         self,
@@ -96,20 +218,21 @@ class PushChannel(ABC):
             max_bytes: 图片最大字节数 超过时压缩
 
         Returns:
-            BytesIO: 图片数据 统一jpeg格式
+            BytesIO: 图片数据 统一jpeg格式 多个渠道之间共用编码结果 每次返回新的 BytesIO
         """
+        data = _encoded_image_cache.get(image, ('.jpg', max_bytes), lambda: self._encode_jpg(image, max_bytes))
+        return BytesIO(data) if data is not None else None
+
+    def _encode_jpg(self, image: MatLike, max_bytes: int | None) -> bytes | None:
         bgr_image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
         retval, buffer = cv2.imencode('.jpg', bgr_image)
 
         if retval:
-            image_bytes = BytesIO(buffer.tobytes())
-            if max_bytes is not None:
-                img_bytes = image_bytes.getvalue()
-                orig_size = len(img_bytes)
-                if orig_size > max_bytes:
-                    return self._compress_image_bytes(bgr_image, max_bytes)
-
-            return image_bytes
+            if max_bytes is not None and buffer.nbytes > max_bytes:
+                compressed = self._compress_image_bytes(bgr_image, max_bytes)
+                return compressed.getvalue() if compressed is not None else None
+
+            return buffer.tobytes()
         else:
             return None
 
@@ -160,11 +283,14 @@ class PushChannel(ABC):
         Returns:
             str: 图片 base64 字符串
         """
-        image_bytes = self.image_to_bytes(image, max_bytes=max_bytes)
-        if image_bytes is None:
-            return None
-        image_bytes.seek(0)
-        return base64.b64encode(image_bytes.getvalue()).decode('utf-8')
+        def _encode() -> bytes | None:
+            image_bytes = self.image_to_bytes(image, max_bytes=max_bytes)
+            if image_bytes is None:
+                return None
+            return base64.b64encode(image_bytes.getvalue())
+
+        data = _encoded_image_cache.get(image, ('base64', max_bytes), _encode)
+        return data.decode('utf-8') if data is not None else None
 
     def get_proxy(self, proxy_url: str) -> dict | None:
         """
@@ -0,0 +1,249 @@
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+
+from one_dragon.base.operation.notify_pool import NotifyPoolItem
+from one_dragon.utils import cv2_utils
+from one_dragon.utils.log_utils import log
+
+
+@dataclass
+class PushOutboxItem:
+    """推送失败 等待重试的消息"""
+    item_id: str
+    channel_id: str
+    title: str
+    content_list: list[str]
+    image_file_list: list[str | None]  # 与 content_list 一一对应 保存在消息目录下的图片文件名
+    merged: bool  # 是否合并消息
+    create_time: float
+    attempt_cnt: int = 0  # 已经重试的次数
+    next_retry_time: float = 0
+    last_error: str = ''
+
+
+class PushOutbox:
+
+    def __init__(
+        self,
+        outbox_dir: str,
+        max_attempts: int = 6,
+        base_delay: float = 30,
+        max_delay: float = 3600,
+        max_items: int = 100,
+    ):
+        """
+        推送失败消息的发件箱 保存在本地 程序重启后仍会继续重试
+
+        每条消息一个目录 包含 item.json 和图片
+        只保存渠道ID 重试时使用当时的渠道配置 不会把密钥等配置写入发件箱
+        第 n 次重试的间隔为 base_delay * 2^(n-1) 不超过 max_delay 超过 max_attempts 次后丢弃
+
+        Args:
+            outbox_dir: 发件箱目录
+            max_attempts: 最多重试次数
+            base_delay: 第一次重试的间隔
+            max_delay: 重试的最长间隔
+            max_items: 最多保存的消息数量 超过时丢弃最旧的
+        """
+        self.outbox_dir: str = outbox_dir
+        self.max_attempts: int = max_attempts
+        self.base_delay: float = base_delay
+        self.max_delay: float = max_delay
+        self.max_items: int = max_items
+
+        self._lock = threading.Lock()
+        self._items: dict[str, PushOutboxItem] | None = None  # 第一次使用时从磁盘加载
+        self._retrying: set[str] = set()  # 正在重试 还没有结果的消息
+
+    def _load(self) -> dict[str, PushOutboxItem]:
+        if self._items is not None:
+            return self._items
+
+        self._items = {}
+        if not os.path.isdir(self.outbox_dir):
+            return self._items
+        for item_id in os.listdir(self.outbox_dir):
+            item_path = os.path.join(self.outbox_dir, item_id, 'item.json')
+            try:
+                with open(item_path, encoding='utf-8') as file:
+                    item = PushOutboxItem(**json.load(file))
+                self._items[item.item_id] = item
+            except Exception:
+                log.warning(f'推送发件箱中的消息无法读取 已丢弃 {item_id}')
+                self._remove_files(item_id)
+        return self._items
+
+    def add(
+        self,
+        channel_id: str,
+        title: str,
+        items: list[NotifyPoolItem],
+        merged: bool,
+        error: str,
+    ) -> None:
+        """
+        加入一条推送失败的消息
+
+        Args:
+            channel_id: 推送渠道ID
+            title: 标题
+            items: 消息列表 非合并消息时只有一个
+            merged: 是否合并消息
+            error: 失败原因
+        """
+        now = time.time()
+        item_id = f'{int(now * 1000)}_{uuid.uuid4().hex[:8]}'
+        item_dir = os.path.join(self.outbox_dir, item_id)
+        os.makedirs(item_dir, exist_ok=True)
+
+        image_file_list: list[str | None] = []
+        for idx, notify_item in enumerate(items):
+            if notify_item.image is None:
+                image_file_list.append(None)
+                continue
+            file_name = f'image_{idx}.png'
+            cv2_utils.save_image(notify_item.image, os.path.join(item_dir, file_name))
+            image_file_list.append(file_name)
+
+        item = PushOutboxItem(
+            item_id=item_id,
+            channel_id=channel_id,
+            title=title,
+            content_list=[i.content for i in items],
+            image_file_list=image_file_list,
+            merged=merged,
+            create_time=now,
+            next_retry_time=now + self.base_delay,
+            last_error=error,
+        )
+        with self._lock:
+            items_map = self._load()
+            items_map[item_id] = item
+            self._save(item)
+            while len(items_map) > self.max_items:
+                oldest = min(items_map.values(), key=lambda i: i.create_time)
+                log.warning(f'推送发件箱已满 丢弃消息 {oldest.channel_id} {oldest.title}')
+                self._discard(oldest)
+
+    def get_due_items(self, now: float | None = None) -> list[PushOutboxItem]:
+        """
+        获取已经到达重试时间的消息
+
+        Args:
+            now: 当前时间
+
+        Returns:
+            list[PushOutboxItem]: 需要重试的消息 按创建时间排序
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            due_list = [i for i in self._load().values()
+                        if i.next_retry_time <= now and i.item_id not in self._retrying]
+        due_list.sort(key=lambda i: i.create_time)
+        return due_list
+
+    def get_next_retry_time(self) -> float | None:
+        """
+        最早的重试时间 没有消息时返回None
+        """
+        with self._lock:
+            retry_time_list = [i.next_retry_time for i in self._load().values() if i.item_id not in self._retrying]
+            if len(retry_time_list) == 0:
+                return None
+            return min(retry_time_list)
+
+    def start_retry(self, item: PushOutboxItem) -> None:
+        """
+        开始重试 得到结果之前不会再出现在 get_due_items 中
+        之后需要调用 on_success / on_failure / drop 其中之一
+        """
+        with self._lock:
+            self._retrying.add(item.item_id)
+
+    def load_notify_items(self, item: PushOutboxItem) -> list[NotifyPoolItem]:
+        """
+        读取消息的内容和图片
+
+        Args:
+            item: 发件箱中的消息
+
+        Returns:
+            list[NotifyPoolItem]: 消息列表
+        """
+        item_dir = os.path.join(self.outbox_dir, item.item_id)
+        result: list[NotifyPoolItem] = []
+        for content, image_file in zip(item.content_list, item.image_file_list, strict=False):
+            image = None if image_file is None else cv2_utils.read_image(os.path.join(item_dir, image_file))
+            result.append(NotifyPoolItem(content=content, image=image))
+        return result
+
+    def on_success(self, item: PushOutboxItem) -> None:
+        """
+        重试成功 从发件箱中移除
+        """
+        with self._lock:
+            self._discard(item)
+
+    def drop(self, item: PushOutboxItem, reason: str) -> None:
+        """
+        不再重试 从发件箱中丢弃
+
+        Args:
+            item: 发件箱中的消息
+            reason: 丢弃原因
+        """
+        log.warning(f'推送发件箱丢弃消息 {item.channel_id} {item.title} {reason}')
+        with self._lock:
+            self._discard(item)
+
+    def on_failure(self, item: PushOutboxItem, error: str, now: float | None = None) -> None:
+        """
+        重试失败 增加重试次数并计算下次重试时间 超过最多次数时丢弃
+
+        Args:
+            item: 发件箱中的消息
+            error: 失败原因
+            now: 当前时间
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            self._retrying.discard(item.item_id)
+            if self._items is None or item.item_id not in self._items:  # 已经被丢弃
+                return
+            item.attempt_cnt += 1
+            item.last_error = error
+            if item.attempt_cnt >= self.max_attempts:
+                log.error(f'推送重试 {item.attempt_cnt} 次仍失败 已丢弃 {item.channel_id} {item.title} {error}')
+                self._discard(item)
+                return
+            delay = min(self.max_delay, self.base_delay * (2 ** item.attempt_cnt))
+            item.next_retry_time = now + delay
+            self._save(item)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+    def _save(self, item: PushOutboxItem) -> None:
+        item_dir = os.path.join(self.outbox_dir, item.item_id)
+        os.makedirs(item_dir, exist_ok=True)
+        temp_path = os.path.join(item_dir, 'item.json.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(asdict(item), file, ensure_ascii=False)
+        os.replace(temp_path, os.path.join(item_dir, 'item.json'))
+
+    def _discard(self, item: PushOutboxItem) -> None:
+        self._retrying.discard(item.item_id)
+        if self._items is not None:
+            self._items.pop(item.item_id, None)
+        self._remove_files(item.item_id)
+
+    def _remove_files(self, item_id: str) -> None:
+        shutil.rmtree(os.path.join(self.outbox_dir, item_id), ignore_errors=True)
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
-from functools import cached_property
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import cached_property, partial
 from typing import TYPE_CHECKING
 
 from cv2.typing import MatLike
@@ -36,7 +37,8 @@ from one_dragon.base.push.channel.wx_pusher import WxPusher
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField
 from one_dragon.base.push.push_config import PushConfig, PushProxy
-from one_dragon.utils import thread_utils
+from one_dragon.base.push.push_outbox import PushOutbox, PushOutboxItem
+from one_dragon.utils import os_utils, thread_utils
 from one_dragon.utils.log_utils import log
 
 if TYPE_CHECKING:
@@ -51,6 +53,17 @@ class PushService:
         self._executor = ThreadPoolExecutor(
             thread_name_prefix="one_dragon_push_service", max_workers=1
         )
+        # 各个渠道并发推送 一个渠道慢不会拖慢其它渠道
+        self._channel_executor = ThreadPoolExecutor(
+            thread_name_prefix="one_dragon_push_channel", max_workers=8
+        )
+        self.channel_timeout_seconds: float = 60  # 等待单个渠道的最长时间 超时后渠道仍在后台继续推送
+
+        # 自动推送失败的消息 放入发件箱定时重试
+        self.outbox: PushOutbox = PushOutbox(os_utils.get_path_under_work_dir('.log', 'push_outbox'))
+        self._outbox_event = threading.Event()
+        self._outbox_thread: threading.Thread | None = None
+        self._shutdown: bool = False
 
         self._init_lock = threading.Lock()
         self._inited: bool = False
@@ -98,6 +111,8 @@ class PushService:
         finally:
             self._init_lock.release()
 
+        self._start_outbox_thread()
+
     def _add_channel(self, channel: PushChannel) -> None:
         """
         添加一个推送渠道
@@ -145,36 +160,38 @@ class PushService:
         if not self.push_config.send_image:
             image = None
 
-        any_ok: bool = False
-        err_msg: str = ''
-        if channel_id is None:
-            any_push = False
-            for channel_id, channel in self._id_2_channels.items():
-                channel_config = self.get_channel_config(channel_id)
-                ok, msg = channel.validate_config(channel_config)
-                if not ok:
-                    continue
-
-                any_push = True
-
-                ok, msg = channel.push(
-                    config=channel_config,
-                    title=title,
-                    content=content,
-                    image=image,
-                    proxy_url=self.get_proxy(),
-                )
-                if not ok:
-                    log.error(f'推送失败: {channel_id} {msg}')
-                    err_msg += f'{channel_id} {msg}\n'
-                    continue
-
-                any_ok = True
-                log.info(f'推送成功: {channel_id}')
-
-            if not any_push:
-                return False, '没有可用的推送渠道'
-        else:
+        return self._push_to_channels(
+            title=title,
+            items=[NotifyPoolItem(content=content, image=image)],
+            merged=False,
+            channel_id=channel_id,
+        )
+
+    def _push_to_channels(
+        self,
+        title: str,
+        items: list[NotifyPoolItem],
+        merged: bool,
+        channel_id: str | None = None,
+    ) -> tuple[bool, str]:
+        """
+        推送到一个或所有渠道
+
+        所有渠道时 并发推送并分别等待超时 失败的消息放入发件箱稍后重试
+        超时的渠道不会被中断 在后台推送完成后 真正失败时才放入发件箱 避免重复发送
+        指定渠道时 一般是测试配置 直接返回结果 不放入发件箱
+
+        Args:
+            title: 标题
+            items: 消息列表 非合并消息时只有一个
+            merged: 是否合并消息
+            channel_id: 推送渠道ID 未传入时使用所有能通过配置校验的渠道
+
+        Returns:
+            tuple[bool, str]: 是否成功、错误信息
+        """
+        log_prefix = '合并推送' if merged else '推送'
+        if channel_id is not None:
             channel = self._id_2_channels.get(channel_id)
             if channel is None:
                 return False, f'推送渠道不存在: {channel_id}'
@@ -182,15 +199,184 @@ class PushService:
             ok, msg = channel.validate_config(channel_config)
             if not ok:
                 return False, msg
-            any_ok, err_msg = channel.push(
+            return self._push_to_channel(channel, channel_config, title, items, merged)
+
+        future_list: list[tuple[str, Future]] = []
+        for cid, channel in self._id_2_channels.items():
+            channel_config = self.get_channel_config(cid)
+            ok, msg = channel.validate_config(channel_config)
+            if not ok:
+                continue
+            future = self._channel_executor.submit(
+                self._push_to_channel, channel, channel_config, title, items, merged
+            )
+            future.add_done_callback(partial(self._on_channel_push_done, cid, title, items, merged, log_prefix))
+            future_list.append((cid, future))
+
+        if len(future_list) == 0:
+            return False, '没有可用的推送渠道'
+
+        any_ok: bool = False
+        err_msg: str = ''
+        deadline = time.time() + self.channel_timeout_seconds
+        for cid, future in future_list:
+            try:
+                ok, msg = future.result(timeout=max(0.0, deadline - time.time()))
+            except FutureTimeoutError:
+                log.warning(f'{log_prefix}超时: {cid} {self.channel_timeout_seconds}s 内未完成 继续在后台推送')
+                ok, msg = False, f'推送超时 {self.channel_timeout_seconds}s'
+            except Exception as e:
+                ok, msg = False, f'推送异常: {e}'
+
+            # 成功和失败的日志 以及放入发件箱 都在 _on_channel_push_done 中处理
+            if not ok:
+                err_msg += f'{cid} {msg}\n'
+                continue
+
+            any_ok = True
+
+        return any_ok, err_msg
+
+    def _on_channel_push_done(
+        self,
+        channel_id: str,
+        title: str,
+        items: list[NotifyPoolItem],
+        merged: bool,
+        log_prefix: str,
+        future: Future,
+    ) -> None:
+        """
+        单个渠道推送完成 包括等待超时后才完成的 失败时放入发件箱
+        """
+        try:
+            ok, msg = future.result()
+        except Exception as e:
+            ok, msg = False, f'推送异常: {e}'
+
+        if ok:
+            log.info(f'{log_prefix}成功: {channel_id}')
+        else:
+            log.error(f'{log_prefix}失败: {channel_id} {msg}')
+            self._add_to_outbox(channel_id, title, items, merged, msg)
+
+    def _push_to_channel(
+        self,
+        channel: PushChannel,
+        channel_config: dict[str, str],
+        title: str,
+        items: list[NotifyPoolItem],
+        merged: bool,
+    ) -> tuple[bool, str]:
+        """
+        推送到单个渠道
+
+        Returns:
+            tuple[bool, str]: 是否成功、错误信息
+        """
+        if merged:
+            return channel.push_merged(
                 config=channel_config,
                 title=title,
-                content=content,
-                image=image,
+                items=items,
+                proxy_url=self.get_proxy(),
+            )
+        else:
+            return channel.push(
+                config=channel_config,
+                title=title,
+                content=items[0].content,
+                image=items[0].image,
                 proxy_url=self.get_proxy(),
             )
 
-        return any_ok, err_msg
+    def _add_to_outbox(
+        self,
+        channel_id: str,
+        title: str,
+        items: list[NotifyPoolItem],
+        merged: bool,
+        error: str,
+    ) -> None:
+        try:
+            self.outbox.add(channel_id, title, items, merged, error)
+        except Exception:
+            log.error('推送失败的消息无法放入发件箱', exc_info=True)
+            return
+        self._outbox_event.set()
+
+    def _start_outbox_thread(self) -> None:
+        """
+        启动发件箱的重试线程
+        """
+        with self._init_lock:
+            if self._outbox_thread is not None or self._shutdown:
+                return
+            self._outbox_thread = threading.Thread(
+                target=self._outbox_loop, name='one_dragon_push_outbox', daemon=True
+            )
+            self._outbox_thread.start()
+
+    def _outbox_loop(self) -> None:
+        """
+        等待到最早的重试时间 逐条开始重试发件箱中的消息 重试结果在推送完成时处理
+        """
+        while not self._shutdown:
+            next_retry_time = self.outbox.get_next_retry_time()
+            timeout = None if next_retry_time is None else max(0.0, next_retry_time - time.time())
+            self._outbox_event.wait(timeout)
+            self._outbox_event.clear()
+            if self._shutdown:
+                break
+            for item in self.outbox.get_due_items():
+                if self._shutdown:
+                    break
+                try:
+                    self._retry_outbox_item(item)
+                except Exception as e:
+                    log.error('推送重试异常', exc_info=True)
+                    self.outbox.on_failure(item, str(e))
+
+    def _retry_outbox_item(self, item: PushOutboxItem) -> None:
+        """
+        使用当前的渠道配置 重试发件箱中的一条消息
+        不设超时 推送完成前这条消息不会再次重试 避免重复发送
+        """
+        channel = self._id_2_channels.get(item.channel_id)
+        if channel is None:
+            self.outbox.drop(item, f'推送渠道不存在: {item.channel_id}')
+            return
+        channel_config = self.get_channel_config(item.channel_id)
+        ok, msg = channel.validate_config(channel_config)
+        if not ok:  # 配置已被修改或删除 不再重试
+            self.outbox.drop(item, f'推送渠道配置已失效: {msg}')
+            return
+
+        items = self.outbox.load_notify_items(item)
+        if not self.push_config.send_image:
+            items = [NotifyPoolItem(content=i.content) for i in items]
+        self.outbox.start_retry(item)
+        future = self._channel_executor.submit(
+            self._push_to_channel, channel, channel_config, item.title, items, item.merged
+        )
+        future.add_done_callback(partial(self._on_retry_done, item))
+
+    def _on_retry_done(self, item: PushOutboxItem, future: Future) -> None:
+        """
+        发件箱中的消息重试完成
+        """
+        try:
+            ok, msg = future.result()
+        except Exception as e:
+            ok, msg = False, f'推送异常: {e}'
+
+        if ok:
+            log.info(f'推送重试成功: {item.channel_id} 第{item.attempt_cnt + 1}次')
+            self.outbox.on_success(item)
+        else:
+            log.error(f'推送重试失败: {item.channel_id} 第{item.attempt_cnt + 1}次 {msg}')
+            self.outbox.on_failure(item, msg)
+        self._outbox_event.set()  # 重新计算下次重试时间
 
     def get_channel_config(self, channel_id: str) -> dict[str, str]:
         """
@@ -265,50 +451,12 @@ class PushService:
         if not self.push_config.send_image:
             items = [NotifyPoolItem(content=item.content) for item in items]
 
-        any_ok: bool = False
-        err_msg: str = ''
-        if channel_id is None:
-            any_push = False
-            for cid, channel in self._id_2_channels.items():
-                channel_config = self.get_channel_config(cid)
-                ok, msg = channel.validate_config(channel_config)
-                if not ok:
-                    continue
-
-                any_push = True
-
-                ok, msg = channel.push_merged(
-                    config=channel_config,
-                    title=title,
-                    items=items,
-                    proxy_url=self.get_proxy(),
-                )
-                if not ok:
-                    log.error(f'合并推送失败: {cid} {msg}')
-                    err_msg += f'{cid} {msg}\n'
-                    continue
-
-                any_ok = True
-                log.info(f'合并推送成功: {cid}')
-
-            if not any_push:
-                return False, '没有可用的推送渠道'
-        else:
-            channel = self._id_2_channels.get(channel_id)
-            if channel is None:
-                return False, f'推送渠道不存在: {channel_id}'
-            channel_config = self.get_channel_config(channel_id)
-            ok, msg = channel.validate_config(channel_config)
-            if not ok:
-                return False, msg
-            any_ok, err_msg = channel.push_merged(
-                config=channel_config,
-                title=title,
-                items=items,
-                proxy_url=self.get_proxy(),
-            )
-
-        return any_ok, err_msg
+        return self._push_to_channels(
+            title=title,
+            items=items,
+            merged=True,
+            channel_id=channel_id,
+        )
 
     def push_merged_async(
         self,
@@ -348,4 +496,84 @@ class PushService:
         """
         整个脚本运行结束后的清理
         """
+        self._shutdown = True
+        self._outbox_event.set()
         self._executor.shutdown(wait=True)
+        self._channel_executor.shutdown(wait=False, cancel_futures=True)
+        for channel in self.channels:
+            channel.close_session()
+
+
+def __debug_local_servers():
+    """
+    使用本地 HTTP 服务代替推送服务端 验证并发推送和发件箱重试
+    - 正常的服务端 立即返回
+    - 缓慢的服务端 5 秒后才返回 不应该拖慢其它渠道
+    - 先失败后恢复的服务端 失败的消息进入发件箱 恢复后重试成功
+    """
+    import tempfile
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    import numpy as np
+
+    from one_dragon.base.push.channel.webhook import Webhook
+
+    recover_time = time.time() + 3
+    received: list[tuple[float, str]] = []
+
+    class _Handler(BaseHTTPRequestHandler):
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.path == '/slow':
+                time.sleep(5)
+            if self.path == '/flaky' and time.time() < recover_time:
+                self.send_response(500)
+                self.end_headers()
+                return
+            received.append((time.time(), self.path))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    service = PushService(ctx=None)
+    channel_configs: dict[str, dict[str, str]] = {}
+    for path in ['fast', 'slow', 'flaky']:
+        channel = Webhook()
+        channel.channel_id = f'WEBHOOK_{path.upper()}'
+        service._add_channel(channel)
+        channel_configs[channel.channel_id] = {
+            'URL': f'{base_url}/{path}',
+            'METHOD': 'POST',
+            'CONTENT_TYPE': 'application/json',
+            'HEADERS': '{}',
+            'BODY': '{"title": "$title", "image": "$image"}',
+        }
+    service._inited = True
+    service.get_channel_config = lambda cid: channel_configs.get(cid, {})
+    service.get_proxy = lambda: None
+    service.outbox = PushOutbox(tempfile.mkdtemp(), base_delay=1)
+    service._start_outbox_thread()
+
+    image = np.random.randint(0, 255, (1080, 1920, 3), dtype=np.uint8)
+    start_time = time.time()
+    ok, msg = service._push_to_channels('测试', [NotifyPoolItem(content='内容', image=image)], merged=False)
+    print(f'推送完成 耗时 {time.time() - start_time:.2f}s 结果 {ok} {msg.strip()}')
+    for receive_time, path in received:
+        print(f'  {path} 收到 {receive_time - start_time:.2f}s')
+    print(f'发件箱中的消息 {len(service.outbox)}')
+
+    time.sleep(6)
+    print(f'等待重试后 发件箱中的消息 {len(service.outbox)} 服务端收到 {[i[1] for i in received]}')
+    service.after_app_shutdown()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    __debug_local_servers()
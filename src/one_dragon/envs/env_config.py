@@ -330,6 +330,18 @@ class EnvConfig(YamlConfig):
         """
         self.update('is_debug', new_value)
 
+    @property
+    def perf_trace_enabled(self) -> bool:
+        """
+        记录性能追踪 把调试事件和操作节点的耗时持续写入 .debug/perf_trace
+        :return:
+        """
+        return self.get('perf_trace_enabled', False)
+
+    @perf_trace_enabled.setter
+    def perf_trace_enabled(self, new_value: bool):
+        self.update('perf_trace_enabled', new_value)
+
     @property
     def copy_screenshot(self) -> bool:
         """
@@ -0,0 +1,313 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from pygit2 import Oid, Repository
+from pygit2.enums import SortMode
+
+from one_dragon.utils.log_utils import log
+
+_INDEX_VERSION = 1
+
+
+@dataclass
+class GitCommitRecord:
+    """提交索引中的一条记录"""
+    commit_id: str
+    author: str
+    commit_time: int
+    subject: str
+    ordinal: int  # 从 HEAD 开始的序号 HEAD 为0
+
+
+class GitCommitIndex:
+
+    def __init__(self, index_path: str | Path, shallow_path: str | Path | None = None) -> None:
+        """
+        保存在本地的提交索引 用于分页和搜索提交记录
+
+        每个提交保存一个递增的 seq 越旧的提交越小 最新的 HEAD 最大
+        因此 从 HEAD 开始的序号 = 最大seq - seq 分页时按 seq 区间查询 不需要跳过前面的提交
+
+        HEAD 前进时 只遍历上次索引的 HEAD 之后的新提交 追加在最后
+        HEAD 不是上次索引的 HEAD 的后代时(例如回滚) 整个重建
+        浅克隆的边界变化时(例如 deepen / unshallow) HEAD 即使没有变化 能遍历到的历史也变了 整个重建
+
+        Args:
+            index_path: 索引文件路径 一般放在 .git 目录下
+            shallow_path: 仓库的 shallow 文件路径 为None时使用仓库目录下的 shallow
+        """
+        self.index_path: Path = Path(index_path)
+        self.shallow_path: Path | None = Path(shallow_path) if shallow_path is not None else None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.index_path)
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS commit_log ('
+            'seq INTEGER PRIMARY KEY, '
+            'oid TEXT NOT NULL, '
+            'author TEXT NOT NULL, '
+            'commit_time INTEGER NOT NULL, '
+            'subject TEXT NOT NULL)'
+        )
+        return conn
+
+    @staticmethod
+    def _get_meta(conn: sqlite3.Connection, key: str) -> str | None:
+        row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    @staticmethod
+    def _set_meta(conn: sqlite3.Connection, key: str, value: str) -> None:
+        conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def sync(self, repo: Repository) -> None:
+        """
+        将索引更新到仓库当前的 HEAD
+
+        Args:
+            repo: 仓库
+        """
+        head_oid: Oid = repo.head.target
+        shallow_hash = self._get_shallow_hash(repo)
+        with self._lock:
+            conn = self._connect()
+            try:
+                if (self._get_meta(conn, 'version') != str(_INDEX_VERSION)
+                        or self._get_meta(conn, 'shallow') != shallow_hash):
+                    self._rebuild(conn, repo, head_oid, shallow_hash)
+                    return
+
+                indexed_head = self._get_meta(conn, 'head')
+                if indexed_head == str(head_oid):
+                    return
+
+                indexed_oid: Oid | None = None
+                if indexed_head is not None:
+                    try:
+                        indexed_oid = Oid(hex=indexed_head)
+                        if not repo.descendant_of(head_oid, indexed_oid):
+                            indexed_oid = None
+                    except Exception:  # 上次索引的提交可能已经不存在
+                        indexed_oid = None
+
+                if indexed_oid is None:
+                    self._rebuild(conn, repo, head_oid, shallow_hash)
+                else:
+                    self._append(conn, repo, head_oid, indexed_oid)
+            finally:
+                conn.close()
+
+    def _get_shallow_hash(self, repo: Repository) -> str:
+        """
+        shallow 文件的哈希 记录了浅克隆的边界 不是浅克隆时为空字符串
+        """
+        shallow_path = self.shallow_path if self.shallow_path is not None else Path(repo.path) / 'shallow'
+        if not shallow_path.is_file():
+            return ''
+        return hashlib.sha1(shallow_path.read_bytes()).hexdigest()
+
+    def _rebuild(self, conn: sqlite3.Connection, repo: Repository, head_oid: Oid, shallow_hash: str) -> None:
+        t1 = time.time()
+        rows = self._walk_rows(repo, head_oid)
+        total = len(rows)
+        with conn:
+            conn.execute('DELETE FROM commit_log')
+            conn.executemany(
+                'INSERT INTO commit_log (seq, oid, author, commit_time, subject) VALUES (?, ?, ?, ?, ?)',
+                ((total - 1 - idx, *row) for idx, row in enumerate(rows))
+            )
+            self._set_meta(conn, 'version', str(_INDEX_VERSION))
+            self._set_meta(conn, 'head', str(head_oid))
+            self._set_meta(conn, 'shallow', shallow_hash)
+        log.info(f'重建提交索引 共 {total} 个提交 耗时 {time.time() - t1:.2f}s')
+
+    def _append(self, conn: sqlite3.Connection, repo: Repository, head_oid: Oid, indexed_oid: Oid) -> None:
+        rows = self._walk_rows(repo, head_oid, hide_oid=indexed_oid)
+        max_seq = self._get_max_seq(conn)
+        with conn:
+            conn.executemany(
+                'INSERT INTO commit_log (seq, oid, author, commit_time, subject) VALUES (?, ?, ?, ?, ?)',
+                ((max_seq + len(rows) - idx, *row) for idx, row in enumerate(rows))
+            )
+            self._set_meta(conn, 'head', str(head_oid))
+
+    @staticmethod
+    def _walk_rows(repo: Repository, head_oid: Oid, hide_oid: Oid | None = None) -> list[tuple]:
+        """
+        按拓扑顺序遍历提交 从新到旧
+        隐藏上次索引的 HEAD 时 新提交都排在旧提交之前 拼接后仍是合法的拓扑顺序
+        """
+        walker = repo.walk(head_oid, SortMode.TOPOLOGICAL)
+        if hide_oid is not None:
+            walker.hide(hide_oid)
+
+        rows: list[tuple] = []
+        for commit in walker:
+            author = commit.author.name if commit.author and commit.author.name else ''
+            subject = commit.message.splitlines()[0] if commit.message else ''
+            rows.append((str(commit.id), author, commit.commit_time, subject))
+        return rows
+
+    @staticmethod
+    def _get_max_seq(conn: sqlite3.Connection) -> int:
+        row = conn.execute('SELECT MAX(seq) FROM commit_log').fetchone()
+        return row[0] if row is not None and row[0] is not None else -1
+
+    def count(self) -> int:
+        """
+        提交总数
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                return self._get_max_seq(conn) + 1
+            finally:
+                conn.close()
+
+    def get_page(self, page_num: int, page_size: int) -> list[GitCommitRecord]:
+        """
+        获取一页提交 从 HEAD 开始
+
+        Args:
+            page_num: 页码（从0开始）
+            page_size: 每页数量
+
+        Returns:
+            list[GitCommitRecord]: 提交记录 从新到旧
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                max_seq = self._get_max_seq(conn)
+                seq_end = max_seq - page_num * page_size
+                seq_start = seq_end - page_size + 1
+                cursor = conn.execute(
+                    'SELECT seq, oid, author, commit_time, subject FROM commit_log '
+                    'WHERE seq BETWEEN ? AND ? ORDER BY seq DESC',
+                    (seq_start, seq_end)
+                )
+                return [self._to_record(row, max_seq) for row in cursor]
+            finally:
+                conn.close()
+
+    def search(
+        self,
+        keyword: str | None = None,
+        author: str | None = None,
+        page_num: int = 0,
+        page_size: int = 20,
+    ) -> tuple[int, list[GitCommitRecord]]:
+        """
+        按提交信息和作者搜索 都是包含匹配 不区分大小写
+
+        Args:
+            keyword: 提交信息中包含的文本
+            author: 作者名称中包含的文本
+            page_num: 页码（从0开始）
+            page_size: 每页数量
+
+        Returns:
+            tuple[int, list[GitCommitRecord]]: 匹配的总数 当前页的提交记录
+        """
+        condition_list: list[str] = []
+        param_list: list[str] = []
+        if keyword:
+            condition_list.append("subject LIKE ? ESCAPE '\\'")
+            param_list.append(f'%{self._escape_like(keyword)}%')
+        if author:
+            condition_list.append("author LIKE ? ESCAPE '\\'")
+            param_list.append(f'%{self._escape_like(author)}%')
+        where = f'WHERE {" AND ".join(condition_list)}' if len(condition_list) > 0 else ''
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                max_seq = self._get_max_seq(conn)
+                total = conn.execute(f'SELECT COUNT(*) FROM commit_log {where}', param_list).fetchone()[0]
+                cursor = conn.execute(
+                    f'SELECT seq, oid, author, commit_time, subject FROM commit_log {where} '
+                    'ORDER BY seq DESC LIMIT ? OFFSET ?',
+                    (*param_list, page_size, page_num * page_size)
+                )
+                return total, [self._to_record(row, max_seq) for row in cursor]
+            finally:
+                conn.close()
+
+    @staticmethod
+    def _escape_like(text: str) -> str:
+        return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+    @staticmethod
+    def _to_record(row: tuple, max_seq: int) -> GitCommitRecord:
+        seq, oid, author, commit_time, subject = row
+        return GitCommitRecord(oid, author, commit_time, subject, max_seq - seq)
+
+
+def __debug_benchmark():
+    """
+    在临时目录中生成一个有 50000 个提交的本地仓库
+    对比 遍历器跳过前面的提交 和 提交索引 获取深处分页和总数的耗时
+    """
+    import tempfile
+
+    from pygit2 import Signature, init_repository
+
+    commit_cnt = 50000
+    page_size = 20
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo = init_repository(temp_dir)
+        tree = repo.TreeBuilder().write()
+        parents: list[Oid] = []
+        t1 = time.time()
+        for i in range(commit_cnt):
+            author = Signature(f'author{i % 7}', f'author{i % 7}@example.com', 1700000000 + i, 0)
+            oid = repo.create_commit('refs/heads/main', author, author, f'commit {i}\n\nbody', tree, parents)
+            parents = [oid]
+        repo.set_head('refs/heads/main')
+        print(f'生成 {commit_cnt} 个提交 耗时 {time.time() - t1:.1f}s')
+
+        page_num = commit_cnt // page_size - 1
+        t1 = time.time()
+        total = sum(1 for _ in repo.walk(repo.head.target, SortMode.TOPOLOGICAL))
+        t2 = time.time()
+        walker_page = []
+        for idx, commit in enumerate(repo.walk(repo.head.target, SortMode.TOPOLOGICAL)):
+            if idx < page_num * page_size:
+                continue
+            if len(walker_page) >= page_size:
+                break
+            walker_page.append(str(commit.id))
+        t3 = time.time()
+        print(f'遍历器: 总数 {total} 耗时 {(t2 - t1) * 1000:.1f}ms 最后一页 耗时 {(t3 - t2) * 1000:.1f}ms')
+
+        index = GitCommitIndex(Path(repo.path) / 'od_commit_index.sqlite')
+        t1 = time.time()
+        index.sync(repo)
+        t2 = time.time()
+        total = index.count()
+        t3 = time.time()
+        index_page = [i.commit_id for i in index.get_page(page_num, page_size)]
+        t4 = time.time()
+        search_total, _ = index.search(keyword='commit 4999', author='author3')
+        t5 = time.time()
+        print(f'提交索引: 首次建立 {(t2 - t1) * 1000:.1f}ms 总数 {total} 耗时 {(t3 - t2) * 1000:.1f}ms '
+              f'最后一页 耗时 {(t4 - t3) * 1000:.1f}ms 结果一致 {walker_page == index_page} '
+              f'搜索 {search_total}条 耗时 {(t5 - t4) * 1000:.1f}ms')
+
+        author = Signature('author', 'author@example.com', 1800000000, 0)
+        repo.create_commit('refs/heads/main', author, author, 'new commit', tree, parents)
+        t1 = time.time()
+        index.sync(repo)
+        print(f'提交索引: 增量更新 1 个提交 耗时 {(time.time() - t1) * 1000:.1f}ms 总数 {index.count()}')
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
@@ -33,6 +33,7 @@ from pygit2.enums import CheckoutStrategy, ConfigLevel, ResetMode, SortMode
 
 from one_dragon.base.config.config_item import ConfigItem
 from one_dragon.envs.env_config import EnvConfig
+from one_dragon.envs.git_commit_index import GitCommitIndex, GitCommitRecord
 from one_dragon.envs.repo_config import RepoConfig, RepositoryItem
 from one_dragon.utils import os_utils
 from one_dragon.utils.i18_utils import gt
@@ -575,6 +576,7 @@ class GitService:
 
         self._repo: Repository | None = None
         self._rebuilding_repository: bool = False
+        self._commit_index: GitCommitIndex | None = None
         self._ensure_config_search_path()
 
     # ================== 私有辅助方法 ==================
@@ -1741,11 +1743,42 @@ class GitService:
 
         return False, gt('与远程分支不一致')
 
+    def _get_synced_commit_index(self) -> GitCommitIndex | None:
+        """获取已经更新到当前 HEAD 的提交索引
+
+        Returns:
+            提交索引，失败时返回None
+        """
+        try:
+            repo = self._open_repo()
+            if self._commit_index is None:
+                self._commit_index = GitCommitIndex(
+                    Path(repo.path) / 'od_commit_index.sqlite',
+                    shallow_path=_get_repository_shallow_path(repo),
+                )
+            self._commit_index.sync(repo)
+            return self._commit_index
+        except Exception:
+            log.error('更新提交索引失败', exc_info=True)
+            return None
+
+    @staticmethod
+    def _to_git_log(record: GitCommitRecord) -> GitLog:
+        commit_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.commit_time))
+        return GitLog(record.commit_id[:7], record.author, commit_time, record.subject)
+
     def fetch_total_commit(self) -> int:
         """
         获取commit的总数。获取失败时返回0
         """
         log.info(gt('获取commit总数'))
+        commit_index = self._get_synced_commit_index()
+        if commit_index is not None:
+            try:
+                return commit_index.count()
+            except Exception:
+                log.error('读取提交索引失败', exc_info=True)
+
         walker = self._get_commit_walker()
         return sum(1 for _ in walker) if walker else 0
 
@@ -1760,6 +1793,13 @@ class GitService:
             GitLog列表
         """
         log.info(f"{gt('获取commit')} 第{page_num + 1}页")
+        commit_index = self._get_synced_commit_index()
+        if commit_index is not None:
+            try:
+                return [self._to_git_log(i) for i in commit_index.get_page(page_num, page_size)]
+            except Exception:
+                log.error('读取提交索引失败', exc_info=True)
+
         walker = self._get_commit_walker()
         if not walker:
             return []
@@ -1780,6 +1820,34 @@ class GitService:
 
         return logs
 
+    def search_commit(
+        self,
+        keyword: str | None = None,
+        author: str | None = None,
+        page_num: int = 0,
+        page_size: int = 20,
+    ) -> tuple[int, list[GitLog]]:
+        """按提交信息和作者搜索commit
+
+        Args:
+            keyword: 提交信息中包含的文本
+            author: 作者名称中包含的文本
+            page_num: 页码（从0开始）
+            page_size: 每页数量
+
+        Returns:
+            (匹配的总数, 当前页的GitLog列表)，失败时返回 (0, [])
+        """
+        commit_index = self._get_synced_commit_index()
+        if commit_index is None:
+            return 0, []
+        try:
+            total, record_list = commit_index.search(keyword, author, page_num, page_size)
+        except Exception:
+            log.error('搜索commit失败', exc_info=True)
+            return 0, []
+        return total, [self._to_git_log(i) for i in record_list]
+
     def update_remote(self) -> None:
         """
         更新remote
@@ -9,6 +9,7 @@ from cv2.typing import MatLike
 
 from one_dragon.base.geometry.rectangle import Rect
 from one_dragon.base.matcher.match_result import MatchResultList, MatchResult
+from one_dragon.utils import scroll_stitch_utils
 from one_dragon.utils.log_utils import log
 
 feature_detector = cv2.SIFT_create()
@@ -228,47 +229,50 @@ def concat_vertically(img: MatLike, next_img: MatLike, decision_height: int = 15
     """
     垂直拼接图片。
     假设两张图片是通过垂直滚动得到的，即宽度一样，部分内容重叠
-    :param img: 图
+    连续拼接多张图时 使用 scroll_stitch_utils.ScrollStitcher 不需要每次复制已拼接的图
+    :param img: 图 可以是已经拼接好的长图
     :param next_img: 下一张图
-    :param decision_height: 用第二张图的多少高度来判断重叠部分
+    :param decision_height: 最少的重叠高度
     :return:
     """
-    # 截取一个横截面用来匹配 要用中心部分 四周空白较多容易误判
-    for threshold in range(95, 70, -5):
-        for dh in range(decision_height, next_img.shape[0] // 2, 10):
-            cy = next_img.shape[0] // 2
-            next_part = next_img[:-dh, :]
-            r = match_template(img, next_part, threshold / 100.0).max
-            if r is None:
-                continue
-            h, w, _ = img.shape
-            overlap_h = h - r.y
-            extra_part = next_img[overlap_h+1:, :]
-            # 垂直拼接两张图像
-            return cv2.vconcat([img, extra_part])
-    raise Exception('拼接图片失败')
+    return _concat_scrolled(img, next_img, 0, decision_height)
 
 
 def concat_horizontally(img: MatLike, next_img: MatLike, decision_width: int = 200):
     """
     水平拼接图片。
     假设两张图片是通过水平滚动得到的，即高度一样，部分内容重叠
+    :param img: 图 可以是已经拼接好的长图
+    :param next_img: 下一张图
+    :param decision_width: 最少的重叠宽度
+    :return:
+    """
+    return _concat_scrolled(img, next_img, 1, decision_width)
+
+
+def _concat_scrolled(img: MatLike, next_img: MatLike, axis: int, min_overlap: int) -> MatLike:
+    """
+    拼接滚动得到的两张图片
     :param img: 图
     :param next_img: 下一张图
-    :param decision_width: 用第二张图的多少宽度来判断重叠部分
+    :param axis: 0=垂直 1=水平
+    :param min_overlap: 最少的重叠长度
     :return:
     """
-    # 截取一个横截面用来匹配 要用中心部分 四周空白较多容易误判
-    cx = next_img.shape[1] // 2
-    next_part = next_img[:, cx - decision_width:cx + decision_width]
-    result = match_template(img, next_part, 0.8)
-    # 找出置信度最高的结果
-    r = result.max
-    h, w, _ = img.shape
-    overlap_w = w - r.x + cx - decision_width
-    extra_part = next_img[:, overlap_w+1:]
-    # 水平拼接两张图像
-    return cv2.hconcat([img, extra_part])
+    img_len = img.shape[axis]
+    next_len = next_img.shape[axis]
+    # 只需要和图的末尾比较
+    prev_start = max(0, img_len - next_len)
+    prev_part = img[prev_start:] if axis == 0 else img[:, prev_start:]
+    offset = scroll_stitch_utils.estimate_scroll_offset(prev_part, next_img, axis=axis, min_overlap=min_overlap)
+    if offset is None:
+        raise Exception('拼接图片失败')
+
+    overlap = prev_part.shape[axis] - offset.shift_px
+    if axis == 0:
+        return cv2.vconcat([img, next_img[overlap:]])
+    else:
+        return cv2.hconcat([img, next_img[:, overlap:]])
 
 
 def concat_horizontally_2(img: MatLike, next_img: MatLike, decision_width: int = 200) -> MatLike:
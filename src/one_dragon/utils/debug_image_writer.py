@@ -0,0 +1,364 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+import cv2
+from cv2.typing import MatLike
+
+from one_dragon.utils.log_utils import log
+
+AUTO_FILE_PREFIX = 'auto_'  # save_debug_image 自动生成的调试图片的文件名前缀
+# 自动生成的文件名 auto_{prefix}_{毫秒时间戳} 只有这些文件会被容量限制自动删除
+# 快捷键截图等手动保存的图片 _{毫秒时间戳} 会用作测试图片 不能删除
+_AUTO_FILE_NAME_PATTERN = re.compile(r'^' + AUTO_FILE_PREFIX + r'.*_\d{13}\.(png|jpg|jpeg|webp)$')
+_SUBMIT_BLOCK_TIMEOUT = 10  # 队列满时 不可丢弃的图片最多等待的秒数
+
+
+@dataclass
+class DebugImageFormat:
+    """调试图片的编码方式"""
+
+    ext: str = 'png'
+    """文件格式 png / jpg / webp"""
+
+    png_compression: int = 1
+    """png 压缩等级 0~9 越大越慢 文件越小"""
+
+    jpeg_quality: int = 95
+    """jpg 质量 0~100"""
+
+    webp_quality: int = 90
+    """webp 质量 0~100 超过100为无损"""
+
+    max_width: int | None = None
+    """宽度超过该值时等比例缩小 None 时不缩放"""
+
+    @property
+    def suffix(self) -> str:
+        return '.' + self.ext
+
+    def get_encode_params(self, ext: str) -> list[int]:
+        ext = ext.lower()
+        if ext == 'png':
+            return [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression]
+        elif ext in ('jpg', 'jpeg'):
+            return [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        elif ext == 'webp':
+            return [cv2.IMWRITE_WEBP_QUALITY, self.webp_quality]
+        return []
+
+
+class _WriteTask:
+
+    def __init__(self, image: MatLike, file_path: str, image_format: DebugImageFormat, droppable: bool):
+        self.image: MatLike = image
+        self.file_path: str = file_path
+        self.image_format: DebugImageFormat = image_format
+        self.droppable: bool = droppable
+        self.future: Future[str] = Future()
+
+
+class DebugImageWriter:
+
+    def __init__(
+        self,
+        image_dir: str,
+        max_queue_size: int = 32,
+        max_total_bytes: int | None = 2 * 1024 * 1024 * 1024,
+        image_format: DebugImageFormat | None = None,
+    ):
+        """
+        在后台线程中编码和保存调试图片 避免在识别循环中同步编码 png
+
+        - 队列有上限 满时丢弃最旧的可丢弃图片 没有可丢弃的图片时 丢弃新提交的可丢弃图片
+        - 队列中全是不可丢弃的图片时 提交不可丢弃图片的调用方等待队列有空位 最多等待 _SUBMIT_BLOCK_TIMEOUT 秒
+        - 图片目录超过容量时 从最旧的开始删除自动命名的图片 快捷键截图和手动放入的图片不会被删除
+        - 停止后再次提交时 重新启动后台线程
+
+        Args:
+            image_dir: 图片目录 用于容量限制
+            max_queue_size: 队列中最多等待的图片数量
+            max_total_bytes: 图片目录中自动命名的图片最多占用的空间 None 时不限制
+            image_format: 默认的编码方式
+        """
+        self.image_dir: str = image_dir
+        self.max_queue_size: int = max_queue_size
+        self.max_total_bytes: int | None = max_total_bytes
+        self.image_format: DebugImageFormat = image_format if image_format is not None else DebugImageFormat()
+
+        self._queue: deque[_WriteTask] = deque()
+        self._condition = threading.Condition()
+        self._running: bool = True
+        self._writing: bool = False  # 后台线程是否正在写图片
+        self._thread: threading.Thread | None = None
+
+        # 容量限制 第一次写入时扫描目录
+        self._disk_files: deque[tuple[str, int]] | None = None  # (路径, 大小) 从旧到新
+        self._disk_total_bytes: int = 0
+
+        # 统计
+        self.submitted_cnt: int = 0  # 提交的图片数量
+        self.written_cnt: int = 0  # 保存成功的图片数量
+        self.dropped_cnt: int = 0  # 队列满时丢弃的图片数量
+        self.failed_cnt: int = 0  # 保存失败的图片数量
+        self.removed_cnt: int = 0  # 超过容量时删除的图片数量
+        self.written_bytes: int = 0  # 保存的总字节数
+        self.encode_seconds: float = 0  # 编码和写盘的总耗时
+        self.max_encode_seconds: float = 0  # 单张图片最长的编码和写盘耗时
+
+    def submit(
+        self,
+        image: MatLike,
+        file_path: str,
+        image_format: DebugImageFormat | None = None,
+        droppable: bool = True,
+        copy_image: bool = True,
+    ) -> Future[str]:
+        """
+        提交一张图片 在后台编码保存
+
+        Args:
+            image: RGB 图片
+            file_path: 保存路径 按后缀决定编码
+            image_format: 编码方式 不传入时使用默认的
+            droppable: 队列满时是否可以丢弃 调用方需要等待结果时应传入 False
+            copy_image: 是否复制图片 调用方之后可能修改图片时需要复制
+
+        Returns:
+            Future[str]: 保存完成后返回路径 保存失败、被丢弃或等待队列超时时抛出异常
+        """
+        task = _WriteTask(
+            image=image.copy() if copy_image else image,
+            file_path=file_path,
+            image_format=image_format if image_format is not None else self.image_format,
+            droppable=droppable,
+        )
+        with self._condition:
+            self._running = True  # 停止后再次提交时重新启动
+            self.submitted_cnt += 1
+            if len(self._queue) >= self.max_queue_size:
+                self._drop_oldest()
+            if len(self._queue) >= self.max_queue_size:
+                if droppable:
+                    self.dropped_cnt += 1
+                    task.future.set_exception(RuntimeError(f'调试图片队列已满 丢弃 {task.file_path}'))
+                    return task.future
+                # 队列中全是不可丢弃的图片 等待后台保存 不让队列无限增长
+                self._ensure_thread()
+                if not self._condition.wait_for(lambda: len(self._queue) < self.max_queue_size,
+                                                timeout=_SUBMIT_BLOCK_TIMEOUT):
+                    self.failed_cnt += 1
+                    task.future.set_exception(RuntimeError(f'调试图片队列已满 等待超时 {task.file_path}'))
+                    return task.future
+            self._queue.append(task)
+            self._ensure_thread()
+            self._condition.notify_all()
+        return task.future
+
+    def _drop_oldest(self) -> None:
+        for task in self._queue:
+            if task.droppable:
+                self._queue.remove(task)
+                self.dropped_cnt += 1
+                task.future.set_exception(RuntimeError(f'调试图片队列已满 丢弃 {task.file_path}'))
+                return
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='od_debug_image_writer', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._running and len(self._queue) == 0:
+                    self._condition.wait()
+                if len(self._queue) == 0:
+                    return
+                task = self._queue.popleft()
+                self._writing = True
+                self._condition.notify_all()  # 队列有空位了 唤醒等待提交的调用方
+
+            try:
+                self._write(task)
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+    def _write(self, task: _WriteTask) -> None:
+        t1 = time.perf_counter()
+        try:
+            size = self.encode_to_file(task.image, task.file_path, task.image_format)
+        except Exception as e:
+            self.failed_cnt += 1
+            log.error(f'调试图片保存失败 {task.file_path}', exc_info=True)
+            task.future.set_exception(e)
+            return
+
+        cost = time.perf_counter() - t1
+        self.written_cnt += 1
+        self.written_bytes += size
+        self.encode_seconds += cost
+        self.max_encode_seconds = max(self.max_encode_seconds, cost)
+        self._apply_quota(task.file_path, size)
+        task.future.set_result(task.file_path)
+
+    @staticmethod
+    def encode_to_file(image: MatLike, file_path: str, image_format: DebugImageFormat) -> int:
+        """
+        按编码方式保存图片 兼容非 ASCII 路径
+
+        Args:
+            image: RGB 图片
+            file_path: 保存路径
+            image_format: 编码方式
+
+        Returns:
+            int: 文件大小
+        """
+        if image_format.max_width is not None and image.shape[1] > image_format.max_width:
+            scale = image_format.max_width / image.shape[1]
+            image = cv2.resize(image, (image_format.max_width, int(image.shape[0] * scale)),
+                               interpolation=cv2.INTER_AREA)
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+
+        ext = os.path.splitext(file_path)[1][1:]
+        ok, buf = cv2.imencode('.' + ext, image, image_format.get_encode_params(ext))
+        if not ok:
+            raise RuntimeError(f'图片编码失败 {file_path}')
+        buf.tofile(file_path)
+        return buf.size
+
+    def _apply_quota(self, file_path: str, size: int) -> None:
+        """
+        记录新保存的图片 超过容量时从最旧的开始删除
+        """
+        if self.max_total_bytes is None:
+            return
+        if os.path.dirname(os.path.abspath(file_path)) != os.path.abspath(self.image_dir):
+            return
+        if not _AUTO_FILE_NAME_PATTERN.match(os.path.basename(file_path)):
+            return
+
+        if self._disk_files is None:
+            self._disk_files = self._scan_disk_files()
+            self._disk_total_bytes = sum(i[1] for i in self._disk_files)
+        else:
+            self._disk_files.append((file_path, size))
+            self._disk_total_bytes += size
+
+        while self._disk_total_bytes > self.max_total_bytes and len(self._disk_files) > 1:
+            old_path, old_size = self._disk_files.popleft()
+            self._disk_total_bytes -= old_size
+            try:
+                os.remove(old_path)
+                self.removed_cnt += 1
+            except OSError:
+                pass
+
+    def _scan_disk_files(self) -> deque[tuple[str, int]]:
+        file_list: list[tuple[float, str, int]] = []
+        with os.scandir(self.image_dir) as it:
+            for entry in it:
+                if not entry.is_file() or not _AUTO_FILE_NAME_PATTERN.match(entry.name):
+                    continue
+                stat = entry.stat()
+                file_list.append((stat.st_mtime, entry.path, stat.st_size))
+        file_list.sort()
+        return deque((i[1], i[2]) for i in file_list)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        等待队列中的图片全部保存
+
+        Args:
+            timeout: 最长等待秒数 None 时一直等待
+
+        Returns:
+            bool: 是否全部保存完
+        """
+        end_time = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while len(self._queue) > 0 or self._writing:
+                if self._thread is None or not self._thread.is_alive():
+                    return False
+                remain = None if end_time is None else end_time - time.time()
+                if remain is not None and remain <= 0:
+                    return False
+                self._condition.wait(remain)
+        return True
+
+    def shutdown(self, timeout: float | None = 5) -> None:
+        """
+        保存队列中剩余的图片后停止后台线程 之后再提交图片会重新启动
+
+        Args:
+            timeout: 最长等待秒数
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def queue_size(self) -> int:
+        """队列中等待保存的图片数量"""
+        return len(self._queue)
+
+    @property
+    def stats_display(self) -> str:
+        avg = self.encode_seconds / self.written_cnt * 1000 if self.written_cnt > 0 else 0
+        return (f'调试图片 提交 {self.submitted_cnt} 保存 {self.written_cnt} 丢弃 {self.dropped_cnt} '
+                f'失败 {self.failed_cnt} 删除 {self.removed_cnt} 队列 {self.queue_size} '
+                f'编码 平均 {avg:.1f}ms 最长 {self.max_encode_seconds * 1000:.1f}ms '
+                f'共 {self.written_bytes / 1024 / 1024:.1f}MB')
+
+
+def __debug_benchmark():
+    """
+    对比 调用方线程中同步保存 和 提交到后台保存 调用方每张图片的耗时
+    以及 不同编码方式下 后台的编码耗时和文件大小
+    """
+    import tempfile
+
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, (1080, 1920, 3), dtype=np.uint8)
+    image[:, :960] = 30  # 一半是纯色 接近游戏画面的压缩率
+    image_cnt = 30
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        t1 = time.perf_counter()
+        for i in range(image_cnt):
+            cv2.imwrite(os.path.join(temp_dir, f'sync_{i}.png'), cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
+        print(f'同步保存: 调用方 {(time.perf_counter() - t1) / image_cnt * 1000:.1f}ms/张')
+
+        for image_format in [
+            DebugImageFormat(ext='png', png_compression=1),
+            DebugImageFormat(ext='png', png_compression=6),
+            DebugImageFormat(ext='jpg', jpeg_quality=90),
+            DebugImageFormat(ext='webp', webp_quality=80),
+            DebugImageFormat(ext='jpg', jpeg_quality=90, max_width=960),
+        ]:
+            writer = DebugImageWriter(temp_dir, max_queue_size=8, image_format=image_format)
+            t1 = time.perf_counter()
+            for i in range(image_cnt):
+                writer.submit(image, os.path.join(temp_dir, f'async_{i}_{round(time.time() * 1000)}{image_format.suffix}'))
+                time.sleep(0.01)  # 模拟识别循环
+            caller_cost = (time.perf_counter() - t1 - 0.01 * image_cnt) / image_cnt
+            writer.flush()
+            writer.shutdown()
+            print(f'{image_format}: 调用方 {caller_cost * 1000:.2f}ms/张 {writer.stats_display}')
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
@@ -4,13 +4,13 @@ import time
 from functools import lru_cache
 from typing import Optional
 
-import cv2
 import win32clipboard
 import win32con
 from cv2.typing import MatLike
 from PIL import Image
 
 from one_dragon.utils import cv2_utils, os_utils
+from one_dragon.utils.debug_image_writer import AUTO_FILE_PREFIX, DebugImageWriter
 from one_dragon.utils.log_utils import log
 
 
@@ -24,6 +24,14 @@ def get_debug_image_dir_path() -> str:
     return os_utils.get_path_under_work_dir('.debug', 'images')
 
 
+@lru_cache
+def get_debug_image_writer() -> DebugImageWriter:
+    """
+    保存调试图片的后台写入器 可修改其 image_format 调整编码方式
+    """
+    return DebugImageWriter(get_debug_image_dir_path())
+
+
 def get_debug_image_path(filename, suffix: str = '.png') -> str:
     return os.path.join(get_debug_image_dir_path(), filename + suffix)
 
@@ -53,17 +61,36 @@ def copy_image_to_clipboard(image) -> bool:
         return False
 
 
-def save_debug_image(image, file_name: Optional[str] = None, prefix: str = '', copy_screenshot: bool = False) -> str:
-    """保存调试图片到文件，可选择是否同时复制到剪贴板"""
+def save_debug_image(image, file_name: Optional[str] = None, prefix: str = '', copy_screenshot: bool = False,
+                     sync: bool = False, keep: bool = False) -> str:
+    """
+    保存调试图片到文件，可选择是否同时复制到剪贴板
+
+    默认在后台线程编码保存 返回时文件可能还没有写入 需要立刻读取文件时传入 sync=True
+    自动生成的文件名带有 auto_ 前缀 队列满时可能被丢弃 超过容量时会被删除
+    快捷键截图等需要保留的图片传入 keep=True 不会被丢弃 文件名为 {prefix}_{毫秒时间戳} 不会被删除
+    """
     if file_name is None:
         file_name = '%s_%d' % (prefix, round(time.time() * 1000))
-    path = get_debug_image_path(file_name)
+        if not keep:
+            file_name = AUTO_FILE_PREFIX + file_name
+    writer = get_debug_image_writer()
+    path = get_debug_image_path(file_name, writer.image_format.suffix)
     log.debug('临时图片保存 %s', path)
 
-    bgr_image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-    cv2.imwrite(path, bgr_image)
+    future = writer.submit(image, path, droppable=not (sync or keep))
+    if sync:
+        future.result()
 
     if copy_screenshot:
         copy_image_to_clipboard(image)
 
-    return file_name
\ No newline at end of file
+    return file_name
+
+
+def shutdown_debug_image_writer(timeout: float = 5) -> None:
+    """
+    保存剩余的调试图片后停止后台写入
+    """
+    if get_debug_image_writer.cache_info().currsize > 0:
+        get_debug_image_writer().shutdown(timeout)
@@ -0,0 +1,461 @@
+import atexit
+import bisect
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+
+BLOCK_RECORDS = 64  # 索引和读取的最小单位 每块的日志数量
+SEGMENT_RECORDS = 16384  # 每个文件的日志数量 淘汰旧日志时按文件整个删除 需要是 BLOCK_RECORDS 的整数倍
+DEFAULT_MAX_RECORDS = 1_000_000  # 默认最多保留的日志数量 约一整天的运行日志
+
+
+class LogStore:
+
+    def __init__(
+            self,
+            dir_path: str | None = None,
+            max_records: int = DEFAULT_MAX_RECORDS,
+            cache_blocks: int = 256,
+    ):
+        """
+        有上限的日志存储 日志文本写在磁盘上 内存中只保留每条日志的等级、模块、时间和文件位置
+
+        - 日志按 SEGMENT_RECORDS 条一个文件 超过 max_records 后整个删除最旧的文件
+        - 每 BLOCK_RECORDS 条日志为一块 按块建立单字和双字的倒排索引 搜索时只读取可能包含关键字的块
+        - 读取文本时整块读取并缓存 界面滚动时相邻的行不需要重复读文件
+        - 日志序号从0开始递增 清空前不会重复使用
+
+        Args:
+            dir_path: 保存日志文件的目录 None 时使用系统临时目录 关闭时删除
+            max_records: 最多保留的日志数量 实际可能多出不到一个文件的数量
+            cache_blocks: 最多缓存的块数量
+        """
+        self._own_dir: bool = dir_path is None
+        self.dir_path: str = tempfile.mkdtemp(prefix='one_dragon_log_') if dir_path is None else dir_path
+        os.makedirs(self.dir_path, exist_ok=True)
+        self.max_records: int = max(max_records, SEGMENT_RECORDS)
+        self.cache_blocks: int = cache_blocks
+
+        self._lock = threading.RLock()
+        self._first_seq: int = 0  # 最旧一条日志的序号 总是 SEGMENT_RECORDS 的整数倍
+        self._end_seq: int = 0  # 下一条日志的序号
+
+        # 按 序号 - _first_seq 保存
+        self._times: array = array('d')
+        self._levels: array = array('b')
+        self._modules: array = array('H')
+        self._offsets: array = array('q')  # 在所属文件中的位置
+
+        self._module_names: list[str] = []
+        self._module_ids: dict[str, int] = {}
+
+        self._index: dict[str, array] = {}  # {单字或双字: 包含它的块序号 递增}
+        self._pending_texts: list[str] = []  # 最后一块还没有建立索引的小写文本
+
+        self._writer = None
+        self._writer_segment: int = -1
+        self._write_pos: int = 0
+        self._dirty: bool = False  # 有写入但还没有刷到磁盘
+
+        self._block_cache: OrderedDict[int, list[str]] = OrderedDict()
+
+        _active_stores.add(self)
+
+    @property
+    def first_seq(self) -> int:
+        """最旧一条日志的序号"""
+        return self._first_seq
+
+    @property
+    def end_seq(self) -> int:
+        """下一条日志的序号"""
+        return self._end_seq
+
+    def __len__(self) -> int:
+        return self._end_seq - self._first_seq
+
+    @property
+    def module_names(self) -> list[str]:
+        """出现过的模块名称 按第一次出现的顺序"""
+        with self._lock:
+            return list(self._module_names)
+
+    def append(self, text: str, levelno: int, module: str, create_time: float | None = None) -> int:
+        """
+        添加一条日志
+
+        Args:
+            text: 格式化后的日志文本
+            levelno: 日志等级
+            module: 模块名称 用于筛选
+            create_time: 日志时间 None 时使用当前时间
+
+        Returns:
+            int: 日志序号
+        """
+        data = (json.dumps(text, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            seq = self._end_seq
+            segment = seq // SEGMENT_RECORDS
+            if segment != self._writer_segment:
+                self._open_writer(segment)
+
+            module_id = self._module_ids.get(module)
+            if module_id is None:
+                module_id = len(self._module_names)
+                self._module_names.append(module)
+                self._module_ids[module] = module_id
+
+            self._times.append(time.time() if create_time is None else create_time)
+            self._levels.append(min(levelno, 127))
+            self._modules.append(module_id)
+            self._offsets.append(self._write_pos)
+            self._writer.write(data)
+            self._write_pos += len(data)
+            self._dirty = True
+
+            self._pending_texts.append(text.casefold())
+            self._end_seq += 1
+            if self._end_seq % BLOCK_RECORDS == 0:
+                self._index_block(seq // BLOCK_RECORDS, self._pending_texts)
+                self._pending_texts = []
+            if self._end_seq % SEGMENT_RECORDS == 0:
+                self._close_writer()
+                self._drop_old_segments()
+            return seq
+
+    def get_text(self, seq: int) -> str | None:
+        """
+        获取一条日志的文本
+
+        Args:
+            seq: 日志序号
+
+        Returns:
+            str | None: 日志文本 已被淘汰或不存在时返回 None
+        """
+        with self._lock:
+            if seq < self._first_seq or seq >= self._end_seq:
+                return None
+            block = seq // BLOCK_RECORDS
+            return self._read_block(block)[seq - block * BLOCK_RECORDS]
+
+    def get_record(self, seq: int) -> tuple[float, int, str, str] | None:
+        """
+        获取一条日志
+
+        Args:
+            seq: 日志序号
+
+        Returns:
+            tuple[float, int, str, str] | None: 时间 等级 模块 文本 已被淘汰或不存在时返回 None
+        """
+        with self._lock:
+            if seq < self._first_seq or seq >= self._end_seq:
+                return None
+            idx = seq - self._first_seq
+            return (self._times[idx], self._levels[idx], self._module_names[self._modules[idx]],
+                    self.get_text(seq))
+
+    def query(
+            self,
+            min_level: int = 0,
+            modules: list[str] | None = None,
+            keyword: str | None = None,
+            start_seq: int | None = None,
+    ) -> np.ndarray:
+        """
+        筛选日志
+
+        Args:
+            min_level: 最低日志等级
+            modules: 只保留这些模块的日志 None 时不筛选
+            keyword: 日志文本包含的关键字 不区分大小写 None 或空字符串时不筛选
+            start_seq: 只筛选这个序号及之后的日志
+
+        Returns:
+            np.ndarray: 符合条件的日志序号 递增
+        """
+        with self._lock:
+            start = self._first_seq if start_seq is None else max(start_seq, self._first_seq)
+            end = self._end_seq
+            if start >= end:
+                return np.empty(0, dtype=np.int64)
+
+            mask = self._meta_mask(start, end, min_level, modules)
+            if not keyword:
+                if mask is None:
+                    return np.arange(start, end, dtype=np.int64)
+                return np.flatnonzero(mask).astype(np.int64) + start
+
+            keyword = keyword.casefold()
+            # 在 json 转义后的文本中查找 不需要逐行解析
+            escaped_keyword = json.dumps(keyword, ensure_ascii=False)[1:-1]
+            blocks = self._candidate_blocks(keyword, start // BLOCK_RECORDS)
+            if mask is not None:
+                # 没有符合等级和模块的日志的块 不需要读取
+                blocks = [i for i in blocks
+                          if mask[max(start, i * BLOCK_RECORDS) - start:(i + 1) * BLOCK_RECORDS - start].any()]
+            result: list[int] = []
+            for block, lines in self._iter_block_lines(blocks):
+                block_start = block * BLOCK_RECORDS
+                lo = max(start, block_start)
+                hi = min(end, block_start + BLOCK_RECORDS)
+                for seq in range(lo, hi):
+                    if mask is not None and not mask[seq - start]:
+                        continue
+                    if escaped_keyword in lines[seq - block_start]:
+                        result.append(seq)
+            return np.array(result, dtype=np.int64)
+
+    def clear(self) -> None:
+        """
+        删除全部日志
+        """
+        with self._lock:
+            self._close_writer()
+            for name in os.listdir(self.dir_path):
+                if name.endswith('.log'):
+                    os.remove(os.path.join(self.dir_path, name))
+            self._first_seq = 0
+            self._end_seq = 0
+            for arr in (self._times, self._levels, self._modules, self._offsets):
+                del arr[:]
+            self._module_names.clear()
+            self._module_ids.clear()
+            self._index.clear()
+            self._pending_texts = []
+            self._block_cache.clear()
+
+    def close(self) -> None:
+        """
+        删除全部日志 使用临时目录时同时删除目录
+        """
+        with self._lock:
+            self.clear()
+            if self._own_dir:
+                shutil.rmtree(self.dir_path, ignore_errors=True)
+            _active_stores.discard(self)
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.dir_path, f'{segment}.log')
+
+    def _open_writer(self, segment: int) -> None:
+        self._close_writer()
+        self._writer = open(self._segment_path(segment), 'wb')  # noqa: SIM115 写满一个文件前保持打开
+        self._writer_segment = segment
+        self._write_pos = 0
+
+    def _close_writer(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._writer_segment = -1
+        self._dirty = False
+
+    def _index_block(self, block: int, texts: list[str]) -> None:
+        """
+        为一整块建立索引 块内重复出现的字只记录一次
+        """
+        joined = '\n'.join(texts)
+        tokens = set(joined)
+        tokens.update(map(str.__add__, joined, joined[1:]))
+        index = self._index
+        for token in tokens:
+            postings = index.get(token)
+            if postings is None:
+                index[token] = array('i', (block,))
+            else:
+                postings.append(block)
+
+    def _candidate_blocks(self, keyword: str, first_block: int) -> list[int]:
+        """
+        可能包含关键字的块 最后一块没有建立索引 总是需要检查
+        """
+        tokens = {keyword} if len(keyword) == 1 else set(map(str.__add__, keyword, keyword[1:]))
+        posting_list = [self._index.get(token) for token in tokens]
+        blocks: np.ndarray | None = None
+        if all(postings is not None for postings in posting_list):
+            # 从最短的开始求交集
+            for postings in sorted(posting_list, key=len):
+                arr = np.array(postings, dtype=np.int32)
+                blocks = arr if blocks is None else np.intersect1d(blocks, arr, assume_unique=True)
+                if len(blocks) == 0:
+                    break
+        result = [] if blocks is None else blocks[blocks >= first_block].tolist()
+
+        if self._end_seq % BLOCK_RECORDS != 0:
+            tail_block = self._end_seq // BLOCK_RECORDS
+            if tail_block >= first_block:
+                result.append(tail_block)
+        return result
+
+    def _meta_mask(self, start: int, end: int, min_level: int, modules: list[str] | None) -> np.ndarray | None:
+        """
+        按等级和模块筛选 返回 [start, end) 的布尔数组 不需要筛选时返回 None
+        """
+        lo = start - self._first_seq
+        hi = end - self._first_seq
+        mask = None
+        if min_level > 0:
+            levels = np.frombuffer(self._levels, dtype=np.int8)
+            mask = levels[lo:hi] >= min_level
+            del levels  # 释放缓冲区 否则之后不能再追加
+        if modules is not None:
+            module_ids = [self._module_ids[i] for i in modules if i in self._module_ids]
+            module_arr = np.frombuffer(self._modules, dtype=np.uint16)
+            module_mask = np.isin(module_arr[lo:hi], module_ids)
+            del module_arr
+            mask = module_mask if mask is None else mask & module_mask
+        return mask
+
+    def _read_block(self, block: int) -> list[str]:
+        """
+        读取一整块的文本 完整的块会被缓存
+        """
+        texts = self._block_cache.get(block)
+        if texts is not None:
+            self._block_cache.move_to_end(block)
+            return texts
+
+        block_start = block * BLOCK_RECORDS
+        block_end = min(block_start + BLOCK_RECORDS, self._end_seq)
+        with open(self._segment_path(block_start // SEGMENT_RECORDS), 'rb') as f:
+            data = self._read_block_data(f, block)
+
+        # 文本经过 json 转义 不包含换行
+        texts = [json.loads(line) for line in data.split(b'\n')[:block_end - block_start]]
+        if block_end - block_start == BLOCK_RECORDS:
+            self._block_cache[block] = texts
+            while len(self._block_cache) > self.cache_blocks:
+                self._block_cache.popitem(last=False)
+        return texts
+
+    def _read_block_data(self, f, block: int) -> bytes:
+        """
+        从块所在的文件中读取这一块的原始内容
+        """
+        if self._dirty:
+            self._writer.flush()
+            self._dirty = False
+
+        block_start = block * BLOCK_RECORDS
+        block_end = min(block_start + BLOCK_RECORDS, self._end_seq)
+        offset = self._offsets[block_start - self._first_seq]
+        f.seek(offset)
+        if block_end < self._end_seq and block_end % SEGMENT_RECORDS != 0:
+            return f.read(self._offsets[block_end - self._first_seq] - offset)
+        return f.read()  # 文件中的最后一块
+
+    def _iter_block_lines(self, blocks: list[int]):
+        """
+        按顺序读取多个块 返回每块 json 转义后的小写文本 同一个文件只打开一次
+        """
+        for segment, segment_blocks in itertools.groupby(blocks, key=lambda i: i * BLOCK_RECORDS // SEGMENT_RECORDS):
+            with open(self._segment_path(segment), 'rb') as f:
+                for block in segment_blocks:
+                    data = self._read_block_data(f, block).decode('utf-8').casefold()
+                    yield block, data.split('\n')
+
+    def _drop_old_segments(self) -> None:
+        """
+        删除超出上限的最旧的文件 同时清理索引和缓存
+        """
+        dropped = False
+        while self._end_seq - self._first_seq > self.max_records:
+            os.remove(self._segment_path(self._first_seq // SEGMENT_RECORDS))
+            for arr in (self._times, self._levels, self._modules, self._offsets):
+                del arr[:SEGMENT_RECORDS]
+            self._first_seq += SEGMENT_RECORDS
+            dropped = True
+
+        if not dropped:
+            return
+
+        first_block = self._first_seq // BLOCK_RECORDS
+        for token in list(self._index.keys()):
+            postings = self._index[token]
+            if postings[0] >= first_block:
+                continue
+            del postings[:bisect.bisect_left(postings, first_block)]
+            if len(postings) == 0:
+                del self._index[token]
+        for block in [i for i in self._block_cache if i < first_block]:
+            del self._block_cache[block]
+
+
+def _close_active_stores() -> None:
+    """
+    退出时删除临时目录中的日志文件
+    """
+    for store in list(_active_stores):
+        store.close()
+
+
+_active_stores: weakref.WeakSet[LogStore] = weakref.WeakSet()
+atexit.register(_close_active_stores)
+
+
+def __debug_benchmark():
+    """
+    写入 100万 条日志 对比 筛选、搜索、读取可见行 的耗时
+    """
+    import logging
+    import random
+
+    modules = ['operation', 'zzz_context', 'yolo', 'ocr_matcher', 'world_patrol']
+    words = ['识别画面', '点击', '等待', '大世界', '战斗', '空洞', '商店', '寻路', '截图', 'screen', 'battle']
+    levels = [logging.DEBUG, logging.INFO, logging.INFO, logging.INFO, logging.WARNING]
+    random.seed(0)
+    total = 1_000_000
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = LogStore(temp_dir, max_records=total)
+        t1 = time.perf_counter()
+        for i in range(total):
+            levelno = logging.ERROR if i % 50000 == 7 else random.choice(levels)
+            text = f'[{random.choice(modules)}] {random.choice(words)} {random.choice(words)} 第 {i} 次'
+            if levelno == logging.ERROR:
+                text += f' 发生异常 code-{i}'
+            store.append(text, levelno, random.choice(modules))
+        print(f'写入 {total} 条 {(time.perf_counter() - t1) / total * 1e6:.2f}us/条 '
+              f'索引 {len(store._index)} 个字')
+
+        t1 = time.perf_counter()
+        rows = store.query(min_level=logging.WARNING)
+        print(f'等级筛选 {len(rows)} 条 {(time.perf_counter() - t1) * 1000:.1f}ms')
+
+        t1 = time.perf_counter()
+        rows = store.query(modules=['yolo'])
+        print(f'模块筛选 {len(rows)} 条 {(time.perf_counter() - t1) * 1000:.1f}ms')
+
+        for keyword in ['code-550007', '发生异常', 'SCREEN 截图']:
+            t1 = time.perf_counter()
+            rows = store.query(keyword=keyword)
+            print(f'搜索 {keyword} {len(rows)} 条 {(time.perf_counter() - t1) * 1000:.1f}ms')
+
+        # 模拟界面拖动滚动条 每次跳到随机位置 读取可见的 40 行
+        t1 = time.perf_counter()
+        for _ in range(100):
+            top = random.randrange(store.first_seq, store.end_seq - 40)
+            for seq in range(top, top + 40):
+                store.get_text(seq)
+        print(f'随机跳转读取可见行 {(time.perf_counter() - t1) * 10:.2f}ms/次')
+
+        for i in range(total // 2):
+            store.append(f'新日志 {i}', logging.INFO, 'operation')
+        print(f'超出上限后保留 {len(store)} 条 最旧序号 {store.first_seq}')
+        store.close()
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
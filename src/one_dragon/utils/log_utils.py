@@ -1,13 +1,21 @@
+import atexit
 import logging
+import queue
+import sys
+import threading
+import time
+import weakref
 from contextlib import suppress
 from dataclasses import dataclass
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from pathlib import Path
 
 from one_dragon.utils import os_utils
 
 LOGGER_NAME = 'OneDragon'
 _HANDLER_OWNER_ATTR = '_one_dragon_logger_owner'
+_QUEUE_BLOCK_TIMEOUT = 1  # 队列满时 WARNING 及以上的日志最多等待的秒数
+_FLUSH_TIMEOUT = 5  # 等待队列写完的默认秒数
 
 
 @dataclass(slots=True)
@@ -17,6 +25,8 @@ class LoggerConfig:
     default_name: str = 'log.txt'
     add_console_handler: bool = True
     propagate: bool = False
+    use_queue: bool = True  # 在后台线程中格式化和写入 调用方只负责放入队列
+    queue_size: int = 10000  # 队列上限 满时丢弃 WARNING 以下的日志
 
 
 @dataclass(slots=True)
@@ -29,6 +39,166 @@ class ProjectRuntimeLoggingContext:
     framework_log_file_path: str
 
 
+class _QueueListener(QueueListener):
+
+    def __init__(self, owner: 'BoundedQueueHandler', log_queue: queue.SimpleQueue, *handlers: logging.Handler):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self._owner: BoundedQueueHandler = owner
+
+    def handle(self, record: logging.LogRecord) -> None:
+        try:
+            super().handle(record)
+        finally:
+            self._owner.on_record_done()
+
+
+class BoundedQueueHandler(QueueHandler):
+
+    def __init__(self, max_queue_size: int, target_handlers: list[logging.Handler]):
+        """
+        把日志放入有上限的队列 由后台线程交给真正的 handler 格式化和写入文件
+        调用方只需要生成日志文本 不会因为写文件和控制台输出被阻塞
+
+        - 队列满时丢弃 WARNING 以下的日志 之后补一条丢弃数量的提示
+        - 队列满时 WARNING 及以上的日志最多等待 _QUEUE_BLOCK_TIMEOUT 秒
+        - 停止后 日志直接在调用方线程中交给真正的 handler 保证退出过程中的日志不丢失
+
+        Args:
+            max_queue_size: 队列中最多等待的日志数量
+            target_handlers: 真正写入日志的 handler
+        """
+        super().__init__(queue.SimpleQueue())
+        self.max_queue_size: int = max_queue_size
+        self.target_handlers: list[logging.Handler] = target_handlers
+        self.listener: QueueListener = _QueueListener(self, self.queue, *target_handlers)
+
+        # SimpleQueue 没有上限 自己计数 put_cnt - done_cnt 为队列中未写完的数量
+        self._count_condition = threading.Condition(threading.Lock())
+        self._put_cnt: int = 0
+        self._done_cnt: int = 0
+
+        self.dropped_cnt: int = 0  # 累计丢弃的日志数量
+        self._unreported_dropped_cnt: int = 0  # 还没有提示的丢弃数量
+        self._stop_lock = threading.Lock()
+        self._stopped: bool = False
+
+        self.listener.start()
+        _active_queue_handlers.add(self)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._stopped:
+            self._handle_directly(record)
+            return
+        super().emit(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        在调用方线程中生成日志文本 避免参数在放入队列后被修改
+        与默认实现不同 不复制 record 也不做完整的格式化 格式化留给后台线程
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            # 异常栈只能在调用方线程中生成 生成后 Formatter 会直接使用 exc_text
+            record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self._unreported_dropped_cnt > 0:
+            self._report_dropped()
+
+        with self._count_condition:
+            if self._put_cnt - self._done_cnt >= self.max_queue_size:
+                if record.levelno < logging.WARNING or not self._count_condition.wait_for(
+                        lambda: self._put_cnt - self._done_cnt < self.max_queue_size,
+                        timeout=_QUEUE_BLOCK_TIMEOUT):
+                    self.dropped_cnt += 1
+                    self._unreported_dropped_cnt += 1
+                    return
+            self._put_cnt += 1
+        self.queue.put_nowait(record)
+
+    def on_record_done(self) -> None:
+        """
+        后台线程写完一条日志
+        """
+        with self._count_condition:
+            self._done_cnt += 1
+            self._count_condition.notify_all()
+
+    def _report_dropped(self) -> None:
+        with self._count_condition:
+            dropped_cnt = self._unreported_dropped_cnt
+            if dropped_cnt == 0 or self._put_cnt - self._done_cnt >= self.max_queue_size:
+                return
+            self._unreported_dropped_cnt = 0
+            self._put_cnt += 1
+        self.queue.put_nowait(logging.makeLogRecord({
+            'name': getattr(self, _HANDLER_OWNER_ATTR, LOGGER_NAME),
+            'levelno': logging.WARNING,
+            'levelname': logging.getLevelName(logging.WARNING),
+            'filename': Path(__file__).name,
+            'msg': f'日志队列已满 丢弃了 {dropped_cnt} 条日志',
+        }))
+
+    def _handle_directly(self, record: logging.LogRecord) -> None:
+        for handler in self.target_handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    @property
+    def queue_size(self) -> int:
+        """队列中未写完的日志数量"""
+        return self._put_cnt - self._done_cnt
+
+    def wait_flushed(self, timeout: float | None = _FLUSH_TIMEOUT) -> bool:
+        """
+        等待队列中的日志全部写入
+
+        Args:
+            timeout: 最长等待秒数 None 时一直等待
+
+        Returns:
+            bool: 是否全部写入
+        """
+        with self._count_condition:
+            done = self._count_condition.wait_for(lambda: self._put_cnt == self._done_cnt, timeout=timeout)
+        for handler in self.target_handlers:
+            with suppress(Exception):
+                handler.flush()
+        return done
+
+    def flush(self) -> None:
+        if not self._stopped:
+            self.wait_flushed()
+
+    def stop(self) -> None:
+        """
+        写完队列中的日志后停止后台线程 之后的日志在调用方线程中直接写入
+        """
+        with self._stop_lock:
+            if self._stopped:
+                return
+            with suppress(Exception):
+                self.listener.stop()
+            self._stopped = True
+            _active_queue_handlers.discard(self)
+        for handler in self.target_handlers:
+            with suppress(Exception):
+                handler.flush()
+
+    def close(self) -> None:
+        self.stop()
+        for handler in self.target_handlers:
+            with suppress(Exception):
+                handler.close()
+        super().close()
+
+
+_EXC_FORMATTER = logging.Formatter()
+_active_queue_handlers: weakref.WeakSet[BoundedQueueHandler] = weakref.WeakSet()
+
+
 def get_log_formatter() -> logging.Formatter:
     return logging.Formatter(
         '[%(asctime)s.%(msecs)03d] [%(filename)s %(lineno)d] [%(levelname)s]: %(message)s',
@@ -45,9 +215,14 @@ def configure_logger(logger: logging.Logger, config: LoggerConfig) -> logging.Lo
     _close_managed_handlers(logger)
     logger.setLevel(config.level)
     logger.propagate = config.propagate
-    logger.addHandler(_build_file_handler(logger, config))
+    handlers = [_build_file_handler(logger, config)]
     if config.add_console_handler:
-        logger.addHandler(_prepare_handler(logging.StreamHandler(), logger, config))
+        handlers.append(_prepare_handler(logging.StreamHandler(), logger, config))
+    if config.use_queue:
+        logger.addHandler(_build_queue_handler(handlers, logger, config))
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
     return logger
 
 
@@ -165,6 +340,9 @@ def set_log_level(level: int, logger: logging.Logger | None = None) -> None:
         if not _handler_belongs_to_logger(handler, target):
             continue
         handler.setLevel(level)
+        if isinstance(handler, BoundedQueueHandler):
+            for target_handler in handler.target_handlers:
+                target_handler.setLevel(level)
 
 
 def mask_text(text: str) -> str:
@@ -181,6 +359,118 @@ def mask_text(text: str) -> str:
         return text[:2] + '*' * (len(text) - 4) + text[-2:]
 
 
+def flush_logs(timeout: float | None = _FLUSH_TIMEOUT) -> bool:
+    """
+    等待所有队列中的日志写入文件 用于退出和崩溃时
+
+    Args:
+        timeout: 每个 logger 最长等待秒数
+
+    Returns:
+        bool: 是否全部写入
+    """
+    result = True
+    for handler in list(_active_queue_handlers):
+        result = handler.wait_flushed(timeout) and result
+    return result
+
+
+_throttle_lock = threading.Lock()
+_throttle_states: dict[object, list] = {}  # {位置: [上次输出的时间或计数, 省略的条数]}
+
+
+def log_every(
+    interval: float,
+    level: int,
+    msg: str,
+    *args,
+    key: object = None,
+    logger: logging.Logger | None = None,
+) -> bool:
+    """
+    限频日志 同一个位置在 interval 秒内只输出一次 用于识别循环等每帧都会执行的位置
+    输出时附带期间省略的条数
+
+    Args:
+        interval: 最短间隔秒数
+        level: 日志等级
+        msg: 日志内容 使用 % 格式化 低于日志等级时不会格式化
+        args: 格式化参数
+        key: 区分不同位置的键 默认使用调用的文件和行号
+        logger: 默认使用框架 logger
+
+    Returns:
+        bool: 本次是否输出
+    """
+    target = logger or log
+    if not target.isEnabledFor(level):
+        return False
+    if key is None:
+        frame = sys._getframe(1)
+        key = (frame.f_code.co_filename, frame.f_lineno)
+
+    now = time.monotonic()
+    with _throttle_lock:
+        state = _throttle_states.get(key)
+        if state is None:
+            state = _throttle_states[key] = [now - interval, 0]
+        if now - state[0] < interval:
+            state[1] += 1
+            return False
+        suppressed_cnt = state[1]
+        state[0] = now
+        state[1] = 0
+
+    if suppressed_cnt > 0:
+        msg = f'{msg} (省略 {suppressed_cnt} 条)'
+    target.log(level, msg, *args, stacklevel=2)
+    return True
+
+
+def log_every_n(
+    n: int,
+    level: int,
+    msg: str,
+    *args,
+    key: object = None,
+    logger: logging.Logger | None = None,
+) -> bool:
+    """
+    采样日志 同一个位置每 n 次调用只输出第 1 次
+
+    Args:
+        n: 采样间隔次数
+        level: 日志等级
+        msg: 日志内容 使用 % 格式化 低于日志等级时不会格式化
+        args: 格式化参数
+        key: 区分不同位置的键 默认使用调用的文件和行号
+        logger: 默认使用框架 logger
+
+    Returns:
+        bool: 本次是否输出
+    """
+    target = logger or log
+    if not target.isEnabledFor(level):
+        return False
+    if key is None:
+        frame = sys._getframe(1)
+        key = (frame.f_code.co_filename, frame.f_lineno)
+
+    with _throttle_lock:
+        state = _throttle_states.get(key)
+        if state is None:
+            state = _throttle_states[key] = [0, 0]
+        call_idx = state[0]
+        state[0] = call_idx + 1
+        if call_idx % n != 0:
+            return False
+
+    if call_idx > 0:
+        msg = f'{msg} (第 {call_idx + 1} 次)'
+    target.log(level, msg, *args, stacklevel=2)
+    return True
+
+
 def _close_managed_handlers(logger: logging.Logger) -> None:
     for handler in list(logger.handlers):
         if not _handler_belongs_to_logger(handler, logger):
@@ -206,6 +496,17 @@ def _build_file_handler(logger: logging.Logger, config: LoggerConfig) -> logging
     return _prepare_handler(handler, logger, config)
 
 
+def _build_queue_handler(
+    handlers: list[logging.Handler],
+    logger: logging.Logger,
+    config: LoggerConfig,
+) -> logging.Handler:
+    handler = BoundedQueueHandler(config.queue_size, handlers)
+    setattr(handler, _HANDLER_OWNER_ATTR, logger.name)
+    handler.setLevel(config.level)
+    return handler
+
+
 def _prepare_handler(
     handler: logging.Handler,
     logger: logging.Logger,
@@ -217,4 +518,102 @@ def _prepare_handler(
     return handler
 
 
+def _stop_queue_handlers() -> None:
+    """
+    退出时写完所有队列中的日志
+    在 logging 模块自己的退出处理之前执行 之后的日志直接写入
+    """
+    for handler in list(_active_queue_handlers):
+        handler.stop()
+
+
+def _install_crash_hooks() -> None:
+    """
+    未捕获的异常导致退出时 先写完队列中的日志 再交给原来的处理
+    """
+    previous_excepthook = sys.excepthook
+    previous_threading_excepthook = threading.excepthook
+
+    def _excepthook(exc_type, exc_value, exc_traceback) -> None:
+        flush_logs()
+        previous_excepthook(exc_type, exc_value, exc_traceback)
+
+    def _threading_excepthook(args) -> None:
+        flush_logs()
+        previous_threading_excepthook(args)
+
+    sys.excepthook = _excepthook
+    threading.excepthook = _threading_excepthook
+
+
+atexit.register(_stop_queue_handlers)
+_install_crash_hooks()
 log = get_logger()
+
+
+def __debug_benchmark():
+    """
+    对比 DEBUG 等级下 同步写入 和 放入队列 调用方每条日志的耗时
+    模拟识别循环 每帧输出若干条日志后等待下一帧
+    以及 限频日志 和 低于日志等级 时的耗时
+    """
+    import tempfile
+
+    frame_cnt = 500
+    log_per_frame = 20
+    call_cnt = frame_cnt * log_per_frame
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for add_console_handler in [False, True]:
+            for use_queue in [False, True]:
+                logger = configure_logger(
+                    logging.getLogger(f'OneDragonBenchmark_{add_console_handler}_{use_queue}'),
+                    LoggerConfig(
+                        level=logging.DEBUG,
+                        log_file_path=str(Path(temp_dir) / f'log_{add_console_handler}_{use_queue}.txt'),
+                        add_console_handler=add_console_handler,
+                        use_queue=use_queue,
+                    ),
+                )
+                with open(Path(temp_dir) / f'console_{use_queue}.txt', 'w', encoding='utf-8') as console_file:
+                    # 控制台输出到文件 避免刷屏
+                    for handler in [*logger.handlers, *getattr(logger.handlers[0], 'target_handlers', [])]:
+                        if type(handler) is logging.StreamHandler:
+                            handler.setStream(console_file)
+
+                    caller_seconds = 0
+                    t1 = time.perf_counter()
+                    for i in range(frame_cnt):
+                        t2 = time.perf_counter()
+                        for j in range(log_per_frame):
+                            logger.debug('识别画面 %s 第 %d 轮 第 %d 项 耗时 %.4f', '大世界', i, j, 0.0123)
+                        caller_seconds += time.perf_counter() - t2
+                        time.sleep(0.002)  # 模拟识别
+                    flush_logs(None)
+                    total_seconds = time.perf_counter() - t1
+                    print(f'控制台={add_console_handler} 队列={use_queue}: '
+                          f'调用方 {caller_seconds / call_cnt * 1e6:.2f}us/条 全部写入 {total_seconds:.2f}s')
+                    _close_managed_handlers(logger)
+
+        logger = configure_logger(
+            logging.getLogger('OneDragonBenchmarkThrottle'),
+            LoggerConfig(
+                level=logging.DEBUG,
+                log_file_path=str(Path(temp_dir) / 'log_throttle.txt'),
+                add_console_handler=False,
+            ),
+        )
+        t1 = time.perf_counter()
+        for i in range(call_cnt):
+            log_every(1, logging.DEBUG, '识别画面 %s 第 %d 轮', '大世界', i, logger=logger)
+        print(f'限频日志: 调用方 {(time.perf_counter() - t1) / call_cnt * 1e6:.2f}us/条')
+
+        logger.setLevel(logging.INFO)
+        t1 = time.perf_counter()
+        for i in range(call_cnt):
+            logger.debug('识别画面 %s 第 %d 轮', '大世界', i)
+        print(f'低于日志等级: 调用方 {(time.perf_counter() - t1) / call_cnt * 1e6:.2f}us/条')
+        _close_managed_handlers(logger)
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
@@ -0,0 +1,391 @@
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+_SIGNATURE_BANDS = 16  # 每行按列分成多少段计算特征
+_LOW_TEXTURE_STD = 1.0  # 特征的标准差低于这个值时 认为是纯色区域 行投影无法区分
+_PEAK_MIN_DISTANCE = 3  # 相距多少行以内的峰视为同一个
+_PEAK_CANDIDATES = 5  # 最多用原图验证多少个峰
+_AMBIGUOUS_MARGIN = 0.005  # 其它位置和最好的位置相差多少以内 视为有歧义 例如列表中完全相同的条目
+
+
+@dataclass
+class ScrollOffset:
+    """
+    两帧之间的滚动距离
+    """
+
+    shift: float
+    """滚动的像素 亚像素精度 下一帧的第 0 行 对应上一帧的第 shift 行"""
+
+    confidence: float
+    """置信度 重叠部分的归一化相关系数"""
+
+    method: str
+    """计算方法 projection=行投影 template=模板匹配"""
+
+    ambiguous: bool = False
+    """是否有多个差不多好的位置 有 expected_shift 时选最接近的 否则选最好的"""
+
+    @property
+    def shift_px(self) -> int:
+        """滚动的整数像素"""
+        return int(round(self.shift))
+
+
+def estimate_scroll_offset(
+        prev_img: MatLike,
+        next_img: MatLike,
+        axis: int = 0,
+        min_overlap: int | None = None,
+        expected_shift: float | None = None,
+        threshold: float = 0.97,
+        template_threshold: float = 0.95,
+) -> ScrollOffset | None:
+    """
+    计算滚动前后两帧的滚动距离
+
+    1. 行投影: 把每一行压缩成一个很短的特征 在特征上做归一化互相关 再用抛物线拟合得到亚像素位置
+       比在原图上做模板匹配快两个数量级 并且用整个重叠部分计算置信度
+    2. 模板匹配: 行投影失败时 例如重叠部分只有纯色背景 从下一帧选纹理最多的一段在上一帧中做模板匹配
+
+    Args:
+        prev_img: 上一帧 可以比下一帧长 例如已经拼接好的图的末尾
+        next_img: 下一帧 垂直滚动时和上一帧宽度相同 水平滚动时高度相同
+        axis: 0=垂直滚动 1=水平滚动
+        min_overlap: 最少的重叠像素 None 时使用两帧中较短一帧的 1/5
+        expected_shift: 预计的滚动距离 例如按滚动的操作估算 有歧义时选最接近的位置
+        threshold: 行投影的置信度阈值
+        template_threshold: 模板匹配的置信度阈值
+
+    Returns:
+        ScrollOffset | None: 滚动距离 无法计算时返回 None
+    """
+    prev_gray = _to_gray(prev_img)
+    next_gray = _to_gray(next_img)
+    if axis == 1:
+        prev_gray = cv2.transpose(prev_gray)
+        next_gray = cv2.transpose(next_gray)
+    if prev_gray.shape[1] != next_gray.shape[1]:
+        return None
+
+    prev_len = prev_gray.shape[0]
+    next_len = next_gray.shape[0]
+    if min_overlap is None:
+        min_overlap = min(prev_len, next_len) // 5
+    min_overlap = max(8, min(min_overlap, prev_len, next_len))
+
+    result = _estimate_by_projection(prev_gray, next_gray, min_overlap, expected_shift, threshold)
+    if result is not None:
+        return result
+    return _estimate_by_template(prev_gray, next_gray, min_overlap, template_threshold)
+
+
+def row_signature(gray: MatLike, bands: int = _SIGNATURE_BANDS) -> np.ndarray:
+    """
+    行投影特征 每一行按列分成若干段 每段的平均亮度和平均横向梯度
+
+    Args:
+        gray: 灰度图
+        bands: 分段数量
+
+    Returns:
+        np.ndarray: 形状为 (行数, 2 * bands) 的 float32 特征
+    """
+    height, width = gray.shape[:2]
+    bands = max(1, min(bands, width // 2))
+    intensity = cv2.resize(gray, (bands, height), interpolation=cv2.INTER_AREA).astype(np.float32)
+    gradient = cv2.absdiff(gray[:, 1:], gray[:, :-1])
+    gradient = cv2.resize(gradient, (bands, height), interpolation=cv2.INTER_AREA).astype(np.float32)
+    return np.hstack([intensity, gradient])
+
+
+def _to_gray(img: MatLike) -> MatLike:
+    if img.ndim == 2:
+        return img
+    return cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+
+
+def _ncc(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    两个相同形状数组的归一化相关系数 两边都是常量时 相同视为 1
+    """
+    a = a.astype(np.float32) - a.mean()
+    b = b.astype(np.float32) - b.mean()
+    denominator = float(np.sqrt((a * a).sum() * (b * b).sum()))
+    if denominator < 1e-6:
+        return 1.0 if np.allclose(a, b) else 0.0
+    return float((a * b).sum() / denominator)
+
+
+def _overlap_ncc(prev_gray: MatLike, next_gray: MatLike, shift: int) -> float:
+    """
+    下一帧从上一帧第 shift 行开始重叠时 重叠部分的归一化相关系数 隔行隔列采样
+    """
+    overlap = min(prev_gray.shape[0] - shift, next_gray.shape[0])
+    return _ncc(prev_gray[shift:shift + overlap:2, ::2], next_gray[:overlap:2, ::2])
+
+
+def _sub_pixel_peak(scores: np.ndarray, idx: int) -> float:
+    """
+    用峰和左右两个值拟合抛物线 返回亚像素的峰位置
+    """
+    if idx <= 0 or idx >= len(scores) - 1:
+        return float(idx)
+    left, center, right = float(scores[idx - 1]), float(scores[idx]), float(scores[idx + 1])
+    denominator = left - 2 * center + right
+    if abs(denominator) < 1e-9:
+        return float(idx)
+    return idx + 0.5 * (left - right) / denominator
+
+
+def _estimate_by_projection(
+        prev_gray: MatLike,
+        next_gray: MatLike,
+        min_overlap: int,
+        expected_shift: float | None,
+        threshold: float,
+) -> ScrollOffset | None:
+    prev_sig = row_signature(prev_gray)
+    next_sig = row_signature(next_gray)
+    template = next_sig[:min_overlap]
+
+    # 下一帧开头 min_overlap 行 在上一帧每个位置的相关系数
+    # 每列分别计算再平均 只使用沿滚动方向有变化的列
+    textured_cols = np.flatnonzero(template.std(axis=0) >= _LOW_TEXTURE_STD)
+    if len(textured_cols) == 0:
+        return None
+    scores = np.zeros(prev_sig.shape[0] - min_overlap + 1, dtype=np.float32)
+    for col in textured_cols:
+        col_scores = cv2.matchTemplate(np.ascontiguousarray(prev_sig[:, col:col + 1]),
+                                       np.ascontiguousarray(template[:, col:col + 1]),
+                                       cv2.TM_CCOEFF_NORMED)[:, 0]
+        scores += np.nan_to_num(col_scores, nan=0, posinf=0, neginf=0)
+    scores /= len(textured_cols)
+
+    # 特征只保留了每段的平均值 列表中背景相同的条目也会有很高的分数
+    # 取分数最高的几个峰 用原图的整个重叠部分重新计算相关系数
+    candidates: list[int] = []
+    for idx in np.argsort(-scores):
+        if len(candidates) >= _PEAK_CANDIDATES or scores[idx] < threshold:
+            break
+        if all(abs(int(idx) - i) > _PEAK_MIN_DISTANCE for i in candidates):
+            candidates.append(int(idx))
+    if len(candidates) == 0:
+        return None
+
+    candidate_scores = [_overlap_ncc(prev_gray, next_gray, i) for i in candidates]
+    best_score = max(candidate_scores)
+    if best_score < threshold:
+        return None
+    similar = [i for i, score in zip(candidates, candidate_scores, strict=True)
+               if score >= best_score - _AMBIGUOUS_MARGIN]
+    ambiguous = len(similar) > 1
+    if ambiguous and expected_shift is not None:
+        peak = min(similar, key=lambda i: abs(i - expected_shift))
+    else:
+        peak = candidates[candidate_scores.index(best_score)]
+    confidence = candidate_scores[candidates.index(peak)]
+
+    return ScrollOffset(
+        shift=_sub_pixel_peak(scores, peak),
+        confidence=confidence,
+        method='projection',
+        ambiguous=ambiguous,
+    )
+
+
+def _estimate_by_template(
+        prev_gray: MatLike,
+        next_gray: MatLike,
+        min_overlap: int,
+        threshold: float,
+) -> ScrollOffset | None:
+    # 在下一帧可能重叠的部分中 选横向梯度最多的一段作为模板
+    search_len = max(min_overlap, min(prev_gray.shape[0], next_gray.shape[0]) - min_overlap)
+    gradient = cv2.absdiff(next_gray[:search_len, 1:], next_gray[:search_len, :-1]).sum(axis=1, dtype=np.float64)
+    window = np.convolve(gradient, np.ones(min_overlap), mode='valid')
+    start = int(np.argmax(window))
+    if window[start] <= 0:  # 完全没有纹理
+        return None
+
+    template = next_gray[start:start + min_overlap]
+    scores = cv2.matchTemplate(prev_gray, template, cv2.TM_CCOEFF_NORMED)[:, 0]
+    scores = np.nan_to_num(scores, nan=-1, posinf=-1, neginf=-1)
+    peak = int(np.argmax(scores))
+    confidence = float(scores[peak])
+    if confidence < threshold:
+        return None
+
+    return ScrollOffset(
+        shift=_sub_pixel_peak(scores, peak) - start,
+        confidence=confidence,
+        method='template',
+    )
+
+
+class ScrollStitcher:
+
+    def __init__(
+            self,
+            axis: int = 0,
+            min_overlap: int | None = None,
+            threshold: float = 0.97,
+    ):
+        """
+        逐帧拼接滚动截图 例如滚动列表时每次滚动后截图
+
+        - 每帧只和上一帧比较 只保存新出现的部分 不会反复复制已经拼接好的图
+        - 需要完整的图时 再一次性拼接
+
+        Args:
+            axis: 0=垂直滚动 1=水平滚动
+            min_overlap: 最少的重叠像素 None 时使用帧长度的 1/5
+            threshold: 行投影的置信度阈值
+        """
+        self.axis: int = axis
+        self.min_overlap: int | None = min_overlap
+        self.threshold: float = threshold
+
+        self.strips: list[MatLike] = []  # 每帧新出现的部分
+        self.frame_positions: list[int] = []  # 每帧在拼接图中的位置 垂直滚动时为纵坐标
+        self.offsets: list[ScrollOffset] = []  # 每帧相对上一帧的滚动距离
+        self.length: int = 0  # 拼接图的长度
+        self.no_move_cnt: int = 0  # 连续没有滚动的帧数 通常说明已经到底
+        self.last_frame: MatLike | None = None
+
+    @property
+    def frame_cnt(self) -> int:
+        return len(self.frame_positions)
+
+    def append(self, frame: MatLike, expected_shift: float | None = None) -> ScrollOffset | None:
+        """
+        添加一帧
+
+        Args:
+            frame: 滚动后的截图
+            expected_shift: 预计的滚动距离 用于列表中有重复条目时选择位置
+
+        Returns:
+            ScrollOffset | None: 相对上一帧的滚动距离 第一帧返回滚动距离0 无法匹配时返回 None 这一帧不会被添加
+        """
+        frame_len = frame.shape[self.axis]
+        if self.last_frame is None:
+            offset = ScrollOffset(shift=0, confidence=1, method='projection')
+            self._add_strip(frame, 0, frame_len)
+            self.frame_positions.append(0)
+        else:
+            offset = estimate_scroll_offset(
+                self.last_frame, frame,
+                axis=self.axis,
+                min_overlap=self.min_overlap,
+                expected_shift=expected_shift,
+                threshold=self.threshold,
+            )
+            if offset is None:
+                return None
+
+            shift = max(0, offset.shift_px)
+            position = self.frame_positions[-1] + shift
+            # 上一帧之后的部分是新出现的
+            new_start = self.frame_positions[-1] + self.last_frame.shape[self.axis] - position
+            if new_start < frame_len:
+                self._add_strip(frame, new_start, frame_len)
+                self.no_move_cnt = 0
+            else:
+                self.no_move_cnt += 1
+            self.frame_positions.append(position)
+
+        self.offsets.append(offset)
+        self.last_frame = frame
+        return offset
+
+    def _add_strip(self, frame: MatLike, start: int, end: int) -> None:
+        strip = frame[start:end] if self.axis == 0 else frame[:, start:end]
+        self.strips.append(strip.copy())  # 只复制新的部分 截图缓冲区可能会被复用
+        self.length += end - start
+
+    def get_image(self) -> MatLike | None:
+        """
+        拼接所有帧
+
+        Returns:
+            MatLike | None: 拼接后的图 还没有添加帧时返回 None
+        """
+        if len(self.strips) == 0:
+            return None
+        if self.axis == 0:
+            return cv2.vconcat(self.strips)
+        return cv2.hconcat(self.strips)
+
+
+def __debug_benchmark():
+    """
+    模拟滚动一个很长的列表 对比 原图模板匹配 和 行投影 的准确率和耗时
+    列表中有重复的条目 和 只有纯色背景的空白区域
+    """
+    import time
+
+    rng = np.random.default_rng(0)
+    width, frame_height = 800, 600
+    total_height = 12000
+
+    # 生成长列表 每个条目高度相同 部分条目文字相同
+    page = np.full((total_height, width, 3), 40, dtype=np.uint8)
+    item_height = 90
+    for i, y in enumerate(range(0, total_height - item_height, item_height)):
+        cv2.rectangle(page, (10, y + 5), (width - 10, y + item_height - 5), (70, 70, 70), -1)
+        if i % 7 == 3:
+            continue  # 没有文字的条目
+        cv2.putText(page, f'item {i % 40:02d} reward x{(i * 37) % 1000}', (30, y + 55),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, (230, 230, 230), 2)
+    page[4000:4300] = 40  # 一段纯色区域
+
+    positions = [0]
+    while positions[-1] + frame_height < total_height:
+        positions.append(min(total_height - frame_height, positions[-1] + int(rng.integers(120, 420))))
+    frames = []
+    for y in positions:
+        frame = page[y:y + frame_height].astype(np.int16) + rng.integers(-3, 4, (frame_height, width, 1))
+        frames.append(np.clip(frame, 0, 255).astype(np.uint8))
+
+    def _brute_force(prev: MatLike, nxt: MatLike) -> int | None:
+        # 原来的做法 在原图上做模板匹配
+        for threshold in range(95, 70, -5):
+            for dh in range(150, nxt.shape[0] // 2, 10):
+                scores = cv2.matchTemplate(prev, nxt[:-dh], cv2.TM_CCOEFF_NORMED)
+                _, max_val, _, max_loc = cv2.minMaxLoc(scores)
+                if max_val >= threshold / 100:
+                    return max_loc[1]
+        return None
+
+    for name, estimate in [
+        ('原图模板匹配', _brute_force),
+        ('行投影', lambda p, n: None if (r := estimate_scroll_offset(p, n)) is None else r.shift_px),
+    ]:
+        correct = failed = 0
+        t1 = time.perf_counter()
+        for i in range(1, len(frames)):
+            shift = estimate(frames[i - 1], frames[i])
+            if shift is None:
+                failed += 1
+            elif shift == positions[i] - positions[i - 1]:
+                correct += 1
+        cost = (time.perf_counter() - t1) / (len(frames) - 1) * 1000
+        print(f'{name}: {len(frames) - 1} 次 正确 {correct} 失败 {failed} 平均 {cost:.1f}ms')
+
+    stitcher = ScrollStitcher()
+    t1 = time.perf_counter()
+    for i, frame in enumerate(frames):
+        stitcher.append(frame, expected_shift=None if i == 0 else 270)
+    image = stitcher.get_image()
+    cost = time.perf_counter() - t1
+    same = image.shape[0] == positions[-1] + frame_height and np.abs(
+        image.astype(np.int16) - page[:image.shape[0]].astype(np.int16)).max() <= 3
+    print(f'逐帧拼接 {len(frames)} 帧 {cost * 1000:.0f}ms 高度 {image.shape[0]} 与原图一致 {same}')
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
@@ -0,0 +1,410 @@
+import math
+
+from one_dragon.base.geometry.point import Point
+from one_dragon.base.geometry.rectangle import Rect
+from one_dragon.yolo.detect_utils import DetectFrameResult, DetectObjectResult
+
+
+class TrackedObject:
+
+    def __init__(self, track_id: int, detect_result: DetectObjectResult, run_time: float):
+        """
+        跨帧跟踪的一个目标
+        """
+        self.track_id: int = track_id
+        """跟踪ID 同一个目标在跟踪期间保持不变"""
+
+        self.detect_result: DetectObjectResult = detect_result
+        """最后一次匹配到的识别结果"""
+
+        self.label: str = detect_result.detect_class.class_name
+        """最后一次匹配到的类别"""
+
+        self.label_changed: bool = False
+        """最后一次匹配时 类别是否有变化"""
+
+        self.rect: Rect = Rect(detect_result.x1, detect_result.y1, detect_result.x2, detect_result.y2)
+        """最后一次匹配到的位置"""
+
+        self.first_seen_time: float = run_time
+        """第一次识别到的时间"""
+
+        self.last_seen_time: float = run_time
+        """最后一次匹配到的时间"""
+
+        self.hit_cnt: int = 1
+        """匹配到的总帧数"""
+
+        self.missed_cnt: int = 0
+        """连续没有匹配到的帧数"""
+
+        self.velocity_x: float = 0
+        """横向速度 像素/秒"""
+
+        self.velocity_y: float = 0
+        """纵向速度 像素/秒"""
+
+        self.last_displacement: float = 0
+        """最后一次匹配时 中心点相对上一次的位移 像素"""
+
+    @property
+    def center(self) -> Point:
+        return self.rect.center
+
+    @property
+    def is_visible(self) -> bool:
+        """当前帧是否匹配到 False 时为按预测位置保留的目标"""
+        return self.missed_cnt == 0
+
+    def predict_rect(self, run_time: float) -> Rect:
+        """
+        按速度预测在某个时间的位置 大小保持不变
+
+        Args:
+            run_time: 预测的时间
+
+        Returns:
+            Rect: 预测的位置
+        """
+        dt = max(0.0, run_time - self.last_seen_time)
+        dx = self.velocity_x * dt
+        dy = self.velocity_y * dt
+        return Rect(self.rect.x1 + dx, self.rect.y1 + dy, self.rect.x2 + dx, self.rect.y2 + dy)
+
+    def predict_center(self, run_time: float) -> Point:
+        return self.predict_rect(run_time).center
+
+
+class DetectTrackResult:
+
+    def __init__(
+        self,
+        run_time: float,
+        visible_tracks: list[TrackedObject],
+        coasting_tracks: list[TrackedObject],
+        new_track_ids: list[int],
+        removed_track_ids: list[int],
+    ):
+        """
+        一帧画面的跟踪结果
+        """
+        self.run_time: float = run_time
+        """识别时间"""
+
+        self.visible_tracks: list[TrackedObject] = visible_tracks
+        """当前帧匹配到的目标"""
+
+        self.coasting_tracks: list[TrackedObject] = coasting_tracks
+        """当前帧没有匹配到 但仍在容忍帧数内保留的目标"""
+
+        self.new_track_ids: list[int] = new_track_ids
+        """当前帧新出现的目标"""
+
+        self.removed_track_ids: list[int] = removed_track_ids
+        """当前帧超过容忍帧数被移除的目标"""
+
+    def get_track(self, track_id: int, include_coasting: bool = False) -> TrackedObject | None:
+        """
+        按跟踪ID获取目标
+
+        Args:
+            track_id: 跟踪ID
+            include_coasting: 是否包含当前帧没有匹配到的目标
+
+        Returns:
+            TrackedObject | None: 目标
+        """
+        for track in self.visible_tracks:
+            if track.track_id == track_id:
+                return track
+        if include_coasting:
+            for track in self.coasting_tracks:
+                if track.track_id == track_id:
+                    return track
+        return None
+
+    def get_track_by_result(self, detect_result: DetectObjectResult) -> TrackedObject | None:
+        """
+        获取当前帧某个识别结果对应的目标
+        """
+        for track in self.visible_tracks:
+            if track.detect_result is detect_result:
+                return track
+        return None
+
+
+class DetectTracker:
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        max_center_distance: float = 100,
+        max_missed_frames: int = 3,
+        label_change_penalty: float = 0.5,
+        velocity_alpha: float = 0.5,
+    ):
+        """
+        轻量的多目标跟踪 在 DetectFrameResult 之上为目标分配稳定的跟踪ID
+
+        - 先按速度预测已有目标在当前帧的位置 再与识别结果匹配
+        - 与预测位置 IOU 足够时优先匹配 图标较小、移动较快 IOU 为 0 时按中心点距离匹配
+        - 按匹配分数从高到低贪心分配 一个识别结果只匹配一个目标
+        - 类别不同也允许匹配 但分数会打折扣 以容忍模型的类别抖动
+        - 连续 max_missed_frames 帧没有匹配到才移除 期间按预测位置保留 避免单帧漏识别导致目标闪烁
+
+        Args:
+            iou_threshold: 与预测位置的 IOU 大于该值时 按 IOU 匹配
+            max_center_distance: 按中心点匹配时的最大距离 像素
+            max_missed_frames: 最多容忍连续多少帧没有匹配到
+            label_change_penalty: 类别不同时分数的倍数 0 时不允许类别变化
+            velocity_alpha: 速度平滑系数 越大越偏向最新一次的速度
+        """
+        self.iou_threshold: float = iou_threshold
+        self.max_center_distance: float = max_center_distance
+        self.max_missed_frames: int = max_missed_frames
+        self.label_change_penalty: float = label_change_penalty
+        self.velocity_alpha: float = velocity_alpha
+
+        self._tracks: list[TrackedObject] = []
+        self._next_track_id: int = 1
+        self.last_result: DetectTrackResult | None = None
+
+    def reset(self) -> None:
+        """
+        清空所有目标 画面有大幅跳变时(例如大角度转向)使用
+        """
+        self._tracks = []
+        self.last_result = None
+
+    @property
+    def tracks(self) -> list[TrackedObject]:
+        """当前保留的全部目标"""
+        return list(self._tracks)
+
+    def update(self, frame_result: DetectFrameResult) -> DetectTrackResult:
+        """
+        使用一帧的识别结果更新跟踪
+
+        Args:
+            frame_result: 一帧的识别结果 识别时间应不早于上一帧
+
+        Returns:
+            DetectTrackResult: 当前帧的跟踪结果
+        """
+        run_time = frame_result.run_time
+        detect_list = frame_result.results
+
+        # 计算所有可能的匹配 按分数从高到低分配
+        candidate_list: list[tuple[float, int, int]] = []
+        for track_idx, track in enumerate(self._tracks):
+            predicted = track.predict_rect(run_time)
+            for detect_idx, detect_result in enumerate(detect_list):
+                score = self._match_score(track, predicted, detect_result)
+                if score > 0:
+                    candidate_list.append((score, track_idx, detect_idx))
+        candidate_list.sort(key=lambda i: i[0], reverse=True)
+
+        matched_track_set: set[int] = set()
+        matched_detect_set: set[int] = set()
+        for _, track_idx, detect_idx in candidate_list:
+            if track_idx in matched_track_set or detect_idx in matched_detect_set:
+                continue
+            matched_track_set.add(track_idx)
+            matched_detect_set.add(detect_idx)
+            self._update_track(self._tracks[track_idx], detect_list[detect_idx], run_time)
+
+        # 没有匹配到的目标 超过容忍帧数后移除
+        removed_track_ids: list[int] = []
+        alive_tracks: list[TrackedObject] = []
+        for track_idx, track in enumerate(self._tracks):
+            if track_idx not in matched_track_set:
+                track.missed_cnt += 1
+                if track.missed_cnt > self.max_missed_frames:
+                    removed_track_ids.append(track.track_id)
+                    continue
+            alive_tracks.append(track)
+
+        # 没有匹配到的识别结果 作为新目标
+        new_track_ids: list[int] = []
+        for detect_idx, detect_result in enumerate(detect_list):
+            if detect_idx in matched_detect_set:
+                continue
+            track = TrackedObject(self._next_track_id, detect_result, run_time)
+            self._next_track_id += 1
+            alive_tracks.append(track)
+            new_track_ids.append(track.track_id)
+
+        self._tracks = alive_tracks
+        self.last_result = DetectTrackResult(
+            run_time=run_time,
+            visible_tracks=[i for i in alive_tracks if i.is_visible],
+            coasting_tracks=[i for i in alive_tracks if not i.is_visible],
+            new_track_ids=new_track_ids,
+            removed_track_ids=removed_track_ids,
+        )
+        return self.last_result
+
+    def _match_score(self, track: TrackedObject, predicted: Rect, detect_result: DetectObjectResult) -> float:
+        """
+        目标与识别结果的匹配分数 不能匹配时返回0
+        IOU 匹配的分数在 (1, 2] 中心点匹配的分数在 (0, 1)
+        """
+        iou = self._iou(predicted, detect_result)
+        if iou > self.iou_threshold:
+            score = 1 + iou
+        else:
+            dx = (predicted.x1 + predicted.x2) / 2 - (detect_result.x1 + detect_result.x2) / 2
+            dy = (predicted.y1 + predicted.y2) / 2 - (detect_result.y1 + detect_result.y2) / 2
+            dis = math.sqrt(dx * dx + dy * dy)
+            if dis >= self.max_center_distance:
+                return 0
+            score = 1 - dis / self.max_center_distance
+
+        if detect_result.detect_class.class_name != track.label:
+            score *= self.label_change_penalty
+        return score
+
+    @staticmethod
+    def _iou(rect: Rect, detect_result: DetectObjectResult) -> float:
+        inter_w = min(rect.x2, detect_result.x2) - max(rect.x1, detect_result.x1)
+        inter_h = min(rect.y2, detect_result.y2) - max(rect.y1, detect_result.y1)
+        if inter_w <= 0 or inter_h <= 0:
+            return 0
+        inter = inter_w * inter_h
+        union = rect.width * rect.height + detect_result.width * detect_result.height - inter
+        return inter / union if union > 0 else 0
+
+    def _update_track(self, track: TrackedObject, detect_result: DetectObjectResult, run_time: float) -> None:
+        old_center_x = (track.rect.x1 + track.rect.x2) / 2
+        old_center_y = (track.rect.y1 + track.rect.y2) / 2
+        new_center_x = (detect_result.x1 + detect_result.x2) / 2
+        new_center_y = (detect_result.y1 + detect_result.y2) / 2
+        dx = new_center_x - old_center_x
+        dy = new_center_y - old_center_y
+
+        dt = run_time - track.last_seen_time
+        if dt > 0:
+            alpha = 1 if track.hit_cnt == 1 else self.velocity_alpha  # 第二帧时直接使用测量的速度
+            track.velocity_x = alpha * dx / dt + (1 - alpha) * track.velocity_x
+            track.velocity_y = alpha * dy / dt + (1 - alpha) * track.velocity_y
+
+        new_label = detect_result.detect_class.class_name
+        track.label_changed = new_label != track.label
+        track.label = new_label
+        track.detect_result = detect_result
+        track.rect = Rect(detect_result.x1, detect_result.y1, detect_result.x2, detect_result.y2)
+        track.last_seen_time = run_time
+        track.last_displacement = math.sqrt(dx * dx + dy * dy)
+        track.hit_cnt += 1
+        track.missed_cnt = 0
+
+
+def __debug_evaluate():
+    """
+    离线评估 对比 逐帧独立选择(不容忍漏识别) 和 容忍3帧漏识别 两种跟踪的效果
+
+    使用 .debug/detect_sequence/*.jsonl 中录制的识别序列 每行一帧
+    {"run_time": 1.0, "results": [[x1, y1, x2, y2, score, class_name, gt_id], ...]}
+    gt_id 为人工标注的真实目标 没有录制序列时 生成带漏识别、位置抖动和类别抖动的模拟序列
+
+    统计
+    - ID切换: 同一个真实目标 前后两次匹配到的跟踪ID不同的次数
+    - 断开: 真实目标可见 但没有处于可见或预测中的跟踪目标的帧数
+    - 每帧更新耗时
+    """
+    import json
+    import os
+    import random
+    import time
+
+    from one_dragon.utils import os_utils
+    from one_dragon.yolo.detect_utils import DetectClass
+
+    class_map: dict[str, DetectClass] = {}
+
+    def _to_frame(run_time: float, rows: list) -> tuple[DetectFrameResult, list]:
+        results = []
+        gt_ids = []
+        for x1, y1, x2, y2, score, class_name, gt_id in rows:
+            if class_name not in class_map:
+                class_map[class_name] = DetectClass(len(class_map), class_name)
+            results.append(DetectObjectResult([x1, y1, x2, y2], score, class_map[class_name]))
+            gt_ids.append(gt_id)
+        return DetectFrameResult(None, results, run_time=run_time), gt_ids
+
+    def _simulate(seed: int) -> list:
+        """
+        模拟移动中追踪入口图标 画面随转向左右平移 每帧 0.1 秒
+        """
+        rng = random.Random(seed)
+        frame_list = []
+        objects = [[rng.uniform(200, 1700), rng.uniform(300, 700), rng.choice(['目标-战斗', '目标-奖励', '目标-商店']), gt_id]
+                   for gt_id in range(rng.randint(2, 4))]
+        pan_speed = 0.0
+        for frame_idx in range(300):
+            pan_speed = max(-300.0, min(300.0, pan_speed + rng.uniform(-60, 60)))  # 像素/秒
+            rows = []
+            for obj in objects:
+                obj[0] += pan_speed * 0.1
+                obj[1] += rng.uniform(-3, 3)
+                size = 40
+                if rng.random() < 0.15:  # 漏识别
+                    continue
+                class_name = obj[2] if rng.random() > 0.05 else '目标-未知'  # 类别抖动
+                jitter_x = rng.uniform(-4, 4)
+                jitter_y = rng.uniform(-4, 4)
+                rows.append([obj[0] + jitter_x - size / 2, obj[1] + jitter_y - size / 2,
+                             obj[0] + jitter_x + size / 2, obj[1] + jitter_y + size / 2,
+                             0.8, class_name, obj[3]])
+            frame_list.append((frame_idx * 0.1, rows))
+        return frame_list
+
+    sequence_list: list[tuple[str, list]] = []
+    sequence_dir = os_utils.get_path_under_work_dir('.debug', 'detect_sequence')
+    for file_name in sorted(os.listdir(sequence_dir)):
+        if not file_name.endswith('.jsonl'):
+            continue
+        with open(os.path.join(sequence_dir, file_name), encoding='utf-8') as file:
+            sequence_list.append((file_name, [(i['run_time'], i['results']) for i in map(json.loads, file) if i]))
+    if len(sequence_list) == 0:
+        sequence_list = [(f'模拟序列{i}', _simulate(i)) for i in range(20)]
+        print(f'.debug/detect_sequence 下没有录制的序列 使用 {len(sequence_list)} 个模拟序列')
+
+    for title, max_missed_frames in [('逐帧独立', 0), ('容忍3帧漏识别', 3)]:
+        id_switch_cnt = 0
+        lost_cnt = 0
+        gt_frame_cnt = 0
+        cost_list: list[float] = []
+        for _, sequence in sequence_list:
+            tracker = DetectTracker(max_missed_frames=max_missed_frames)
+            gt_2_track: dict = {}
+            for run_time, rows in sequence:
+                frame, gt_ids = _to_frame(run_time, rows)
+                t1 = time.perf_counter()
+                track_result = tracker.update(frame)
+                cost_list.append(time.perf_counter() - t1)
+
+                for detect_result, gt_id in zip(frame.results, gt_ids, strict=True):
+                    gt_frame_cnt += 1
+                    track = track_result.get_track_by_result(detect_result)
+                    last_track_id = gt_2_track.get(gt_id)
+                    if last_track_id is not None and track.track_id != last_track_id:
+                        id_switch_cnt += 1
+                    gt_2_track[gt_id] = track.track_id
+
+                # 真实目标仍存在 但对应的跟踪目标已被移除
+                visible_gt_set = set(gt_ids)
+                alive_track_set = {i.track_id for i in tracker.tracks}
+                for gt_id, track_id in gt_2_track.items():
+                    if gt_id not in visible_gt_set and track_id not in alive_track_set:
+                        lost_cnt += 1
+
+        cost_list.sort()
+        p50 = cost_list[len(cost_list) // 2] * 1e6
+        p99 = cost_list[int(len(cost_list) * 0.99)] * 1e6
+        print(f'{title}: 识别结果 {gt_frame_cnt}个 ID切换 {id_switch_cnt}次 断开 {lost_cnt}帧 '
+              f'更新耗时 p50 {p50:.0f}us p99 {p99:.0f}us')
+
+
+if __name__ == '__main__':
+    __debug_evaluate()
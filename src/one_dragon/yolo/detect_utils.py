@@ -6,6 +6,8 @@ from typing import List, Optional, Tuple
 import numpy as np
 from cv2.typing import MatLike
 
+from one_dragon.base.geometry.rectangle import Rect
+
 _COLORS = np.random.default_rng(3).uniform(0, 255, size=(100, 3))
 
 
@@ -46,6 +48,12 @@ class DetectContext:
         self.scale_width: int = 0
         """缩放后的宽度"""
 
+        self.roi_list: Optional[List[Rect]] = None
+        """识别的区域 None 代表全图识别"""
+
+        self.roi_scale_list: List[Tuple[int, int]] = []
+        """每个识别区域缩放后的 (高度, 宽度)"""
+
 
 class DetectClass:
 
@@ -3,8 +3,11 @@ import time
 import urllib.request
 import zipfile
 
+import numpy as np
 import onnxruntime as ort
+from cv2.typing import MatLike
 
+from one_dragon.base.geometry.rectangle import Rect
 from one_dragon.utils import gpu_executor
 from one_dragon.yolo.log_utils import log
 
@@ -22,6 +25,7 @@ class OnnxModelLoader:
                  personal_proxy: str | None = '',
                  gpu: bool = False,
                  backup_model_name: str | None = None,
+                 roi_list: list[Rect] | None = None,
                  ):
         self.model_name: str = model_name
         self.backup_model_name: str = backup_model_name  # 备用模型 默认在本地一定有的模型 在新模型无法下载使用时使用
@@ -32,12 +36,14 @@ class OnnxModelLoader:
         self.gh_proxy_url: str = gh_proxy_url
         self.personal_proxy: str | None = personal_proxy
         self.gpu: bool = gpu  # 是否使用GPU加速
+        self.roi_list: list[Rect] | None = roi_list  # 模型默认的识别区域 目标只会出现在固定区域时使用 None 代表全图
 
         # 从模型中读取到的输入输出信息
         self.session: ort.InferenceSession = None
         self.input_names: list[str] = []
         self.onnx_input_width: int = 0
         self.onnx_input_height: int = 0
+        self.onnx_input_batch_dynamic: bool = False  # 模型输入的batch维度是否可变
         self.output_names: list[str] = []
 
         if not self.check_and_download_model():  # 新模型不ok
@@ -168,9 +174,57 @@ class OnnxModelLoader:
         self.input_names = [model_inputs[i].name for i in range(len(model_inputs))]
 
         shape = model_inputs[0].shape
+        self.onnx_input_batch_dynamic = not isinstance(shape[0], int)  # 动态维度时是字符串或None
         self.onnx_input_height = shape[2]
         self.onnx_input_width = shape[3]
 
     def get_output_details(self):
         model_outputs = self.session.get_outputs()
         self.output_names = [model_outputs[i].name for i in range(len(model_outputs))]
+
+    def get_roi_list(self, image: MatLike, roi_list: list[Rect] | None = None) -> list[Rect] | None:
+        """
+        获取本次识别使用的区域 会裁剪到图片范围内 并去掉空区域
+        :param image: 原图
+        :param roi_list: 本次调用指定的区域 None 时使用模型默认的区域
+        :return: 需要识别的区域 None 代表全图识别
+        """
+        if roi_list is None:
+            roi_list = self.roi_list
+        if roi_list is None or len(roi_list) == 0:
+            return None
+
+        img_height, img_width = image.shape[:2]
+        result: list[Rect] = []
+        for roi in roi_list:
+            x1, y1 = max(0, roi.x1), max(0, roi.y1)
+            x2, y2 = min(img_width, roi.x2), min(img_height, roi.y2)
+            if x2 <= x1 or y2 <= y1:
+                continue
+            result.append(Rect(x1, y1, x2, y2))
+
+        return result
+
+    def run_session_batch(self, output_names: list[str], input_tensor_list: list[np.ndarray]) -> list:
+        """
+        多张图片的推理
+        模型支持动态batch时 合并成一次推理；否则逐张推理后再合并结果
+        :param output_names: 输出名称
+        :param input_tensor_list: 每张图片预处理后的输入 形状均为 [1, c, h, w]
+        :return: 与 run_session 相同格式的输出 每个输出的第0维是图片下标
+        """
+        if len(input_tensor_list) == 1:
+            return self.run_session(output_names, {self.input_names[0]: input_tensor_list[0]})
+
+        if self.onnx_input_batch_dynamic:
+            input_tensor = np.concatenate(input_tensor_list, axis=0)
+            return self.run_session(output_names, {self.input_names[0]: input_tensor})
+
+        output_list = [
+            self.run_session(output_names, {self.input_names[0]: input_tensor})
+            for input_tensor in input_tensor_list
+        ]
+        return [
+            np.concatenate([outputs[i] for outputs in output_list], axis=0)
+            for i in range(len(output_names))
+        ]
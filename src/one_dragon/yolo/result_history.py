@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from typing import Generic, Protocol, TypeVar
+
+
+class TimedResult(Protocol):
+
+    run_time: float
+    """识别时间"""
+
+
+T = TypeVar('T', bound=TimedResult)
+
+
+class ResultHistory(Generic[T]):
+
+    def __init__(
+        self,
+        keep_seconds: float,
+        capacity: int = 256,
+        label_getter: Callable[[T], Iterable[Hashable]] | None = None,
+    ):
+        """
+        按识别时间排序的定长环形缓冲区 用于保存模型的历史识别结果
+
+        追加和过期都是 O(1) 操作
+        - 超过容量时 自动丢弃最旧的结果
+        - 追加时 丢弃与新结果时间差超过 keep_seconds 的结果
+
+        Args:
+            keep_seconds: 保留多长时间的识别结果
+            capacity: 最多保留多少个识别结果
+            label_getter: 获取一个识别结果中包含的标签 用于按标签查询
+        """
+        self.keep_seconds: float = keep_seconds
+        self.capacity: int = capacity
+        self._label_getter: Callable[[T], Iterable[Hashable]] | None = label_getter
+        self._buffer: deque[T] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def append(self, result: T) -> None:
+        """
+        追加一个识别结果 并丢弃过期的结果
+
+        Args:
+            result: 识别结果 识别时间应不早于已有的结果
+        """
+        with self._lock:
+            self._buffer.append(result)
+            self._expire(result.run_time)
+
+    def expire(self, now: float | None = None) -> None:
+        """
+        丢弃过期的结果
+
+        Args:
+            now: 当前时间 不传入时使用系统时间
+        """
+        with self._lock:
+            self._expire(time.time() if now is None else now)
+
+    def _expire(self, now: float) -> None:
+        while len(self._buffer) > 0 and now - self._buffer[0].run_time > self.keep_seconds:
+            self._buffer.popleft()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buffer.clear()
+
+    @property
+    def latest(self) -> T | None:
+        """
+        最新的识别结果
+        """
+        with self._lock:
+            return self._buffer[-1] if len(self._buffer) > 0 else None
+
+    def in_window(self, window_seconds: float, now: float | None = None) -> list[T]:
+        """
+        获取时间窗口内的识别结果
+
+        Args:
+            window_seconds: 时间窗口 即最近多少秒
+            now: 当前时间 不传入时使用系统时间
+
+        Returns:
+            list[T]: 窗口内的识别结果 按识别时间从旧到新排序
+        """
+        if now is None:
+            now = time.time()
+        result_list: list[T] = []
+        with self._lock:
+            for result in reversed(self._buffer):  # 从新到旧 遇到窗口外的即可停止
+                if now - result.run_time > window_seconds:
+                    break
+                result_list.append(result)
+        result_list.reverse()
+        return result_list
+
+    def any_in_window(self, label: Hashable, window_seconds: float, now: float | None = None) -> bool:
+        """
+        时间窗口内 是否有识别结果包含特定标签
+
+        Args:
+            label: 标签
+            window_seconds: 时间窗口 即最近多少秒
+            now: 当前时间 不传入时使用系统时间
+
+        Returns:
+            bool: 是否存在
+        """
+        return self.count_in_window(label, window_seconds, now, stop_at_first=True) > 0
+
+    def count_in_window(
+        self,
+        label: Hashable,
+        window_seconds: float,
+        now: float | None = None,
+        stop_at_first: bool = False,
+    ) -> int:
+        """
+        时间窗口内 包含特定标签的识别结果数量
+
+        Args:
+            label: 标签
+            window_seconds: 时间窗口 即最近多少秒
+            now: 当前时间 不传入时使用系统时间
+            stop_at_first: 找到第一个后就停止
+
+        Returns:
+            int: 包含该标签的识别结果数量 (按帧计算)
+        """
+        if self._label_getter is None:
+            raise ValueError('未设置 label_getter 无法按标签查询')
+        if now is None:
+            now = time.time()
+
+        cnt: int = 0
+        with self._lock:
+            for result in reversed(self._buffer):
+                if now - result.run_time > window_seconds:
+                    break
+                if label in self._label_getter(result):
+                    cnt += 1
+                    if stop_at_first:
+                        break
+        return cnt
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def __iter__(self) -> Iterator[T]:
+        with self._lock:
+            return iter(list(self._buffer))
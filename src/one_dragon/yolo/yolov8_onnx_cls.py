@@ -4,8 +4,10 @@ import numpy as np
 from cv2.typing import MatLike
 from typing import Optional, List
 
+from one_dragon.base.geometry.rectangle import Rect
 from one_dragon.yolo import onnx_utils
 from one_dragon.yolo.onnx_model_loader import OnnxModelLoader
+from one_dragon.yolo.result_history import ResultHistory
 
 
 class RunContext:
@@ -36,6 +38,9 @@ class RunContext:
         self.scale_width: int = 0
         """缩放后的宽度"""
 
+        self.roi_list: Optional[List[Rect]] = None
+        """识别的区域 None 代表全图识别"""
+
 
 class ClassificationResult:
 
@@ -60,12 +65,14 @@ class Yolov8Classifier(OnnxModelLoader):
                  gpu: bool = False,
                  backup_model_name: Optional[str] = None,
                  keep_result_seconds: float = 2,
+                 roi_list: Optional[List[Rect]] = None,
                  ):
         """
         :param model_name: 模型名称 在根目录下会有一个以模型名称创建的子文件夹
         :param model_parent_dir_path: 放置所有模型的根目录
         :param gpu: 是否启用GPU加速
         :param keep_result_seconds: 保留多长时间的识别结果
+        :param roi_list: 默认的识别区域 目标只会出现在固定区域时使用 不传入时全图识别
         """
         OnnxModelLoader.__init__(
             self,
@@ -76,31 +83,52 @@ class Yolov8Classifier(OnnxModelLoader):
             gh_proxy_url=gh_proxy_url,
             personal_proxy=personal_proxy,
             gpu=gpu,
-            backup_model_name=backup_model_name
+            backup_model_name=backup_model_name,
+            roi_list=roi_list,
         )
 
         self.keep_result_seconds: float = keep_result_seconds  # 保留识别结果的秒数
-        self.run_result_history: List[ClassificationResult] = []  # 历史识别结果
+        self.run_result_history: ResultHistory[ClassificationResult] = ResultHistory(
+            keep_seconds=keep_result_seconds,
+            label_getter=lambda result: (result.class_idx,),
+        )  # 历史识别结果 可按分类下标查询 见 ResultHistory
 
-    def run(self, image: MatLike, conf: float = 0.9, run_time: Optional[float] = None) -> ClassificationResult:
+    def run(self, image: MatLike, conf: float = 0.9, run_time: Optional[float] = None,
+            roi_list: Optional[List[Rect]] = None) -> ClassificationResult:
         """
         对图片进行识别
         :param image: 使用 opencv 读取的图片 RGB通道
         :param conf: 置信度阈值
+        :param roi_list: 限定识别的区域 各区域裁剪后合并成一次推理 取置信度最高的区域作为结果。不传入时使用模型默认的区域
         :return: 识别结果
         """
         t1 = time.time()
         context = RunContext(image, run_time)
         context.conf = conf
+        context.roi_list = self.get_roi_list(image, roi_list)
+
+        if context.roi_list is None:
+            input_tensor = self.prepare_input(context)
+            t2 = time.time()
 
-        input_tensor = self.prepare_input(context)
-        t2 = time.time()
+            outputs = self.inference(input_tensor)
+            t3 = time.time()
+
+            result = self.process_output(outputs, context)
+            t4 = time.time()
+        else:
+            input_tensor_list = [
+                onnx_utils.scale_input_image_u(context.img[roi.y1:roi.y2, roi.x1:roi.x2],
+                                               self.onnx_input_width, self.onnx_input_height)[0]
+                for roi in context.roi_list
+            ]
+            t2 = time.time()
 
-        outputs = self.inference(input_tensor)
-        t3 = time.time()
+            outputs = self.run_session_batch(self.output_names, input_tensor_list)
+            t3 = time.time()
 
-        result = self.process_output(outputs, context)
-        t4 = time.time()
+            result = self.process_roi_output(outputs, context)
+            t4 = time.time()
 
         # log.info(f'识别完毕 预处理耗时 {t2 - t1:.3f}s, 推理耗时 {t3 - t2:.3f}s, 后处理耗时 {t4 - t3:.3f}s')
 
@@ -141,6 +169,23 @@ class Yolov8Classifier(OnnxModelLoader):
         )
         return result
 
+    def process_roi_output(self, output, context: RunContext) -> ClassificationResult:
+        """
+        多区域推理结果的后处理 取置信度最高的区域
+        :param output: 推理结果 第0维是区域下标
+        :param context: 上下文
+        :return: 最终得到的识别结果
+        """
+        scores = np.reshape(output[0], (len(context.roi_list), -1))
+        roi_idx, idx = np.unravel_index(np.argmax(scores), scores.shape)
+        conf = scores[roi_idx, idx]
+        result = ClassificationResult(
+            raw_image=context.img,
+            run_time=context.run_time,
+            class_idx=int(idx) if conf >= context.conf else -1
+        )
+        return result
+
     def record_result(self, context: RunContext, result: ClassificationResult) -> None:
         """
         记录本帧识别结果
@@ -149,12 +194,7 @@ class Yolov8Classifier(OnnxModelLoader):
         :return: 组合结果
         """
         self.run_result_history.append(result)
-        self.run_result_history = [i for i in self.run_result_history
-                                   if context.run_time - i.run_time > self.keep_result_seconds]
 
     @property
     def last_run_result(self) -> Optional[ClassificationResult]:
-        if len(self.run_result_history) > 0:
-            return self.run_result_history[len(self.run_result_history) - 1]
-        else:
-            return None
+        return self.run_result_history.latest
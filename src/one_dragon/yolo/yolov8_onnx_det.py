@@ -4,12 +4,14 @@ import csv
 import numpy as np
 import os
 from cv2.typing import MatLike
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
+from one_dragon.base.geometry.rectangle import Rect
 from one_dragon.yolo import onnx_utils
 from one_dragon.yolo.detect_utils import DetectFrameResult, DetectClass, DetectContext, DetectObjectResult, xywh2xyxy, \
     multiclass_nms
 from one_dragon.yolo.onnx_model_loader import OnnxModelLoader
+from one_dragon.yolo.result_history import ResultHistory
 
 
 class Yolov8Detector(OnnxModelLoader):
@@ -23,7 +25,8 @@ class Yolov8Detector(OnnxModelLoader):
                  personal_proxy: Optional[str] = None,
                  gpu: bool = False,
                  backup_model_name: Optional[str] = None,
-                 keep_result_seconds: float = 2
+                 keep_result_seconds: float = 2,
+                 roi_list: Optional[List[Rect]] = None,
                  ):
         """
         yolov8 detect 导出 onnx 后使用
@@ -33,6 +36,7 @@ class Yolov8Detector(OnnxModelLoader):
         :param model_parent_dir_path: 放置所有模型的根目录
         :param gpu: 是否启用GPU运算
         :param keep_result_seconds: 保留多长时间的识别结果
+        :param roi_list: 默认的识别区域 目标只会出现在固定区域时使用 不传入时全图识别
         """
         OnnxModelLoader.__init__(
             self,
@@ -43,11 +47,15 @@ class Yolov8Detector(OnnxModelLoader):
             gh_proxy_url=gh_proxy_url,
             personal_proxy=personal_proxy,
             gpu=gpu,
-            backup_model_name=backup_model_name
+            backup_model_name=backup_model_name,
+            roi_list=roi_list,
         )
 
         self.keep_result_seconds: float = keep_result_seconds  # 保留识别结果的秒数
-        self.run_result_history: List[DetectFrameResult] = []  # 历史识别结果
+        self.run_result_history: ResultHistory[DetectFrameResult] = ResultHistory(
+            keep_seconds=keep_result_seconds,
+            label_getter=_get_frame_labels,
+        )  # 历史识别结果 可按标签查询 见 ResultHistory
         self.overlay_debug_bus = None
 
         self.idx_2_class: dict[int, DetectClass] = {}  # 分类
@@ -63,6 +71,7 @@ class Yolov8Detector(OnnxModelLoader):
         run_time: Optional[float] = None,
         label_list: Optional[List[str]] = None,
         category_list: Optional[List[str]] = None,
+        roi_list: Optional[List[Rect]] = None,
     ) -> DetectFrameResult:
         """
         对图片进行识别
@@ -74,6 +83,7 @@ class Yolov8Detector(OnnxModelLoader):
             run_time: 识别时间
             label_list: 限定识别的标签
             category_list: 限定识别的标签分类
+            roi_list: 限定识别的区域 各区域裁剪后合并成一次推理 结果坐标仍是原图坐标。不传入时使用模型默认的区域
 
         Returns:
             DetectFrameResult: 识别结果
@@ -84,15 +94,26 @@ class Yolov8Detector(OnnxModelLoader):
         context.iou = iou
         context.label_list = label_list
         context.category_list = category_list
+        context.roi_list = self.get_roi_list(image, roi_list)
 
-        input_tensor = self.prepare_input(context)
-        t2 = time.time()
+        if context.roi_list is None:
+            input_tensor = self.prepare_input(context)
+            t2 = time.time()
 
-        outputs = self.inference(input_tensor)
-        t3 = time.time()
+            outputs = self.inference(input_tensor)
+            t3 = time.time()
 
-        results = self.process_output(outputs, context)
-        t4 = time.time()
+            results = self.process_output(outputs, context)
+            t4 = time.time()
+        else:
+            input_tensor_list = self.prepare_roi_input(context)
+            t2 = time.time()
+
+            outputs = self.run_session_batch(self.output_names, input_tensor_list)
+            t3 = time.time()
+
+            results = self.process_roi_output(outputs, context)
+            t4 = time.time()
 
         # log.info(f'识别完毕 得到结果 {len(results)}个。预处理耗时 {t2 - t1:.3f}s, 推理耗时 {t3 - t2:.3f}s, 后处理耗时 {t4 - t3:.3f}s')
 
@@ -115,6 +136,19 @@ class Yolov8Detector(OnnxModelLoader):
         context.scale_width = scale_width
         return input_tensor
 
+    def prepare_roi_input(self, context: DetectContext) -> List[np.ndarray]:
+        """
+        按识别区域裁剪后分别进行预处理
+        """
+        input_tensor_list: List[np.ndarray] = []
+        context.roi_scale_list = []
+        for roi in context.roi_list:
+            crop = context.img[roi.y1:roi.y2, roi.x1:roi.x2]
+            input_tensor, scale_height, scale_width = onnx_utils.scale_input_image_u(crop, self.onnx_input_width, self.onnx_input_height)
+            input_tensor_list.append(input_tensor)
+            context.roi_scale_list.append((scale_height, scale_width))
+        return input_tensor_list
+
     def inference(self, input_tensor: np.ndarray):
         """
         图片输入到模型中进行推理
@@ -130,8 +164,78 @@ class Yolov8Detector(OnnxModelLoader):
         :param context: 上下文
         :return: 最终得到的识别结果
         """
-        predictions = np.squeeze(output[0]).T
+        boxes, scores, class_ids = self._decode_predictions(
+            np.squeeze(output[0], axis=0).T,
+            context,
+            scale_width=context.scale_width,
+            scale_height=context.scale_height,
+            img_width=context.img_width,
+            img_height=context.img_height,
+        )
+        return self._nms_results(boxes, scores, class_ids, context)
+
+    def process_roi_output(self, output, context: DetectContext) -> List[DetectObjectResult]:
+        """
+        多区域推理结果的后处理 坐标还原到原图后 跨区域一起进行NMS
+        :param output: 推理结果 第0维是区域下标
+        :param context: 上下文
+        :return: 最终得到的识别结果
+        """
+        boxes_list = []
+        scores_list = []
+        class_ids_list = []
+        for idx, roi in enumerate(context.roi_list):
+            scale_height, scale_width = context.roi_scale_list[idx]
+            boxes, scores, class_ids = self._decode_predictions(
+                output[0][idx].T,
+                context,
+                scale_width=scale_width,
+                scale_height=scale_height,
+                img_width=roi.width,
+                img_height=roi.height,
+                offset_x=roi.x1,
+                offset_y=roi.y1,
+            )
+            boxes_list.append(boxes)
+            scores_list.append(scores)
+            class_ids_list.append(class_ids)
+
+        return self._nms_results(
+            np.concatenate(boxes_list, axis=0),
+            np.concatenate(scores_list, axis=0),
+            np.concatenate(class_ids_list, axis=0),
+            context,
+        )
+
+    def _decode_predictions(
+        self,
+        predictions: np.ndarray,
+        context: DetectContext,
+        scale_width: int,
+        scale_height: int,
+        img_width: int,
+        img_height: int,
+        offset_x: int = 0,
+        offset_y: int = 0,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        将一张图片的推理结果 过滤后转化成原图坐标
 
+        Args:
+            predictions: 一张图片的推理结果 [anchors, 4 + 类别数]
+            context: 上下文
+            scale_width: 缩放后的宽度
+            scale_height: 缩放后的高度
+            img_width: 推理图片的宽度
+            img_height: 推理图片的高度
+            offset_x: 推理图片在原图中的横坐标偏移
+            offset_y: 推理图片在原图中的纵坐标偏移
+
+        Returns:
+            boxes: 原图坐标 xyxy
+            scores: 置信度
+            class_ids: 类别
+        """
         keep = np.ones(shape=(predictions.shape[1]), dtype=bool)
 
         if context.label_list is not None or context.category_list is not None:
@@ -154,21 +258,32 @@ class Yolov8Detector(OnnxModelLoader):
         predictions = predictions[scores > context.conf, :]
         scores = scores[scores > context.conf]
 
-        results: List[DetectObjectResult] = []
         if len(scores) == 0:
-            return results
+            return np.zeros((0, 4), dtype=np.float32), scores, np.zeros((0,), dtype=np.int64)
 
         # 选择置信度最高的类别
         class_ids = np.argmax(predictions[:, 4:], axis=1)
 
         # 提取Bounding box
         boxes = predictions[:, :4]  # 原始推理结果 xywh
-        scale_shape = np.array([context.scale_width, context.scale_height, context.scale_width, context.scale_height])  # 缩放后图片的大小
+        scale_shape = np.array([scale_width, scale_height, scale_width, scale_height])  # 缩放后图片的大小
         boxes = np.divide(boxes, scale_shape, dtype=np.float32)  # 转化到 0~1
-        boxes *= np.array([context.img_width, context.img_height, context.img_width, context.img_height])  # 恢复到原图的坐标
+        boxes *= np.array([img_width, img_height, img_width, img_height])  # 恢复到推理图片的坐标
         boxes = xywh2xyxy(boxes)  # 转化成 xyxy
+        if offset_x != 0 or offset_y != 0:
+            boxes += np.array([offset_x, offset_y, offset_x, offset_y], dtype=np.float32)  # 恢复到原图的坐标
+
+        return boxes, scores, class_ids
+
+    def _nms_results(self, boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray,
+                     context: DetectContext) -> List[DetectObjectResult]:
+        """
+        进行NMS 获取最后的结果
+        """
+        results: List[DetectObjectResult] = []
+        if len(scores) == 0:
+            return results
 
-        # 进行NMS 获取最后的结果
         indices = multiclass_nms(boxes, scores, class_ids, context.iou)
 
         for idx in indices:
@@ -193,8 +308,6 @@ class Yolov8Detector(OnnxModelLoader):
             run_time=context.run_time
         )
         self.run_result_history.append(new_frame)
-        self.run_result_history = [i for i in self.run_result_history
-                                   if context.run_time - i.run_time <= self.keep_result_seconds]
 
         return new_frame
 
@@ -270,10 +383,7 @@ class Yolov8Detector(OnnxModelLoader):
 
     @property
     def last_run_result(self) -> Optional[DetectFrameResult]:
-        if len(self.run_result_history) > 0:
-            return self.run_result_history[len(self.run_result_history) - 1]
-        else:
-            return None
+        return self.run_result_history.latest
 
     def _load_detect_classes(self, model_dir_path: str):
         """
@@ -294,3 +404,10 @@ class Yolov8Detector(OnnxModelLoader):
                 if c.class_category not in self.category_2_idx:
                     self.category_2_idx[c.class_category] = []
                 self.category_2_idx[c.class_category].append(c.class_id)
+
+
+def _get_frame_labels(frame_result: DetectFrameResult):
+    """
+    一帧识别结果中包含的标签 供 ResultHistory 按标签查询
+    """
+    return (result.detect_class.class_name for result in frame_result.results)
@@ -5,7 +5,7 @@ from qfluentwidgets import (FluentIcon, PushButton, SpinBox, ComboBox,
                             BodyLabel)
 
 from one_dragon.base.operation.one_dragon_context import OneDragonContext
-from one_dragon.utils import cv2_utils
+from one_dragon.utils import cv2_utils, scroll_stitch_utils
 from one_dragon.utils.log_utils import log
 from one_dragon_qt.widgets.image_viewer_widget import ImageViewerWidget
 from one_dragon_qt.widgets.setting_card.multi_push_setting_card import MultiPushSettingCard
@@ -580,7 +580,8 @@ class ImageStitchingInterface(VerticalScrollInterface):
     def _perform_image_matching(self) -> tuple[int, int]:
         """执行图像匹配算法。
 
-        使用模板匹配算法在两张图像的重叠区域中寻找最佳匹配位置。
+        两张图是滚动截图时，直接计算滚动距离得到第二张图的位置；
+        否则使用模板匹配算法在两张图像的重叠区域中寻找最佳匹配位置。
 
         Returns:
             tuple[int, int]: 匹配得到的偏移量（相对于初始位置的调整）
@@ -591,6 +592,11 @@ class ImageStitchingInterface(VerticalScrollInterface):
         if self.base_image is None or self.second_image is None:
             return 0, 0
 
+        # 滚动截图可以直接计算滚动距离
+        scroll_pos = self._match_by_scroll_offset()
+        if scroll_pos is not None:
+            return scroll_pos[0] - self.second_image_x, scroll_pos[1] - self.second_image_y
+
         # 根据拼接方向提取匹配区域
         base_region, second_region = self._extract_matching_regions()
 
@@ -614,6 +620,47 @@ class ImageStitchingInterface(VerticalScrollInterface):
         log.info(f'匹配成功，匹配度: {max_val:.3f}')
         return offset_x, offset_y
 
+    def _match_by_scroll_offset(self) -> tuple[int, int] | None:
+        """按滚动截图计算第二张图的位置。
+
+        两张图是滚动同一个画面得到的（上下拼接时宽度相同，左右拼接时高度相同）时，
+        计算两张图之间的滚动距离，不需要依赖重叠比例和当前位置。
+
+        Returns:
+            tuple[int, int] | None: 第二张图的绝对X和Y坐标，不是滚动截图或无法匹配时返回 None
+        """
+        if self.stitch_direction in ['top', 'bottom']:
+            axis = 0
+        elif self.stitch_direction in ['left', 'right']:
+            axis = 1
+        else:
+            return None
+
+        # 滚动方向以外的大小需要一致
+        if self.base_image.shape[1 - axis] != self.second_image.shape[1 - axis]:
+            return None
+
+        base_len = self.base_image.shape[axis]
+        second_len = self.second_image.shape[axis]
+        if self.stitch_direction in ['bottom', 'right']:
+            # 第二张图在后面，用底图的末尾和第二张图比较
+            start = max(0, base_len - second_len)
+            base_part = self.base_image[start:] if axis == 0 else self.base_image[:, start:]
+            offset = scroll_stitch_utils.estimate_scroll_offset(base_part, self.second_image, axis=axis)
+            if offset is None:
+                return None
+            pos = start + offset.shift_px
+        else:
+            # 第二张图在前面，用第二张图和底图的开头比较
+            base_part = self.base_image[:second_len] if axis == 0 else self.base_image[:, :second_len]
+            offset = scroll_stitch_utils.estimate_scroll_offset(self.second_image, base_part, axis=axis)
+            if offset is None:
+                return None
+            pos = -offset.shift_px
+
+        log.info(f'按滚动截图匹配成功，滚动距离: {offset.shift:.1f}，置信度: {offset.confidence:.3f}')
+        return (0, pos) if axis == 0 else (pos, 0)
+
     def _extract_matching_regions(self) -> tuple[np.ndarray | None, np.ndarray | None]:
         """提取用于匹配的图像区域。
 
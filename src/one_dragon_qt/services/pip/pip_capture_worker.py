@@ -10,7 +10,10 @@ from one_dragon.utils.log_utils import log
 
 
 class PipCaptureWorker(QThread):
-    """独立线程截图，通过信号将帧数据传递给主线程。"""
+    """独立线程截图，通过信号将帧数据传递给主线程。
+
+    截图总线上的帧是只读的，不会再被修改，直接传递不需要复制。
+    """
 
     frame_ready = Signal(np.ndarray)
 
@@ -42,7 +45,7 @@ class PipCaptureWorker(QThread):
                 frame = None
 
             if frame is not None:
-                self.frame_ready.emit(frame.copy())
+                self.frame_ready.emit(frame)
 
             elapsed = time.perf_counter() - start
             sleep_time = self._target_interval - elapsed
@@ -3,10 +3,8 @@ from __future__ import annotations
 from cv2.typing import MatLike
 from PySide6.QtCore import QTimer
 
+from one_dragon.base.controller.frame_bus import FrameSubscriber
 from one_dragon.base.controller.pc_controller_base import PcControllerBase
-from one_dragon.base.controller.pc_screenshot.pc_screenshot_controller import (
-    PcScreenshotController,
-)
 from one_dragon.base.operation.one_dragon_context import OneDragonContext
 from one_dragon.utils.log_utils import log
 from one_dragon_qt.services.pip.pip_capture_worker import PipCaptureWorker
@@ -24,13 +22,14 @@ class PipModeManager:
     """
 
     POLL_INTERVAL_MS: int = 200
+    CAPTURE_FPS: int = 30
 
     def __init__(self, ctx: OneDragonContext) -> None:
         self.ctx = ctx
         self._controller: PcControllerBase | None = None
         self._pip_window: PipWindow | None = None
         self._worker: PipCaptureWorker | None = None
-        self._screenshot_ctrl: PcScreenshotController | None = None
+        self._frame_subscriber: FrameSubscriber | None = None
         self._poll_timer = QTimer()
         self._poll_timer.timeout.connect(self._on_poll)
         self._active: bool = False
@@ -84,9 +83,10 @@ class PipModeManager:
             self._pip_window.hide()
             self._pip_window.deleteLater()
             self._pip_window = None
-        if self._screenshot_ctrl is not None:
-            self._screenshot_ctrl.cleanup()
-            self._screenshot_ctrl = None
+        if self._frame_subscriber is not None:
+            self._frame_subscriber.unsubscribe()
+            log.debug(self._frame_subscriber.stats_display)
+            self._frame_subscriber = None
         self._controller = None
 
     def _on_poll(self) -> None:
@@ -94,7 +94,7 @@ class PipModeManager:
 
         三个阶段:
         1. 等待 controller 出现（游戏未启动时）
-        2. 等待游戏窗口就绪并初始化截图控制器
+        2. 等待游戏窗口就绪并订阅截图总线
         3. 前台/后台切换逻辑
         """
         try:
@@ -113,15 +113,12 @@ class PipModeManager:
         if self._controller is not None and self._controller is not controller:
             self._release_resources()
 
-        # 阶段 2: 绑定 controller 并初始化截图控制器
+        # 阶段 2: 绑定 controller 并订阅截图总线 与运行中的指令、后台服务共用截图
         if self._controller is None:
             if not controller.is_game_window_ready:
                 return
             self._controller = controller
-            self._screenshot_ctrl = self._create_screenshot_controller()
-            if self._screenshot_ctrl is None:
-                self._controller = None
-                return
+            self._frame_subscriber = controller.frame_bus.subscribe('画中画', max_fps=self.CAPTURE_FPS)
 
         game_win = self._controller.game_win
         if not game_win.is_win_valid:
@@ -144,29 +141,21 @@ class PipModeManager:
                     self._worker.resume()
                 self._pip_window.show()
 
-    def _create_screenshot_controller(self) -> PcScreenshotController | None:
-        c = self._controller
-        ctrl = PcScreenshotController(c.game_win, c.standard_width, c.standard_height)
-        if ctrl.init_screenshot(c.screenshot_method) is None:
-            log.warning('画中画截图器初始化失败')
-            return None
-        return ctrl
-
     def _create_pip_and_worker(self) -> tuple[PipWindow | None, PipCaptureWorker | None]:
         """创建画中画窗口和截图线程。"""
-        if self._screenshot_ctrl is None:
+        if self._frame_subscriber is None:
             return None, None
 
-        screenshot_ctrl = self._screenshot_ctrl
+        frame_subscriber = self._frame_subscriber
         game_win = self._controller.game_win
 
         def capture() -> MatLike | None:
             if game_win.win_rect is None:
                 return None
-            return screenshot_ctrl.get_screenshot(resize=False)
+            return frame_subscriber.get_image()
 
         pip = PipWindow(self.ctx.pip_config)
-        worker = PipCaptureWorker(capture)
+        worker = PipCaptureWorker(capture, target_fps=self.CAPTURE_FPS)
         worker.frame_ready.connect(pip.on_frame_ready)
         worker.start()
 
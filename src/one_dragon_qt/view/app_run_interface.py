@@ -14,7 +14,7 @@ from one_dragon.base.operation.application.application_run_context import (
     ApplicationRunContextStateEventEnum,
     ApplicationRunResult,
 )
-from one_dragon.base.operation.context_event_bus import ContextEventItem
+from one_dragon.base.operation.context_event_bus import ContextEventItem, EventPriority
 from one_dragon.base.operation.one_dragon_context import (
     ContextKeyboardEventEnum,
     OneDragonContext,
@@ -41,10 +41,10 @@ class AppRunner(QThread):
         运行 最后发送结束信号
         :return:
         """
-        self.ctx.run_context.event_bus.listen_event(ApplicationRunContextStateEventEnum.START, self._on_state_changed)
-        self.ctx.run_context.event_bus.listen_event(ApplicationRunContextStateEventEnum.PAUSE, self._on_state_changed)
-        self.ctx.run_context.event_bus.listen_event(ApplicationRunContextStateEventEnum.STOP, self._on_state_changed)
-        self.ctx.run_context.event_bus.listen_event(ApplicationRunContextStateEventEnum.RESUME, self._on_state_changed)
+        self.ctx.run_context.event_bus.listen_event(ApplicationRunContextStateEventEnum.START, self._on_state_changed, sync=True)
+        self.ctx.run_context.event_bus.listen_event(ApplicationRunContextStateEventEnum.PAUSE, self._on_state_changed, sync=True)
+        self.ctx.run_context.event_bus.listen_event(ApplicationRunContextStateEventEnum.STOP, self._on_state_changed, sync=True)
+        self.ctx.run_context.event_bus.listen_event(ApplicationRunContextStateEventEnum.RESUME, self._on_state_changed, sync=True)
 
         self.run_result = self.ctx.run_context.run_application(
             app_id=self.app_id,
@@ -141,7 +141,7 @@ class AppRunInterface(VerticalScrollInterface):
 
     def on_interface_shown(self) -> None:
         VerticalScrollInterface.on_interface_shown(self)
-        self.ctx.listen_event(ContextKeyboardEventEnum.PRESS.value, self._on_key_press)
+        self.ctx.listen_event(ContextKeyboardEventEnum.PRESS.value, self._on_key_press, priority=EventPriority.HIGH)
 
     def on_interface_hidden(self) -> None:
         VerticalScrollInterface.on_interface_hidden(self)
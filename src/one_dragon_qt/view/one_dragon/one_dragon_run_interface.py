@@ -131,7 +131,7 @@ class OneDragonRunInterface(SplitAppRunInterface):
 
         self.ctx.listen_event(ApplicationEventId.APPLICATION_START.value, self._on_app_state_changed)
         self.ctx.listen_event(ApplicationEventId.APPLICATION_STOP.value, self._on_app_state_changed)
-        self.ctx.listen_event(ContextInstanceEventEnum.instance_active.value, self._on_instance_event)
+        self.ctx.listen_event(ContextInstanceEventEnum.instance_active.value, self._on_instance_event, sync=True)
 
         self.instance_run_opt.blockSignals(True)
         self.instance_run_opt.setValue(self.ctx.one_dragon_config.instance_run)
@@ -14,6 +14,7 @@ from qfluentwidgets import (
 from one_dragon.base.operation.one_dragon_context import OneDragonContext
 from one_dragon.envs.env_config import ProxyTypeEnum, ScreenshotMethodEnum
 from one_dragon.utils.i18_utils import gt
+from one_dragon.utils.log_utils import log
 from one_dragon_qt.widgets.setting_card.combo_box_setting_card import (
     ComboBoxSettingCard,
 )
@@ -74,6 +75,17 @@ class SettingEnvInterface(VerticalScrollInterface):
         self.debug_opt.value_changed.connect(lambda: self.ctx.init_async())
         basic_group.addSettingCard(self.debug_opt)
 
+        self.perf_trace_opt = SwitchSettingCard(
+            icon=FluentIcon.STOP_WATCH, title='性能追踪',
+            content='持续记录识别、决策和节点耗时到 .debug/perf_trace，导出后可用 ui.perfetto.dev 查看'
+        )
+        self.perf_trace_opt.value_changed.connect(lambda: self.ctx.update_perf_trace())
+        self.perf_trace_export_btn = PushButton(gt('导出'), self)
+        self.perf_trace_export_btn.clicked.connect(self.on_perf_trace_export_clicked)
+        self.perf_trace_opt.hBoxLayout.addWidget(self.perf_trace_export_btn, 0, Qt.AlignmentFlag.AlignRight)
+        self.perf_trace_opt.hBoxLayout.addSpacing(16)
+        basic_group.addSettingCard(self.perf_trace_opt)
+
         self.copy_screenshot_opt = SwitchSettingCard(
             icon=FluentIcon.CAMERA, title='复制截图到剪贴板',
             content='按下截图按键时，自动将截图复制到剪贴板'
@@ -207,6 +219,7 @@ class SettingEnvInterface(VerticalScrollInterface):
 
         self.screenshot_method_opt.init_with_adapter(self.ctx.env_config.get_prop_adapter('screenshot_method'))
         self.debug_opt.init_with_adapter(self.ctx.env_config.get_prop_adapter('is_debug'))
+        self.perf_trace_opt.init_with_adapter(self.ctx.env_config.get_prop_adapter('perf_trace_enabled'))
         self.copy_screenshot_opt.init_with_adapter(self.ctx.env_config.get_prop_adapter('copy_screenshot'))
 
         self.key_start_running_input.init_with_adapter(self.ctx.env_config.get_prop_adapter('key_start_running'))
@@ -242,6 +255,21 @@ class SettingEnvInterface(VerticalScrollInterface):
         self.ctx.gh_proxy_service.update_proxy_url()
         self.gh_proxy_url_opt.init_with_adapter(self.ctx.env_config.get_prop_adapter('gh_proxy_url'))
 
+    def on_perf_trace_export_clicked(self) -> None:
+        # 记录可能很大 在后台导出
+        self.perf_trace_export_btn.setDisabled(True)
+        self._perf_trace_export_runner = PerfTraceExportRunner(self.ctx)
+
+        def export_result(file_path: str) -> None:
+            self.perf_trace_export_btn.setDisabled(False)
+            if file_path:
+                self._show_info_bar(title='性能追踪已导出', content=file_path, duration=5000)
+            else:
+                self._show_info_bar(title='性能追踪', content='没有导出记录，请先开启性能追踪，或查看日志中的导出错误', duration=3000)
+
+        self._perf_trace_export_runner.result_signal.connect(export_result)
+        self._perf_trace_export_runner.start()
+
     def _show_info_bar(self, title: str, content: str, duration: int = 20000):
         """显示信息条"""
         InfoBar.success(
@@ -348,3 +376,19 @@ class PipSourceSpeedTestThread(SpeedTestRunnerBase):
             self.result_signal.emit(best_label, best_ms, best_source_value)
         else:
             self.result_signal.emit("Error", 9999, "")
+
+
+class PerfTraceExportRunner(QThread):
+    result_signal = Signal(str)
+
+    def __init__(self, ctx: OneDragonContext, parent=None):
+        self.ctx: OneDragonContext = ctx
+        super().__init__(parent)
+
+    def run(self):
+        try:
+            file_path = self.ctx.export_perf_trace()
+        except Exception:
+            log.error('导出性能记录失败', exc_info=True)
+            file_path = None
+        self.result_signal.emit(file_path or '')
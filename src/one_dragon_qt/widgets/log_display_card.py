@@ -1,24 +1,114 @@
-from collections import deque
+import bisect
 import logging
-from PySide6.QtCore import Signal, QObject, QTimer, QEvent
-from PySide6.QtGui import QMouseEvent
-from qfluentwidgets import PlainTextEdit, isDarkTheme
+import re
+import threading
+import weakref
+from array import array
+from collections import OrderedDict, deque
+
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QEvent,
+    QModelIndex,
+    QObject,
+    QSize,
+    Qt,
+    QTimer,
+    Signal,
+)
+from PySide6.QtGui import (
+    QColor,
+    QFont,
+    QFontMetrics,
+    QGuiApplication,
+    QKeySequence,
+    QPainter,
+)
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QHBoxLayout,
+    QStyle,
+    QStyledItemDelegate,
+    QVBoxLayout,
+    QWidget,
+)
+from qfluentwidgets import ComboBox, ListView, SearchLineEdit, isDarkTheme
+
+from one_dragon.utils.i18_utils import gt
+from one_dragon.utils.log_store import LogStore
+from one_dragon.utils.log_utils import BoundedQueueHandler
 from one_dragon.utils.log_utils import log as od_log
 from one_dragon.yolo.log_utils import log as yolo_log
-import re
+
+# 红色加粗显示的错误关键字
+_ERROR_KEYWORDS = ['失败', '错误', '异常', '警告', 'ERROR', 'WARNING', 'FAIL', 'Exception', 'Error']
+_ERROR_PATTERN = re.compile('|'.join(re.escape(i) for i in _ERROR_KEYWORDS))
+_BRACKET_PATTERN = re.compile(r'\[([^\]]+)\]')
+
+# 日志片段的样式
+SPAN_NORMAL = 0
+SPAN_BRACKET = 1  # 绿色 方括号内容
+SPAN_ERROR = 2  # 红色加粗 错误关键字
+
+LOG_SPAN_ROLE = Qt.ItemDataRole.UserRole + 1
+
+_RECEIVER_QUEUE_SIZE = 10000  # 共用接收器的日志队列上限
+_RECEIVER_FLUSH_TIMEOUT = 0.5  # 停止显示时 等待队列中的日志写入存储的最长秒数
+
+
+def split_log_spans(text: str) -> list[tuple[str, int]]:
+    """
+    把一行日志切分成不同样式的片段
+    错误关键字显示为红色 方括号内容显示为绿色 包含错误关键字的方括号内容只突出关键字
+
+    Args:
+        text: 日志文本
+
+    Returns:
+        list[tuple[str, int]]: 片段文本 样式
+    """
+    spans: list[tuple[str, int]] = []
+    pos = 0
+    for match in _BRACKET_PATTERN.finditer(text):
+        content = match.group(1)
+        if _ERROR_PATTERN.search(content) is not None:
+            continue
+        _append_error_spans(spans, text[pos:match.start() + 1])
+        spans.append((content, SPAN_BRACKET))
+        pos = match.end() - 1
+    _append_error_spans(spans, text[pos:])
+    return spans
+
+
+def _append_error_spans(spans: list[tuple[str, int]], text: str) -> None:
+    pos = 0
+    for match in _ERROR_PATTERN.finditer(text):
+        if match.start() > pos:
+            spans.append((text[pos:match.start()], SPAN_NORMAL))
+        spans.append((match.group(0), SPAN_ERROR))
+        pos = match.end()
+    if pos < len(text):
+        spans.append((text[pos:], SPAN_NORMAL))
+
 
 class LogSignal(QObject):
     new_log = Signal(str)
 
 class LogReceiver(logging.Handler):
-    def __init__(self):
+    def __init__(self, store: LogStore | None = None):
+        """
+        Args:
+            store: 保存日志的存储 传入时新日志写入存储 不再保留在 new_logs 中
+        """
         super().__init__()
         # 限制日志数量
-        self.log_list: deque[str] = deque(maxlen=64)  
+        self.log_list: deque[str] = deque(maxlen=64)
         # 新日志
         self.new_logs: list[str] = []
         # 是否接收日志
-        self.update = False 
+        self.update = False
+        # 日志存储
+        self.store: LogStore | None = store
 
     def emit(self, record):
         """将新日志记录添加到日志队列"""
@@ -27,7 +117,10 @@ class LogReceiver(logging.Handler):
             return
         msg = self.format(record)
         self.log_list.append(msg)
-        self.new_logs.append(msg)
+        if self.store is not None:
+            self.store.append(msg, record.levelno, record.module, record.created)
+        else:
+            self.new_logs.append(msg)
 
     def get_new_logs(self) -> list[str]:
         """获取新的日志"""
@@ -39,24 +132,272 @@ class LogReceiver(logging.Handler):
         """清空日志队列"""
         self.log_list.clear()
         self.new_logs.clear()
+        if self.store is not None:
+            self.store.clear()
+
+
+class LogListModel(QAbstractListModel):
+
+    def __init__(self, store: LogStore, parent=None):
+        """
+        日志列表 只保存符合筛选条件的日志序号 文本在显示时才从存储中读取和切分
+
+        Args:
+            store: 日志存储
+        """
+        super().__init__(parent)
+        self.store: LogStore = store
+
+        self.min_level: int = 0
+        self.module: str | None = None
+        self.keyword: str = ''
+
+        self.start_seq: int = 0  # 只显示这个序号及之后的日志 存储是共用的 清空时只移动这个序号
+        self._first_seq: int = 0  # 已同步的存储最旧序号
+        self._scanned_seq: int = 0  # 已筛选到的存储序号
+        self._rows: array | None = None  # 符合筛选条件的日志序号 没有筛选条件时为 None 行号直接对应序号
+
+        self._span_cache: OrderedDict[int, list[tuple[str, int]]] = OrderedDict()  # {序号: 片段}
+        self._span_cache_size: int = 1024
+
+    @property
+    def has_filter(self) -> bool:
+        return self.min_level > 0 or self.module is not None or len(self.keyword) > 0
+
+    def rowCount(self, parent: QModelIndex | None = None) -> int:
+        if parent is not None and parent.isValid():
+            return 0
+        if self._rows is None:
+            return self._scanned_seq - self._first_seq
+        return len(self._rows)
+
+    def row_to_seq(self, row: int) -> int:
+        return self._first_seq + row if self._rows is None else self._rows[row]
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self.rowCount():
+            return None
+        seq = self.row_to_seq(index.row())
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return self.store.get_text(seq)
+        if role == LOG_SPAN_ROLE:
+            spans = self._span_cache.get(seq)
+            if spans is None:
+                text = self.store.get_text(seq)
+                if text is None:
+                    return None
+                spans = split_log_spans(text)
+                self._span_cache[seq] = spans
+                while len(self._span_cache) > self._span_cache_size:
+                    self._span_cache.popitem(last=False)
+            return spans
+        return None
+
+    def set_filter(self, min_level: int, module: str | None, keyword: str) -> None:
+        """
+        修改筛选条件 重新筛选全部日志
+
+        Args:
+            min_level: 最低日志等级
+            module: 模块名称 None 时不筛选
+            keyword: 关键字 空字符串时不筛选
+        """
+        self.min_level = min_level
+        self.module = module
+        self.keyword = keyword
+        self.reload()
+
+    def clear(self) -> None:
+        """
+        清空显示的日志 之后只显示新的日志
+        """
+        self.start_seq = self.store.end_seq
+        self.reload()
+
+    def reload(self) -> None:
+        """
+        按当前的筛选条件重新加载全部日志
+        """
+        self.beginResetModel()
+        self._first_seq = max(self.store.first_seq, self.start_seq)
+        self._scanned_seq = max(self.store.end_seq, self._first_seq)
+        self._rows = array('q', self._query(self._first_seq).tobytes()) if self.has_filter else None
+        self._span_cache.clear()
+        self.endResetModel()
+
+    def refresh(self) -> bool:
+        """
+        同步存储中的新日志和已被淘汰的旧日志
+
+        Returns:
+            bool: 是否有新的行
+        """
+        first_seq = max(self.store.first_seq, self.start_seq)
+        end_seq = self.store.end_seq
+        if end_seq < self._scanned_seq or first_seq < self._first_seq:
+            # 存储被清空了
+            self.reload()
+            return self.rowCount() > 0
+
+        if first_seq > self._first_seq:
+            # 移除已被淘汰的旧日志
+            if self._rows is None:
+                removed = min(first_seq, self._scanned_seq) - self._first_seq
+            else:
+                removed = bisect.bisect_left(self._rows, first_seq)
+            if removed > 0:
+                self.beginRemoveRows(QModelIndex(), 0, removed - 1)
+            self._first_seq = first_seq
+            self._scanned_seq = max(self._scanned_seq, first_seq)
+            if self._rows is not None:
+                del self._rows[:removed]
+            if removed > 0:
+                self.endRemoveRows()
+
+        if end_seq == self._scanned_seq:
+            return False
+
+        old_cnt = self.rowCount()
+        if self._rows is None:
+            new_cnt = end_seq - self._first_seq
+            self.beginInsertRows(QModelIndex(), old_cnt, new_cnt - 1)
+            self._scanned_seq = end_seq
+            self.endInsertRows()
+            return True
+
+        new_rows = self._query(self._scanned_seq)
+        self._scanned_seq = end_seq
+        if len(new_rows) == 0:
+            return False
+        self.beginInsertRows(QModelIndex(), old_cnt, old_cnt + len(new_rows) - 1)
+        self._rows.frombytes(new_rows.tobytes())
+        self.endInsertRows()
+        return True
+
+    def _query(self, start_seq: int | None):
+        return self.store.query(
+            min_level=self.min_level,
+            modules=None if self.module is None else [self.module],
+            keyword=self.keyword,
+            start_seq=start_seq,
+        )
+
+
+class LogItemDelegate(QStyledItemDelegate):
 
-
-class LogDisplayCard(PlainTextEdit):
+    def __init__(self, parent=None):
+        """
+        逐行绘制可见的日志 只有滚动到的行才会切分和绘制
+        """
+        QStyledItemDelegate.__init__(self, parent)
+        self.text_color: QColor = QColor('#FFFFFF')
+        self.bracket_color: QColor = QColor('#00D9A3')
+        self.error_color: QColor = QColor('#FF6B6B')
+        self._hover_row = -1
+
+    def setHoverRow(self, row: int):
+        """兼容 qfluentwidgets ListView"""
+        self._hover_row = row
+
+    def setPressedRow(self, row: int):
+        """兼容 qfluentwidgets ListView"""
+        pass
+
+    def setSelectedRows(self, indexes):
+        """兼容 qfluentwidgets ListView"""
+        pass
+
+    def paint(self, painter: QPainter, option, index):
+        painter.save()
+        rect = option.rect
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(rect, QColor(128, 128, 128, 60))
+        elif index.row() == self._hover_row:
+            painter.fillRect(rect, QColor(128, 128, 128, 20))
+
+        spans = index.data(LOG_SPAN_ROLE) or []
+        normal_font = QFont(option.font)
+        bold_font = QFont(option.font)
+        bold_font.setBold(True)
+        normal_metrics = QFontMetrics(normal_font)
+        bold_metrics = QFontMetrics(bold_font)
+
+        x = rect.left() + 4
+        baseline = rect.top() + (rect.height() + normal_metrics.ascent() - normal_metrics.descent()) // 2
+        for text, span_type in spans:
+            if x > rect.right():
+                break
+            if span_type == SPAN_ERROR:
+                painter.setFont(bold_font)
+                painter.setPen(self.error_color)
+                metrics = bold_metrics
+            else:
+                painter.setFont(normal_font)
+                painter.setPen(self.bracket_color if span_type == SPAN_BRACKET else self.text_color)
+                metrics = normal_metrics
+            painter.drawText(x, baseline, text)
+            x += metrics.horizontalAdvance(text)
+
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), QFontMetrics(option.font).height() + 4)
+
+
+class LogDisplayCard(QWidget):
     userWheelScroll = Signal()
 
     def __init__(self, parent=None):
         super().__init__(parent=parent)
 
-        # 设置只读
-        self.setReadOnly(True)
+        # 日志保存在磁盘上 列表只绘制可见的行 所有卡片共用一个接收器和存储
+        self.receiver = _get_shared_receiver()
+        self.store: LogStore = self.receiver.store
+        self.model = LogListModel(self.store, self)
+
+        # 筛选条件
+        self.level_opt = ComboBox(self)
+        for level_name, levelno in [('全部等级', 0), ('DEBUG', logging.DEBUG), ('INFO', logging.INFO),
+                                    ('WARNING', logging.WARNING), ('ERROR', logging.ERROR)]:
+            self.level_opt.addItem(gt(level_name), userData=levelno)
+        self.level_opt.currentIndexChanged.connect(self._on_filter_changed)
+
+        self.module_opt = ComboBox(self)
+        self.module_opt.addItem(gt('全部模块'), userData=None)
+        self.module_opt.currentIndexChanged.connect(self._on_filter_changed)
+        self._module_cnt = 0  # 下拉框中已添加的模块数量
+
+        self.search_input = SearchLineEdit(self)
+        self.search_input.setPlaceholderText(gt('搜索日志'))
+        self.search_input.textChanged.connect(self._on_search_changed)
+        # 输入停顿后再搜索
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.timeout.connect(self._on_filter_changed)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.setContentsMargins(0, 0, 0, 0)
+        filter_layout.addWidget(self.level_opt)
+        filter_layout.addWidget(self.module_opt)
+        filter_layout.addWidget(self.search_input, stretch=1)
+
+        self.delegate = LogItemDelegate(self)
+        self.list_view = ListView(self)
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(self.delegate)
+        self.list_view.setUniformItemSizes(True)  # 所有行同高 滚动条不需要计算每行的高度
+        self.list_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.list_view.installEventFilter(self)
+        self.list_view.viewport().installEventFilter(self)
+
+        main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(0, 0, 0, 0)
+        main_layout.addLayout(filter_layout)
+        main_layout.addWidget(self.list_view, stretch=1)
 
         # 初始化颜色
-        self.init_color()  
-
-        # 初始化接收器
-        self.receiver = LogReceiver()
-        od_log.addHandler(self.receiver)
-        yolo_log.addHandler(self.receiver)
+        self.init_color()
 
         # 初始化定时器
         self.update_timer = QTimer()
@@ -75,37 +416,45 @@ class LogDisplayCard(PlainTextEdit):
         self.auto_scroll = False
 
         # 更新频率(毫秒)
-        self.update_frequency = 100 
+        self.update_frequency = 100
 
         # 日志是否运行
-        self.is_running = False  
+        self.is_running = False
 
         # 暂停标记
         self.is_pause = False
 
-        # 限制显示行数
-        self.setMaximumBlockCount(192)
+    def verticalScrollBar(self):
+        return self.list_view.verticalScrollBar()
 
     def init_color(self):
         """根据主题设置颜色"""
         if isDarkTheme():
+            self._text_color = '#FFFFFF'
             self._color = '#00D9A3'  # 绿色(方括号内容)
             self._error_color = '#FF6B6B'  # 红色(错误关键字)
         else:
+            self._text_color = '#000000'
             self._color = '#00A064'  # 绿色(方括号内容)
             self._error_color = '#E74C3C'  # 红色(错误关键字)
+        self.delegate.text_color = QColor(self._text_color)
+        self.delegate.bracket_color = QColor(self._color)
+        self.delegate.error_color = QColor(self._error_color)
+        self.list_view.viewport().update()
+
+    def clear(self):
+        """清空显示的日志"""
+        self.model.clear()
 
     def start(self, clear_log: bool = False):
         """启动日志显示"""
         if clear_log:
-            self.receiver.clear_logs()
             self.clear()
         self.init_color()
-        self.receiver.update = True
+        _set_card_receiving(self, True)
         if not self.is_running:
             self.is_running = True
         if not self.is_pause:
-            self.receiver.clear_logs()
             self.clear()
         self.auto_scroll = True
         self.update_timer.start(self.update_frequency)
@@ -118,7 +467,7 @@ class LogDisplayCard(PlainTextEdit):
         self.auto_scroll = False
         self.update_timer.stop()
         self.scroll_reset_timer.stop()
-        self.receiver.update = False
+        _set_card_receiving(self, False)
 
     def stop(self):
         """停止日志显示"""
@@ -129,30 +478,59 @@ class LogDisplayCard(PlainTextEdit):
         self.auto_scroll = False
         self.update_timer.stop()
         self.scroll_reset_timer.stop()
+        _flush_shared_receiver()
         self.update_logs()  # 停止后 最后更新一次日志
-        self.receiver.update = False
+        _set_card_receiving(self, False)
 
     def update_logs(self) -> None:
         """更新日志显示区域"""
-        new_logs = self.receiver.get_new_logs()
-        # 格式化日志
-        if len(new_logs) != 0:
-            formatted_logs = self._format_logs(new_logs)  
-            self.appendHtml(formatted_logs)
-        if self.auto_scroll:
-            self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())  # 滚动到最新位置
-
-    def mousePressEvent(self, event: QMouseEvent):
+        # 只同步新日志的序号 文本在绘制可见行时才读取
+        has_new = self.model.refresh()
+        self._update_module_opt()
+        if has_new and self.auto_scroll:
+            self.list_view.scrollToBottom()  # 滚动到最新位置
+
+    def _update_module_opt(self) -> None:
+        """把新出现的模块加入下拉框"""
+        module_names = self.store.module_names
+        if len(module_names) < self._module_cnt:  # 存储被清空了 保留已有的选项
+            self._module_cnt = 0
+        for module in module_names[self._module_cnt:]:
+            if self.module_opt.findData(module) < 0:
+                self.module_opt.addItem(module, userData=module)
+        self._module_cnt = len(module_names)
+
+    def _on_search_changed(self, text: str) -> None:
+        self.search_timer.start(300)
+
+    def _on_filter_changed(self, *args) -> None:
+        """筛选条件变化后 重新筛选全部日志"""
+        self.search_timer.stop()
+        self.model.set_filter(
+            min_level=self.level_opt.currentData() or 0,
+            module=self.module_opt.currentData(),
+            keyword=self.search_input.text().strip(),
+        )
+        if self.auto_scroll or not self.model.has_filter:
+            self.list_view.scrollToBottom()
+
+    def copy_selected_logs(self) -> None:
+        """复制选中的日志"""
+        rows = sorted(i.row() for i in self.list_view.selectionModel().selectedRows())
+        if len(rows) == 0:
+            return
+        texts = [self.model.data(self.model.index(row)) or '' for row in rows]
+        QGuiApplication.clipboard().setText('\n'.join(texts))
+
+    def _on_mouse_press(self):
         """处理鼠标点击事件"""
         self._mouse_button_down = True
         self.auto_scroll = False
-        super().mousePressEvent(event)
         self.scroll_reset_timer.stop()
 
-    def mouseReleaseEvent(self, event: QMouseEvent):
+    def _on_mouse_release(self):
         """处理鼠标释放事件"""
         self._mouse_button_down = False
-        super().mouseReleaseEvent(event)
         self.scroll_reset_timer.start(15000)  # 15秒
 
     def _on_user_wheel_scroll(self):
@@ -162,7 +540,7 @@ class LogDisplayCard(PlainTextEdit):
 
     def _enable_auto_scroll(self):
         """在用户滚动一段时间后恢复自动滚动"""
-        if self.is_running and not self.is_pause and not self.textCursor().hasSelection():
+        if self.is_running and not self.is_pause and not self.list_view.selectionModel().hasSelection():
             self.auto_scroll = True
 
     def handle_scroll_change(self, value: int):
@@ -174,53 +552,121 @@ class LogDisplayCard(PlainTextEdit):
         is_at_bottom = scrollbar.value() == scrollbar.maximum()
         is_scrollable = scrollbar.maximum() > scrollbar.minimum()
 
-        if not self.auto_scroll: 
+        if not self.auto_scroll:
             if is_at_bottom and is_scrollable:
                 if self.is_running and not self.is_pause:
                     self.auto_scroll = True
                 self.scroll_reset_timer.stop()
 
     def eventFilter(self, obj, event: QEvent):
-        if event.type() == QEvent.Type.Wheel:
+        event_type = event.type()
+        if event_type == QEvent.Type.Wheel:
             self.userWheelScroll.emit()
+        elif event_type == QEvent.Type.MouseButtonPress:
+            self._on_mouse_press()
+        elif event_type == QEvent.Type.MouseButtonRelease:
+            self._on_mouse_release()
+        elif event_type == QEvent.Type.KeyPress and obj is self.list_view and event.matches(QKeySequence.StandardKey.Copy):
+            self.copy_selected_logs()
+            return True
         return super().eventFilter(obj, event)
 
-    def _format_logs(self, log_list: list[str]) -> str:
-        """格式化日志"""
-        formatted_logs = []
-        formatted_log = ""
-
-        for log_item in log_list:
-            formatted_log = log_item
-            
-            # 1. 先处理红色错误关键字
-            error_keywords = ['失败', '错误', '异常', '警告', 'ERROR', 'WARNING', 'FAIL', 'Exception', 'Error']
-            for keyword in error_keywords:
-                if keyword in formatted_log:
-                    formatted_log = formatted_log.replace(
-                        keyword, 
-                        f'<span style="color: {self._error_color}; font-weight: bold;">{keyword}</span>'
-                    )
-            
-            # 2. 再处理绿色方括号内容(注意避免重复处理已经有HTML标签的部分)
-            if '[' in log_item and ']' in log_item:
-                # 使用正则表达式来更精确地处理方括号，避免与HTML标签冲突
-
-                pattern = r'\[([^\]]+)\]'
-                
-                def replace_brackets(match):
-                    content = match.group(1)
-                    # 检查是否已经被HTML标签包围(避免重复处理)
-                    if '<span' in content or '</span>' in content:
-                        return match.group(0)  # 返回原始内容
-                    return f'[<span style="color: {self._color};">{content}</span>]'
-                
-                formatted_log = re.sub(pattern, replace_brackets, formatted_log)
-                
-            formatted_logs.append(formatted_log)
-
-        # 检查是否有日志
-        if len(log_list) <= 1:
-            return formatted_log
+
+_shared_lock = threading.Lock()
+_shared_receiver: LogReceiver | None = None
+_shared_queue_handler: BoundedQueueHandler | None = None
+_receiving_cards: weakref.WeakSet[LogDisplayCard] = weakref.WeakSet()  # 正在显示日志的卡片
+
+
+def _get_shared_receiver() -> LogReceiver:
+    """
+    获取进程内所有日志卡片共用的接收器 第一次调用时创建 整个进程只有一个日志存储和临时目录
+
+    接收器放在 BoundedQueueHandler 后面 写入存储在后台线程中进行 不阻塞打日志的线程
+    """
+    global _shared_receiver, _shared_queue_handler
+    with _shared_lock:
+        if _shared_receiver is None:
+            receiver = LogReceiver(LogStore())
+            queue_handler = BoundedQueueHandler(_RECEIVER_QUEUE_SIZE, [receiver])
+            od_log.addHandler(queue_handler)
+            yolo_log.addHandler(queue_handler)
+            _shared_receiver = receiver
+            _shared_queue_handler = queue_handler
+        return _shared_receiver
+
+
+def _set_card_receiving(card: LogDisplayCard, receiving: bool) -> None:
+    """
+    修改卡片是否在显示日志 有任意一个卡片在显示时 共用的接收器才接收日志
+
+    Args:
+        card: 日志卡片
+        receiving: 是否在显示日志
+    """
+    with _shared_lock:
+        if receiving:
+            _receiving_cards.add(card)
         else:
-            return '<br>'.join(formatted_logs)
+            _receiving_cards.discard(card)
+        card.receiver.update = len(_receiving_cards) > 0
+
+
+def _flush_shared_receiver() -> None:
+    """
+    等待队列中的日志写入共用的存储
+    """
+    if _shared_queue_handler is not None:
+        _shared_queue_handler.wait_flushed(_RECEIVER_FLUSH_TIMEOUT)
+
+
+def __debug_benchmark():
+    """
+    往日志列表中写入 100万 条日志 统计同步、筛选和绘制的耗时
+    """
+    import random
+    import time
+
+    from PySide6.QtWidgets import QApplication
+
+    app = QApplication([])
+    card = LogDisplayCard()
+    card.resize(800, 600)
+    card.show()
+
+    words = ['识别画面', '点击', '等待', '大世界', '战斗', '空洞', '[商店]', '寻路失败', '截图', 'screen']
+    t1 = time.perf_counter()
+    for i in range(1_000_000):
+        card.store.append(f'[{i}] {random.choice(words)} {random.choice(words)}',
+                          random.choice([logging.DEBUG, logging.INFO, logging.WARNING]), 'benchmark')
+    t2 = time.perf_counter()
+    card.update_logs()
+    t3 = time.perf_counter()
+    app.processEvents()
+    card.list_view.viewport().repaint()
+    t4 = time.perf_counter()
+    print(f'写入 {t2 - t1:.2f}s 同步 {(t3 - t2) * 1000:.1f}ms 绘制 {(t4 - t3) * 1000:.1f}ms 行数 {card.model.rowCount()}')
+
+    for level_idx, keyword in [(3, ''), (0, '寻路失败'), (0, '[123456]')]:
+        t1 = time.perf_counter()
+        card.level_opt.setCurrentIndex(level_idx)
+        card.search_input.setText(keyword)
+        card._on_filter_changed()
+        card.list_view.viewport().repaint()
+        print(f'筛选 等级={card.level_opt.currentText()} 关键字={keyword} 行数 {card.model.rowCount()} '
+              f'{(time.perf_counter() - t1) * 1000:.1f}ms')
+
+    t1 = time.perf_counter()
+    scrollbar = card.verticalScrollBar()
+    card.level_opt.setCurrentIndex(0)
+    card.search_input.setText('')
+    card._on_filter_changed()
+    for _ in range(100):
+        scrollbar.setValue(random.randint(0, scrollbar.maximum()))
+        card.list_view.viewport().repaint()
+    print(f'随机滚动并绘制 {(time.perf_counter() - t1) * 10:.2f}ms/次')
+    card.store.close()
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
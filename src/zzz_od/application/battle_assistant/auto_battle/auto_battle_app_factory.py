@@ -5,9 +5,6 @@ from typing import TYPE_CHECKING
 from one_dragon.base.operation.application.application_factory import ApplicationFactory
 from one_dragon.base.operation.application_base import Application
 from zzz_od.application.battle_assistant.auto_battle import auto_battle_const
-from zzz_od.application.battle_assistant.auto_battle.auto_battle_app import (
-    AutoBattleApp,
-)
 
 if TYPE_CHECKING:
     from zzz_od.context.zzz_context import ZContext
@@ -20,4 +17,8 @@ class AutoBattleAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.battle_assistant.auto_battle.auto_battle_app import (
+            AutoBattleApp,
+        )
+
         return AutoBattleApp(self.ctx)
@@ -5,9 +5,6 @@ from typing import TYPE_CHECKING
 from one_dragon.base.operation.application.application_factory import ApplicationFactory
 from one_dragon.base.operation.application_base import Application
 from zzz_od.application.battle_assistant.dodge_assitant import dodge_assistant_const
-from zzz_od.application.battle_assistant.dodge_assitant.dodge_assistant_app import (
-    DodgeAssistantApp,
-)
 
 if TYPE_CHECKING:
     from zzz_od.context.zzz_context import ZContext
@@ -47,4 +44,8 @@ class DodgeAssistantFactory(ApplicationFactory):
         Returns:
             Application: 闪避助手应用实例
         """
+        from zzz_od.application.battle_assistant.dodge_assitant.dodge_assistant_app import (
+            DodgeAssistantApp,
+        )
+
         return DodgeAssistantApp(self.ctx)
@@ -7,7 +7,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.charge_plan import charge_plan_const
-from zzz_od.application.charge_plan.charge_plan_app import ChargePlanApp
 from zzz_od.application.charge_plan.charge_plan_config import ChargePlanConfig
 from zzz_od.application.charge_plan.charge_plan_run_record import ChargePlanRunRecord
 
@@ -22,6 +21,8 @@ class ChargePlanAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.charge_plan.charge_plan_app import ChargePlanApp
+
         return ChargePlanApp(self.ctx)
 
     def create_config(
@@ -6,7 +6,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.city_fund import city_fund_const
-from zzz_od.application.city_fund.city_fund_app import CityFundApp
 from zzz_od.application.city_fund.city_fund_run_record import CityFundRunRecord
 
 if TYPE_CHECKING:
@@ -20,6 +19,8 @@ class CityFundAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.city_fund.city_fund_app import CityFundApp
+
         return CityFundApp(self.ctx)
 
     def create_run_record(self, instance_idx: int) -> AppRunRecord:
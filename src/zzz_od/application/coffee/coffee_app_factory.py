@@ -7,7 +7,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.coffee import coffee_app_const
-from zzz_od.application.coffee.coffee_app import CoffeeApp
 from zzz_od.application.coffee.coffee_config import CoffeeConfig
 from zzz_od.application.coffee.coffee_run_record import CoffeeRunRecord
 
@@ -22,6 +21,8 @@ class CoffeeAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.coffee.coffee_app import CoffeeApp
+
         return CoffeeApp(self.ctx)
 
     def create_config(
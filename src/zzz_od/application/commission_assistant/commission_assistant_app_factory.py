@@ -6,9 +6,6 @@ from one_dragon.base.operation.application.application_config import Application
 from one_dragon.base.operation.application.application_factory import ApplicationFactory
 from one_dragon.base.operation.application_base import Application
 from zzz_od.application.commission_assistant import commission_assistant_const
-from zzz_od.application.commission_assistant.commission_assistant_app import (
-    CommissionAssistantApp,
-)
 from zzz_od.application.commission_assistant.commission_assistant_config import (
     CommissionAssistantConfig,
 )
@@ -24,6 +21,10 @@ class CommissionAssistantAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.commission_assistant.commission_assistant_app import (
+            CommissionAssistantApp,
+        )
+
         return CommissionAssistantApp(self.ctx)
 
     def create_config(
@@ -6,7 +6,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.daily_signin import daily_signin_const
-from zzz_od.application.daily_signin.daily_signin_app import DailySignInApp
 from zzz_od.application.daily_signin.daily_signin_config import (
     DailySignInConfig,
 )
@@ -26,6 +25,8 @@ class DailySignInFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.daily_signin.daily_signin_app import DailySignInApp
+
         return DailySignInApp(self.ctx, instance_idx, group_id)
 
     def create_config(self, instance_idx: int, group_id: str) -> DailySignInConfig:
@@ -5,9 +5,11 @@ import numpy as np
 from cv2.typing import MatLike
 
 from one_dragon.base.geometry.point import Point
+from one_dragon.base.geometry.rectangle import Rect
 from one_dragon.base.matcher.match_result import MatchResult, MatchResultList
 from one_dragon.utils import cv2_utils, cal_utils
 from zzz_od.application.devtools.large_map_recorder.large_map_recorder_wrapper import LargeMapSnapshot, MiniMapSnapshot
+from zzz_od.application.devtools.large_map_recorder.tiled_road_canvas import TiledRoadCanvas
 from zzz_od.application.world_patrol.world_patrol_area import WorldPatrolLargeMapIcon, WorldPatrolLargeMap
 from zzz_od.context.zzz_context import ZContext
 from zzz_od.application.world_patrol import cal_pos_utils
@@ -54,6 +56,7 @@ def merge_large_map(
         large_map: LargeMapSnapshot,
         mini_map: MiniMapSnapshot,
         pos_mr: MatchResult,
+        copy_road: bool = False,
 ) -> LargeMapSnapshot:
     """
     将图标合并到现有的大地图上
@@ -62,6 +65,7 @@ def merge_large_map(
         large_map: 大地图
         mini_map: 当前的道路掩码
         pos_mr: 坐标
+        copy_road: 是否要复制道路
 
     Returns:
         MatLike: 合并后的大地图
@@ -78,7 +82,7 @@ def merge_large_map(
         return large_map
 
     # 将道路掩码合并到大地图上
-    merged_map = _merge_at_position(large_map, to_use, pos_mr)
+    merged_map = _merge_at_position(large_map, to_use, pos_mr, copy_road=copy_road)
 
     # 检查并扩展边缘
     final_map = _expand_edges_if_needed(merged_map, (to_use.road_mask.shape[0], to_use.road_mask.shape[1]))
@@ -98,18 +102,14 @@ def _initialize_large_map(mini_map: MiniMapSnapshot) -> LargeMapSnapshot:
     """
     mask_height, mask_width = mini_map.road_mask.shape[:2]
 
-    # 创建3x3大小的大地图
-    large_height = mask_height * 3
-    large_width = mask_width * 3
-
-    # 初始化为全黑（0值）
-    large_map = np.zeros((large_height, large_width), dtype=np.uint8)
+    # 创建3x3大小的大地图 画布只为有道路的区域分配块
+    canvas = TiledRoadCanvas()
 
     # 将第一张小地图放在中心位置
     center_y = mask_height  # 中心位置的y坐标
     center_x = mask_width   # 中心位置的x坐标
 
-    large_map[center_y:center_y + mask_height, center_x:center_x + mask_width] = mini_map.road_mask
+    canvas.paste(mini_map.road_mask, center_x, center_y)
 
     icon_list = []
     for icon_name, icon_pos in mini_map.icon_list:
@@ -124,13 +124,15 @@ def _initialize_large_map(mini_map: MiniMapSnapshot) -> LargeMapSnapshot:
     # Create a temporary WorldPatrolLargeMap to pass to LargeMapSnapshot
     temp_world_patrol_map = WorldPatrolLargeMap(
         area_full_id="",  # Empty area_full_id for initialization
-        road_mask=large_map,
+        road_mask=None,
         icon_list=icon_list
     )
 
     return LargeMapSnapshot(
         world_patrol_large_map=temp_world_patrol_map,
         pos_after_merge=Point(center_x, center_y) + Point(mask_width // 2, mask_height // 2),
+        canvas=canvas,
+        canvas_rect=Rect(0, 0, mask_width * 3, mask_height * 3),
     )
 
 
@@ -155,18 +157,6 @@ def _merge_at_position(
     x = pos_mr.x
     y = pos_mr.y
 
-    # 创建大地图的副本
-    merged_road_mask = large_map.road_mask.copy()
-
-    if copy_road:
-        mask_height, mask_width = mini_map.road_mask.shape[:2]
-
-        # 使用按位或操作合并掩码，这样可以保留两个掩码的所有道路信息
-        merged_road_mask[y:y + mask_height, x:x + mask_width] = cv2.bitwise_or(
-            merged_road_mask[y:y + mask_height, x:x + mask_width],
-            mini_map.road_mask,
-        )
-
     icon_list: list[WorldPatrolLargeMapIcon] = [
         WorldPatrolLargeMapIcon(
             icon_name=icon.icon_name,
@@ -199,15 +189,24 @@ def _merge_at_position(
     # Create a temporary WorldPatrolLargeMap to pass to LargeMapSnapshot
     temp_world_patrol_map = WorldPatrolLargeMap(
         area_full_id=large_map.area_full_id,
-        road_mask=merged_road_mask,
+        road_mask=None,
         icon_list=icon_list
     )
 
-    return LargeMapSnapshot(
+    # 画布写时复制 只有合并涉及的块会被复制 原来的大地图保持不变 可以用于回退
+    merged_map = LargeMapSnapshot(
         world_patrol_large_map=temp_world_patrol_map,
         pos_after_merge=pos_mr.center,
+        canvas=large_map.canvas,
+        canvas_rect=large_map.canvas_rect,
     )
 
+    if copy_road:
+        # 使用按位或操作合并掩码，这样可以保留两个掩码的所有道路信息
+        merged_map.merge_road(mini_map.road_mask, x, y)
+
+    return merged_map
+
 
 def _expand_edges_if_needed(
         large_map: LargeMapSnapshot,
@@ -223,9 +222,8 @@ def _expand_edges_if_needed(
     Returns:
         LargeMapSnapshot: 可能扩展后的大地图
     """
-    road_mask = large_map.road_mask
     mask_height, mask_width = mask_shape
-    large_height, large_width = road_mask.shape[0], road_mask.shape[1]
+    large_height, large_width = large_map.height, large_map.width
 
     # 检查边缘是否需要扩展，使用更精确的检测
     expand_top = expand_bottom = expand_left = expand_right = 0
@@ -234,36 +232,39 @@ def _expand_edges_if_needed(
     edge_thickness_h = mask_height // 2
     edge_thickness_w = mask_width // 2
 
+    # 画布增量维护了有道路的区域 不需要扫描整张图
+    content_rect = large_map.get_content_rect()
+    if content_rect is None:
+        return large_map
+
     # 检查顶部边缘
-    if np.any(road_mask[:edge_thickness_h, :] > 0):
+    if content_rect.y1 < edge_thickness_h:
         expand_top = mask_height
 
     # 检查底部边缘
-    if np.any(road_mask[-edge_thickness_h:, :] > 0):
+    if content_rect.y2 > large_height - edge_thickness_h:
         expand_bottom = mask_height
 
     # 检查左侧边缘
-    if np.any(road_mask[:, :edge_thickness_w] > 0):
+    if content_rect.x1 < edge_thickness_w:
         expand_left = mask_width
 
     # 检查右侧边缘
-    if np.any(road_mask[:, -edge_thickness_w:] > 0):
+    if content_rect.x2 > large_width - edge_thickness_w:
         expand_right = mask_width
 
     # 如果不需要扩展，直接返回原地图
     if expand_top == 0 and expand_bottom == 0 and expand_left == 0 and expand_right == 0:
         return large_map
 
-    # 计算新的地图尺寸
-    new_height = large_height + expand_top + expand_bottom
-    new_width = large_width + expand_left + expand_right
-
-    # 创建扩展后的地图
-    expanded_map = np.zeros((new_height, new_width), dtype=np.uint8)
-
-    # 将原地图复制到新位置
-    expanded_map[expand_top:expand_top + large_height,
-                 expand_left:expand_left + large_width] = road_mask
+    # 扩展只改变大地图在画布上的区域 道路掩码不需要复制
+    canvas_rect = large_map.canvas_rect
+    expanded_rect = Rect(
+        canvas_rect.x1 - expand_left,
+        canvas_rect.y1 - expand_top,
+        canvas_rect.x2 + expand_right,
+        canvas_rect.y2 + expand_bottom,
+    )
 
     left_top = Point(expand_left, expand_top)
     new_icon_list = [
@@ -279,13 +280,15 @@ def _expand_edges_if_needed(
     # Create a temporary WorldPatrolLargeMap to pass to LargeMapSnapshot
     temp_world_patrol_map = WorldPatrolLargeMap(
         area_full_id=large_map.area_full_id,
-        road_mask=expanded_map,
+        road_mask=None,
         icon_list=new_icon_list
     )
 
     return LargeMapSnapshot(
         world_patrol_large_map=temp_world_patrol_map,
         pos_after_merge=large_map.pos_after_merge + left_top,
+        canvas=large_map.canvas,
+        canvas_rect=expanded_rect,
     )
 
 
@@ -537,10 +540,15 @@ def cal_pos_by_icon(
     # 多个候选结果时 比较和原图的相似度
     template = get_mini_map_in_circle(mini_map)
     for mr in max_confidence_list:
-        source_part = large_map.road_mask[
-                   mr.left_top.y:mr.left_top.y + template.road_mask.shape[0],
-                   mr.left_top.x:mr.left_top.x + template.road_mask.shape[1]
-                   ]
+        source_part, _ = large_map.get_road_part(Rect(
+            mr.left_top.x,
+            mr.left_top.y,
+            mr.left_top.x + template.road_mask.shape[1],
+            mr.left_top.y + template.road_mask.shape[0],
+        ))
+        if source_part.shape != template.road_mask.shape:  # 超出大地图范围
+            mr.confidence = -np.inf
+            continue
         # 置信度=差异的负数
         mr.confidence = -cv2.absdiff(source_part, template.road_mask).sum()
 
@@ -566,11 +574,24 @@ def cal_pos_by_road(
     Returns:
         MatchResult: 匹配结果
     """
-    return cal_pos_utils.cal_pos(
-        large_map.road_mask,
-        mini_map.road_mask,
-        last_pos,
-    )
+    if last_pos is None:
+        return cal_pos_utils.cal_pos(
+            large_map.road_mask,
+            mini_map.road_mask,
+            last_pos,
+        )
+
+    # 只取上次位置附近的块进行匹配 不需要导出整张大地图
+    source, rect = large_map.get_road_part(Rect(
+        last_pos.x - mini_map.road_mask.shape[1] * 2,
+        last_pos.y - mini_map.road_mask.shape[0] * 2,
+        last_pos.x + mini_map.road_mask.shape[1] * 2,
+        last_pos.y + mini_map.road_mask.shape[0] * 2,
+    ))
+    mr = cal_pos_utils.cal_pos(source, mini_map.road_mask)
+    if mr is not None:
+        mr.add_offset(rect.left_top)
+    return mr
 
 
 def __debug():
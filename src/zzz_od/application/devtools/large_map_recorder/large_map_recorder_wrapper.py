@@ -1,7 +1,14 @@
 from cv2.typing import MatLike
 
 from one_dragon.base.geometry.point import Point
-from zzz_od.application.world_patrol.world_patrol_area import WorldPatrolLargeMapIcon, WorldPatrolLargeMap
+from one_dragon.base.geometry.rectangle import Rect
+from zzz_od.application.devtools.large_map_recorder.tiled_road_canvas import (
+    TiledRoadCanvas,
+)
+from zzz_od.application.world_patrol.world_patrol_area import (
+    WorldPatrolLargeMap,
+    WorldPatrolLargeMapIcon,
+)
 
 
 class LargeMapSnapshot(WorldPatrolLargeMap):
@@ -10,10 +17,28 @@ class LargeMapSnapshot(WorldPatrolLargeMap):
             self,
             world_patrol_large_map: WorldPatrolLargeMap,
             pos_after_merge: Point,
+            canvas: TiledRoadCanvas | None = None,
+            canvas_rect: Rect | None = None,
     ):
+        """
+        录制过程中的大地图 道路掩码保存在分块画布上
+
+        大地图坐标 (0, 0) 对应画布上 canvas_rect 的左上角
+        扩展边缘只需要改变 canvas_rect 不需要复制道路掩码
+        road_mask 是按 canvas_rect 导出的整张图 只在需要时导出
+
+        Args:
+            world_patrol_large_map: 大地图 传入 canvas 时不使用其中的道路掩码
+            pos_after_merge: 合并后的坐标
+            canvas: 分块画布 会被复制 之后的修改不会影响原画布
+            canvas_rect: 大地图在画布上的区域 传入 canvas 时需要同时传入
+        """
+        self.canvas: TiledRoadCanvas = TiledRoadCanvas()
+        self.canvas_rect: Rect = Rect(0, 0, 0, 0)
+        self._road_mask: MatLike | None = None  # 导出的整张图 修改后清空
+
         # Copy data from WorldPatrolLargeMap to avoid modifying original data
         area_full_id = world_patrol_large_map.area_full_id
-        road_mask = world_patrol_large_map.road_mask.copy() if world_patrol_large_map.road_mask is not None else None
         icon_list = [
             WorldPatrolLargeMapIcon(
                 icon_name=icon.icon_name,
@@ -24,15 +49,92 @@ class LargeMapSnapshot(WorldPatrolLargeMap):
             for icon in world_patrol_large_map.icon_list
         ]
 
-        # Initialize parent class with copied data
-        super().__init__(area_full_id, road_mask, icon_list)
+        if canvas is None:
+            # 父类中赋值 road_mask 时 从整张图创建画布
+            super().__init__(area_full_id, world_patrol_large_map.road_mask, icon_list)
+        else:
+            super().__init__(area_full_id, None, icon_list)
+            self.canvas = canvas.copy()
+            self.canvas_rect = Rect(canvas_rect.x1, canvas_rect.y1, canvas_rect.x2, canvas_rect.y2)
 
         # Add the additional property for snapshot functionality
         self.pos_after_merge: Point = pos_after_merge
 
+    @property
+    def road_mask(self) -> MatLike | None:
+        """
+        导出的整张道路掩码 只读 需要修改时整体赋值
+        """
+        if self._road_mask is None and self.canvas_rect.width > 0 and self.canvas_rect.height > 0:
+            self._road_mask = self.canvas.crop(self.canvas_rect)
+            self._road_mask.flags.writeable = False
+        return self._road_mask
+
+    @road_mask.setter
+    def road_mask(self, road_mask: MatLike | None) -> None:
+        if road_mask is None:
+            self.canvas = TiledRoadCanvas()
+            self.canvas_rect = Rect(0, 0, 0, 0)
+        else:
+            self.canvas = TiledRoadCanvas.from_dense(road_mask)
+            self.canvas_rect = Rect(0, 0, road_mask.shape[1], road_mask.shape[0])
+        self._road_mask = None
+
+    @property
+    def width(self) -> int:
+        return self.canvas_rect.width
+
+    @property
+    def height(self) -> int:
+        return self.canvas_rect.height
+
+    def merge_road(self, mask: MatLike, x: int, y: int) -> None:
+        """
+        用按位或把道路合并到大地图上 只修改涉及的块
+
+        Args:
+            mask: 道路掩码
+            x: 掩码左上角在大地图上的横坐标
+            y: 掩码左上角在大地图上的纵坐标
+        """
+        self.canvas.merge(mask, x + self.canvas_rect.x1, y + self.canvas_rect.y1)
+        self._road_mask = None
+
+    def get_road_part(self, rect: Rect) -> tuple[MatLike, Rect]:
+        """
+        获取大地图中的一块区域 只读取附近的块 不需要导出整张图
+        区域超出大地图时 和 cv2_utils.crop_image 一样裁剪到大地图范围内
+
+        Args:
+            rect: 区域 大地图坐标
+
+        Returns:
+            tuple[MatLike, Rect]: 区域内的道路掩码 和 实际的区域
+        """
+        x1 = max(0, rect.x1)
+        y1 = max(0, rect.y1)
+        x2 = min(self.width, rect.x2)
+        y2 = min(self.height, rect.y2)
+        part = self.canvas.crop(Rect(x1 + self.canvas_rect.x1, y1 + self.canvas_rect.y1,
+                                     x2 + self.canvas_rect.x1, y2 + self.canvas_rect.y1))
+        return part, Rect(x1, y1, x2, y2)
+
+    def get_content_rect(self) -> Rect | None:
+        """
+        有道路的区域 大地图坐标
+
+        Returns:
+            Rect | None: 有道路的区域 没有道路时返回 None
+        """
+        rect = self.canvas.content_rect
+        if rect is None:
+            return None
+        rect.add_offset(Point(-self.canvas_rect.x1, -self.canvas_rect.y1))
+        return rect
+
 
 class MiniMapSnapshot:
 
     def __init__(self, road_mask: MatLike, icon_list: list[tuple[str, Point]]):
         self.road_mask: MatLike = road_mask
-        self.icon_list: list[tuple[str, Point]] = icon_list
\ No newline at end of file
+        self.icon_list: list[tuple[str, Point]] = icon_list
@@ -0,0 +1,265 @@
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from one_dragon.base.geometry.rectangle import Rect
+
+DEFAULT_TILE_SIZE = 256
+
+
+class TiledRoadCanvas:
+
+    def __init__(self, tile_size: int = DEFAULT_TILE_SIZE):
+        """
+        按固定大小分块保存的道路掩码画布 只有画过的块才会分配内存
+
+        - 坐标没有范围限制 可以是负数 不需要因为靠近边缘而扩展和复制整张图
+        - 合并时只修改涉及的块 耗时只和合并区域的大小有关
+        - 复制时共用所有块 之后哪边修改了某个块 再复制这一块(写时复制) 可以低成本地保留回退用的快照
+
+        Args:
+            tile_size: 块的边长
+        """
+        self.tile_size: int = tile_size
+        self._tiles: dict[tuple[int, int], MatLike] = {}  # {(块横坐标, 块纵坐标): 块}
+        self._owned: set[tuple[int, int]] = set()  # 只属于当前画布的块 可以直接修改
+        self._content_rect: Rect | None = None  # 非零像素的外接矩形
+
+    @classmethod
+    def from_dense(cls, image: MatLike, x: int = 0, y: int = 0, tile_size: int = DEFAULT_TILE_SIZE) -> 'TiledRoadCanvas':
+        """
+        从整张图创建画布 全黑的块不保存
+
+        Args:
+            image: 单通道的道路掩码
+            x: 图片左上角在画布上的横坐标
+            y: 图片左上角在画布上的纵坐标
+            tile_size: 块的边长
+
+        Returns:
+            TiledRoadCanvas: 画布
+        """
+        canvas = cls(tile_size)
+        canvas.paste(image, x, y)
+        return canvas
+
+    @property
+    def tile_cnt(self) -> int:
+        """已分配的块数量"""
+        return len(self._tiles)
+
+    @property
+    def content_rect(self) -> Rect | None:
+        """
+        非零像素的外接矩形 画布坐标 合并时增量更新 不需要扫描整张图
+        只会扩大 被覆盖成黑色的区域不会让它缩小
+        """
+        if self._content_rect is None:
+            return None
+        return Rect(self._content_rect.x1, self._content_rect.y1, self._content_rect.x2, self._content_rect.y2)
+
+    def copy(self) -> 'TiledRoadCanvas':
+        """
+        复制画布 只复制块的索引 块在之后被修改时才复制
+
+        Returns:
+            TiledRoadCanvas: 新的画布
+        """
+        canvas = TiledRoadCanvas(self.tile_size)
+        canvas._tiles = dict(self._tiles)
+        canvas._content_rect = self.content_rect
+        # 两边都不再独占现有的块
+        self._owned = set()
+        return canvas
+
+    def merge(self, mask: MatLike, x: int, y: int) -> None:
+        """
+        用按位或把掩码合并到画布上 保留两边所有的道路
+
+        Args:
+            mask: 单通道的道路掩码
+            x: 掩码左上角在画布上的横坐标
+            y: 掩码左上角在画布上的纵坐标
+        """
+        self._draw(mask, x, y, overwrite=False)
+
+    def paste(self, image: MatLike, x: int, y: int) -> None:
+        """
+        把图片覆盖到画布上
+
+        Args:
+            image: 单通道的道路掩码
+            x: 图片左上角在画布上的横坐标
+            y: 图片左上角在画布上的纵坐标
+        """
+        self._draw(image, x, y, overwrite=True)
+
+    def crop(self, rect: Rect) -> MatLike:
+        """
+        导出画布上的一块区域 只读取和区域相交的块 没有分配的块为黑色
+
+        Args:
+            rect: 区域 画布坐标
+
+        Returns:
+            MatLike: 区域内的道路掩码 大小和区域一致
+        """
+        result = np.zeros((max(0, rect.height), max(0, rect.width)), dtype=np.uint8)
+        if rect.width <= 0 or rect.height <= 0:
+            return result
+        for (tx, ty), tile_x1, tile_y1 in self._iter_tile_keys(rect):
+            tile = self._tiles.get((tx, ty))
+            if tile is None:
+                continue
+            x1 = max(rect.x1, tile_x1)
+            y1 = max(rect.y1, tile_y1)
+            x2 = min(rect.x2, tile_x1 + self.tile_size)
+            y2 = min(rect.y2, tile_y1 + self.tile_size)
+            result[y1 - rect.y1:y2 - rect.y1, x1 - rect.x1:x2 - rect.x1] = tile[y1 - tile_y1:y2 - tile_y1,
+                                                                                x1 - tile_x1:x2 - tile_x1]
+        return result
+
+    def to_dense(self) -> tuple[MatLike, Rect | None]:
+        """
+        导出包含所有非零像素的整张图
+
+        Returns:
+            tuple[MatLike, Rect | None]: 整张图 和 它在画布上的区域 画布为空时区域为 None
+        """
+        rect = self.content_rect
+        if rect is None:
+            return np.zeros((0, 0), dtype=np.uint8), None
+        return self.crop(rect), rect
+
+    def _draw(self, image: MatLike, x: int, y: int, overwrite: bool) -> None:
+        height, width = image.shape[:2]
+        rect = Rect(x, y, x + width, y + height)
+        for key, tile_x1, tile_y1 in self._iter_tile_keys(rect):
+            x1 = max(rect.x1, tile_x1)
+            y1 = max(rect.y1, tile_y1)
+            x2 = min(rect.x2, tile_x1 + self.tile_size)
+            y2 = min(rect.y2, tile_y1 + self.tile_size)
+            part = image[y1 - y:y2 - y, x1 - x:x2 - x]
+
+            tile = self._tiles.get(key)
+            if tile is None:
+                if not part.any():  # 不为全黑的区域分配块
+                    continue
+                tile = np.zeros((self.tile_size, self.tile_size), dtype=np.uint8)
+                self._tiles[key] = tile
+                self._owned.add(key)
+            elif key not in self._owned:
+                tile = tile.copy()
+                self._tiles[key] = tile
+                self._owned.add(key)
+
+            tile_part = tile[y1 - tile_y1:y2 - tile_y1, x1 - tile_x1:x2 - tile_x1]
+            if overwrite:
+                tile_part[:] = part
+            else:
+                cv2.bitwise_or(tile_part, part, dst=tile_part)
+
+        # 用合并区域的非零外接矩形更新画布的外接矩形
+        bx, by, bw, bh = cv2.boundingRect(image)
+        if bw > 0 and bh > 0:
+            self._extend_content_rect(Rect(x + bx, y + by, x + bx + bw, y + by + bh))
+
+    def _extend_content_rect(self, rect: Rect) -> None:
+        if self._content_rect is None:
+            self._content_rect = rect
+            return
+        self._content_rect = Rect(
+            min(self._content_rect.x1, rect.x1),
+            min(self._content_rect.y1, rect.y1),
+            max(self._content_rect.x2, rect.x2),
+            max(self._content_rect.y2, rect.y2),
+        )
+
+    def _iter_tile_keys(self, rect: Rect):
+        """
+        遍历和区域相交的块 返回 (块坐标, 块左上角横坐标, 块左上角纵坐标)
+        """
+        size = self.tile_size
+        for ty in range(rect.y1 // size, (rect.y2 - 1) // size + 1):
+            for tx in range(rect.x1 // size, (rect.x2 - 1) // size + 1):
+                yield (tx, ty), tx * size, ty * size
+
+
+def __debug_benchmark():
+    """
+    回放一条很长的录制路线 每一步把小地图合并到大地图上 并保证边缘有一个小地图的空白
+    对比 整张图扩展和复制 与 分块画布 的耗时和内存
+    """
+    import time
+
+    rng = np.random.default_rng(0)
+    mini_size = 210
+    step_cnt = 1000
+
+    # 模拟小地图 几条随机的道路
+    mini_maps = []
+    for _ in range(16):
+        mini = np.zeros((mini_size, mini_size), dtype=np.uint8)
+        for _ in range(4):
+            p1 = rng.integers(0, mini_size, 2).tolist()
+            p2 = rng.integers(0, mini_size, 2).tolist()
+            cv2.line(mini, p1, p2, 255, 8)
+        mini_maps.append(mini)
+
+    # 随机游走的路线 偏向一个方向 覆盖越来越大的区域
+    route = []
+    pos = np.array([0, 0])
+    for _ in range(step_cnt):
+        pos = pos + rng.integers(-30, 41, 2)
+        route.append(pos.tolist())
+
+    # 原来的做法 每次合并复制整张图 靠近边缘时扩展并复制整张图
+    t1 = time.perf_counter()
+    dense = np.zeros((mini_size * 3, mini_size * 3), dtype=np.uint8)
+    origin = [mini_size, mini_size]  # 路线坐标 (0, 0) 在整张图上的位置
+    for i, (rx, ry) in enumerate(route):
+        x, y = rx + origin[0], ry + origin[1]
+        dense = dense.copy()
+        dense[y:y + mini_size, x:x + mini_size] = cv2.bitwise_or(dense[y:y + mini_size, x:x + mini_size],
+                                                                 mini_maps[i % len(mini_maps)])
+        edge = mini_size // 2
+        top = mini_size if dense[:edge, :].any() else 0
+        bottom = mini_size if dense[-edge:, :].any() else 0
+        left = mini_size if dense[:, :edge].any() else 0
+        right = mini_size if dense[:, -edge:].any() else 0
+        if top or bottom or left or right:
+            expanded = np.zeros((dense.shape[0] + top + bottom, dense.shape[1] + left + right), dtype=np.uint8)
+            expanded[top:top + dense.shape[0], left:left + dense.shape[1]] = dense
+            dense = expanded
+            origin = [origin[0] + left, origin[1] + top]
+    dense_seconds = time.perf_counter() - t1
+
+    # 分块画布 保留每一步的快照用于回退
+    t1 = time.perf_counter()
+    canvas = TiledRoadCanvas()
+    for i, (rx, ry) in enumerate(route):
+        canvas = canvas.copy()
+        canvas.merge(mini_maps[i % len(mini_maps)], rx, ry)
+    tiled_seconds = time.perf_counter() - t1
+
+    t1 = time.perf_counter()
+    tiled_dense, rect = canvas.to_dense()
+    export_seconds = time.perf_counter() - t1
+
+    t1 = time.perf_counter()
+    for rx, ry in route[-100:]:
+        canvas.crop(Rect(rx - mini_size * 2, ry - mini_size * 2, rx + mini_size * 3, ry + mini_size * 3))
+    crop_ms = (time.perf_counter() - t1) * 10
+
+    print(f'{step_cnt} 步 最终大地图 {dense.shape[1]}x{dense.shape[0]}')
+    print(f'整张图: {dense_seconds:.2f}s 内存 {dense.nbytes / 1024 / 1024:.1f}MB')
+    print(f'分块画布: {tiled_seconds:.2f}s 块 {canvas.tile_cnt} 个 内存 '
+          f'{canvas.tile_cnt * canvas.tile_size ** 2 / 1024 / 1024:.1f}MB '
+          f'导出整张图 {export_seconds * 1000:.1f}ms 裁剪匹配区域 {crop_ms:.2f}ms/次')
+    same = np.array_equal(dense[origin[1] + rect.y1:origin[1] + rect.y2, origin[0] + rect.x1:origin[0] + rect.x2],
+                          tiled_dense)
+    print(f'结果一致: {same}')
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
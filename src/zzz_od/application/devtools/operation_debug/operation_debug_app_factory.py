@@ -5,9 +5,6 @@ from typing import TYPE_CHECKING
 from one_dragon.base.operation.application.application_factory import ApplicationFactory
 from one_dragon.base.operation.application_base import Application
 from zzz_od.application.devtools.operation_debug import operation_debug_const
-from zzz_od.application.devtools.operation_debug.operation_debug_app import (
-    OperationDebugApp,
-)
 from zzz_od.application.devtools.operation_debug.operation_debug_config import (
     OperationDebugConfig,
 )
@@ -23,6 +20,10 @@ class OperationDebugAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.devtools.operation_debug.operation_debug_app import (
+            OperationDebugApp,
+        )
+
         return OperationDebugApp(self.ctx)
 
     def create_config(self, instance_idx: int, group_id: str) -> OperationDebugConfig:
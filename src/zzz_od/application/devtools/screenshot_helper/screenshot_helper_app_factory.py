@@ -6,9 +6,6 @@ from one_dragon.base.operation.application.application_config import Application
 from one_dragon.base.operation.application.application_factory import ApplicationFactory
 from one_dragon.base.operation.application_base import Application
 from zzz_od.application.devtools.screenshot_helper import screenshot_helper_const
-from zzz_od.application.devtools.screenshot_helper.screenshot_helper_app import (
-    ScreenshotHelperApp,
-)
 from zzz_od.application.devtools.screenshot_helper.screenshot_helper_config import (
     ScreenshotHelperConfig,
 )
@@ -24,6 +21,10 @@ class ScreenshotHelperAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.devtools.screenshot_helper.screenshot_helper_app import (
+            ScreenshotHelperApp,
+        )
+
         return ScreenshotHelperApp(self.ctx)
 
     def create_config(
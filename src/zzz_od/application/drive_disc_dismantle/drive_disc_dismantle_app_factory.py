@@ -7,9 +7,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.drive_disc_dismantle import drive_disc_dismantle_const
-from zzz_od.application.drive_disc_dismantle.drive_disc_dismantle_app import (
-    DriveDiscDismantleApp,
-)
 from zzz_od.application.drive_disc_dismantle.drive_disc_dismantle_config import (
     DriveDiscDismantleConfig,
 )
@@ -28,6 +25,10 @@ class DriveDiscDismantleAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.drive_disc_dismantle.drive_disc_dismantle_app import (
+            DriveDiscDismantleApp,
+        )
+
         return DriveDiscDismantleApp(self.ctx)
 
     def create_config(
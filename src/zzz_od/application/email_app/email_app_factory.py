@@ -6,7 +6,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.email_app import email_app_const
-from zzz_od.application.email_app.email_app import EmailApp
 from zzz_od.application.email_app.email_run_record import EmailRunRecord
 
 if TYPE_CHECKING:
@@ -20,6 +19,8 @@ class EmailAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.email_app.email_app import EmailApp
+
         return EmailApp(self.ctx)
 
     def create_run_record(self, instance_idx: int) -> AppRunRecord:
@@ -6,9 +6,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.engagement_reward import engagement_reward_const
-from zzz_od.application.engagement_reward.engagement_reward_app import (
-    EngagementRewardApp,
-)
 from zzz_od.application.engagement_reward.engagement_reward_run_record import (
     EngagementRewardRunRecord,
 )
@@ -24,6 +21,10 @@ class EngagementRewardAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.engagement_reward.engagement_reward_app import (
+            EngagementRewardApp,
+        )
+
         return EngagementRewardApp(self.ctx)
 
     def create_run_record(self, instance_idx: int) -> AppRunRecord:
@@ -7,9 +7,6 @@ from one_dragon.base.operation.application_base import Application
 from zzz_od.application.game_config_checker.mouse_sensitivity_checker import (
     mouse_sensitivity_checker_const,
 )
-from zzz_od.application.game_config_checker.mouse_sensitivity_checker.mouse_sensitivity_checker import (
-    MouseSensitivityChecker,
-)
 
 if TYPE_CHECKING:
     from zzz_od.context.zzz_context import ZContext
@@ -22,4 +19,8 @@ class MouseSensitivityCheckerFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.game_config_checker.mouse_sensitivity_checker.mouse_sensitivity_checker import (
+            MouseSensitivityChecker,
+        )
+
         return MouseSensitivityChecker(self.ctx)
@@ -3,6 +3,7 @@ from typing import ClassVar
 import cv2
 from cv2.typing import MatLike
 
+from one_dragon.base.geometry.rectangle import Rect
 from one_dragon.utils import yolo_config_utils
 from one_dragon.yolo.detect_utils import DetectFrameResult, DetectObjectResult
 from one_dragon.yolo.yolo_utils import get_github_model_download_url
@@ -68,6 +69,7 @@ class LostVoidDetector(Yolov8Detector):
         run_time: float | None = None,
         label_list: list[str] | None = None,
         category_list: list[str] | None = None,
+        roi_list: list[Rect] | None = None,
     ) -> DetectFrameResult:
         """
         对图片进行识别；推理前先涂黑战斗头像区域
@@ -80,6 +82,7 @@ class LostVoidDetector(Yolov8Detector):
             run_time=run_time,
             label_list=label_list,
             category_list=category_list,
+            roi_list=roi_list,
         )
 
     def is_frame_with_all(self, frame_result: DetectFrameResult | None = None) -> tuple[bool, bool, bool]:
@@ -172,5 +175,62 @@ def __debug():
     print(detector.is_frame_with(frame_result, LostVoidDetector.CLASS_INTERACT))
 
 
+def __debug_roi_benchmark():
+    """
+    对比 全图识别 和 区域识别 的耗时与召回率
+    使用 .debug/images 下录制的画面 以全图识别中落在区域内的结果作为基准
+    """
+    import os
+    import time
+
+    import numpy as np
+
+    from one_dragon.utils import cv2_utils, debug_utils
+    from one_dragon.yolo.detect_utils import compute_iou
+    from zzz_od.context.zzz_context import ZContext
+
+    ctx = ZContext()
+    detector = LostVoidDetector(model_name=ctx.model_config.lost_void_det,
+                                backup_model_name=ctx.model_config.lost_void_det_backup)
+    roi_list = [Rect(0, 110, 960, 1080), Rect(960, 110, 1920, 1080)]
+
+    image_dir = debug_utils.get_debug_image_dir_path()
+    image_list = [cv2_utils.read_image(os.path.join(image_dir, i))
+                  for i in os.listdir(image_dir) if i.endswith('.png')]
+
+    full_cost: float = 0
+    roi_cost: float = 0
+    expected_cnt: int = 0
+    recall_cnt: int = 0
+    for image in image_list:
+        t1 = time.time()
+        full_result = detector.run(image)
+        t2 = time.time()
+        roi_result = detector.run(image, roi_list=roi_list)
+        t3 = time.time()
+        full_cost += t2 - t1
+        roi_cost += t3 - t2
+
+        for expected in full_result.results:
+            if not any(roi.x1 <= expected.center[0] < roi.x2 and roi.y1 <= expected.center[1] < roi.y2
+                       for roi in roi_list):
+                continue
+            expected_cnt += 1
+            for actual in roi_result.results:
+                if actual.detect_class.class_id != expected.detect_class.class_id:
+                    continue
+                iou = compute_iou(np.array([expected.x1, expected.y1, expected.x2, expected.y2]),
+                                  np.array([[actual.x1, actual.y1, actual.x2, actual.y2]]))
+                if iou[0] >= 0.5:
+                    recall_cnt += 1
+                    break
+
+    total = max(1, len(image_list))
+    print(f'图片数量 {len(image_list)} 模型动态batch {detector.onnx_input_batch_dynamic}')
+    print(f'全图识别 平均耗时 {full_cost / total * 1000:.2f}ms')
+    print(f'区域识别 平均耗时 {roi_cost / total * 1000:.2f}ms')
+    print(f'区域识别 召回率 {recall_cnt}/{expected_cnt} = {recall_cnt / max(1, expected_cnt):.2%}')
+
+
 if __name__ == '__main__':
     __debug()
@@ -11,6 +11,7 @@ from one_dragon.base.operation.operation_node import operation_node
 from one_dragon.base.operation.operation_round_result import OperationRoundResult
 from one_dragon.utils import cal_utils
 from one_dragon.utils.log_utils import log
+from one_dragon.yolo.detect_tracker import DetectTracker, DetectTrackResult
 from one_dragon.yolo.detect_utils import DetectFrameResult, DetectObjectResult
 from zzz_od.application.hollow_zero.lost_void.context.lost_void_detector import (
     LostVoidDetector,
@@ -38,6 +39,7 @@ class MoveTargetWrapper:
         self.is_mixed: bool = False  # 是否混合楼层
         self.target_name_list: list[str] = [detect_result.detect_class.class_name[5:]]
         self.target_rect_list: list[Rect] = [Rect(detect_result.x1, detect_result.y1, detect_result.x2, detect_result.y2)]
+        self.detect_result_list: list[DetectObjectResult] = [detect_result]
 
         self.leftest_target_name: str = self.target_name_list[0]  # 最左边的入口类型 也就是第一个遇到的区域
         self.entire_rect: Rect = self.target_rect_list[0]
@@ -72,6 +74,7 @@ class MoveTargetWrapper:
 
             this.target_name_list.extend(other.target_name_list)
             this.target_rect_list.extend(other.target_rect_list)
+            this.detect_result_list.extend(other.detect_result_list)
 
             leftest_entry_idx = 0
             x1 = this.target_rect_list[0].x1
@@ -152,7 +155,11 @@ class LostVoidMoveByDet(ZOperation):
         ]
 
         self.last_target_result: MoveTargetWrapper | None = None  # 最后一次识别到的目标
-        self.last_visible_target_list: list[MoveTargetWrapper] = []  # 上一次识别到的全部可见目标
+        self.target_track_id_set: set[int] = set()  # 最后一次识别到的目标 对应的跟踪ID
+
+        # 跨帧跟踪识别结果 用于保持目标一致、容忍短暂漏识别和卡住判断
+        self.tracker: DetectTracker = DetectTracker(max_missed_frames=3)
+        self.last_track_result: DetectTrackResult | None = None
         self.last_target_name: str | None = None  # 最后识别到的交互目标名称
         self.same_target_times: float = 0  # 识别到相同目标的次数
         self.total_turn_times: int = 0  # 总共转向次数
@@ -189,7 +196,60 @@ class LostVoidMoveByDet(ZOperation):
         重置卡住判断相关的状态
         """
         self.same_target_times = 0
-        self.last_visible_target_list = []
+
+    def detect_to_go(self) -> DetectFrameResult:
+        """
+        识别最后一张截图中需要前往的内容 并更新跨帧跟踪
+        """
+        frame_result = self.ctx.lost_void.detect_to_go(self.last_screenshot, screenshot_time=self.last_screenshot_time,
+                                                       ignore_list=self.ignore_entry_list)
+        self.last_track_result = self.tracker.update(frame_result)
+        return frame_result
+
+    def _reset_tracker(self) -> None:
+        """
+        画面会大幅跳变时(大角度转向、脱困) 清空跟踪的目标
+        """
+        self.tracker.reset()
+        self.last_track_result = None
+        self.target_track_id_set = set()
+
+    def _set_target(self, target: MoveTargetWrapper | None) -> None:
+        """
+        记录当前的移动目标 及其对应的跟踪ID
+        """
+        self.last_target_result = target
+        self.target_track_id_set = set()
+        if target is None or self.last_track_result is None:
+            return
+        for detect_result in target.detect_result_list:
+            track = self.last_track_result.get_track_by_result(detect_result)
+            if track is not None:
+                self.target_track_id_set.add(track.track_id)
+
+    def _is_tracked_target(self, target: MoveTargetWrapper) -> bool:
+        """
+        目标是否与上一次的移动目标 属于同一个跟踪目标
+        """
+        if len(self.target_track_id_set) == 0 or self.last_track_result is None:
+            return False
+        for detect_result in target.detect_result_list:
+            track = self.last_track_result.get_track_by_result(detect_result)
+            if track is not None and track.track_id in self.target_track_id_set:
+                return True
+        return False
+
+    def _get_coasting_target_pos(self) -> Point | None:
+        """
+        当前帧没有识别到移动目标 但跟踪仍在容忍帧数内时 返回按速度预测的目标位置
+        """
+        if self.last_track_result is None:
+            return None
+        for track_id in self.target_track_id_set:
+            track = self.last_track_result.get_track(track_id, include_coasting=True)
+            if track is not None and not track.is_visible:
+                return track.predict_center(self.last_track_result.run_time)
+        return None
 
     def _get_detected_class_names(self, frame_result: DetectFrameResult) -> list[str]:
         return [result.detect_class.class_name for result in frame_result.results]
@@ -223,8 +283,7 @@ class LostVoidMoveByDet(ZOperation):
         if not in_world:
             return self.handle_not_in_world(self.last_screenshot)
 
-        frame_result = self.ctx.lost_void.detect_to_go(self.last_screenshot, screenshot_time=self.last_screenshot_time,
-                                                       ignore_list=self.ignore_entry_list)
+        frame_result = self.detect_to_go()
         log.info('寻路节点[%s] 当前目标=%s 检测结果=%s',
                  '移动前转向', self.target_type, self._get_detected_class_summary(frame_result))
 
@@ -256,10 +315,10 @@ class LostVoidMoveByDet(ZOperation):
                 if self.lost_target_during_move_times % 5 == 0:  # 尝试脱困
                     self.stuck_state.stuck_times += 1
                     self.get_out_of_stuck()
-            self.last_target_result = None
+            self._set_target(None)
             return self.round_success(LostVoidMoveByDet.STATUS_NO_FOUND)
         self.no_target_handle_times = 0
-        self.last_target_result = target_result
+        self._set_target(target_result)
         pos = target_result.entire_rect.center
         turn = self.turn_to_target(pos)
         if turn:
@@ -272,9 +331,7 @@ class LostVoidMoveByDet(ZOperation):
     @node_from(from_name='移动前转向', status='开始移动')
     @operation_node(name='移动')
     def move_towards(self) -> OperationRoundResult:
-        frame_result: DetectFrameResult = self.ctx.lost_void.detect_to_go(
-            self.last_screenshot, screenshot_time=self.last_screenshot_time,
-            ignore_list=self.ignore_entry_list)
+        frame_result: DetectFrameResult = self.detect_to_go()
         log.info('寻路节点[%s] 当前目标=%s 检测结果=%s',
                  '移动', self.target_type, self._get_detected_class_summary(frame_result))
 
@@ -285,6 +342,12 @@ class LostVoidMoveByDet(ZOperation):
         target_result = self.get_move_target(frame_result)
 
         if target_result is None:
+            coasting_pos = self._get_coasting_target_pos()
+            if coasting_pos is not None:
+                # 单帧漏识别 按跟踪预测的位置继续移动 避免目标闪烁导致停下
+                self.turn_to_target(coasting_pos, is_moving=True)
+                return self.round_wait('目标短暂漏识别', wait_round_time=0.1)
+
             current_time = time.time()
             if self.target_lost_start_time == 0:
                 self.target_lost_start_time = current_time
@@ -320,11 +383,11 @@ class LostVoidMoveByDet(ZOperation):
 
         self.target_lost_start_time = 0
         self.no_target_handle_times = 0
-        is_stuck = self.check_stuck(frame_result, target_result)
+        is_stuck = self.check_stuck(target_result)
         if is_stuck is not None:
             return is_stuck
 
-        self.last_target_result = target_result
+        self._set_target(target_result)
         self.last_target_name = target_result.leftest_target_name
         self.turn_to_target(target_result.entire_rect.center, is_moving=True)
         self.ctx.controller.start_moving_forward()
@@ -443,8 +506,10 @@ class LostVoidMoveByDet(ZOperation):
         @return:
         """
         if self.target_type != LostVoidDetector.CLASS_ENTRY:
-            detect_result = self.ctx.lost_void.detector.get_result_by_x(frame_result, self.target_type,
-                                                                        by_max_x=self.choose_by_max_x)
+            detect_result = self.get_tracked_detect_result()
+            if detect_result is None:
+                detect_result = self.ctx.lost_void.detector.get_result_by_x(frame_result, self.target_type,
+                                                                            by_max_x=self.choose_by_max_x)
             if detect_result is not None:
                 return MoveTargetWrapper(detect_result)
             else:
@@ -459,6 +524,19 @@ class LostVoidMoveByDet(ZOperation):
 
         return None
 
+    def get_tracked_detect_result(self) -> DetectObjectResult | None:
+        """
+        当前帧中 与上一次移动目标属于同一个跟踪目标的识别结果
+        有多个同类目标时 避免按x坐标选择导致目标来回切换
+        """
+        if self.last_track_result is None:
+            return None
+        for track_id in self.target_track_id_set:
+            track = self.last_track_result.get_track(track_id)
+            if track is not None and track.label == self.target_type:
+                return track.detect_result
+        return None
+
     def get_entry_target(self, frame_result: DetectFrameResult) -> MoveTargetWrapper | None:
         """
         获取入口目标 按优先级 尽量避免混合楼层
@@ -496,6 +574,9 @@ class LostVoidMoveByDet(ZOperation):
             ]
 
         if self.last_target_result is not None:  # 优先保持与上次一致的目标
+            for item in entry_list:
+                if self._is_tracked_target(item):
+                    return item
             result = self.get_same_as_last_target(entry_list)
             if result is not None:
                 return result
@@ -509,90 +590,50 @@ class LostVoidMoveByDet(ZOperation):
         else:
             return None
 
-    def get_visible_targets(self, frame_result: DetectFrameResult) -> list[MoveTargetWrapper]:
-        """
-        获取当前画面里可用于卡住判断的全部目标
-        """
-        visible_target_list: list[MoveTargetWrapper] = []
-        for result in frame_result.results:
-            visible_target_list.append(MoveTargetWrapper(result))
-
-        return visible_target_list
-
-    def is_same_visible_target_list(
-        self,
-        last_target_list: list[MoveTargetWrapper],
-        new_target_list: list[MoveTargetWrapper],
-    ) -> tuple[bool, str]:
+    def is_all_tracks_static(self, track_result: DetectTrackResult | None) -> tuple[bool, str]:
         """
-        判断两次识别到的可见目标是否整体保持不动
+        判断当前画面的全部跟踪目标是否整体保持不动
         """
-        if len(last_target_list) == 0:
-            return False, f'上一轮无可见目标 current={len(new_target_list)}'
+        if track_result is None or len(track_result.visible_tracks) == 0:
+            return False, '当前无可见目标'
 
-        if len(last_target_list) != len(new_target_list):
-            return False, f'目标数量变化 last={len(last_target_list)} current={len(new_target_list)}'
+        if len(track_result.new_track_ids) > 0 or len(track_result.coasting_tracks) > 0 or len(track_result.removed_track_ids) > 0:
+            return False, (
+                f'目标数量变化 new={len(track_result.new_track_ids)} '
+                f'missed={len(track_result.coasting_tracks)} removed={len(track_result.removed_track_ids)}'
+            )
 
-        used_idx_set: set[int] = set()
         class_changed: bool = False
-        for new_target in new_target_list:
-            matched_idx: int | None = None
-            matched_distance: float | None = None
-            matched_last_target: MoveTargetWrapper | None = None
-
-            for idx, last_target in enumerate(last_target_list):
-                if idx in used_idx_set:
-                    continue
-
-                dis = cal_utils.distance_between(last_target.entire_rect.center, new_target.entire_rect.center)
-                if dis >= 10:
-                    continue
-
-                if matched_distance is None or dis < matched_distance:
-                    matched_idx = idx
-                    matched_distance = dis
-                    matched_last_target = last_target
-
-            if matched_idx is None:
-                return False, (
-                    f'目标未匹配 name={new_target.leftest_target_name} '
-                    f'center={new_target.entire_rect.center}'
-                )
-
-            if matched_last_target is not None and matched_last_target.leftest_target_name != new_target.leftest_target_name:
+        for track in track_result.visible_tracks:
+            if track.last_displacement >= 10:
+                return False, f'目标移动 id={track.track_id} name={track.label} center={track.center}'
+            if track.label_changed:
                 class_changed = True
 
-            used_idx_set.add(matched_idx)
-
         if class_changed:
             return True, '全部可见目标位移都在阈值内，且存在类别抖动'
         else:
             return True, '全部可见目标位移都在阈值内'
 
-    def check_stuck(self, frame_result: DetectFrameResult, new_target: MoveTargetWrapper) -> OperationRoundResult | None:
+    def check_stuck(self, new_target: MoveTargetWrapper) -> OperationRoundResult | None:
         """
         判断是否被困
         @return:
         """
-        visible_target_list = self.get_visible_targets(frame_result)
         if self.last_target_result is None or new_target is None:
             self._reset_stuck_status()
-            self.last_visible_target_list = visible_target_list
             return None
 
-        all_visible_targets_static, _ = self.is_same_visible_target_list(
-            self.last_visible_target_list,
-            visible_target_list,
-        )
+        all_visible_targets_static, _ = self.is_all_tracks_static(self.last_track_result)
 
+        visible_cnt = len(self.last_track_result.visible_tracks) if self.last_track_result is not None else 0
         if all_visible_targets_static:
-            increase_count = 0.2 if len(visible_target_list) == 1 else 1
+            increase_count = 0.2 if visible_cnt == 1 else 1
             self.same_target_times += increase_count
         else:
             self.same_target_times = 0
 
-        self.last_visible_target_list = visible_target_list
-        stuck_threshold = 5 if len(visible_target_list) == 1 else 20
+        stuck_threshold = 5 if visible_cnt == 1 else 20
 
         if self.same_target_times >= stuck_threshold:
             self.ctx.controller.stop_moving_forward()
@@ -636,10 +677,8 @@ class LostVoidMoveByDet(ZOperation):
             self.ctx.controller.move_w(press=True, press_time=forward_press_time, release=True)
 
         self.screenshot()
-        frame_result = self.ctx.lost_void.detect_to_go(
-            self.last_screenshot, screenshot_time=self.last_screenshot_time,
-            ignore_list=self.ignore_entry_list,
-        )
+        self._reset_tracker()  # 脱困后画面大幅变化
+        frame_result = self.detect_to_go()
         if self.target_type == LostVoidDetector.CLASS_INTERACT:
             return self.round_success(LostVoidMoveByDet.STATUS_NEED_DETECT)
 
@@ -716,9 +755,7 @@ class LostVoidMoveByDet(ZOperation):
         if self.stop_when_disappear:
             return self.round_success(LostVoidMoveByDet.STATUS_ARRIVAL, data=self.last_target_name)
 
-        frame_result: DetectFrameResult = self.ctx.lost_void.detect_to_go(
-            self.last_screenshot, screenshot_time=self.last_screenshot_time,
-            ignore_list=self.ignore_entry_list)
+        frame_result: DetectFrameResult = self.detect_to_go()
         if self.check_interact_stop(self.last_screenshot, frame_result):
             result = self.round_by_find_area(self.last_screenshot, '战斗画面', '按键-交互')
             if result.is_success:
@@ -737,7 +774,7 @@ class LostVoidMoveByDet(ZOperation):
         if self.last_target_result is not None:
             # 曾经识别到过 可能被血条 或者其它东西遮住了 尝试往前走一点
             self.ctx.controller.move_w(press=True, press_time=0.5, release=True)
-            self.last_target_result = None
+            self._set_target(None)
 
         # 没找到目标 转动
         self.total_turn_times += 1
@@ -745,6 +782,7 @@ class LostVoidMoveByDet(ZOperation):
             return self.round_fail(LostVoidMoveByDet.STATUS_NO_FOUND)
 
         self.ctx.controller.turn_by_distance(-200)
+        self._reset_tracker()  # 大角度转向后 之前的目标位置都不再有效
         # 识别不到目标的时候 判断是否在战斗 转动等待的时候持续识别 否则0.5秒才识别一次间隔太久 很难识别到黄光
         in_battle = self.ctx.lost_void.check_battle_encounter_in_period(0.5)
         if in_battle:
@@ -8,9 +8,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.hollow_zero.withered_domain import withered_domain_const
-from zzz_od.application.hollow_zero.withered_domain.withered_domain_app import (
-    WitheredDomainApp,
-)
 from zzz_od.application.hollow_zero.withered_domain.withered_domain_config import (
     WitheredDomainConfig,
 )
@@ -29,6 +26,10 @@ class WitheredDomainAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.hollow_zero.withered_domain.withered_domain_app import (
+            WitheredDomainApp,
+        )
+
         return WitheredDomainApp(self.ctx)
 
     def create_config(
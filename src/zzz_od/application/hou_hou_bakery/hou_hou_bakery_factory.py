@@ -6,7 +6,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.hou_hou_bakery import hou_hou_bakery_const
-from zzz_od.application.hou_hou_bakery.hou_hou_bakery_app import HouHouBakeryApp
 from zzz_od.application.hou_hou_bakery.hou_hou_bakery_run_record import (
     HouHouBakeryRunRecord,
 )
@@ -37,6 +36,8 @@ class HouHouBakeryFactory(ApplicationFactory):
         Returns:
             Application: 吼吼饼铺应用实例。
         """
+        from zzz_od.application.hou_hou_bakery.hou_hou_bakery_app import HouHouBakeryApp
+
         return HouHouBakeryApp(self.ctx)
 
     def create_run_record(self, instance_idx: int) -> AppRunRecord:
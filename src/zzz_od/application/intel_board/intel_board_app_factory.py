@@ -8,9 +8,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.intel_board import intel_board_const
-from zzz_od.application.intel_board.intel_board_app import (
-    IntelBoardApp,
-)
 from zzz_od.application.intel_board.intel_board_config import (
     IntelBoardConfig,
 )
@@ -29,6 +26,10 @@ class IntelBoardAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.intel_board.intel_board_app import (
+            IntelBoardApp,
+        )
+
         return IntelBoardApp(self.ctx)
 
     def create_config(
@@ -8,7 +8,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.life_on_line import life_on_line_const
-from zzz_od.application.life_on_line.life_on_line_app import LifeOnLineApp
 from zzz_od.application.life_on_line.life_on_line_config import LifeOnLineConfig
 from zzz_od.application.life_on_line.life_on_line_run_record import LifeOnLineRunRecord
 
@@ -23,6 +22,8 @@ class LifeOneLineAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.life_on_line.life_on_line_app import LifeOnLineApp
+
         return LifeOnLineApp(self.ctx)
 
     def create_config(
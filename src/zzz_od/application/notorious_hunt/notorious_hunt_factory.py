@@ -8,7 +8,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.notorious_hunt import notorious_hunt_const
-from zzz_od.application.notorious_hunt.notorious_hunt_app import NotoriousHuntApp
 from zzz_od.application.notorious_hunt.notorious_hunt_config import NotoriousHuntConfig
 from zzz_od.application.notorious_hunt.notorious_hunt_run_record import (
     NotoriousHuntRunRecord,
@@ -25,6 +24,10 @@ class NotoriousHuntAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.notorious_hunt.notorious_hunt_app import (
+            NotoriousHuntApp,
+        )
+
         return NotoriousHuntApp(self.ctx)
 
     def create_config(
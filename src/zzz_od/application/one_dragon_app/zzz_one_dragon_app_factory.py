@@ -5,7 +5,6 @@ from typing import TYPE_CHECKING
 from one_dragon.base.operation.application.application_factory import ApplicationFactory
 from one_dragon.base.operation.application_base import Application
 from zzz_od.application.one_dragon_app import zzz_one_dragon_app_const
-from zzz_od.application.one_dragon_app.zzz_one_dragon_app import ZOneDragonApp
 
 if TYPE_CHECKING:
     from zzz_od.context.zzz_context import ZContext
@@ -18,4 +17,6 @@ class ZzzOneDragonAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.one_dragon_app.zzz_one_dragon_app import ZOneDragonApp
+
         return ZOneDragonApp(self.ctx)
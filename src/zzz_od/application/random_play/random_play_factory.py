@@ -7,7 +7,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.random_play import random_play_const
-from zzz_od.application.random_play.random_play_app import RandomPlayApp
 from zzz_od.application.random_play.random_play_config import RandomPlayConfig
 from zzz_od.application.random_play.random_play_run_record import (
     RandomPlayRunRecord,
@@ -24,6 +23,8 @@ class RandomPlayFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.random_play.random_play_app import RandomPlayApp
+
         return RandomPlayApp(self.ctx)
 
     def create_config(
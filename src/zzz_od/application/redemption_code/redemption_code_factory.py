@@ -6,7 +6,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.redemption_code import redemption_code_const
-from zzz_od.application.redemption_code.redemption_code_app import RedemptionCodeApp
 from zzz_od.application.redemption_code.redemption_code_config import (
     RedemptionCodeConfig,
 )
@@ -25,6 +24,10 @@ class RedemptionCodeFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.redemption_code.redemption_code_app import (
+            RedemptionCodeApp,
+        )
+
         return RedemptionCodeApp(self.ctx)
 
     def create_run_record(self, instance_idx: int) -> AppRunRecord:
@@ -6,7 +6,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.ridu_weekly import ridu_weekly_const
-from zzz_od.application.ridu_weekly.ridu_weekly_app import RiduWeeklyApp
 from zzz_od.application.ridu_weekly.ridu_weekly_run_record import RiduWeeklyRunRecord
 
 if TYPE_CHECKING:
@@ -20,6 +19,8 @@ class RiduWeeklyAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.ridu_weekly.ridu_weekly_app import RiduWeeklyApp
+
         return RiduWeeklyApp(self.ctx)
 
     def create_run_record(self, instance_idx: int) -> AppRunRecord:
@@ -6,7 +6,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.scratch_card import scratch_card_const
-from zzz_od.application.scratch_card.scratch_card_app import ScratchCardApp
 from zzz_od.application.scratch_card.scratch_card_run_record import ScratchCardRunRecord
 
 if TYPE_CHECKING:
@@ -20,6 +19,8 @@ class ScratchCardFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.scratch_card.scratch_card_app import ScratchCardApp
+
         return ScratchCardApp(self.ctx)
 
     def create_run_record(self, instance_idx: int) -> AppRunRecord:
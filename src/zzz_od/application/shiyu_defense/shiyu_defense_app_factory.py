@@ -8,7 +8,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.shiyu_defense import shiyu_defense_const
-from zzz_od.application.shiyu_defense.shiyu_defense_app import ShiyuDefenseApp
 from zzz_od.application.shiyu_defense.shiyu_defense_config import ShiyuDefenseConfig
 from zzz_od.application.shiyu_defense.shiyu_defense_run_record import (
     ShiyuDefenseRunRecord,
@@ -25,6 +24,8 @@ class ShiyuDefenseAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.shiyu_defense.shiyu_defense_app import ShiyuDefenseApp
+
         return ShiyuDefenseApp(self.ctx)
 
     def create_config(
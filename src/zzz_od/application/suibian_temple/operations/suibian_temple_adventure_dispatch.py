@@ -1,24 +1,14 @@
-from enum import StrEnum
-
 from one_dragon.base.operation.operation_edge import node_from
 from one_dragon.base.operation.operation_node import operation_node
 from one_dragon.base.operation.operation_round_result import OperationRoundResult
 from one_dragon.utils.i18_utils import gt
+from zzz_od.application.suibian_temple.suibian_temple_config import (
+    SuibianTempleAdventureDispatchDuration,
+)
 from zzz_od.context.zzz_context import ZContext
 from zzz_od.operation.zzz_operation import ZOperation
 
 
-class SuibianTempleAdventureDispatchDuration(StrEnum):
-
-    MIN_3 = '3分钟'
-    MIN_15 = '15分钟'
-    HOUR_1 = '1小时'
-    HOUR_2 = '2小时'
-    HOUR_6 = '6小时'
-    HOUR_12 = '12小时'
-    HOUR_20 = '20小时'
-
-
 class SuibianTempleAdventureDispatch(ZOperation):
 
     """
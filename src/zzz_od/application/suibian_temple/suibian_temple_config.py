@@ -1,8 +1,17 @@
 from enum import StrEnum
 
 from one_dragon.base.operation.application.application_config import ApplicationConfig
-from zzz_od.application.suibian_temple.operations.suibian_temple_adventure_dispatch import \
-    SuibianTempleAdventureDispatchDuration
+
+
+class SuibianTempleAdventureDispatchDuration(StrEnum):
+
+    MIN_3 = '3分钟'
+    MIN_15 = '15分钟'
+    HOUR_1 = '1小时'
+    HOUR_2 = '2小时'
+    HOUR_6 = '6小时'
+    HOUR_12 = '12小时'
+    HOUR_20 = '20小时'
 
 
 class SuibianTempleConfig(ApplicationConfig):
@@ -7,7 +7,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.suibian_temple import suibian_temple_const
-from zzz_od.application.suibian_temple.suibian_temple_app import SuibianTempleApp
 from zzz_od.application.suibian_temple.suibian_temple_config import SuibianTempleConfig
 from zzz_od.application.suibian_temple.suibian_temple_run_record import (
     SuibianTempleRunRecord,
@@ -24,6 +23,10 @@ class SuibianTempleFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.suibian_temple.suibian_temple_app import (
+            SuibianTempleApp,
+        )
+
         return SuibianTempleApp(self.ctx)
 
     def create_config(
@@ -6,9 +6,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.trigrams_collection import trigrams_collection_const
-from zzz_od.application.trigrams_collection.trigrams_collection_app import (
-    TrigramsCollectionApp,
-)
 from zzz_od.application.trigrams_collection.trigrams_collection_record import (
     TrigramsCollectionRunRecord,
 )
@@ -24,6 +21,10 @@ class TrigramsCollectionFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.trigrams_collection.trigrams_collection_app import (
+            TrigramsCollectionApp,
+        )
+
         return TrigramsCollectionApp(self.ctx)
 
     def create_run_record(self, instance_idx: int) -> AppRunRecord:
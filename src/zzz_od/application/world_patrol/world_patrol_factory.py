@@ -7,7 +7,6 @@ from one_dragon.base.operation.application.application_factory import Applicatio
 from one_dragon.base.operation.application_base import Application
 from one_dragon.base.operation.application_run_record import AppRunRecord
 from zzz_od.application.world_patrol import world_patrol_const
-from zzz_od.application.world_patrol.world_patrol_app import WorldPatrolApp
 from zzz_od.application.world_patrol.world_patrol_config import WorldPatrolConfig
 from zzz_od.application.world_patrol.world_patrol_run_record import WorldPatrolRunRecord
 
@@ -22,6 +21,8 @@ class WorldPatrolAppFactory(ApplicationFactory):
         self.ctx: ZContext = ctx
 
     def create_application(self, instance_idx: int, group_id: str) -> Application:
+        from zzz_od.application.world_patrol.world_patrol_app import WorldPatrolApp
+
         return WorldPatrolApp(self.ctx)
 
     def create_config(
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 import threading
 from concurrent.futures import ThreadPoolExecutor, Future
 from typing import Optional, List, Union, Tuple, Callable, TYPE_CHECKING
@@ -9,7 +10,7 @@ from cv2.typing import MatLike
 from one_dragon.base.conditional_operation.state_recorder import StateRecord, StateRecorder
 from one_dragon.base.screen.screen_area import ScreenArea
 from one_dragon.utils import cv2_utils, cal_utils
-from one_dragon.utils.log_utils import log
+from one_dragon.utils.log_utils import log, log_every
 from zzz_od.auto_battle.agent_state import agent_state_checker
 from zzz_od.auto_battle.auto_battle_state import BattleStateEnum
 from zzz_od.game_data.agent import Agent, AgentEnum, AgentStateCheckWay, CommonAgentStateEnum, AgentStateDef
@@ -407,7 +408,7 @@ class AutoBattleAgentContext:
             if agent is not None:
                 return False
 
-        log.debug('当前识别不到任何角色，下一次截图强制重新识别所有角色')
+        log_every(1, logging.DEBUG, '当前识别不到任何角色，下一次截图强制重新识别所有角色')
         return True
 
     def _check_agent_in_parallel(self, screen: MatLike) -> List[Tuple[Agent, Optional[str]]]:
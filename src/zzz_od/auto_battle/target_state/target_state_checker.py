@@ -1,3 +1,4 @@
+import logging
 import re
 import time
 from typing import List, Tuple, Any
@@ -7,7 +8,7 @@ from cv2.typing import MatLike
 
 from one_dragon.base.cv_process.cv_pipeline import CvPipelineContext
 from one_dragon.utils import str_utils
-from one_dragon.utils.log_utils import log
+from one_dragon.utils.log_utils import log, log_every
 from zzz_od.context.zzz_context import ZContext
 from zzz_od.game_data.target_state import DetectionTask, TargetStateDef, TargetCheckWay
 
@@ -185,7 +186,8 @@ class TargetStateChecker:
 
         # 1. 验证输入
         if not cv_result.contours:
-            log.debug(f"状态 {state_def.state_name}: 未找到轮廓")
+            log_every(1, logging.DEBUG, "状态 %s: 未找到轮廓", state_def.state_name,
+                      key=('target_state_no_contour', state_def.state_name))
             return None if state_def.clear_on_miss else False
 
         if cv_result.mask_image is None:
@@ -195,7 +197,9 @@ class TargetStateChecker:
         # 2. 获取参数
         contour_index = state_def.check_params.get('contour_index', 0)
         if len(cv_result.contours) <= contour_index:
-            log.debug(f"状态 {state_def.state_name}: 轮廓索引 {contour_index} 越界 (共 {len(cv_result.contours)} 个轮廓)")
+            log_every(1, logging.DEBUG, "状态 %s: 轮廓索引 %d 越界 (共 %d 个轮廓)",
+                      state_def.state_name, contour_index, len(cv_result.contours),
+                      key=('target_state_contour_index', state_def.state_name))
             return None if state_def.clear_on_miss else False
 
         # 3. 计算
@@ -204,7 +208,8 @@ class TargetStateChecker:
             mask_width = cv_result.mask_image.shape[1]
 
             if mask_width == 0:
-                log.debug(f"状态 {state_def.state_name}: 遮罩宽度为0")
+                log_every(1, logging.DEBUG, "状态 %s: 遮罩宽度为0", state_def.state_name,
+                          key=('target_state_mask_width', state_def.state_name))
                 return None if state_def.clear_on_miss else False
 
             # 【核心修正】: 使用外接矩形的宽度，而不是轮廓周长
@@ -247,8 +252,9 @@ class TargetStateChecker:
             # 在这里，我们不再遍历OCR文本中的每个词，而是将整个OCR文本与候选词进行比较
             # 这更适合短语匹配
             best_match, score = str_utils.find_best_match_by_similarity(ocr_text, expected_texts, threshold)
-            log.debug(f"状态 {state_def.state_name}: OCR文本='{ocr_text}', 候选='{expected_texts}', "
-                      f"最佳匹配='{best_match}', 分数={score:.2f} (阈值 {threshold})")
+            log_every(1, logging.DEBUG, "状态 %s: OCR文本='%s', 候选='%s', 最佳匹配='%s', 分数=%.2f (阈值 %s)",
+                      state_def.state_name, ocr_text, expected_texts, best_match, score, threshold,
+                      key=('target_state_ocr', state_def.state_name))
 
             if best_match is not None:
                 return True
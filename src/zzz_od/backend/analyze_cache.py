@@ -0,0 +1,231 @@
+"""实时画面分析的合并与短时缓存。
+
+智能体和界面经常在同一秒内连续调用 analyze，每次都要截图 + 全图 OCR + 画面匹配。
+- 合并：传入 ``max_age_ms`` 时，后到的请求等待开始时间满足要求的那一次正在进行的分析；
+  不传时正在进行的分析可能用的是请求之前的截图，不合并，重新截图
+- 内容缓存：按截图内容的哈希缓存分析结果，画面没有变化时跳过 OCR 和画面匹配，在 TTL 内有效
+- 新鲜度：调用方可以用 ``max_age_ms`` 接受最近一段时间内的结果，连截图都可以省掉
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+from cv2.typing import MatLike
+
+from zzz_od.backend.schemas import AnalyzeCacheStats, AnalyzeScreenResult
+
+
+@dataclass
+class LiveAnalyzeFrame:
+    """一次实时分析的截图和结果。
+
+    Attributes:
+        image: 截图(已打码 UID);截图失败时为 None。
+        content_hash: 截图内容的哈希;截图失败时为空。
+        capture_time: 截图时间(``time.time``)。
+        result: 分析结果,``screenshot_path`` 总是 None,由调用方按需填写。
+    """
+
+    image: MatLike | None
+    content_hash: str
+    capture_time: float
+    result: AnalyzeScreenResult
+
+
+class _InFlight:
+
+    def __init__(self, start_time: float) -> None:
+        self.start_time: float = start_time
+        self.future: Future[LiveAnalyzeFrame] = Future()
+
+
+class AnalyzeCache:
+    """实时画面分析的合并与短时缓存。"""
+
+    def __init__(self, ttl_seconds: float = 2, max_entries: int = 8) -> None:
+        """初始化缓存。
+
+        Args:
+            ttl_seconds: 按内容缓存的分析结果的有效秒数;为 0 时不缓存,只合并同时到达的请求。
+            max_entries: 最多缓存的不同画面数量。
+        """
+        self.ttl_seconds: float = ttl_seconds
+        self.max_entries: int = max_entries
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, AnalyzeScreenResult]] = OrderedDict()  # {内容哈希: (缓存时间, 结果)}
+        self._latest: LiveAnalyzeFrame | None = None  # 最近一次成功的实时分析
+        self._inflight: _InFlight | None = None
+
+        self.request_cnt: int = 0
+        self.recent_hit_cnt: int = 0
+        self.collapsed_cnt: int = 0
+        self.content_hit_cnt: int = 0
+        self.compute_cnt: int = 0
+
+    @staticmethod
+    def hash_image(image: MatLike) -> str:
+        """计算截图内容的哈希。
+
+        Args:
+            image: 截图。
+
+        Returns:
+            包含尺寸的内容哈希。
+        """
+        digest = hashlib.blake2b(image.tobytes(), digest_size=16).hexdigest()
+        return f'{image.shape}:{digest}'
+
+    def get_live(
+        self,
+        compute: Callable[[], LiveAnalyzeFrame],
+        max_age_ms: int | None = None,
+    ) -> LiveAnalyzeFrame:
+        """获取一次实时分析。
+
+        - ``max_age_ms`` 内有成功的分析时直接返回
+        - 传入 ``max_age_ms``,有正在进行的分析且开始时间满足 ``max_age_ms`` 时,等待它的结果
+        - 否则在当前线程中调用 ``compute``,期间到达的传入了 ``max_age_ms`` 的请求会合并到这一次
+
+        Args:
+            compute: 截图并分析,内部应使用 ``get_by_content`` / ``put_content`` 复用内容缓存。
+            max_age_ms: 可以接受的结果最长时间(毫秒);None 时总是使用本次请求之后的截图,
+                不使用已完成的结果,也不合并正在进行的分析(它的截图可能在本次请求之前)。
+
+        Returns:
+            实时分析的截图和结果。
+        """
+        now = time.time()
+        with self._lock:
+            self.request_cnt += 1
+            latest = self._latest
+            if max_age_ms is not None and latest is not None and now - latest.capture_time <= max_age_ms / 1000:
+                self.recent_hit_cnt += 1
+                return latest
+
+            inflight = self._inflight
+            if inflight is not None and max_age_ms is not None and now - inflight.start_time <= max_age_ms / 1000:
+                self.collapsed_cnt += 1
+                leader = False
+            else:
+                inflight = _InFlight(now)
+                self._inflight = inflight
+                leader = True
+
+        if not leader:
+            return inflight.future.result()
+
+        try:
+            frame = compute()
+        except BaseException as e:
+            inflight.future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                if self._inflight is inflight:
+                    self._inflight = None
+
+        with self._lock:
+            if frame.result.success:
+                self._latest = frame
+        inflight.future.set_result(frame)
+        return frame
+
+    def get_by_content(self, content_hash: str) -> AnalyzeScreenResult | None:
+        """按截图内容获取 TTL 内缓存的分析结果。
+
+        Args:
+            content_hash: ``hash_image`` 的结果。
+
+        Returns:
+            缓存的分析结果;没有或已过期时为 None。
+        """
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.ttl_seconds:
+                self._entries.pop(content_hash)
+                return None
+            self._entries.move_to_end(content_hash)
+            self.content_hit_cnt += 1
+            return entry[1]
+
+    def put_content(self, content_hash: str, result: AnalyzeScreenResult) -> None:
+        """缓存一次完整计算的分析结果。只缓存成功的结果。
+
+        Args:
+            content_hash: ``hash_image`` 的结果。
+            result: 分析结果。
+        """
+        with self._lock:
+            self.compute_cnt += 1
+            if self.ttl_seconds <= 0 or not result.success:
+                return
+            self._entries[content_hash] = (time.time(), result)
+            self._entries.move_to_end(content_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存,画面/区域定义变化后调用,避免返回按旧定义匹配的结果。"""
+        with self._lock:
+            self._entries.clear()
+            self._latest = None
+
+    def get_stats(self) -> AnalyzeCacheStats:
+        """获取缓存统计。
+
+        Returns:
+            请求数、各类命中数和完整计算次数。
+        """
+        with self._lock:
+            return AnalyzeCacheStats(
+                ttl_seconds=self.ttl_seconds,
+                cached_entries=len(self._entries),
+                request_cnt=self.request_cnt,
+                recent_hit_cnt=self.recent_hit_cnt,
+                collapsed_cnt=self.collapsed_cnt,
+                content_hit_cnt=self.content_hit_cnt,
+                compute_cnt=self.compute_cnt,
+            )
+
+
+def __debug_concurrency():
+    """模拟多个客户端同时轮询 analyze,对比完整计算次数。"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    import numpy as np
+
+    image = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    cache = AnalyzeCache(ttl_seconds=2)
+
+    def _compute() -> LiveAnalyzeFrame:
+        content_hash = AnalyzeCache.hash_image(image)
+        result = cache.get_by_content(content_hash)
+        if result is None:
+            time.sleep(0.2)  # 模拟 OCR + 画面匹配
+            result = AnalyzeScreenResult(success=True, ocr_texts=[], screens=[], error=None)
+            cache.put_content(content_hash, result)
+        return LiveAnalyzeFrame(image=image, content_hash=content_hash, capture_time=time.time(), result=result)
+
+    t1 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for _ in range(40):
+            executor.submit(cache.get_live, _compute, max_age_ms=500)
+            time.sleep(0.02)
+    print(f'40 个请求 耗时 {time.perf_counter() - t1:.2f}s 无缓存约 {40 * 0.2 / 8:.2f}s {cache.get_stats()}')
+
+    t1 = time.perf_counter()
+    for _ in range(100):
+        AnalyzeCache.hash_image(image)
+    print(f'1080p 截图哈希 {(time.perf_counter() - t1) * 10:.2f}ms/次')
+
+
+if __name__ == '__main__':
+    __debug_concurrency()
@@ -9,10 +9,16 @@
 - ⚠️ **不能用 ``__module__`` 守卫**(与 ``operation_registry`` 不同):App 类是 import 进
   factory 模块的,定义在 ``xxx_app.py``,其 ``__module__`` 是 ``xxx.xxx_app`` 而非
   factory 模块 → 加 ``__module__`` 守卫会把所有 App 类排除(扫到 0 个)。改用 leaf 选择。
+- factory 为了延迟加载 在 ``create_application`` 内才 import App 类 模块 namespace 里没有
+  → 额外按字节码读出 ``create_application`` 内的 ``from x import Y``,用到时才导入。
 """
+import dis
 import importlib
 import inspect
 
+from one_dragon.base.operation.application.application_factory_manifest import (
+    LazyApplicationFactory,
+)
 from one_dragon.base.operation.application_base import Application
 from zzz_od.backend._doc_utils import _doc_summary
 
@@ -23,7 +29,8 @@ _ABSTRACT_APP_BASES: set[type] = {Application}
 def _app_description(factory: object) -> str:
     """扫 factory 所属模块 namespace 找 Application 子类 → docstring 摘要(去 ``:param``)。
 
-    经 factory 所属模块取 ``vars(mod)``,过滤出 ``Application`` 子类(排除 ``Application``
+    经 factory 所属模块取 ``vars(mod)``,加上 ``create_application`` 内 import 的类
+    (见 ``_create_application_imports``),过滤出 ``Application`` 子类(排除 ``Application``
     基类本身),再做 **leaf 选择**(排除被其它候选类继承的,防 import 进来的中间基类如
     ``ZApplication`` 干扰)。恰好 1 个 leaf 时返回其 ``_doc_summary``;否则返空串。
 
@@ -38,13 +45,16 @@ def _app_description(factory: object) -> str:
         应用用途描述;factory 未 import App 类(0 个)或歧义(>1 个 leaf)时返空串。
         契约测试硬卡每个注册 app 恰好扫到 1 个非空 docstring 的 App 类。
     """
+    if isinstance(factory, LazyApplicationFactory):
+        factory = factory.factory  # 清单延迟加载的工厂 需要先导入真正的工厂模块
     mod = importlib.import_module(type(factory).__module__)
-    candidates = [
-        obj for obj in vars(mod).values()
+    objs = list(vars(mod).values()) + _create_application_imports(type(factory))
+    candidates = list(dict.fromkeys(
+        obj for obj in objs
         if inspect.isclass(obj)
         and issubclass(obj, Application)
         and obj not in _ABSTRACT_APP_BASES
-    ]
+    ))
     # leaf 选择:排除被其它候选类继承的(防 import 进来的中间基类如 ZApplication 干扰)
     leaves = [
         c for c in candidates
@@ -53,3 +63,39 @@ def _app_description(factory: object) -> str:
     if len(leaves) != 1:
         return ''  # 0:factory 未 import App 类;>1:多 App 类歧义。契约测试硬卡 ==1
     return _doc_summary(leaves[0])
+
+
+def _create_application_imports(factory_cls: type) -> list[object]:
+    """factory 的 ``create_application`` 内 ``from x import Y`` 导入的对象。
+
+    按字节码读取 ``IMPORT_NAME`` / ``IMPORT_FROM`` 不需要源码;相对导入按 factory 所属包解析。
+    只在这里导入对应模块 不影响界面启动时不导入 App 模块的延迟加载。
+
+    Args:
+        factory_cls: ``ApplicationFactory`` 子类。
+
+    Returns:
+        导入的对象;没有 ``create_application`` 或模块导入失败时跳过。
+    """
+    func = getattr(factory_cls, 'create_application', None)
+    if not inspect.isfunction(func):
+        return []
+    package = factory_cls.__module__.rpartition('.')[0]
+    result: list[object] = []
+    consts: list[object] = []  # IMPORT_NAME 前的 LOAD_CONST: level, fromlist
+    module = None
+    for ins in dis.get_instructions(func):
+        if ins.opname == 'LOAD_CONST':
+            consts.append(ins.argval)
+        elif ins.opname == 'IMPORT_NAME':
+            level = consts[-2] if len(consts) >= 2 and isinstance(consts[-2], int) else 0
+            name = '.' * level + ins.argval
+            try:
+                module = importlib.import_module(name, package=package if level > 0 else None)
+            except Exception:
+                module = None
+        elif ins.opname == 'IMPORT_FROM' and module is not None:
+            obj = getattr(module, ins.argval, None)
+            if obj is not None:
+                result.append(obj)
+    return result
@@ -17,6 +17,7 @@ import threading
 import time
 from collections.abc import Callable
 from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
@@ -34,9 +35,12 @@ from one_dragon.base.operation.operation_base import OperationResult
 from one_dragon.base.screen.screen_area import ScreenArea
 from one_dragon.base.screen.screen_match import find_screen_matches
 from one_dragon.utils import cv2_utils, debug_utils, os_utils
+from one_dragon.utils.debug_image_writer import DebugImageFormat
 from one_dragon.utils.log_utils import mask_text
 from zzz_od.application.shiyu_defense import shiyu_defense_const
+from zzz_od.backend.analyze_cache import AnalyzeCache, LiveAnalyzeFrame
 from zzz_od.backend.app_registry import _app_description
+from zzz_od.backend.frame_stream import FrameStreamHub, FrameStreamSubscriber
 from zzz_od.backend.schemas import (
     AnalyzeScreenResult,
     ApplicationInfo,
@@ -61,6 +65,9 @@ if TYPE_CHECKING:
 # agent_id(主 id)→ Agent 映射;team_config 存的是 agent_id 主 id,用于查 dmg_type 推导弱点。
 _AGENT_MAP: dict[str, Agent] = {e.value.agent_id: e.value for e in AgentEnum}
 
+# analyze 截图后台写盘的最长等待秒数;OCR 通常已经覆盖了编码耗时,这里只是兜底。
+_SCREENSHOT_SAVE_TIMEOUT: float = 10
+
 
 # analyze_screen 返回的能力边界提示:本结果仅含 OCR + 模板匹配的部分识别,
 # 提醒调用方(智能体)需要全面判断画面时,补一步视觉工具 / 多模态再看。
@@ -358,27 +365,24 @@ class BackendNotReadyError(Exception):
     """
 
 
-def _save_screenshot(image: 'MatLike') -> str:
-    """将 RGB 截图以 BGR 写盘到 ``.debug/zzz_od_mcp/screenshot/``,返回绝对路径。
+def _save_screenshot(image: 'MatLike') -> Future[str]:
+    """将 RGB 截图提交到后台写入器,以 PNG 写盘到 ``.debug/zzz_od_mcp/screenshot/``。
+
+    编码在后台线程进行,调用方可以先做 OCR 等处理,需要路径时再等待结果。
+    该截图不会因为队列已满被丢弃。
 
     Args:
         image: backend ``capture`` / ``analyze`` 截到的 RGB ``ndarray``。
 
     Returns:
-        保存后的截图文件绝对路径。
-
-    Raises:
-        RuntimeError: ``cv2.imwrite`` 写盘失败时抛出。
+        写盘完成后返回截图文件绝对路径的 ``Future``;写盘失败时 ``result()`` 抛出异常。
     """
-    import cv2
-
     screenshot_dir = Path(os_utils.get_path_under_work_dir('.debug', 'zzz_od_mcp', 'screenshot'))
     screenshot_dir.mkdir(parents=True, exist_ok=True)
     img_path = screenshot_dir / f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.png"
-    bgr_image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-    if not cv2.imwrite(str(img_path), bgr_image):
-        raise RuntimeError(f'截图写盘失败: {img_path}')
-    return str(img_path)
+    return debug_utils.get_debug_image_writer().submit(
+        image, str(img_path), image_format=DebugImageFormat(), droppable=False,
+    )
 
 
 class ZzzBackendContext:
@@ -391,14 +395,19 @@ class ZzzBackendContext:
         - 任何 game 切片方法在执行前应先调用 ``_ensure_ready`` 校验。
     """
 
-    def __init__(self, ctx: ZContext) -> None:
+    def __init__(self, ctx: ZContext, analyze_cache_ttl: float = 2) -> None:
         """初始化后端 context。
 
         Args:
             ctx: 被包装的 ``ZContext`` 实例，由调用方负责构造并注入。
+            analyze_cache_ttl: 实时 analyze 按截图内容缓存结果的有效秒数；为 0 时只合并同时到达的请求。
         """
         self._ctx: ZContext = ctx
         self.run_slot: RunSlot = RunSlot(ctx)
+        # 实时 analyze 的请求合并与短时缓存
+        self.analyze_cache: AnalyzeCache = AnalyzeCache(ttl_seconds=analyze_cache_ttl)
+        # 画面推流：所有订阅者共用一个截图循环，帧来源是截图总线（已打码 UID）
+        self.frame_stream: FrameStreamHub = FrameStreamHub(self._capture_stream_frame)
 
     @property
     def ctx(self) -> ZContext:
@@ -469,10 +478,30 @@ class ZzzBackendContext:
     def capture(self) -> 'MatLike':
         """截取游戏当前画面。
 
-        通过控制器对游戏窗口进行截图，返回 RGB ``ndarray``。
+        通过控制器的截图总线对游戏窗口进行截图，返回 RGB ``ndarray``。
+
+        Returns:
+            截图图像（RGB ``MatLike``，只读，与其他订阅者共用）。
+
+        Raises:
+            BackendNotReadyError: ``ZContext`` 未就绪、游戏窗口未就绪或截图返回 None 时抛出。
+        """
+        self._ensure_ready()
+        controller = self._ctx.controller
+        if controller is None or not controller.is_game_window_ready:
+            raise BackendNotReadyError('游戏窗口未就绪')
+        # 经截图总线:与运行中的指令、画中画共用截图,同时发起的截图只截一次。
+        # 总线上的截图已经打码 UID(backend 截图供 MCP/HTTP 落盘 / 外传,不能带账号信息)。
+        frame = controller.frame_bus.get_frame()
+        if frame is None:
+            raise BackendNotReadyError('截图返回 None')
+        return frame.image
+
+    def _capture_stream_frame(self) -> 'MatLike':
+        """画面推流的帧来源:推流帧间隔内已有的截图(例如运行中的指令刚截的)直接复用,不再截图。
 
         Returns:
-            截图图像（RGB ``MatLike``）。
+            截图图像（RGB ``MatLike``，只读）。
 
         Raises:
             BackendNotReadyError: ``ZContext`` 未就绪、游戏窗口未就绪或截图返回 None 时抛出。
@@ -481,12 +510,27 @@ class ZzzBackendContext:
         controller = self._ctx.controller
         if controller is None or not controller.is_game_window_ready:
             raise BackendNotReadyError('游戏窗口未就绪')
-        image = controller.get_screenshot(independent=False)
-        if image is None:
+        frame = controller.frame_bus.get_frame(max_age=1 / self.frame_stream.max_fps)
+        if frame is None:
             raise BackendNotReadyError('截图返回 None')
-        # 打码 UID:对齐 controller.screenshot()(框架流程截图本就经 fill_uid_black 打码,
-        # backend 截图供 MCP/HTTP 落盘 / 外传,同样不能带账号信息)。
-        return controller.fill_uid_black(image)
+        return frame.image
+
+    def subscribe_frame_stream(self, fps: float, max_width: int, quality: int) -> FrameStreamSubscriber:
+        """订阅画面推流，需要在事件循环中调用。
+
+        Args:
+            fps: 帧率，超过推流上限时使用上限。
+            max_width: 最大宽度，超过推流上限时使用上限。
+            quality: JPEG 质量 1~100。
+
+        Returns:
+            订阅者；用 ``next_frame`` 获取 JPEG 帧，结束后调用 ``frame_stream.unsubscribe``。
+
+        Raises:
+            BackendNotReadyError: ``ZContext`` 未就绪时抛出。
+        """
+        self._ensure_ready()
+        return self.frame_stream.subscribe(fps=fps, max_width=max_width, quality=quality)
 
     @staticmethod
     def _resolve_screenshot(screenshot: str) -> 'tuple[MatLike | None, str]':
@@ -507,7 +551,12 @@ class ZzzBackendContext:
             resolved = debug_utils.get_debug_image_path(screenshot)
         return cv2_utils.read_image(resolved), resolved
 
-    def analyze(self, screenshot: str | None = None, save_image: bool = False) -> AnalyzeScreenResult:
+    def analyze(
+        self,
+        screenshot: str | None = None,
+        save_image: bool = False,
+        max_age_ms: int | None = None,
+    ) -> AnalyzeScreenResult:
         """分析画面:截图 + 全图 OCR + 画面匹配(精准/模糊)。
 
         screenshot 省略 → 截当前游戏画面(需游戏窗口就绪);精准命中回写
@@ -516,6 +565,10 @@ class ZzzBackendContext:
         纯名字到 ``.debug/images/<名字>.png`` 读;读不到返失败(error 带解析后完整路径)。
         **不回写**识别状态(离线 / 可能是旧图,不污染实时识别)。
 
+        实时模式经过 ``analyze_cache``:截图内容与 TTL 内分析过的画面相同时跳过 OCR 和画面匹配;
+        传入 max_age_ms 时,该时间内已有的分析结果直接返回,不再截图,
+        同时到达的请求合并为一次截图 + 分析。离线模式不缓存。
+
         save_image=True(**仅实时模式生效**)→ 把截到的内存图落盘到
         ``.debug/zzz_od_mcp/screenshot/``,路径写入 ``screenshot_path`` 返回,
         供调用方喂给 vision 复用(省掉第二次截图)。离线模式忽略(调用方本就有路径)。
@@ -524,6 +577,7 @@ class ZzzBackendContext:
             screenshot: 截图绝对路径,或 ``.debug/images`` 下的图名(不带后缀);
                 None 表示实时截当前画面。
             save_image: 实时模式下是否把截图落盘并回传路径(默认 False)。
+            max_age_ms: 实时模式下可以接受的结果最长时间(毫秒);None 表示总是使用本次请求之后的截图。
 
         Returns:
             分析结果:成功标志、OCR 文本列表、画面匹配列表、错误描述、
@@ -531,26 +585,66 @@ class ZzzBackendContext:
             vision_hint(成功时填的能力边界提示,失败时 None)。
         """
         self._ensure_ready()
-        should_save: bool = save_image and screenshot is None
-        saved_path: str | None = None
-        if screenshot is None:
-            controller = self._ctx.controller
-            if controller is None or not controller.is_game_window_ready:
-                return AnalyzeScreenResult(success=False, ocr_texts=[], screens=[], error='游戏窗口未就绪')
-            image = controller.get_screenshot(independent=False)
-            if image is None:
-                return AnalyzeScreenResult(success=False, ocr_texts=[], screens=[], error='截图失败')
-            # 打码 UID:对齐 controller.screenshot(),analyze 的 OCR / 画面匹配不依赖 UID 区域。
-            image = controller.fill_uid_black(image)
-            write_back = True
-        else:
+        if screenshot is not None:
             image, resolved = self._resolve_screenshot(screenshot)
             if image is None:
                 return AnalyzeScreenResult(success=False, ocr_texts=[], screens=[], error=f'读取截图失败: {resolved}')
-            write_back = False
+            return self._analyze_image(image)
+
+        controller = self._ctx.controller
+        if controller is None or not controller.is_game_window_ready:
+            return AnalyzeScreenResult(success=False, ocr_texts=[], screens=[], error='游戏窗口未就绪')
+
+        save_future: Future[str] | None = None
+
+        def _compute() -> LiveAnalyzeFrame:
+            nonlocal save_future
+            frame = controller.frame_bus.get_frame()
+            if frame is None:
+                return LiveAnalyzeFrame(image=None, content_hash='', capture_time=time.time(),
+                                        result=AnalyzeScreenResult(success=False, ocr_texts=[], screens=[],
+                                                                   error='截图失败'))
+            # 截图总线上的截图已经打码 UID,analyze 的 OCR / 画面匹配不依赖 UID 区域。
+            image = frame.image
+            capture_time = frame.create_time
+            if save_image:
+                save_future = _save_screenshot(image)  # 后台写盘 与下方 OCR 并行
+            content_hash = AnalyzeCache.hash_image(image)
+            result = self.analyze_cache.get_by_content(content_hash)
+            if result is None:
+                result = self._analyze_image(image)
+                self.analyze_cache.put_content(content_hash, result)
+            if result.success and result.screens and result.screens[0].is_precise:
+                self._ctx.screen_loader.update_current_screen_name(result.screens[0].screen_name)
+            return LiveAnalyzeFrame(image=image, content_hash=content_hash, capture_time=capture_time, result=result)
+
+        frame = self.analyze_cache.get_live(_compute, max_age_ms=max_age_ms)
+        result = frame.result
+        if not save_image:
+            return result
+
+        if save_future is None and frame.image is not None:
+            save_future = _save_screenshot(frame.image)  # 合并到其他请求的结果 保存共用的那张截图
+        if save_future is None:
+            return result
+        try:
+            saved_path = save_future.result(timeout=_SCREENSHOT_SAVE_TIMEOUT)
+        except Exception as e:  # noqa: BLE001 存盘失败:成功的分析也返失败,失败的分析不回传路径
+            if result.success:
+                return AnalyzeScreenResult(success=False, ocr_texts=[], screens=[], error=str(e))
+            return result
+        return replace(result, screenshot_path=saved_path)
+
+    def _analyze_image(self, image: 'MatLike') -> AnalyzeScreenResult:
+        """对一张截图做全图 OCR + 画面匹配,不回写识别状态、不落盘。
+
+        Args:
+            image: RGB 截图。
+
+        Returns:
+            分析结果;OCR / 匹配异常时返回失败,``screenshot_path`` 总是 None。
+        """
         try:
-            if should_save:
-                saved_path = _save_screenshot(image)  # 写盘失败抛错,由本 except 兜住
             # crop_first=False:与下方 find_screen_matches 内 find_area_with_detail(color_range=None)复用
             # 同一份全图 OCR 缓存(cache key 含 crop_first;True/False 不复用会触发两次全图 OCR)。
             # rect=None 时 crop_first 不影响 OCR 结果(都全图),只改 cache key。
@@ -560,12 +654,10 @@ class ZzzBackendContext:
                 for r in ocr_result_list
             ]
             screens = find_screen_matches(self._ctx, image)
-            if write_back and screens and screens[0].is_precise:
-                self._ctx.screen_loader.update_current_screen_name(screens[0].screen_name)
             return AnalyzeScreenResult(success=True, ocr_texts=ocr_texts, screens=screens, error=None,
-                                       screenshot_path=saved_path, vision_hint=_VISION_HINT)
-        except Exception as e:  # noqa: BLE001 OCR/匹配/存盘异常兜底:不回写,返失败(存盘已成功的仍回传路径排障)
-            return AnalyzeScreenResult(success=False, ocr_texts=[], screens=[], error=str(e), screenshot_path=saved_path)
+                                       vision_hint=_VISION_HINT)
+        except Exception as e:  # noqa: BLE001 OCR/匹配异常兜底:不回写,返失败
+            return AnalyzeScreenResult(success=False, ocr_texts=[], screens=[], error=str(e))
 
     def upsert_screen_area(
         self,
@@ -624,6 +716,7 @@ class ZzzBackendContext:
             screen_info = self._ctx.screen_loader.get_screen(screen_name)  # 未找到 raise
             action = screen_info.upsert_area(area)
             self._ctx.screen_loader.save_screen(screen_info)
+            self.analyze_cache.clear()  # 画面定义已变 旧的匹配结果作废
             return _area_result(True, screen_name, area_name, action, count=len(screen_info.area_list))
         except Exception as e:  # noqa: BLE001 工具层兜底,不向 MCP 透传
             return _area_result(False, screen_name, area_name, None, error=str(e),
@@ -647,6 +740,7 @@ class ZzzBackendContext:
                 return _area_result(False, screen_name, area_name, None,
                                     error=f'未找到 area: {area_name}', count=len(screen_info.area_list))
             self._ctx.screen_loader.save_screen(screen_info)
+            self.analyze_cache.clear()  # 画面定义已变 旧的匹配结果作废
             return _area_result(True, screen_name, area_name, 'deleted', count=len(screen_info.area_list))
         except Exception as e:  # noqa: BLE001 工具层兜底
             return _area_result(False, screen_name, area_name, None, error=str(e),
@@ -981,5 +1075,7 @@ class ZzzBackendContext:
 
         ``ZContext.after_app_shutdown()`` 是同步的清理流程（遥测、战斗上下文、
         框架服务等），同样通过 ``asyncio.to_thread`` 避免阻塞事件循环。
+        画面推流的截图循环依赖 ``ZContext``，需要先停止。
         """
+        await asyncio.to_thread(self.frame_stream.shutdown)
         await asyncio.to_thread(self._ctx.after_app_shutdown)
@@ -0,0 +1,472 @@
+"""画面推流：所有订阅者共用一个截图循环，按订阅者参数推送 JPEG 帧。
+
+相比客户端轮询 ``GET /game/capture``（每次都截图 + 全图 PNG 编码）：
+- 只有一个截图循环，帧率取订阅者中最高的，且不超过上限；没有订阅者时停止
+- 画面没有变化时跳过编码和推送，静止画面几乎不占用 CPU 和带宽
+- 画面每次变化分配一个序号，订阅者记录已经收到的序号，低帧率的订阅者到时间后也能收到期间的变化
+- 同一帧、相同宽度和质量的订阅者共用一次编码
+- 每个订阅者只保留最新的一帧，客户端跟不上时丢弃旧帧，不会积压
+- 帧来源是一个返回 RGB 图片的函数，测试时可以用 ``ReplayFrameSource`` 回放图片
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from contextlib import suppress
+from pathlib import Path
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from one_dragon.utils import cv2_utils
+from one_dragon.utils.log_utils import log
+from zzz_od.backend.schemas import FrameStreamStats, FrameStreamSubscriberStats
+
+_STATS_WINDOW_SECONDS = 5  # 带宽和帧率按最近几秒统计
+
+
+class ReplayFrameSource:
+    """回放图片的帧来源，用于在没有游戏窗口时测试推流。"""
+
+    def __init__(self, frames: list[MatLike] | None = None, image_dir: str | None = None, loop: bool = True) -> None:
+        """初始化回放帧来源。
+
+        Args:
+            frames: RGB 图片列表。
+            image_dir: 图片目录，按文件名顺序读取其中的 png/jpg；和 frames 二选一。
+            loop: 回放完后是否从头开始；否则一直返回最后一帧。
+        """
+        if frames is None:
+            frames = []
+            if image_dir is not None:
+                for file_path in sorted(Path(image_dir).iterdir()):
+                    if file_path.suffix.lower() not in ('.png', '.jpg', '.jpeg'):
+                        continue
+                    image = cv2_utils.read_image(str(file_path))
+                    if image is not None:
+                        frames.append(image)
+        if len(frames) == 0:
+            raise ValueError('回放帧来源没有图片')
+        self.frames: list[MatLike] = frames
+        self.loop: bool = loop
+        self._idx: int = 0
+
+    def __call__(self) -> MatLike:
+        frame = self.frames[self._idx]
+        if self._idx + 1 < len(self.frames):
+            self._idx += 1
+        elif self.loop:
+            self._idx = 0
+        return frame
+
+
+class FrameStreamSubscriber:
+    """一个推流订阅者。
+
+    推流循环在自己的线程中调用 ``offer``，帧通过事件循环交给订阅者；
+    订阅者只保留最新的一帧，上一帧还没发送时被覆盖计为丢弃。
+    """
+
+    def __init__(
+        self,
+        subscriber_id: int,
+        fps: float,
+        max_width: int,
+        quality: int,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        """初始化订阅者。
+
+        Args:
+            subscriber_id: 订阅者 ID。
+            fps: 帧率。
+            max_width: 最大宽度，超过时等比例缩小。
+            quality: JPEG 质量 1~100。
+            loop: 订阅者所在的事件循环。
+        """
+        self.subscriber_id: int = subscriber_id
+        self.fps: float = fps
+        self.max_width: int = max_width
+        self.quality: int = quality
+        self._loop: asyncio.AbstractEventLoop = loop
+        self._event: asyncio.Event = asyncio.Event()
+        self._frame: bytes | None = None
+
+        self.sent_seq: int = 0  # 已经收到的画面序号 刚订阅时为 0 会收到当前画面
+        self.last_offer_time: float = 0
+        self.connect_time: float = time.time()
+        self.offered_cnt: int = 0
+        self.sent_cnt: int = 0
+        self.dropped_cnt: int = 0
+        self.sent_bytes: int = 0
+        self._sent_history: deque[tuple[float, int]] = deque()  # 最近发送的 (时间, 字节数)
+
+    @property
+    def encode_key(self) -> tuple[int, int]:
+        """相同的编码参数共用一次编码。"""
+        return self.max_width, self.quality
+
+    def is_due(self, now: float) -> bool:
+        """是否到了该推送下一帧的时间。
+
+        Args:
+            now: 当前时间(``time.perf_counter``)。
+
+        Returns:
+            是否需要推送。
+        """
+        # 允许提前 10% 避免循环间隔的抖动导致实际帧率减半
+        return now - self.last_offer_time >= 0.9 / self.fps
+
+    def offer(self, frame: bytes, seq: int, now: float) -> None:
+        """推流线程中调用：把一帧交给订阅者。
+
+        Args:
+            frame: JPEG 字节。
+            seq: 画面序号。
+            now: 当前时间(``time.perf_counter``)。
+        """
+        self.last_offer_time = now
+        self.sent_seq = seq
+        self.offered_cnt += 1
+        with suppress(RuntimeError):  # 事件循环已经关闭
+            self._loop.call_soon_threadsafe(self._put, frame)
+
+    def _put(self, frame: bytes) -> None:
+        if self._frame is not None:
+            self.dropped_cnt += 1
+        self._frame = frame
+        self._event.set()
+
+    async def next_frame(self) -> bytes:
+        """等待下一帧。
+
+        Returns:
+            JPEG 字节。
+        """
+        while self._frame is None:
+            self._event.clear()
+            await self._event.wait()
+        frame = self._frame
+        self._frame = None
+
+        now = time.time()
+        self.sent_cnt += 1
+        self.sent_bytes += len(frame)
+        self._sent_history.append((now, len(frame)))
+        while self._sent_history and now - self._sent_history[0][0] > _STATS_WINDOW_SECONDS:
+            self._sent_history.popleft()
+        return frame
+
+    def get_stats(self) -> FrameStreamSubscriberStats:
+        """获取订阅者统计。
+
+        Returns:
+            订阅者的帧数、丢弃数和带宽统计。
+        """
+        now = time.time()
+        history = [i for i in self._sent_history if now - i[0] <= _STATS_WINDOW_SECONDS]
+        window = min(_STATS_WINDOW_SECONDS, max(now - self.connect_time, 1e-3))
+        return FrameStreamSubscriberStats(
+            subscriber_id=self.subscriber_id,
+            fps=self.fps,
+            max_width=self.max_width,
+            quality=self.quality,
+            connected_seconds=now - self.connect_time,
+            offered_cnt=self.offered_cnt,
+            sent_cnt=self.sent_cnt,
+            dropped_cnt=self.dropped_cnt,
+            pending=self._frame is not None,
+            sent_bytes=self.sent_bytes,
+            bandwidth=sum(i[1] for i in history) / window,
+            actual_fps=len(history) / window,
+        )
+
+
+class FrameStreamHub:
+    """画面推流中心：管理订阅者和共用的截图循环。"""
+
+    def __init__(
+        self,
+        frame_source: Callable[[], MatLike],
+        max_fps: float = 15,
+        max_width: int = 1920,
+        change_threshold: int = 4,
+        keepalive_seconds: float = 5,
+        retry_seconds: float = 1,
+    ) -> None:
+        """初始化推流中心。
+
+        Args:
+            frame_source: 帧来源，返回 RGB 图片；抛出异常时视为本次截图失败。
+            max_fps: 帧率上限，订阅者请求的帧率不会超过它。
+            max_width: 宽度上限，订阅者请求的宽度不会超过它。
+            change_threshold: 缩略图上像素差的最大值超过该值时视为画面有变化。
+            keepalive_seconds: 订阅者一直没有收到新画面时，每隔多少秒仍推送一帧，让客户端知道连接正常。
+            retry_seconds: 截图失败后等待多久重试。
+        """
+        self.frame_source: Callable[[], MatLike] = frame_source
+        self.max_fps: float = max_fps
+        self.max_width: int = max_width
+        self.change_threshold: int = change_threshold
+        self.keepalive_seconds: float = keepalive_seconds
+        self.retry_seconds: float = retry_seconds
+
+        self._condition = threading.Condition()
+        self._subscribers: list[FrameStreamSubscriber] = []
+        self._id_counter = itertools.count(1)
+        self._thread: threading.Thread | None = None
+        self._running: bool = False
+
+        self._last_image: MatLike | None = None
+        self._last_thumbnail: MatLike | None = None
+        self._frame_seq: int = 0  # 画面每次变化加一 对应 _last_image
+
+        self.capture_cnt: int = 0
+        self.capture_fail_cnt: int = 0
+        self.unchanged_cnt: int = 0
+        self.encode_cnt: int = 0
+        self.capture_seconds: float = 0
+        self.encode_seconds: float = 0
+
+    def subscribe(self, fps: float = 10, max_width: int = 1280, quality: int = 70) -> FrameStreamSubscriber:
+        """新增订阅者，需要在事件循环中调用。
+
+        Args:
+            fps: 帧率，超过上限时使用上限。
+            max_width: 最大宽度，超过上限时使用上限。
+            quality: JPEG 质量 1~100。
+
+        Returns:
+            订阅者，用 ``next_frame`` 获取帧，结束后需要 ``unsubscribe``。
+        """
+        subscriber = FrameStreamSubscriber(
+            subscriber_id=next(self._id_counter),
+            fps=min(max(fps, 0.1), self.max_fps),
+            max_width=min(max(max_width, 16), self.max_width),
+            quality=min(max(quality, 1), 100),
+            loop=asyncio.get_running_loop(),
+        )
+        with self._condition:
+            self._subscribers.append(subscriber)
+            if not self._running:
+                self._running = True
+                self._thread = threading.Thread(target=self._run, name='zzz_backend_frame_stream', daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+        log.info(f'画面推流 新增订阅者 {subscriber.subscriber_id} fps={subscriber.fps} '
+                 f'max_width={subscriber.max_width} quality={subscriber.quality}')
+        return subscriber
+
+    def unsubscribe(self, subscriber: FrameStreamSubscriber) -> None:
+        """移除订阅者，没有订阅者时截图循环会停止。
+
+        Args:
+            subscriber: 订阅者。
+        """
+        with self._condition:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+            self._condition.notify_all()
+        stats = subscriber.get_stats()
+        log.info(f'画面推流 订阅者 {subscriber.subscriber_id} 断开 发送 {stats.sent_cnt} 帧 '
+                 f'丢弃 {stats.dropped_cnt} 帧 共 {stats.sent_bytes / 1024 / 1024:.1f}MB')
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if len(self._subscribers) == 0:
+                    self._running = False
+                    self._thread = None
+                    self._last_image = None
+                    self._last_thumbnail = None
+                    self._frame_seq = 0
+                    return
+                subscribers = list(self._subscribers)
+            frame_start = time.perf_counter()
+            fps = max(i.fps for i in subscribers)
+
+            if not self._run_once(subscribers):
+                wait_seconds = self.retry_seconds
+            else:
+                wait_seconds = 1 / fps - (time.perf_counter() - frame_start)
+            if wait_seconds > 0:
+                with self._condition:
+                    # 有新的订阅者或订阅者都离开时提前唤醒
+                    self._condition.wait(wait_seconds)
+
+    def _run_once(self, subscribers: list[FrameStreamSubscriber]) -> bool:
+        """截图一次并推送给到时间的订阅者。
+
+        Args:
+            subscribers: 当前的订阅者。
+
+        Returns:
+            是否截图成功。
+        """
+        now = time.perf_counter()
+        due_list = [i for i in subscribers if i.is_due(now)]
+        if len(due_list) == 0:
+            return True
+
+        t1 = time.perf_counter()
+        try:
+            image = self.frame_source()
+        except Exception as e:
+            self.capture_fail_cnt += 1
+            if self.capture_fail_cnt == 1 or self.capture_fail_cnt % 100 == 0:
+                log.warning(f'画面推流 截图失败 {e} 累计 {self.capture_fail_cnt} 次')
+            return False
+        self.capture_cnt += 1
+        self.capture_seconds += time.perf_counter() - t1
+
+        if self._is_changed(image):
+            self._last_image = image
+            self._frame_seq += 1
+        else:
+            self.unchanged_cnt += 1
+
+        # 到时间的订阅者中 没有收到最新画面的 或者太久没有收到任何画面的
+        # 不只看这一次截图有没有变化 没到时间的订阅者期间错过的变化会在之后补上
+        encoded: dict[tuple[int, int], bytes] = {}
+        for subscriber in due_list:
+            if (subscriber.sent_seq >= self._frame_seq
+                    and now - subscriber.last_offer_time < self.keepalive_seconds):
+                continue
+            frame = encoded.get(subscriber.encode_key)
+            if frame is None:
+                frame = self._encode(self._last_image, subscriber.max_width, subscriber.quality)
+                if frame is None:
+                    continue
+                encoded[subscriber.encode_key] = frame
+            subscriber.offer(frame, self._frame_seq, now)
+        return True
+
+    def _is_changed(self, image: MatLike) -> bool:
+        """用缩略图比较画面是否有变化。
+
+        Args:
+            image: 新的截图。
+
+        Returns:
+            是否有变化。
+        """
+        height, width = image.shape[:2]
+        thumbnail = cv2.resize(image, (max(width // 8, 1), max(height // 8, 1)), interpolation=cv2.INTER_AREA)
+        last_thumbnail = self._last_thumbnail
+        # 和上一次有变化的画面比较 避免缓慢的变化每帧都低于阈值而一直不推送
+        if (last_thumbnail is None or last_thumbnail.shape != thumbnail.shape
+                or int(np.max(cv2.absdiff(thumbnail, last_thumbnail))) > self.change_threshold):
+            self._last_thumbnail = thumbnail
+            return True
+        return False
+
+    def _encode(self, image: MatLike, max_width: int, quality: int) -> bytes | None:
+        """缩放并编码为 JPEG。
+
+        Args:
+            image: RGB 图片。
+            max_width: 最大宽度。
+            quality: JPEG 质量。
+
+        Returns:
+            JPEG 字节；编码失败时为 None。
+        """
+        t1 = time.perf_counter()
+        if image.shape[1] > max_width:
+            height = max(round(image.shape[0] * max_width / image.shape[1]), 1)
+            image = cv2.resize(image, (max_width, height), interpolation=cv2.INTER_AREA)
+        ok, buf = cv2.imencode('.jpg', cv2.cvtColor(image, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, quality])
+        self.encode_cnt += 1
+        self.encode_seconds += time.perf_counter() - t1
+        if not ok:
+            log.warning('画面推流 图像编码失败')
+            return None
+        return buf.tobytes()
+
+    def get_stats(self) -> FrameStreamStats:
+        """获取推流统计。
+
+        Returns:
+            截图循环和各订阅者的统计。
+        """
+        with self._condition:
+            subscribers = list(self._subscribers)
+            running = self._running
+        return FrameStreamStats(
+            running=running,
+            max_fps=self.max_fps,
+            max_width=self.max_width,
+            capture_cnt=self.capture_cnt,
+            capture_fail_cnt=self.capture_fail_cnt,
+            unchanged_cnt=self.unchanged_cnt,
+            encode_cnt=self.encode_cnt,
+            avg_capture_ms=self.capture_seconds / self.capture_cnt * 1000 if self.capture_cnt > 0 else 0,
+            avg_encode_ms=self.encode_seconds / self.encode_cnt * 1000 if self.encode_cnt > 0 else 0,
+            subscribers=[i.get_stats() for i in subscribers],
+        )
+
+    def shutdown(self) -> None:
+        """移除所有订阅者并等待截图循环结束。"""
+        with self._condition:
+            self._subscribers.clear()
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5)
+
+
+def __debug_replay():
+    """
+    用回放的画面测试推流
+    3 个订阅者：正常客户端、低帧率小分辨率客户端、网络很慢的客户端
+    画面每 10 帧变化 1 帧 其余时间静止 对比 每次请求都编码 PNG 的耗时
+    """
+    rng = np.random.default_rng(0)
+    frames: list[MatLike] = []
+    for i in range(30):
+        if i % 10 == 0:
+            current = rng.integers(0, 255, (1080, 1920, 3), dtype=np.uint8)
+        frames.append(current)
+    t1 = time.perf_counter()
+    for _ in range(5):
+        cv2.imencode('.png', cv2.cvtColor(frames[0], cv2.COLOR_RGB2BGR))
+    print(f'轮询 /game/capture: 每帧 PNG 编码 {(time.perf_counter() - t1) / 5 * 1000:.1f}ms')
+
+    async def _consume(hub: FrameStreamHub, fps: float, max_width: int, delay: float, seconds: float) -> None:
+        subscriber = hub.subscribe(fps=fps, max_width=max_width)
+        end_time = time.time() + seconds
+        try:
+            while time.time() < end_time:
+                try:
+                    await asyncio.wait_for(subscriber.next_frame(), timeout=end_time - time.time())
+                except TimeoutError:
+                    break
+                await asyncio.sleep(delay)  # 模拟网络发送
+            stats = subscriber.get_stats()
+            print(f'订阅者 {stats.subscriber_id} fps={stats.fps} 宽度={stats.max_width}: 发送 {stats.sent_cnt} 帧 '
+                  f'丢弃 {stats.dropped_cnt} 帧 带宽 {stats.bandwidth / 1024:.0f}KB/s 实际帧率 {stats.actual_fps:.1f}')
+        finally:
+            hub.unsubscribe(subscriber)
+
+    async def _main() -> None:
+        hub = FrameStreamHub(ReplayFrameSource(frames), max_fps=30, keepalive_seconds=1)
+        await asyncio.gather(
+            _consume(hub, fps=30, max_width=1920, delay=0, seconds=3),
+            _consume(hub, fps=5, max_width=640, delay=0, seconds=3),
+            _consume(hub, fps=30, max_width=1920, delay=0.5, seconds=3),
+        )
+        stats = hub.get_stats()
+        print(f'推流循环: 截图 {stats.capture_cnt} 次 画面无变化 {stats.unchanged_cnt} 次 编码 {stats.encode_cnt} 次 '
+              f'平均编码 {stats.avg_encode_ms:.1f}ms')
+        hub.shutdown()
+
+    asyncio.run(_main())
+
+
+if __name__ == '__main__':
+    __debug_replay()
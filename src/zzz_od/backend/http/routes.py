@@ -1,12 +1,14 @@
 """HTTP 适配器：``/game/*`` 端点，把 ``ZzzBackendContext`` 暴露给 web/skill。
 
 本模块在后端 game 切片（``ZzzBackendContext``）之上架设一层 HTTP 传输适配：
-- ``register_http_routes`` 通过 FastMCP 的 ``custom_route`` 挂 7 个端点
-  （``window``/``capture``/``analyze``/``enter``/``status``/``stop``/``close``），与 MCP ``/mcp``
-  端点同进程共存。
-- 7 个处理器函数（``handle_game_*``）为模块级、可独立调用，便于直接测试，
+- ``register_http_routes`` 通过 FastMCP 的 ``custom_route`` 挂 10 个端点
+  （``window``/``capture``/``stream``/``stream/stats``/``analyze``/``analyze/stats``/``enter``/``status``/``stop``/``close``），
+  与 MCP ``/mcp`` 端点同进程共存。
+- 10 个处理器函数（``handle_game_*``）为模块级、可独立调用，便于直接测试，
   不依赖 MCP 协议层；``capture`` 直接回传 PNG 字节，不落盘（区别于 MCP 适配器
   的落盘返路径，避免重复的 ``_save_screenshot`` 逻辑）。
+- ``stream`` 以 multipart MJPEG 持续推送画面，所有客户端共用 backend 的一个截图循环，
+  适合需要连续观看画面的客户端，代替高频轮询 ``capture``。
 - 同步 backend 方法通过 ``asyncio.to_thread`` 放到线程池执行，避免阻塞事件循环；
   ``enter`` 走 ``backend.start_run`` 异步派发，``block=true`` 时用
   ``asyncio.wrap_future`` 阻塞到运行结束。
@@ -17,7 +19,7 @@ from dataclasses import asdict
 
 from mcp.server.fastmcp import FastMCP
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
 from zzz_od.backend.backend_context import BackendNotReadyError, ZzzBackendContext
 from zzz_od.backend.http.service_routes import register_service_routes
@@ -102,23 +104,110 @@ async def handle_game_capture(backend: ZzzBackendContext, _request: Request | No
     return Response(bytes(buf), media_type="image/png")
 
 
+def _query_number(request: Request | None, key: str, default: float) -> float:
+    """从 ``request.query_params`` 读数值,无 request / 无 key 时返 default。
+
+    Args:
+        request: Starlette 请求对象;None 时直接返 default。
+        key: query 参数名。
+        default: 缺省值。
+
+    Returns:
+        解析后的数值。
+
+    Raises:
+        ValueError: 参数不是数值时抛出。
+    """
+    if request is None:
+        return default
+    raw = request.query_params.get(key)
+    if raw is None or raw.strip() == '':
+        return default
+    return float(raw)
+
+
+async def handle_game_stream(backend: ZzzBackendContext, request: Request | None = None) -> Response:
+    """处理 ``GET /game/stream?fps=&max_width=&quality=``：以 multipart MJPEG 持续推送画面。
+
+    所有客户端共用 backend 的一个截图循环；画面没有变化时不推送新帧，
+    客户端跟不上时只保留最新的一帧。浏览器可以直接用 ``<img src="/game/stream">`` 观看。
+
+    Args:
+        backend: 提供游戏切片能力的 ``ZzzBackendContext``。
+        request: Starlette 请求对象(读 query 中的 fps / max_width / quality)。
+
+    Returns:
+        200 + ``multipart/x-mixed-replace`` 流,每个 part 是一帧 JPEG;
+        参数不是数值时返回 400,backend 未就绪时返回 503。
+    """
+    try:
+        fps = _query_number(request, 'fps', 10)
+        max_width = int(_query_number(request, 'max_width', 1280))
+        quality = int(_query_number(request, 'quality', 70))
+    except ValueError:
+        return _err("fps / max_width / quality 需要是数值", status=400)
+    try:
+        subscriber = backend.subscribe_frame_stream(fps=fps, max_width=max_width, quality=quality)
+    except BackendNotReadyError as e:
+        return _err(str(e))
+
+    async def _iter_frames():
+        try:
+            while True:
+                frame = await subscriber.next_frame()
+                yield (b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: '
+                       + str(len(frame)).encode() + b'\r\n\r\n' + frame + b'\r\n')
+        finally:
+            # 客户端断开时 Starlette 会取消生成器 在这里移除订阅者
+            backend.frame_stream.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        _iter_frames(),
+        media_type='multipart/x-mixed-replace; boundary=frame',
+        headers={'Cache-Control': 'no-cache'},
+    )
+
+
+async def handle_game_stream_stats(backend: ZzzBackendContext, _request: Request | None = None) -> Response:
+    """处理 ``GET /game/stream/stats``：返回画面推流统计 JSON。
+
+    包括截图循环的截图/跳过/编码次数,以及每个订阅者的丢帧数和带宽,
+    ``dropped_cnt`` 持续增长说明客户端或网络跟不上,应降低 fps 或 max_width。
+
+    Args:
+        backend: 提供游戏切片能力的 ``ZzzBackendContext``。
+        _request: Starlette 请求对象（本处理器不使用）。
+
+    Returns:
+        200 + ``FrameStreamStats`` 全字段 JSON。
+    """
+    return JSONResponse(asdict(backend.frame_stream.get_stats()))
+
+
 async def handle_game_analyze(backend: ZzzBackendContext, request: Request | None = None) -> Response:
     """处理 ``GET /game/analyze``：返回画面分析（截图 + OCR）结果 JSON。
 
     save_image=true(query,**仅实时模式**)→ 截图落盘并把路径放进响应 ``screenshot_path``
     (供 vision 复用,省掉第二次截图)。默认 false。
+    max_age_ms(query)→ 该时间内已有的分析结果直接返回,不再截图;默认不复用已完成的结果。
 
     Args:
         backend: 提供游戏切片能力的 ``ZzzBackendContext``。
-        request: Starlette 请求对象(读 query 中的 save_image)。
+        request: Starlette 请求对象(读 query 中的 save_image / max_age_ms)。
 
     Returns:
         200 + 分析结果 JSON(success / ocr_texts / screens / error / screenshot_path / vision_hint);
-        backend 未就绪时返回 503。决策优先看 ``screens``,散落文本看 ``ocr_texts``。
+        max_age_ms 不是数值时返回 400,backend 未就绪时返回 503。
+        决策优先看 ``screens``,散落文本看 ``ocr_texts``。
     """
+    try:
+        max_age = _query_number(request, 'max_age_ms', -1)
+    except ValueError:
+        return _err("max_age_ms 需要是数值", status=400)
+    max_age_ms = int(max_age) if max_age >= 0 else None
     try:
         save_image = _query_bool(request, 'save_image', False)
-        result = await asyncio.to_thread(backend.analyze, None, save_image)
+        result = await asyncio.to_thread(backend.analyze, None, save_image, max_age_ms)
     except BackendNotReadyError as e:
         return _err(str(e))
     return JSONResponse({
@@ -131,6 +220,21 @@ async def handle_game_analyze(backend: ZzzBackendContext, request: Request | Non
     })
 
 
+async def handle_game_analyze_stats(backend: ZzzBackendContext, _request: Request | None = None) -> Response:
+    """处理 ``GET /game/analyze/stats``：返回实时画面分析的合并与缓存统计 JSON。
+
+    ``compute_cnt`` 远小于 ``request_cnt`` 说明重复的分析请求被合并或命中了缓存。
+
+    Args:
+        backend: 提供游戏切片能力的 ``ZzzBackendContext``。
+        _request: Starlette 请求对象（本处理器不使用）。
+
+    Returns:
+        200 + ``AnalyzeCacheStats`` 全字段 JSON。
+    """
+    return JSONResponse(asdict(backend.analyze_cache.get_stats()))
+
+
 async def handle_game_enter(backend: ZzzBackendContext, request: Request | None = None) -> Response:
     """处理 ``POST /game/enter?block=``：打开并进入绝区零游戏。
 
@@ -214,7 +318,7 @@ async def handle_game_close(backend: ZzzBackendContext, _request: Request | None
 def register_http_routes(mcp: FastMCP, backend: ZzzBackendContext) -> None:
     """把 ``/game/*`` 端点挂到 FastMCP。
 
-    使用 ``custom_route``（装饰器工厂二次调用）在 Starlette 层挂载 7 个端点，
+    使用 ``custom_route``（装饰器工厂二次调用）在 Starlette 层挂载 10 个端点，
     与 MCP ``/mcp`` 同进程共存。通过闭包将 ``backend`` 注入到各 lambda 处理器。
 
     Args:
@@ -233,11 +337,26 @@ def register_http_routes(mcp: FastMCP, backend: ZzzBackendContext) -> None:
         """GET /game/capture 路由分发：委托 ``handle_game_capture``。"""
         return await handle_game_capture(backend, request)
 
+    @mcp.custom_route("/game/stream", methods=["GET"])
+    async def _game_stream(request: Request) -> Response:
+        """GET /game/stream 路由分发：委托 ``handle_game_stream``。"""
+        return await handle_game_stream(backend, request)
+
+    @mcp.custom_route("/game/stream/stats", methods=["GET"])
+    async def _game_stream_stats(request: Request) -> Response:
+        """GET /game/stream/stats 路由分发：委托 ``handle_game_stream_stats``。"""
+        return await handle_game_stream_stats(backend, request)
+
     @mcp.custom_route("/game/analyze", methods=["GET"])
     async def _game_analyze(request: Request) -> Response:
         """GET /game/analyze 路由分发：委托 ``handle_game_analyze``。"""
         return await handle_game_analyze(backend, request)
 
+    @mcp.custom_route("/game/analyze/stats", methods=["GET"])
+    async def _game_analyze_stats(request: Request) -> Response:
+        """GET /game/analyze/stats 路由分发：委托 ``handle_game_analyze_stats``。"""
+        return await handle_game_analyze_stats(backend, request)
+
     @mcp.custom_route("/game/enter", methods=["POST"])
     async def _game_enter(request: Request) -> Response:
         """POST /game/enter 路由分发：委托 ``handle_game_enter``。"""
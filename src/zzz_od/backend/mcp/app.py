@@ -180,6 +180,7 @@ def create_mcp_server(backend: ZzzBackendContext, name: str = "zzz_od") -> FastM
     def analyze_screen(
         screenshot: Annotated[str | None, Field(description="截图来源:None=实时截当前画面(需游戏在线);传路径=读该图(无需游戏在线);纯名字=读 .debug/images/<名字>.png")] = None,
         save_image: Annotated[bool, Field(description="仅实时模式:把截图落盘并回传 screenshot_path 供 vision 复用;离线模式忽略")] = False,
+        max_age_ms: Annotated[int | None, Field(description="仅实时模式:可接受的结果最长时间(毫秒),该时间内已有的分析结果直接返回;None=总是重新截图")] = None,
     ) -> AnalyzeScreenResult:
         """分析画面(截图 + OCR + 画面匹配),返回结构化结果。观察类,不改游戏状态。
 
@@ -192,6 +193,9 @@ def create_mcp_server(backend: ZzzBackendContext, name: str = "zzz_od") -> FastM
         save_image=True(**仅实时模式**)→ 把截图落盘并把路径放进 ``screenshot_path``
         返回,供 vision 复用(省掉另调 capture_game_screen)。离线模式忽略。
 
+        max_age_ms(**仅实时模式**)→ 该时间内已有的分析结果直接返回,不再截图;
+        刚操作完需要看新画面时不要传。同时到达的实时请求总会合并为一次分析。
+
         Returns:
             ``AnalyzeScreenResult``(成功标志、OCR 文本列表、画面匹配结果、错误描述、
             screenshot_path、vision_hint)。
@@ -201,7 +205,7 @@ def create_mcp_server(backend: ZzzBackendContext, name: str = "zzz_od") -> FastM
             视觉理解;需要全面判断画面时配合视觉工具 / 多模态再看(能力边界提醒,非错误)。
         """
         try:
-            return backend.analyze(screenshot, save_image)
+            return backend.analyze(screenshot, save_image, max_age_ms)
         except Exception as e:  # noqa: BLE001 工具层统一兜底，避免异常透传到 MCP 框架
             return AnalyzeScreenResult(success=False, ocr_texts=[], screens=[], error=str(e))
 
@@ -47,6 +47,29 @@ class AnalyzeScreenResult:
     vision_hint: str | None = None
 
 
+@dataclass
+class AnalyzeCacheStats:
+    """实时画面分析的合并与缓存统计。
+
+    Attributes:
+        ttl_seconds: 按截图内容缓存的有效秒数。
+        cached_entries: 当前缓存的不同画面数量。
+        request_cnt: 实时分析请求数。
+        recent_hit_cnt: 按 ``max_age_ms`` 直接返回最近结果的次数(不截图)。
+        collapsed_cnt: 合并到正在进行的分析、没有单独计算的次数。
+        content_hit_cnt: 截图内容和缓存相同、跳过 OCR 和画面匹配的次数。
+        compute_cnt: 完整执行 OCR 和画面匹配的次数。
+    """
+
+    ttl_seconds: float
+    cached_entries: int
+    request_cnt: int
+    recent_hit_cnt: int
+    collapsed_cnt: int
+    content_hit_cnt: int
+    compute_cnt: int
+
+
 @dataclass
 class WindowStatus:
     """游戏窗口状态。
@@ -220,3 +243,65 @@ class OperationListResult:
 
     operations: list[OperationInfo] = field(default_factory=list)
     failures: list[str] = field(default_factory=list)
+
+
+@dataclass
+class FrameStreamSubscriberStats:
+    """画面推流单个订阅者的统计。
+
+    Attributes:
+        subscriber_id: 订阅者 ID(进程内自增)。
+        fps: 订阅者请求的帧率(已按上限收敛)。
+        max_width: 订阅者请求的最大宽度(已按上限收敛)。
+        quality: JPEG 质量。
+        connected_seconds: 已连接秒数。
+        offered_cnt: 推流循环交给该订阅者的帧数。
+        sent_cnt: 已交给传输层发送的帧数。
+        dropped_cnt: 上一帧还没发出就被新帧覆盖的次数(反映客户端/网络跟不上)。
+        pending: 当前是否有帧在等待发送。
+        sent_bytes: 已发送字节数。
+        bandwidth: 最近几秒的发送速率(字节/秒)。
+        actual_fps: 最近几秒实际发送的帧率。
+    """
+
+    subscriber_id: int
+    fps: float
+    max_width: int
+    quality: int
+    connected_seconds: float
+    offered_cnt: int
+    sent_cnt: int
+    dropped_cnt: int
+    pending: bool
+    sent_bytes: int
+    bandwidth: float
+    actual_fps: float
+
+
+@dataclass
+class FrameStreamStats:
+    """画面推流的整体统计。
+
+    Attributes:
+        running: 截图循环是否在运行(没有订阅者时停止)。
+        max_fps: 帧率上限。
+        max_width: 宽度上限。
+        capture_cnt: 截图次数。
+        capture_fail_cnt: 截图失败次数(游戏窗口未就绪等)。
+        unchanged_cnt: 画面没有变化、跳过编码的次数。
+        encode_cnt: JPEG 编码次数(同一帧相同参数的订阅者共用一次编码)。
+        avg_capture_ms: 平均截图耗时(毫秒)。
+        avg_encode_ms: 平均编码耗时(毫秒)。
+        subscribers: 各订阅者的统计。
+    """
+
+    running: bool
+    max_fps: float
+    max_width: int
+    capture_cnt: int
+    capture_fail_cnt: int
+    unchanged_cnt: int
+    encode_cnt: int
+    avg_capture_ms: float
+    avg_encode_ms: float
+    subscribers: list[FrameStreamSubscriberStats] = field(default_factory=list)
@@ -71,7 +71,8 @@ try:
                 parent=parent,
             )
 
-            self.ctx.listen_event(ContextInstanceEventEnum.instance_active.value, self._on_instance_active_event)
+            self.ctx.listen_event(ContextInstanceEventEnum.instance_active.value, self._on_instance_active_event,
+                                  sync=True)
             self._context_event_signal: ContextEventSignal = ContextEventSignal()
             self._context_event_signal.instance_changed.connect(self._on_instance_active_signal)
 
@@ -17,11 +17,9 @@ from one_dragon_qt.widgets.setting_card.multi_push_setting_card import (
 from one_dragon_qt.widgets.setting_card.spin_box_setting_card import SpinBoxSettingCard
 from one_dragon_qt.widgets.setting_card.switch_setting_card import SwitchSettingCard
 from one_dragon_qt.widgets.vertical_scroll_interface import VerticalScrollInterface
-from zzz_od.application.suibian_temple.operations.suibian_temple_adventure_dispatch import (
-    SuibianTempleAdventureDispatchDuration,
-)
 from zzz_od.application.suibian_temple.suibian_temple_config import (
     BangbooPrice,
+    SuibianTempleAdventureDispatchDuration,
     SuibianTempleAdventureMission,
     SuibianTempleConfig,
 )
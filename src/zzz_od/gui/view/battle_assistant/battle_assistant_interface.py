@@ -360,7 +360,7 @@ class BattleAssistantInterface(AppRunInterface):
         AppRunInterface.on_interface_shown(self)
         self._init_config_cards()
         self._on_background_mode_changed(self.ctx.battle_assistant_config.background_mode)
-        self.ctx.listen_event(AutoBattleApp.EVENT_OP_LOADED, self._on_auto_op_loaded_event)
+        self.ctx.listen_event(AutoBattleApp.EVENT_OP_LOADED, self._on_auto_op_loaded_event, sync=True)
 
     def on_interface_hidden(self) -> None:
         AppRunInterface.on_interface_hidden(self)
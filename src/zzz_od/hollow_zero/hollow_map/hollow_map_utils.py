@@ -88,26 +88,29 @@ def construct_map_from_nodes(
 
     edges: dict[int, List[int]] = {}
 
+    # 只有在画面内的 可通行的节点 才有边
+    can_link: list[bool] = [
+        node.entry.can_go
+        and node.pos.x1 >= 0
+        and node.pos.y1 >= 0
+        and node.pos.x2 < ctx.project_config.screen_standard_width
+        and node.pos.y2 < ctx.project_config.screen_standard_height
+        for node in nodes
+    ]
+
+    # 相邻节点的中心距离不会超过节点大小的2倍 只需要检查附近网格中的节点
+    grid = NodeGridIndex(2 * _max_node_size(nodes))
     for i in range(len(nodes)):
-        node_1 = nodes[i]
-        if (node_1.pos.x1 < 0
-                or node_1.pos.y1 < 0
-                or node_1.pos.x2 >= ctx.project_config.screen_standard_width
-                or node_1.pos.y2 >= ctx.project_config.screen_standard_height
-        ):
+        if can_link[i]:
+            grid.add(i, nodes[i].pos)
+
+    for i in range(len(nodes)):
+        if not can_link[i]:
             continue
+        node_1 = nodes[i]
 
-        for j in range(len(nodes)):
+        for j in grid.nearby(node_1.pos):
             node_2 = nodes[j]
-            if (node_2.pos.x1 < 0
-                    or node_2.pos.y1 < 0
-                    or node_2.pos.x2 >= ctx.project_config.screen_standard_width
-                    or node_2.pos.y2 >= ctx.project_config.screen_standard_height
-            ):
-                continue
-
-            if not node_1.entry.can_go or not node_2.entry.can_go:
-                continue
 
             if _at_left(node_1, node_2):  # 1在2左边
                 if node_2.entry.entry_name in ['轨道-左']:
@@ -141,6 +144,56 @@ def construct_map_from_nodes(
     return HollowZeroMap(nodes, current_idx, edges, check_time=check_time)
 
 
+class NodeGridIndex:
+
+    def __init__(self, cell_size: int):
+        """
+        按节点中心坐标分格的网格索引
+        查找某个节点附近的节点时 只需要检查周围 3x3 个格子 不需要遍历所有节点
+        :param cell_size: 格子大小 需要不小于 两个要找的节点之间 中心的最大距离
+        """
+        self.cell_size: int = max(1, cell_size)
+        self._cells: dict[tuple[int, int], list[int]] = {}
+
+    def _cell_of(self, pos: Rect) -> tuple[int, int]:
+        center = pos.center
+        return center.x // self.cell_size, center.y // self.cell_size
+
+    def add(self, idx: int, pos: Rect) -> None:
+        """
+        加入一个节点
+        :param idx: 节点下标
+        :param pos: 节点位置
+        :return:
+        """
+        cell = self._cell_of(pos)
+        if cell not in self._cells:
+            self._cells[cell] = [idx]
+        else:
+            self._cells[cell].append(idx)
+
+    def nearby(self, pos: Rect) -> list[int]:
+        """
+        获取附近的节点
+        :param pos: 位置
+        :return: 附近的节点下标 按下标排序 与遍历所有节点的顺序一致
+        """
+        cx, cy = self._cell_of(pos)
+        result: list[int] = []
+        for x in range(cx - 1, cx + 2):
+            for y in range(cy - 1, cy + 2):
+                result.extend(self._cells.get((x, y), []))
+        result.sort()
+        return result
+
+
+def _max_node_size(nodes: list[HollowZeroMapNode]) -> int:
+    """
+    节点的最大边长
+    """
+    return max((max(node.pos.width, node.pos.height) for node in nodes), default=1)
+
+
 def _at_left(node_1: HollowZeroMapNode, node_2: HollowZeroMapNode) -> bool:
     """
     1在2左边
@@ -248,13 +301,17 @@ def merge_map(ctx: ZContext, map_list: List[HollowZeroMap]):
     nodes: List[HollowZeroMapNode] = []
     max_check_time: Optional[float] = None
 
+    # 相同位置的节点 中心距离不会超过节点大小 只需要检查附近网格中的节点
+    # 合并时节点会换成底座的范围 中心会有偏移 因此网格使用节点大小的2倍
+    grid = NodeGridIndex(2 * _max_node_size([node for m in map_list for node in m.nodes]))
+
     # 每个地图的节点取出来后去重合并
     for m in map_list:
         for node in m.nodes:
             to_merge: Optional[HollowZeroMapNode] = None
-            for existed in nodes:
-                if is_same_node_pos(node, existed):
-                    to_merge = existed
+            for idx in grid.nearby(node.pos):
+                if is_same_node_pos(node, nodes[idx]):
+                    to_merge = nodes[idx]
                     break
 
             if to_merge is not None:
@@ -274,6 +331,7 @@ def merge_map(ctx: ZContext, map_list: List[HollowZeroMap]):
                 elif to_merge.check_time < node.check_time:  # 新旧都是格子类型 新的识别时间更晚 将新的类型赋值上去
                     to_merge.entry = node.entry
             else:
+                grid.add(len(nodes), node.pos)
                 nodes.append(node)
 
         if max_check_time is None or m.check_time > max_check_time:
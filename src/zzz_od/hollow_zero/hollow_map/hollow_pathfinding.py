@@ -1,3 +1,5 @@
+from collections import deque
+
 from cv2.typing import MatLike
 from typing import Optional, List
 
@@ -45,44 +47,47 @@ def _bfs_search_map(
         visited_nodes: List[HollowZeroMapNode] = None
 ) -> None:
     """
-    使用宽度搜索 找到达地图上每一个节点的最短路径
+    使用 0-1 宽度搜索 找到达地图上每一个节点的最短路径
+    前往不需要步数的节点 代价为0 加入当前层继续搜索；前往需要步数的节点 代价为1 加入下一层
+    步数相同时 保留经过格子数量更少的路径
     :param current_map: 识别到的地图信息
     :param start_idx_list: 起始的节点下标列表：在第1次搜索时，只有当前节点；第2次搜索时，会包含第1次搜索的路径结果
     :param avoid_entry_list: 避免途经点
     :param: visited_nodes: 已经去过的节点 这些在后续再经过时不需要步数
     :return:
     """
-    bfs_queue: List[int] = []  # 当前层的节点下标
-    searched: set[int] = set()  # 已经搜索过的节点下标
+    nodes = current_map.nodes
+    node_cnt = len(nodes)
+
+    # 按下标保存的搜索状态 避免在列表中查找
+    is_start = bytearray(node_cnt)  # 起始节点 路径已经确定 不再修改
+    can_pass = bytearray(node_cnt)  # 是否可以前往
+    for idx in range(node_cnt):
+        entry = nodes[idx].entry
+        if not entry.can_go:  # 无法移动
+            continue
+        if avoid_entry_list is not None and entry.entry_name in avoid_entry_list:  # 避免途经点
+            continue
+        can_pass[idx] = 1
+
+    bfs_queue: deque[int] = deque()  # 当前层的节点下标 步数相同
     for idx in start_idx_list:
         bfs_queue.append(idx)
-        searched.add(idx)
+        is_start[idx] = 1
 
     # 宽度搜索 每层先搜索不需要移动步数的；再搜索需要移动步数的
     while len(bfs_queue) > 0:
-        next_bfs_queue: List[int] = []  # 下一层
-        bfs_idx = 0  # 遍历当前层的节点
-        while bfs_idx < len(bfs_queue):  # 注意当前层bfs_queue会不断加入不需要步数的节点 因此用这个while
-            current_idx = bfs_queue[bfs_idx]
-            current_node = current_map.nodes[current_idx]
-            searched.add(current_idx)
-            bfs_idx += 1  # 标记这个节点已经处理 下一次循环需要处理下一个节点的
-
-            if current_idx not in current_map.edges:  # 这个节点没有边 即没有可以移动的节点
-                continue
-
-            for next_idx in current_map.edges[current_idx]:  # 遍历这个节点的边 找到可以移动的节点
-                if next_idx in searched:  # 这个可以移动的节点 已经被搜索过
-                    continue
+        next_bfs_queue: deque[int] = deque()  # 下一层
+        while len(bfs_queue) > 0:  # 当前层会不断加入不需要步数的节点
+            current_idx = bfs_queue.popleft()
+            current_node = nodes[current_idx]
 
-                next_node = current_map.nodes[next_idx]
-                next_entry = next_node.entry
-
-                if not next_entry.can_go:  # 无法移动
-                    continue
-                if avoid_entry_list is not None and next_entry.entry_name in avoid_entry_list:  # 避免途经点
+            for next_idx in current_map.edges.get(current_idx, []):  # 遍历这个节点的边 找到可以移动的节点
+                if is_start[next_idx] or not can_pass[next_idx]:
                     continue
 
+                next_node = nodes[next_idx]
+                next_entry = next_node.entry
                 need_step = next_entry.need_step  # 前往这个节点是否需要步数
 
                 # 已经去过 且还是存在的节点 还是需要先路过
@@ -97,8 +102,15 @@ def _bfs_search_map(
 
                 # 根据节点类型 计算前往下一个节点的步数
                 next_step_cnt = current_node.path_step_cnt + need_step
+                next_node_cnt = current_node.path_node_cnt + 1
+                if next_node.path_step_cnt != -1 and (
+                        next_node.path_step_cnt < next_step_cnt
+                        or (next_node.path_step_cnt == next_step_cnt and next_node.path_node_cnt <= next_node_cnt)
+                ):  # 已经有更好的路径
+                    continue
+
                 # 判断这条路径上 第一个需要步数的节点是哪个 即需要点击的节点
-                if next_step_cnt <= 1 and next_entry.need_step > 0:
+                if next_step_cnt <= 1 and need_step > 0:
                     first_need_step_node = next_node
                 else:
                     first_need_step_node = current_node.path_first_need_step_node
@@ -108,20 +120,13 @@ def _bfs_search_map(
                 next_node.path_first_need_step_node = first_need_step_node
                 next_node.path_last_node = current_node
                 next_node.path_step_cnt = next_step_cnt
-                next_node.path_node_cnt = current_node.path_node_cnt + 1
-                # 构建前往下一个节点的路径
-
-                if next_step_cnt == current_node.path_step_cnt:  # 相同步数 就加入当前层 继续搜索
-                    if next_idx in bfs_queue:  # 已经在当前队列
-                        pass
-                    elif next_idx in next_bfs_queue:  # 在下一层的队列 移动
-                        next_bfs_queue.remove(next_idx)
-                        bfs_queue.append(next_idx)
-                    else:  # 都不在 放入当前的队列
-                        bfs_queue.append(next_idx)
+                next_node.path_node_cnt = next_node_cnt
+
+                # 路径变好的节点需要重新搜索 队列中残留的旧记录再次搜索时不会更新任何节点
+                if need_step == 0:  # 相同步数 就加入当前层 继续搜索
+                    bfs_queue.append(next_idx)
                 else:  # 步数增加的 就加入下一层 等待后续搜索
-                    if next_idx not in next_bfs_queue:
-                        next_bfs_queue.append(next_idx)
+                    next_bfs_queue.append(next_idx)
 
         bfs_queue = next_bfs_queue
 
@@ -260,3 +265,99 @@ def draw_map(screen: MatLike, current_map: HollowZeroMap,
         cv2.circle(to_draw,to_click.tuple(), 10, (0, 0, 255), 2)
 
     return to_draw
+
+
+def __debug_benchmark():
+    """
+    在很大的模拟空洞地图上 对比 列表实现的宽度搜索 和 0-1 宽度搜索 的耗时
+    以及 构造地图 和 合并地图 的耗时
+    """
+    import random
+    import time
+
+    from one_dragon.base.geometry.rectangle import Rect
+    from zzz_od.context.zzz_context import ZContext
+    from zzz_od.hollow_zero.game_data.hollow_zero_event import HollowZeroEntry
+    from zzz_od.hollow_zero.hollow_map import hollow_map_utils
+
+    ctx = ZContext()
+    rng = random.Random(0)
+    entry_list = [
+        HollowZeroEntry('0001 空白已通行', need_step=0),
+        HollowZeroEntry('0002 空白未通行'),
+        HollowZeroEntry('0003 危机'),
+        HollowZeroEntry('0004 邦布商人'),
+        HollowZeroEntry('0005 不可通行', can_go=False),
+    ]
+    weights = [6, 3, 1, 1, 1]  # 大部分是已经走过的空白格子
+    current_entry = HollowZeroEntry('0000 当前', need_step=0)
+    avoid = {'危机'}
+
+    def _old_bfs(current_map: HollowZeroMap, start_idx_list: list[int], avoid_entry_list: set[str] | None) -> None:
+        # 原来的做法 用列表保存队列 每次用 in 判断是否在队列中
+        bfs_queue = list(start_idx_list)
+        searched = set(start_idx_list)
+        while len(bfs_queue) > 0:
+            next_bfs_queue = []
+            bfs_idx = 0
+            while bfs_idx < len(bfs_queue):
+                current_idx = bfs_queue[bfs_idx]
+                current_node = current_map.nodes[current_idx]
+                searched.add(current_idx)
+                bfs_idx += 1
+                for next_idx in current_map.edges.get(current_idx, []):
+                    next_node = current_map.nodes[next_idx]
+                    if (next_idx in searched or not next_node.entry.can_go
+                            or (avoid_entry_list is not None and next_node.entry.entry_name in avoid_entry_list)):
+                        continue
+                    next_node.path_step_cnt = current_node.path_step_cnt + next_node.entry.need_step
+                    next_node.path_node_cnt = current_node.path_node_cnt + 1
+                    if next_node.path_step_cnt == current_node.path_step_cnt:
+                        if next_idx in bfs_queue:
+                            pass
+                        elif next_idx in next_bfs_queue:
+                            next_bfs_queue.remove(next_idx)
+                            bfs_queue.append(next_idx)
+                        else:
+                            bfs_queue.append(next_idx)
+                    elif next_idx not in next_bfs_queue:
+                        next_bfs_queue.append(next_idx)
+            bfs_queue = next_bfs_queue
+
+    cell = 20
+    for size in [10, 30, 60]:
+        nodes: list[HollowZeroMapNode] = []
+        for y in range(size):
+            for x in range(size):
+                entry = current_entry if x == size // 2 and y == size - 1 else rng.choices(entry_list, weights)[0]
+                nodes.append(HollowZeroMapNode(Rect(x * cell, y * cell, x * cell + cell, y * cell + cell), entry))
+        ctx.project_config.screen_standard_width = size * cell + 1
+        ctx.project_config.screen_standard_height = size * cell + 1
+
+        t1 = time.perf_counter()
+        current_map = hollow_map_utils.construct_map_from_nodes(ctx, nodes, time.time())
+        construct_ms = (time.perf_counter() - t1) * 1000
+
+        t1 = time.perf_counter()
+        hollow_map_utils.merge_map(ctx, [current_map, current_map])
+        merge_ms = (time.perf_counter() - t1) * 1000
+
+        current_map.init_path_related()
+        t1 = time.perf_counter()
+        _old_bfs(current_map, [current_map.current_idx], avoid)
+        old_ms = (time.perf_counter() - t1) * 1000
+        old_result = [node.path_step_cnt for node in current_map.nodes]
+
+        current_map.init_path_related()
+        t1 = time.perf_counter()
+        _bfs_search_map(current_map, [current_map.current_idx], avoid)
+        new_ms = (time.perf_counter() - t1) * 1000
+        new_result = [node.path_step_cnt for node in current_map.nodes]
+
+        diff_cnt = sum(1 for i, j in zip(old_result, new_result, strict=True) if i != j)
+        print(f'{size}x{size} 节点 {len(nodes)} 构造地图 {construct_ms:.1f}ms 合并地图 {merge_ms:.1f}ms '
+              f'列表搜索 {old_ms:.1f}ms 0-1搜索 {new_ms:.1f}ms 步数不同的节点 {diff_cnt}')
+
+
+if __name__ == '__main__':
+    __debug_benchmark()
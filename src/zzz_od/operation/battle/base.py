@@ -82,7 +82,8 @@ class BattleOpBase(ZOperation):
         return self.round_success()
 
     @node_from(from_name='加载自动战斗指令')
-    @operation_node(name='等待战斗画面加载', node_max_retry_times=60)
+    @operation_node(name='等待战斗画面加载', node_max_retry_times=60, skip_unchanged_frame=True,
+                    target_fps=1, idle_interval=2)
     def wait_battle_screen(self) -> OperationRoundResult:
         """等「战斗画面/按键-普通攻击」(可选「按键-交互」fallback)。"""
         result = self.round_by_find_area(self.last_screenshot, '战斗画面', '按键-普通攻击', retry_wait_round=1)
@@ -92,7 +93,7 @@ class BattleOpBase(ZOperation):
             result = self.round_by_find_area(self.last_screenshot, '战斗画面', '按键-交互')
             if result.is_success:
                 return self.round_success()
-        return self.round_retry(result.status, wait=1)
+        return self.round_retry(result.status)
 
     @node_from(from_name='等待战斗画面加载')
     @operation_node(name='战前移动')
@@ -59,7 +59,8 @@ class CombatSimulation(ZOperation):
         self.plan: ChargePlanItem = plan
         self.scroll_count: int = 0  # 滑动次数计数器
 
-    @operation_node(name='等待入口加载', is_start_node=True, node_max_retry_times=60)
+    @operation_node(name='等待入口加载', is_start_node=True, node_max_retry_times=60, skip_unchanged_frame=True,
+                    target_fps=1, idle_interval=2)
     def wait_entry_load(self) -> OperationRoundResult:
         result = self.round_by_find_area(self.last_screenshot, '实战模拟室', '挑战等级')
         if result.is_success:
@@ -68,7 +69,7 @@ class CombatSimulation(ZOperation):
         if self.is_in_category_screen(self.last_screenshot):
             return self.round_success(CombatSimulation.STATUS_NEED_TYPE)
 
-        return self.round_retry(wait=1)
+        return self.round_retry()
 
     @node_from(from_name='等待入口加载', status='自定义模板')
     @operation_node(name='自定义模版的返回')
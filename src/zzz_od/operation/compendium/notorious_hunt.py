@@ -103,7 +103,7 @@ class NotoriousHunt(ZOperation):
         return any(str_utils.find_by_lcs(gt(n, 'game'), ocr_result, percent=0.5) for n in names)
 
     @node_from(from_name='初始化加载')
-    @operation_node(name='等待入口加载', node_max_retry_times=60)
+    @operation_node(name='等待入口加载', node_max_retry_times=60, target_fps=1, idle_interval=2)
     def wait_entry_load(self) -> OperationRoundResult:
         r1 = self.round_by_find_area(self.last_screenshot, '恶名狩猎', '当期剩余奖励次数')
         if r1.is_success:
@@ -113,7 +113,7 @@ class NotoriousHunt(ZOperation):
         if r2.is_success:
             return self.round_success(r2.status, wait=1)  # 画面加载有延时 稍微等待
 
-        return self.round_retry(r1.status, wait=1)
+        return self.round_retry(r1.status)
 
     @node_from(from_name='等待入口加载', status='按钮-街区')
     @operation_node(name='判断副本名称')
@@ -331,7 +331,8 @@ class NotoriousHunt(ZOperation):
         return self.round_success()
 
     @node_from(from_name='加载自动战斗指令')
-    @operation_node(name='等待战斗画面加载', node_max_retry_times=60, is_start_node=False)
+    @operation_node(name='等待战斗画面加载', node_max_retry_times=60, is_start_node=False,
+                    target_fps=1, idle_interval=2)
     def wait_battle_screen(self) -> OperationRoundResult:
         result = self.round_by_find_area(self.last_screenshot, '战斗画面', '按键-普通攻击')
         if result.is_success:
@@ -341,7 +342,7 @@ class NotoriousHunt(ZOperation):
         if result.is_success:
             return self.round_success(self.plan.mission_type_name)
 
-        return self.round_retry(result.status, wait=1)
+        return self.round_retry(result.status)
 
     @node_from(from_name='等待战斗画面加载')
     @operation_node(name='战斗前移动')